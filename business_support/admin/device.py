@@ -8,6 +8,7 @@ from django.template.response import TemplateResponse
 from django.urls import reverse
 
 from business_support.models import Device
+from business_support.services.device_binding_cache import invalidate_device_bindings
 
 
 @admin.register(Device)
@@ -138,6 +139,8 @@ class DeviceAdmin(admin.ModelAdmin):
         if to_deactivate:
             ids = [obj.pk for obj in to_deactivate]
             self.model.objects.filter(pk__in=ids).update(is_active=False)
+            # queryset.update() 不触发信号，手动失效设备绑定缓存。
+            invalidate_device_bindings()
             for obj in to_deactivate:
                 obj.is_active = False
                 self.log_change(request, obj, "标记为停用（软删除）")
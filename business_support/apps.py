@@ -5,3 +5,6 @@ class BusinessSupportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'business_support'
     verbose_name = '业务支持库'
+
+    def ready(self):
+        import business_support.signals  # noqa: F401
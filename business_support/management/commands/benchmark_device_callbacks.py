@@ -0,0 +1,250 @@
+"""Benchmark IWOWN callback throughput on the sync (WSGI) and async (ASGI) paths.
+
+请先执行 generate_synthetic_population 生成带手表的合成人群；上传会真实写入体征数据，
+请只在压测库 / 本地库执行。
+
+- sync：N 个线程经 WSGI 处理器并发上传，模拟同步 gunicorn worker；
+- asgi：单个事件循环经 ASGI 处理器并发上传，阻塞工作进入回调线程池
+  （以 DEVICE_CALLBACK_EXECUTOR_WORKERS=8 等环境变量启用）。
+
+--web-threads 会在每轮上传期间用医生账号持续请求工作台，分别统计回调与网页请求延迟。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import List, Sequence, Tuple
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from business_support.models import Device
+from business_support.services.device_integrations.iwown_samples import build_historical_backlog_body
+from core.service.load_scenarios import LOAD_PERCENTILES, StepStats, default_load_host
+from core.service.synthetic_population import SYNTHETIC_DEVICE_PREFIX, SYNTHETIC_USERNAME_PREFIX
+from users.models import DoctorProfile
+
+_MODES = ("sync", "asgi")
+_SUCCESS_BODY = b"\x00"
+
+
+def _build_uploads(
+    device_ids: Sequence[str], uploads: int, records: int, seed: int, window_start
+) -> List[bytes]:
+    rng = random.Random(seed)
+    bodies = []
+    for index in range(uploads):
+        base = window_start + timedelta(minutes=index * records)
+        moments = [base + timedelta(minutes=slot) for slot in range(records)]
+        bodies.append(
+            build_historical_backlog_body(
+                device_ids[index % len(device_ids)], moments, rng, first_sequence=index * records
+            )
+        )
+    return bodies
+
+
+def _run_sync(bodies: Sequence[bytes], concurrency: int, host: str, path: str) -> Tuple[StepStats, float]:
+    stats = StepStats()
+    lock = threading.Lock()
+    queue = list(bodies)
+
+    def worker() -> None:
+        client = Client(HTTP_HOST=host)
+        try:
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    body = queue.pop()
+                started_at = time.perf_counter()
+                try:
+                    response = client.post(path, data=body, content_type="application/x-www-form-urlencoded")
+                    error = response.content != _SUCCESS_BODY
+                except Exception:
+                    error = True
+                with lock:
+                    stats.durations_ms.append((time.perf_counter() - started_at) * 1000)
+                    stats.errors += int(error)
+        finally:
+            connections.close_all()
+
+    started_at = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started_at
+
+
+def _run_asgi(bodies: Sequence[bytes], concurrency: int, host: str, path: str) -> Tuple[StepStats, float]:
+    stats = StepStats()
+
+    async def upload(client: AsyncClient, semaphore: asyncio.Semaphore, body: bytes) -> None:
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                # ASGIHandler 为每个请求建立独立的线程敏感上下文，这里保持一致。
+                async with ThreadSensitiveContext():
+                    response = await client.post(
+                        path, data=body, content_type="application/x-www-form-urlencoded"
+                    )
+                error = response.content != _SUCCESS_BODY
+            except Exception:
+                error = True
+            stats.durations_ms.append((time.perf_counter() - started_at) * 1000)
+            stats.errors += int(error)
+
+    async def main() -> None:
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(upload(client, semaphore, body) for body in bodies))
+
+    # AsyncClient 固定以 testserver 作为 Host 头，压测期间临时放行。
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, host, "testserver"]):
+        started_at = time.perf_counter()
+        asyncio.run(main())
+        elapsed = time.perf_counter() - started_at
+    connections.close_all()
+    return stats, elapsed
+
+
+class _WebTraffic:
+    """后台线程持续请求医生工作台，统计上传期间的网页请求延迟。"""
+
+    def __init__(self, threads: int, host: str, doctor_user) -> None:
+        self.stats = StepStats()
+        self._threads = threads
+        self._host = host
+        self._doctor_user = doctor_user
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    def _run(self) -> None:
+        client = Client(HTTP_HOST=self._host)
+        client.force_login(self._doctor_user)
+        path = reverse("web_doctor:doctor_workspace")
+        try:
+            while not self._stop.is_set():
+                started_at = time.perf_counter()
+                try:
+                    error = client.get(path).status_code != 200
+                except Exception:
+                    error = True
+                with self._lock:
+                    self.stats.durations_ms.append((time.perf_counter() - started_at) * 1000)
+                    self.stats.errors += int(error)
+        finally:
+            connections.close_all()
+
+    def __enter__(self) -> "_WebTraffic":
+        self._workers = [threading.Thread(target=self._run) for _ in range(self._threads)]
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        for worker in self._workers:
+            worker.join()
+
+
+class Command(BaseCommand):
+    help = "Benchmark IWOWN pb upload throughput through the sync and ASGI callback paths."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--uploads", type=int, default=200, help="Uploads per mode.")
+        parser.add_argument("--records", type=int, default=12, help="History records per upload.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Concurrent uploads.")
+        parser.add_argument(
+            "--mode",
+            action="append",
+            dest="modes",
+            choices=_MODES,
+            help="Path to benchmark; repeat for both. Defaults to sync and asgi.",
+        )
+        parser.add_argument(
+            "--web-threads",
+            type=int,
+            default=0,
+            help="Threads requesting the doctor workspace while uploads run.",
+        )
+        parser.add_argument("--host", default=None, help="Host header; must be in ALLOWED_HOSTS.")
+        parser.add_argument("--seed", type=int, default=2024)
+
+    def handle(self, *args, **options) -> None:
+        if options["uploads"] <= 0 or options["records"] <= 0 or options["concurrency"] <= 0:
+            raise CommandError("--uploads, --records and --concurrency must be positive.")
+        device_ids = list(
+            Device.objects.filter(
+                sn__startswith=SYNTHETIC_DEVICE_PREFIX, current_patient__isnull=False
+            ).values_list("imei", flat=True)
+        )
+        if not device_ids:
+            raise CommandError("缺少合成手表，请先执行 generate_synthetic_population。")
+        doctor = None
+        if options["web_threads"] > 0:
+            doctor = (
+                DoctorProfile.objects.filter(user__username__startswith=SYNTHETIC_USERNAME_PREFIX)
+                .select_related("user")
+                .first()
+            )
+            if doctor is None:
+                raise CommandError("缺少合成医生账号，无法生成网页流量。")
+        if connection.vendor == "sqlite" and options["concurrency"] > 1:
+            self.stderr.write(
+                self.style.WARNING(
+                    "SQLite serialises writers; concurrent uploads may fail with "
+                    "'database is locked'. Use --concurrency 1 or a MySQL stand-in."
+                )
+            )
+
+        host = options["host"] or default_load_host()
+        path = reverse("iwown_health_data_upload")
+        modes = options.get("modes") or list(_MODES)
+        # 每种模式使用不同的测量时间窗口，避免后一轮因去重而跳过入库。
+        window = timedelta(minutes=options["uploads"] * options["records"])
+        window_start = timezone.localtime() - window * (len(modes) + 1)
+        runners = {"sync": _run_sync, "asgi": _run_asgi}
+
+        for index, mode in enumerate(modes):
+            bodies = _build_uploads(
+                device_ids,
+                options["uploads"],
+                options["records"],
+                options["seed"] + index,
+                window_start + window * index,
+            )
+            web = _WebTraffic(options["web_threads"], host, doctor.user) if doctor else nullcontext()
+            with web:
+                stats, elapsed = runners[mode](bodies, options["concurrency"], host, path)
+            self._write_report(
+                mode, stats, elapsed, options["records"], web.stats if doctor else None
+            )
+
+    def _write_report(self, mode, stats: StepStats, elapsed: float, records: int, web_stats) -> None:
+        summary = stats.summary()
+        uploads = summary["count"]
+        latency = " ".join(f"p{percentile}={summary[f'p{percentile}_ms']}ms" for percentile in LOAD_PERCENTILES)
+        self.stdout.write(
+            f"{mode}: {uploads} upload(s), {summary['errors']} error(s), "
+            f"{uploads / elapsed:.1f} uploads/s, {uploads * records / elapsed:.0f} records/s, {latency}"
+        )
+        if web_stats is not None:
+            web = web_stats.summary()
+            web_latency = " ".join(f"p{percentile}={web[f'p{percentile}_ms']}ms" for percentile in LOAD_PERCENTILES)
+            self.stdout.write(f"  web during {mode}: {web['count']} request(s), {web['errors']} error(s), {web_latency}")
+        style = self.style.SUCCESS if not summary["errors"] else self.style.WARNING
+        self.stdout.write(style(f"  {mode} done in {elapsed:.2f}s."))
@@ -0,0 +1,100 @@
+"""Microbenchmark IWOWN pb upload decoding over representative sample packets.
+
+只测解析（IwownHealthDataAdapter.parse_body），不写数据库；
+输出各类样本报文的每秒解析记录数，可用 --min-records-per-second 作为回归门槛。
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from business_support.services.device_integrations.iwown import IwownHealthDataAdapter
+from business_support.services.device_integrations.iwown_samples import (
+    build_historical_backlog_body,
+    build_historical_health_packet,
+    build_iwown_body,
+    build_realtime_steps_packet,
+    build_third_party_scale_packet,
+)
+
+_DEVICE_ID = "860132060870000"
+
+
+class Command(BaseCommand):
+    help = "Benchmark IWOWN health upload decoding and report records per second."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--records",
+            type=int,
+            default=2000,
+            help="History records in the backlog sample upload.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=2024)
+        parser.add_argument(
+            "--min-records-per-second",
+            type=float,
+            default=0,
+            help="Fail when the backlog sample decodes slower than this.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["records"] <= 0 or options["repeat"] <= 0:
+            raise CommandError("--records and --repeat must be positive.")
+
+        rng = random.Random(options["seed"])
+        start = timezone.localtime() - timedelta(days=2)
+        moments = [start + timedelta(minutes=index) for index in range(options["records"])]
+        samples = {
+            "historical_backlog": build_historical_backlog_body(_DEVICE_ID, moments, rng),
+            "third_party_scale": build_iwown_body(
+                _DEVICE_ID,
+                (
+                    build_third_party_scale_packet(moment, index, rng)
+                    for index, moment in enumerate(moments[:200])
+                ),
+            ),
+            "mixed_callback": build_iwown_body(
+                _DEVICE_ID,
+                [
+                    build_realtime_steps_packet(moments[0], 5432),
+                    build_historical_health_packet(moments[1], 1, rng),
+                    build_third_party_scale_packet(moments[2], 2, rng),
+                ],
+            ),
+        }
+
+        adapter = IwownHealthDataAdapter()
+        backlog_rate = None
+        for name, body in samples.items():
+            payload = adapter.parse_body(body)
+            reading_count = len(payload.readings)
+            packet_count = len(payload.raw_payload["packet_options"])
+            iterations = max(1, 5000 // max(packet_count, 1))
+            best = None
+            for _ in range(options["repeat"]):
+                started_at = time.perf_counter()
+                for _ in range(iterations):
+                    adapter.parse_body(body)
+                elapsed = (time.perf_counter() - started_at) / iterations
+                best = elapsed if best is None else min(best, elapsed)
+            records_per_second = packet_count / best
+            if name == "historical_backlog":
+                backlog_rate = records_per_second
+            self.stdout.write(
+                f"{name:<20} {len(body):>9} bytes  {packet_count:>6} records  "
+                f"{reading_count:>6} readings  {best * 1000:>9.3f} ms/upload  "
+                f"{records_per_second:>10.0f} records/s"
+            )
+
+        minimum = options["min_records_per_second"]
+        if minimum and backlog_rate < minimum:
+            raise CommandError(
+                f"historical_backlog decoded {backlog_rate:.0f} records/s, below {minimum:.0f}."
+            )
@@ -0,0 +1,65 @@
+"""Find archived device callback bodies by SHA-256 and replay them into ingestion.
+
+日志里的 post_body_sha256（可用前缀）即归档检索键；默认只解析并打印读数，
+加 --commit 才真正调用 DeviceMetricIngestionService 入库（回执去重仍然生效）。
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from business_support.services.device_integrations.base import DeviceCallbackParseError
+from business_support.services.device_integrations.payload_archive import iter_archived_payloads
+from business_support.services.device_integrations.registry import get_device_provider_adapter
+from health_data.services.device_metric_ingestion import DeviceMetricIngestionService
+
+# 仅这些端点的报文携带体征读数，其余（设备信息、告警）只能查看。
+_REPLAYABLE_ENDPOINTS = frozenset({"pb/upload", "deviceupload"})
+_MIN_PREFIX_LENGTH = 8
+
+
+class Command(BaseCommand):
+    help = "Replay archived raw device callback bodies into health metric ingestion."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("sha256", help="Body SHA-256 or a prefix of at least 8 characters.")
+        parser.add_argument("--dir", default=None, help="Archive directory; defaults to DEVICE_PAYLOAD_ARCHIVE_DIR.")
+        parser.add_argument("--commit", action="store_true", help="Ingest the readings instead of a dry run.")
+
+    def handle(self, *args, **options) -> None:
+        sha256 = options["sha256"].strip().lower()
+        if len(sha256) < _MIN_PREFIX_LENGTH:
+            raise CommandError(f"SHA-256 prefix must be at least {_MIN_PREFIX_LENGTH} characters.")
+        directory = Path(options["dir"]) if options["dir"] else None
+
+        found = 0
+        for payload in iter_archived_payloads(sha256, directory=directory):
+            found += 1
+            self.stdout.write(
+                f"{payload.sha256} {payload.provider} {payload.endpoint} "
+                f"{payload.received_at} {payload.body_bytes} byte(s) [{payload.segment}]"
+            )
+            if payload.truncated:
+                self.stderr.write(self.style.WARNING("  body was truncated when archived; skipped."))
+                continue
+            if payload.endpoint not in _REPLAYABLE_ENDPOINTS:
+                self.stdout.write("  endpoint carries no readings; nothing to replay.")
+                continue
+            try:
+                parsed = get_device_provider_adapter(payload.provider).parse_body(payload.body)
+            except (DeviceCallbackParseError, ValueError) as exc:
+                self.stderr.write(self.style.ERROR(f"  parse failed: {exc}"))
+                continue
+            self.stdout.write(f"  {len(parsed.readings)} reading(s)")
+            if options["commit"]:
+                result = DeviceMetricIngestionService.ingest_readings(parsed.readings)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"  created {result.created_count}, skipped {result.skipped_count}"
+                    )
+                )
+
+        if not found:
+            raise CommandError(f"No archived payload matches {sha256}.")
@@ -0,0 +1,210 @@
+"""设备绑定解析缓存：(厂商编码, 设备号) → 设备 ID / 当前患者 / 启用状态。
+
+设备回调每条读数都要把厂商设备号解析为设备与患者；绑定关系只在绑定、解绑、
+停用与厂商配置变更时改变。本模块提供两级缓存：
+
+- 进程内字典，命中时不访问 Redis 与数据库；
+- Redis（Django cache）中的共享条目，按全局版本号分区，新进程无需回源即可复用；
+- 未登记的设备号同样缓存（负缓存），未入库手表的厂商噪声不会打到 MySQL。
+
+Device / DeviceProvider 保存、删除时由信号递增版本号；进程每隔
+DEVICE_BINDING_VERSION_CHECK_INTERVAL_SECONDS 秒比对一次版本号，版本变化即丢弃本地条目。
+缓存只用于快速路由与拒绝，入库时仍以加锁读取的设备行为准。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from business_support.models import Device, DeviceProvider
+
+logger = logging.getLogger(__name__)
+
+DEVICE_BINDING_VERSION_CACHE_KEY = "business_support:device_binding:version"
+DEVICE_BINDING_CACHE_TTL_SECONDS = 60 * 60
+# 未登记设备号的负缓存时间：新设备入库会递增版本号，这里只限制 Redis 中的条目寿命。
+DEVICE_BINDING_NEGATIVE_TTL_SECONDS = 10 * 60
+DEVICE_BINDING_VERSION_CHECK_INTERVAL_SECONDS = 5
+# Redis 不可用时的兜底：本地条目最长保留时间。
+DEVICE_BINDING_LOCAL_MAX_AGE_SECONDS = 60
+# 单进程最多保留的本地条目数，防止大量随机设备号撑大内存。
+DEVICE_BINDING_LOCAL_MAX_ENTRIES = 50_000
+
+_ENTRY_KEY = "business_support:device_binding:{version}:{provider}:{device_no}"
+
+
+@dataclass(frozen=True)
+class DeviceBinding:
+    """设备号解析结果；device_id 为 None 表示该厂商下未登记此设备号。"""
+
+    device_id: Optional[int]
+    patient_id: Optional[int] = None
+    device_active: bool = False
+    provider_active: bool = False
+
+    @property
+    def is_known(self) -> bool:
+        return self.device_id is not None
+
+
+_UNKNOWN = DeviceBinding(device_id=None)
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {
+    "version": None,
+    "checked_at": 0.0,
+    "built_at": 0.0,
+    "entries": {},
+}
+
+
+def _read_remote_version() -> Optional[int]:
+    try:
+        value = cache.get(DEVICE_BINDING_VERSION_CACHE_KEY)
+    except Exception:  # pragma: no cover - Redis 故障时降级为本地 TTL
+        logger.warning("device binding version read failed", exc_info=True)
+        return None
+    return int(value) if value is not None else 0
+
+
+def clear_local_device_binding_cache() -> None:
+    """丢弃当前进程内的绑定条目（不影响其它进程）。"""
+    with _lock:
+        _state["entries"] = {}
+        _state["version"] = None
+        _state["checked_at"] = 0.0
+        _state["built_at"] = 0.0
+
+
+def _bump_remote_version() -> None:
+    try:
+        if not cache.add(DEVICE_BINDING_VERSION_CACHE_KEY, 1, timeout=None):
+            cache.incr(DEVICE_BINDING_VERSION_CACHE_KEY)
+    except Exception:  # pragma: no cover - Redis 故障时仅依赖本地 TTL
+        logger.warning("device binding version bump failed", exc_info=True)
+
+
+def invalidate_device_bindings() -> None:
+    """
+    【功能说明】
+    - 递增全局绑定版本号并清空当前进程条目；其它进程在下一次版本比对时丢弃本地条目。
+    - 写入时立即递增一次；事务提交后再递增一次，丢弃其它进程在提交前按旧数据写回的条目。
+
+    【使用方法】
+    - Device / DeviceProvider 的保存、删除信号自动调用；
+      queryset.update() 等绕过信号的批量写入（如后台批量停用）需手动调用。
+    """
+    clear_local_device_binding_cache()
+    _bump_remote_version()
+
+    def _after_commit() -> None:
+        clear_local_device_binding_cache()
+        _bump_remote_version()
+
+    transaction.on_commit(_after_commit)
+
+
+def _sync_local_version() -> Optional[int]:
+    now = time.monotonic()
+    if now - _state["checked_at"] < DEVICE_BINDING_VERSION_CHECK_INTERVAL_SECONDS:
+        return _state["version"]
+    remote_version = _read_remote_version()
+    with _lock:
+        expired = now - _state["built_at"] > DEVICE_BINDING_LOCAL_MAX_AGE_SECONDS
+        if remote_version is None:
+            if expired:
+                _state["entries"] = {}
+                _state["built_at"] = now
+        elif remote_version != _state["version"]:
+            _state["entries"] = {}
+            _state["version"] = remote_version
+            _state["built_at"] = now
+        _state["checked_at"] = now
+        return _state["version"]
+
+
+def _load_binding(provider_code: str, device_no: str) -> DeviceBinding:
+    provider = (
+        DeviceProvider.objects.filter(code=provider_code)
+        .values_list("pk", "is_active")
+        .first()
+    )
+    if provider is None:
+        return _UNKNOWN
+    provider_id, provider_active = provider
+    fields = ("pk", "current_patient_id", "is_active")
+    row = (
+        Device.objects.filter(provider_id=provider_id, imei=device_no).values_list(*fields).first()
+        or Device.objects.filter(provider_id=provider_id, sn=device_no).values_list(*fields).first()
+    )
+    if row is None:
+        return _UNKNOWN
+    device_id, patient_id, device_active = row
+    return DeviceBinding(
+        device_id=device_id,
+        patient_id=patient_id,
+        device_active=bool(device_active),
+        provider_active=bool(provider_active),
+    )
+
+
+def resolve_device_binding(provider_code: str, device_no: str) -> DeviceBinding:
+    """
+    【功能说明】
+    - 将厂商设备号解析为设备绑定信息：先查进程内条目，再查 Redis，最后回源数据库（imei 优先，其次 sn）。
+    - 未登记的设备号返回 is_known=False 的结果并同样缓存。
+
+    【参数说明】
+    - provider_code: str，厂商编码（大小写不敏感）。
+    - device_no: str，厂商回调中的设备号。
+
+    【返回值说明】
+    - DeviceBinding，只读共享对象。
+    """
+    provider = (provider_code or "").strip().upper()
+    number = (device_no or "").strip()
+    if not provider or not number:
+        return _UNKNOWN
+
+    version = _sync_local_version()
+    local_key: Tuple[str, str] = (provider, number)
+    binding = _state["entries"].get(local_key)
+    if binding is not None:
+        return binding
+
+    remote_key = None
+    if version is not None:
+        remote_key = _ENTRY_KEY.format(version=version, provider=provider, device_no=number)
+        try:
+            binding = cache.get(remote_key)
+        except Exception:  # pragma: no cover - Redis 故障时直接回源
+            logger.warning("device binding cache read failed", exc_info=True)
+            remote_key = None
+
+    if binding is None:
+        binding = _load_binding(provider, number)
+        if remote_key is not None:
+            timeout = (
+                DEVICE_BINDING_CACHE_TTL_SECONDS
+                if binding.is_known
+                else DEVICE_BINDING_NEGATIVE_TTL_SECONDS
+            )
+            try:
+                cache.set(remote_key, binding, timeout)
+            except Exception:  # pragma: no cover - 写缓存失败不影响本次解析
+                logger.warning("device binding cache write failed", exc_info=True)
+
+    with _lock:
+        if _state["version"] == version:
+            entries = _state["entries"]
+            if len(entries) >= DEVICE_BINDING_LOCAL_MAX_ENTRIES:
+                entries.clear()
+            entries[local_key] = binding
+    return binding
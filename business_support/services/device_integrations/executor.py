@@ -0,0 +1,61 @@
+"""Bounded thread pool for the blocking part of async device callback views.
+
+Under the ASGI device worker pool the callback views run on the event loop;
+parsing, logging and ingestion are handed to a fixed-size executor so a burst
+of vendor retries cannot open more DB connections than the pool allows.
+``DEVICE_CALLBACK_EXECUTOR_WORKERS = 0`` keeps the work on Django's
+thread-sensitive request thread instead (development and tests, where
+``TestCase`` transactions are only visible on that thread).
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_device_callback_executor() -> ThreadPoolExecutor | None:
+    """Return the shared callback executor, or None when disabled by settings."""
+    global _executor
+
+    workers = int(getattr(settings, "DEVICE_CALLBACK_EXECUTOR_WORKERS", 0) or 0)
+    if workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="device-callback",
+                )
+    return _executor
+
+
+def _call_with_fresh_connections(func: Callable[..., Any], *args, **kwargs) -> Any:
+    # Pool threads live outside Django's request_started/finished signals,
+    # so recycle stale connections around every unit of work ourselves.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_device_callback_work(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callback handler without stalling the event loop."""
+    executor = get_device_callback_executor()
+    if executor is None:
+        return await sync_to_async(func)(*args, **kwargs)
+    return await sync_to_async(
+        _call_with_fresh_connections,
+        thread_sensitive=False,
+        executor=executor,
+    )(func, *args, **kwargs)
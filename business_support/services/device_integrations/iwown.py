@@ -5,7 +5,6 @@ import hashlib
 import json
 import logging
 import struct
-from dataclasses import dataclass
 from datetime import UTC, datetime
 from decimal import Decimal
 from typing import Any
@@ -15,6 +14,7 @@ from django.utils import timezone
 
 from health_data.models import MetricType
 
+from .payload_archive import archive_device_payload, is_payload_archive_enabled
 from .base import (
     DeviceCallbackParseError,
     DeviceCallbackPayload,
@@ -40,19 +40,39 @@ def log_iwown_post_body(
     body: bytes,
     content_type: str,
 ) -> None:
-    """Log the exact IWOWN POST body as bounded, reversible Base64."""
+    """
+    Log one IWOWN POST body.
+
+    With the payload archive enabled the body goes to the archive and the log
+    line only carries its SHA-256; otherwise it is logged as bounded,
+    reversible Base64.
+    """
+    body_sha256 = hashlib.sha256(body).hexdigest()
+    fields = {
+        "event": "iwown_post_body_received",
+        "provider": "IWOWN",
+        "endpoint": endpoint,
+        "content_type": content_type,
+        "body_bytes": len(body),
+        "post_body_sha256": body_sha256,
+    }
+    if is_payload_archive_enabled():
+        archived = archive_device_payload(
+            provider="IWOWN",
+            endpoint=endpoint,
+            body=body,
+            content_type=content_type,
+            sha256=body_sha256,
+        )
+        logger.info({**fields, "post_body_archived": archived is not None})
+        return
     logged_body = body[:_MAX_POST_LOG_BODY_BYTES]
     logger.info(
         {
-            "event": "iwown_post_body_received",
-            "provider": "IWOWN",
-            "endpoint": endpoint,
-            "content_type": content_type,
-            "body_bytes": len(body),
+            **fields,
             "post_body_logged_bytes": len(logged_body),
             "post_body_base64": base64.b64encode(logged_body).decode("ascii"),
             "post_body_truncated": len(logged_body) != len(body),
-            "post_body_sha256": hashlib.sha256(body).hexdigest(),
         }
     )
 
@@ -72,13 +92,25 @@ class IwownPacketHeaderError(DeviceCallbackParseError):
     """Raised when an IWOWN health packet does not start with ``DT``."""
 
 
-@dataclass(frozen=True)
-class _ProtobufValue:
-    wire_type: int
-    value: int | bytes
+_FIXED32 = struct.Struct("<I")
+_FIXED64 = struct.Struct("<Q")
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+
+
+def _tag(field_number: int, wire_type: int) -> int:
+    return (field_number << 3) | wire_type
 
 
-def _decode_varint(data: bytes, position: int) -> tuple[int, int]:
+def _schema(**fields: tuple[int, int]) -> dict[int, str]:
+    """Map the wire tags an IWOWN message decoder reads to readable names."""
+    return {_tag(*field): name for name, field in fields.items()}
+
+
+def _decode_varint(data: bytes | memoryview, position: int) -> tuple[int, int]:
     value = 0
     shift = 0
     while position < len(data) and shift < 70:
@@ -91,57 +123,112 @@ def _decode_varint(data: bytes, position: int) -> tuple[int, int]:
     raise DeviceCallbackParseError("Invalid IWOWN protobuf varint")
 
 
-def _parse_protobuf_fields(data: bytes) -> dict[int, list[_ProtobufValue]]:
-    """Read the protobuf wire types needed to skip unknown IWOWN fields safely."""
-    fields: dict[int, list[_ProtobufValue]] = {}
+def _decode_fields(
+    data: bytes | memoryview,
+    schema: dict[int, str],
+) -> dict[str, int | memoryview]:
+    """Decode one protobuf message, keeping only the first value of each schema field.
+
+    Every field is still walked so malformed or truncated input fails exactly as
+    before, but unknown fields are skipped without allocating anything and nested
+    messages are returned as zero-copy ``memoryview`` slices.
+    """
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    size = len(view)
+    found: dict[str, int | memoryview] = {}
     position = 0
-    while position < len(data):
-        key, position = _decode_varint(data, position)
-        field_number = key >> 3
+    while position < size:
+        key = view[position]
+        if key < 0x80:
+            position += 1
+        else:
+            key, position = _decode_varint(view, position)
         wire_type = key & 0x07
-        if field_number == 0:
+        if key >> 3 == 0:
             raise DeviceCallbackParseError("Invalid IWOWN protobuf field number")
 
-        if wire_type == 0:
-            value, position = _decode_varint(data, position)
-        elif wire_type == 1:
-            end = position + 8
-            if end > len(data):
-                raise DeviceCallbackParseError("Truncated IWOWN protobuf fixed64")
-            value = int.from_bytes(data[position:end], "little")
-            position = end
-        elif wire_type == 2:
-            length, position = _decode_varint(data, position)
-            end = position + length
-            if end > len(data):
-                raise DeviceCallbackParseError("Truncated IWOWN protobuf message")
-            value = data[position:end]
-            position = end
-        elif wire_type == 5:
+        name = schema.get(key)
+        if wire_type == _WIRE_FIXED32:
             end = position + 4
-            if end > len(data):
+            if end > size:
                 raise DeviceCallbackParseError("Truncated IWOWN protobuf fixed32")
-            value = int.from_bytes(data[position:end], "little")
-            position = end
+            if name is not None and name not in found:
+                found[name] = _FIXED32.unpack_from(view, position)[0]
+        elif wire_type == _WIRE_LENGTH_DELIMITED:
+            if position < size and view[position] < 0x80:
+                end = position + 1 + view[position]
+                position += 1
+            else:
+                length, position = _decode_varint(view, position)
+                end = position + length
+            if end > size:
+                raise DeviceCallbackParseError("Truncated IWOWN protobuf message")
+            if name is not None and name not in found:
+                found[name] = view[position:end]
+        elif wire_type == _WIRE_VARINT:
+            value, end = _decode_varint(view, position)
+            if name is not None and name not in found:
+                found[name] = value
+        elif wire_type == _WIRE_FIXED64:
+            end = position + 8
+            if end > size:
+                raise DeviceCallbackParseError("Truncated IWOWN protobuf fixed64")
+            if name is not None and name not in found:
+                found[name] = _FIXED64.unpack_from(view, position)[0]
         else:
             raise DeviceCallbackParseError(
                 f"Unsupported IWOWN protobuf wire type: {wire_type}"
             )
-        fields.setdefault(field_number, []).append(
-            _ProtobufValue(wire_type=wire_type, value=value)
-        )
-    return fields
-
-
-def _first_field(
-    fields: dict[int, list[_ProtobufValue]],
-    field_number: int,
-    wire_type: int,
-) -> int | bytes | None:
-    for field in fields.get(field_number, []):
-        if field.wire_type == wire_type:
-            return field.value
-    return None
+        position = end
+    return found
+
+
+_LEN = _WIRE_LENGTH_DELIMITED
+_F32 = _WIRE_FIXED32
+
+# Message layouts used by IWOWN uploads: only the fields the platform reads.
+_REALTIME_REPORT = _schema(health=(5, _LEN), measured_at=(6, _LEN))
+_REALTIME_HEALTH = _schema(steps=(1, _F32))
+_HISTORY_NOTIFICATION = _schema(data_type=(1, _WIRE_VARINT), history=(4, _LEN))
+_HISTORY_DATA = _schema(sequence=(1, _F32), health=(3, _LEN), third_party=(16, _LEN))
+_HISTORY_HEALTH = _schema(
+    measured_at=(1, _LEN),
+    pedometer=(3, _LEN),
+    heart_rate=(4, _LEN),
+    blood_pressure=(6, _LEN),
+    blood_oxygen=(12, _LEN),
+    blood_sugar=(18, _LEN),
+    uric_acid=(21, _LEN),
+)
+_HISTORY_PEDOMETER = _schema(steps=(4, _F32))
+_HISTORY_HEART_RATE = _schema(average=(3, _F32))
+_HISTORY_BLOOD_PRESSURE = _schema(systolic=(1, _F32), diastolic=(2, _F32))
+_HISTORY_BLOOD_OXYGEN = _schema(average=(3, _F32))
+_HISTORY_SINGLE_VALUE = _schema(value=(1, _F32))
+_THIRD_PARTY = _schema(health=(1, _LEN))
+_THIRD_PARTY_HEALTH = _schema(
+    blood_pressure=(5, _LEN),
+    scale=(6, _LEN),
+    blood_oxygen=(7, _LEN),
+    glucose=(9, _LEN),
+    ketone=(10, _LEN),
+    uric_acid=(11, _LEN),
+)
+_THIRD_PARTY_BLOOD_PRESSURE = _schema(
+    systolic=(1, _F32),
+    diastolic=(2, _F32),
+    heart_rate=(3, _F32),
+    measured_at=(5, _LEN),
+)
+_THIRD_PARTY_SCALE = _schema(weight=(1, _F32), units=(3, _F32), measured_at=(5, _LEN))
+_THIRD_PARTY_BLOOD_OXYGEN = _schema(
+    heart_rate=(1, _F32),
+    oxygen=(2, _F32),
+    measured_at=(4, _LEN),
+)
+_THIRD_PARTY_TIMED_VALUE = _schema(value=(1, _F32), measured_at=(2, _LEN))
+_DATE_TIME = _schema(rt_time=(1, _LEN))
+_RT_TIME = _schema(seconds=(1, _F32))
 
 
 class IwownHealthDataAdapter:
@@ -168,6 +255,15 @@ class IwownHealthDataAdapter:
         """Report a packet whose IWOWN header prefix is invalid."""
         return HttpResponse(b"\x03", content_type="application/octet-stream")
 
+    @staticmethod
+    def verify_signature(request) -> bool:
+        """IWOWN uploads carry no signature; the device ID is checked on ingestion."""
+        return True
+
+    def error_response(self, message: str, *, status: int = 200) -> HttpResponse:
+        """Registry contract: IWOWN only understands its one-byte status codes."""
+        return self.invalid_data_response(status=status)
+
     def parse_body(self, body: bytes) -> DeviceCallbackPayload:
         """Parse the IWOWN envelope and only the health packet options in scope."""
         if len(body) < 23:
@@ -181,6 +277,9 @@ class IwownHealthDataAdapter:
 
         readings: list[DeviceMetricReading] = []
         packet_options: list[int] = []
+        body_view = memoryview(body)
+        # Resolved once per upload: a backlog carries thousands of timestamps.
+        self._current_timezone = timezone.get_current_timezone()
         position = 15
         while position < len(body):
             if len(body) - position < 8:
@@ -195,7 +294,7 @@ class IwownHealthDataAdapter:
             if payload_end > len(body):
                 raise DeviceCallbackParseError("Truncated IWOWN packet payload")
 
-            payload = body[payload_start:payload_end]
+            payload = body_view[payload_start:payload_end]
             packet_options.append(option)
             if option == 0x0A:
                 readings.extend(self._parse_realtime_steps(device_no, payload))
@@ -274,18 +373,17 @@ class IwownHealthDataAdapter:
         )
 
     def _parse_realtime_steps(
-        self, device_no: str, payload: bytes
+        self, device_no: str, payload: memoryview
     ) -> list[DeviceMetricReading]:
-        report = _parse_protobuf_fields(payload)
-        health_payload = _first_field(report, 5, 2)
-        if not isinstance(health_payload, bytes):
+        report = _decode_fields(payload, _REALTIME_REPORT)
+        health_payload = report.get("health")
+        if health_payload is None:
             return []
-        health = _parse_protobuf_fields(health_payload)
-        steps = _first_field(health, 1, 5)
-        if not isinstance(steps, int):
+        steps = _decode_fields(health_payload, _REALTIME_HEALTH).get("steps")
+        if steps is None:
             return []
 
-        measured_at = self._parse_datetime(_first_field(report, 6, 2))
+        measured_at = self._parse_datetime(report.get("measured_at"))
         external_event_id = f"0x0A:{hashlib.sha256(payload).hexdigest()}"
         return [
             DeviceMetricReading(
@@ -301,24 +399,24 @@ class IwownHealthDataAdapter:
         ]
 
     def _parse_historical_data(
-        self, device_no: str, payload: bytes
+        self, device_no: str, payload: memoryview
     ) -> list[DeviceMetricReading]:
-        notification = _parse_protobuf_fields(payload)
-        data_type = _first_field(notification, 1, 0)
-        history_payload = _first_field(notification, 4, 2)
-        if not isinstance(history_payload, bytes):
+        notification = _decode_fields(payload, _HISTORY_NOTIFICATION)
+        data_type = notification.get("data_type")
+        history_payload = notification.get("history")
+        if history_payload is None:
             return []
 
-        history_data = _parse_protobuf_fields(history_payload)
-        sequence = _first_field(history_data, 1, 5)
-        if not isinstance(sequence, int):
+        history_data = _decode_fields(history_payload, _HISTORY_DATA)
+        sequence = history_data.get("sequence")
+        if sequence is None:
             raise DeviceCallbackParseError("Missing IWOWN history sequence")
         external_event_id = (
             f"0x80:{data_type}:{sequence}:{hashlib.sha256(payload).hexdigest()}"
         )
         if data_type == 0:
-            health_payload = _first_field(history_data, 3, 2)
-            if isinstance(health_payload, bytes):
+            health_payload = history_data.get("health")
+            if health_payload is not None:
                 return self._parse_historical_health(
                     device_no,
                     health_payload,
@@ -326,8 +424,8 @@ class IwownHealthDataAdapter:
                     external_event_id=external_event_id,
                 )
         elif data_type == 14:
-            third_party_payload = _first_field(history_data, 16, 2)
-            if isinstance(third_party_payload, bytes):
+            third_party_payload = history_data.get("third_party")
+            if third_party_payload is not None:
                 return self._parse_third_party_data(
                     device_no,
                     third_party_payload,
@@ -339,22 +437,33 @@ class IwownHealthDataAdapter:
     def _parse_historical_health(
         self,
         device_no: str,
-        payload: bytes,
+        payload: memoryview,
         *,
         sequence: int,
         external_event_id: str,
     ) -> list[DeviceMetricReading]:
-        health = _parse_protobuf_fields(payload)
-        measured_at = self._parse_datetime(
-            _first_field(health, 1, 2),
-            required=True,
-        )
+        health = _decode_fields(payload, _HISTORY_HEALTH)
+        measured_at = self._parse_datetime(health.get("measured_at"), required=True)
         readings: list[DeviceMetricReading] = []
 
-        pedometer_payload = _first_field(health, 3, 2)
-        if isinstance(pedometer_payload, bytes):
+        def add(metric_type, value_main, raw_values, **kwargs) -> None:
+            readings.append(
+                self._build_reading(
+                    device_no,
+                    measured_at,
+                    metric_type,
+                    value_main,
+                    sequence=sequence,
+                    external_event_id=external_event_id,
+                    raw_values=raw_values,
+                    **kwargs,
+                )
+            )
+
+        pedometer_payload = health.get("pedometer")
+        if pedometer_payload is not None:
             try:
-                pedometer = _parse_protobuf_fields(pedometer_payload)
+                pedometer = _decode_fields(pedometer_payload, _HISTORY_PEDOMETER)
             except DeviceCallbackParseError as error:
                 logger.warning(
                     {
@@ -366,186 +475,120 @@ class IwownHealthDataAdapter:
                     }
                 )
             else:
-                steps = _first_field(pedometer, 4, 5)
-                if isinstance(steps, int):
-                    readings.append(
-                        self._build_reading(
-                            device_no,
-                            measured_at,
-                            MetricType.STEPS,
-                            steps,
-                            sequence=sequence,
-                            external_event_id=external_event_id,
-                            raw_values={"steps": steps},
-                            step_aggregation=StepAggregationMode.INCREMENT,
-                        )
+                steps = pedometer.get("steps")
+                if steps is not None:
+                    add(
+                        MetricType.STEPS,
+                        steps,
+                        {"steps": steps},
+                        step_aggregation=StepAggregationMode.INCREMENT,
                     )
 
-        heart_rate_payload = _first_field(health, 4, 2)
-        if isinstance(heart_rate_payload, bytes):
-            heart_rate = _parse_protobuf_fields(heart_rate_payload)
-            average_bpm = _first_field(heart_rate, 3, 5)
-            if isinstance(average_bpm, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.HEART_RATE,
-                        average_bpm,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"avg_bpm": average_bpm},
-                    )
+        heart_rate_payload = health.get("heart_rate")
+        if heart_rate_payload is not None:
+            average_bpm = _decode_fields(heart_rate_payload, _HISTORY_HEART_RATE).get("average")
+            if average_bpm is not None:
+                add(MetricType.HEART_RATE, average_bpm, {"avg_bpm": average_bpm})
+
+        blood_pressure_payload = health.get("blood_pressure")
+        if blood_pressure_payload is not None:
+            blood_pressure = _decode_fields(blood_pressure_payload, _HISTORY_BLOOD_PRESSURE)
+            systolic = blood_pressure.get("systolic")
+            diastolic = blood_pressure.get("diastolic")
+            if systolic is not None and diastolic is not None:
+                add(
+                    MetricType.BLOOD_PRESSURE,
+                    systolic,
+                    {"sbp": systolic, "dbp": diastolic},
+                    value_sub=diastolic,
                 )
 
-        blood_pressure_payload = _first_field(health, 6, 2)
-        if isinstance(blood_pressure_payload, bytes):
-            blood_pressure = _parse_protobuf_fields(blood_pressure_payload)
-            systolic = _first_field(blood_pressure, 1, 5)
-            diastolic = _first_field(blood_pressure, 2, 5)
-            if isinstance(systolic, int) and isinstance(diastolic, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.BLOOD_PRESSURE,
-                        systolic,
-                        value_sub=diastolic,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"sbp": systolic, "dbp": diastolic},
-                    )
-                )
-
-        blood_oxygen_payload = _first_field(health, 12, 2)
-        if isinstance(blood_oxygen_payload, bytes):
-            blood_oxygen = _parse_protobuf_fields(blood_oxygen_payload)
-            average_oxygen = _first_field(blood_oxygen, 3, 5)
-            if isinstance(average_oxygen, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.BLOOD_OXYGEN,
-                        average_oxygen,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"avg_oxy": average_oxygen},
-                    )
-                )
+        blood_oxygen_payload = health.get("blood_oxygen")
+        if blood_oxygen_payload is not None:
+            average_oxygen = _decode_fields(blood_oxygen_payload, _HISTORY_BLOOD_OXYGEN).get("average")
+            if average_oxygen is not None:
+                add(MetricType.BLOOD_OXYGEN, average_oxygen, {"avg_oxy": average_oxygen})
 
-        blood_sugar_payload = _first_field(health, 18, 2)
-        if isinstance(blood_sugar_payload, bytes):
-            blood_sugar = _parse_protobuf_fields(blood_sugar_payload)
-            sugar = _first_field(blood_sugar, 1, 5)
+        blood_sugar_payload = health.get("blood_sugar")
+        if blood_sugar_payload is not None:
+            sugar = _decode_fields(blood_sugar_payload, _HISTORY_SINGLE_VALUE).get("value")
             glucose = self._normalize_tenths_mmol_per_l(sugar)
             if glucose is not None:
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.BLOOD_GLUCOSE,
-                        glucose,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"blood_sugar": sugar},
-                    )
-                )
+                add(MetricType.BLOOD_GLUCOSE, glucose, {"blood_sugar": sugar})
 
-        uric_acid_payload = _first_field(health, 21, 2)
-        if isinstance(uric_acid_payload, bytes):
-            uric_acid = _parse_protobuf_fields(uric_acid_payload)
-            value = _first_field(uric_acid, 1, 5)
-            if isinstance(value, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.URIC_ACID,
-                        value,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"uric_acid": value},
-                    )
-                )
+        uric_acid_payload = health.get("uric_acid")
+        if uric_acid_payload is not None:
+            value = _decode_fields(uric_acid_payload, _HISTORY_SINGLE_VALUE).get("value")
+            if value is not None:
+                add(MetricType.URIC_ACID, value, {"uric_acid": value})
 
         return readings
 
     def _parse_third_party_data(
         self,
         device_no: str,
-        payload: bytes,
+        payload: memoryview,
         *,
         sequence: int,
         external_event_id: str,
     ) -> list[DeviceMetricReading]:
-        third_party = _parse_protobuf_fields(payload)
-        health_payload = _first_field(third_party, 1, 2)
-        if not isinstance(health_payload, bytes):
+        health_payload = _decode_fields(payload, _THIRD_PARTY).get("health")
+        if health_payload is None:
             return []
-        health = _parse_protobuf_fields(health_payload)
+        health = _decode_fields(health_payload, _THIRD_PARTY_HEALTH)
         readings: list[DeviceMetricReading] = []
         heart_rate_added = False
 
-        blood_pressure_payload = _first_field(health, 5, 2)
-        if isinstance(blood_pressure_payload, bytes):
-            blood_pressure = _parse_protobuf_fields(blood_pressure_payload)
+        def add(measured_at, metric_type, value_main, raw_values, **kwargs) -> None:
+            readings.append(
+                self._build_reading(
+                    device_no,
+                    measured_at,
+                    metric_type,
+                    value_main,
+                    sequence=sequence,
+                    external_event_id=external_event_id,
+                    raw_values=raw_values,
+                    **kwargs,
+                )
+            )
+
+        blood_pressure_payload = health.get("blood_pressure")
+        if blood_pressure_payload is not None:
+            blood_pressure = _decode_fields(blood_pressure_payload, _THIRD_PARTY_BLOOD_PRESSURE)
             measured_at = self._parse_datetime(
-                _first_field(blood_pressure, 5, 2),
+                blood_pressure.get("measured_at"),
                 required=True,
             )
-            systolic = _first_field(blood_pressure, 1, 5)
-            diastolic = _first_field(blood_pressure, 2, 5)
-            heart_rate = _first_field(blood_pressure, 3, 5)
-            if isinstance(systolic, int) and isinstance(diastolic, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.BLOOD_PRESSURE,
-                        systolic,
-                        value_sub=diastolic,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"sbp": systolic, "dbp": diastolic},
-                    )
-                )
-            if isinstance(heart_rate, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.HEART_RATE,
-                        heart_rate,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"heart_rate": heart_rate},
-                    )
+            systolic = blood_pressure.get("systolic")
+            diastolic = blood_pressure.get("diastolic")
+            heart_rate = blood_pressure.get("heart_rate")
+            if systolic is not None and diastolic is not None:
+                add(
+                    measured_at,
+                    MetricType.BLOOD_PRESSURE,
+                    systolic,
+                    {"sbp": systolic, "dbp": diastolic},
+                    value_sub=diastolic,
                 )
+            if heart_rate is not None:
+                add(measured_at, MetricType.HEART_RATE, heart_rate, {"heart_rate": heart_rate})
                 heart_rate_added = True
 
-        scale_payload = _first_field(health, 6, 2)
-        if isinstance(scale_payload, bytes):
-            scale = _parse_protobuf_fields(scale_payload)
-            weight = _first_field(scale, 1, 5)
-            units = _first_field(scale, 3, 5)
+        scale_payload = health.get("scale")
+        if scale_payload is not None:
+            scale = _decode_fields(scale_payload, _THIRD_PARTY_SCALE)
+            weight = scale.get("weight")
+            units = scale.get("units")
             weight_kg = self._normalize_scale_weight_kg(weight, units)
             if weight_kg is not None:
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        self._parse_datetime(
-                            _first_field(scale, 5, 2),
-                            required=True,
-                        ),
-                        MetricType.WEIGHT,
-                        weight_kg,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"weight": weight, "units": units},
-                    )
+                add(
+                    self._parse_datetime(scale.get("measured_at"), required=True),
+                    MetricType.WEIGHT,
+                    weight_kg,
+                    {"weight": weight, "units": units},
                 )
-            elif isinstance(weight, int):
+            elif weight is not None:
                 logger.warning(
                     {
                         "event": "iwown_weight_skipped",
@@ -556,107 +599,48 @@ class IwownHealthDataAdapter:
                     }
                 )
 
-        blood_oxygen_payload = _first_field(health, 7, 2)
-        if isinstance(blood_oxygen_payload, bytes):
-            blood_oxygen = _parse_protobuf_fields(blood_oxygen_payload)
+        blood_oxygen_payload = health.get("blood_oxygen")
+        if blood_oxygen_payload is not None:
+            blood_oxygen = _decode_fields(blood_oxygen_payload, _THIRD_PARTY_BLOOD_OXYGEN)
             measured_at = self._parse_datetime(
-                _first_field(blood_oxygen, 4, 2),
+                blood_oxygen.get("measured_at"),
                 required=True,
             )
-            oxygen = _first_field(blood_oxygen, 2, 5)
-            if isinstance(oxygen, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        measured_at,
-                        MetricType.BLOOD_OXYGEN,
-                        oxygen,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"spo2": oxygen},
-                    )
-                )
+            oxygen = blood_oxygen.get("oxygen")
+            if oxygen is not None:
+                add(measured_at, MetricType.BLOOD_OXYGEN, oxygen, {"spo2": oxygen})
             if not heart_rate_added:
-                heart_rate = _first_field(blood_oxygen, 1, 5)
-                if isinstance(heart_rate, int):
-                    readings.append(
-                        self._build_reading(
-                            device_no,
-                            measured_at,
-                            MetricType.HEART_RATE,
-                            heart_rate,
-                            sequence=sequence,
-                            external_event_id=external_event_id,
-                            raw_values={"heart_rate": heart_rate},
-                        )
-                    )
-
-        glucose_payload = _first_field(health, 9, 2)
-        if isinstance(glucose_payload, bytes):
-            glucose_data = _parse_protobuf_fields(glucose_payload)
-            glucose = self._normalize_tenths_mmol_per_l(
-                _first_field(glucose_data, 1, 5)
-            )
-            if glucose is not None:
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        self._parse_datetime(
-                            _first_field(glucose_data, 2, 2),
-                            required=True,
-                        ),
-                        MetricType.BLOOD_GLUCOSE,
-                        glucose,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={
-                            "glucose": _first_field(glucose_data, 1, 5),
-                        },
-                    )
-                )
-
-        ketone_payload = _first_field(health, 10, 2)
-        if isinstance(ketone_payload, bytes):
-            ketone_data = _parse_protobuf_fields(ketone_payload)
-            ketone = self._normalize_tenths_mmol_per_l(
-                _first_field(ketone_data, 1, 5)
-            )
-            if ketone is not None:
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        self._parse_datetime(
-                            _first_field(ketone_data, 2, 2),
-                            required=True,
-                        ),
-                        MetricType.BLOOD_KETONE,
-                        ketone,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={
-                            "blood_ketones": _first_field(ketone_data, 1, 5),
-                        },
-                    )
+                heart_rate = blood_oxygen.get("heart_rate")
+                if heart_rate is not None:
+                    add(measured_at, MetricType.HEART_RATE, heart_rate, {"heart_rate": heart_rate})
+
+        for field_name, metric_type, raw_key in (
+            ("glucose", MetricType.BLOOD_GLUCOSE, "glucose"),
+            ("ketone", MetricType.BLOOD_KETONE, "blood_ketones"),
+        ):
+            field_payload = health.get(field_name)
+            if field_payload is None:
+                continue
+            timed_value = _decode_fields(field_payload, _THIRD_PARTY_TIMED_VALUE)
+            value = self._normalize_tenths_mmol_per_l(timed_value.get("value"))
+            if value is not None:
+                add(
+                    self._parse_datetime(timed_value.get("measured_at"), required=True),
+                    metric_type,
+                    value,
+                    {raw_key: timed_value.get("value")},
                 )
 
-        uric_acid_payload = _first_field(health, 11, 2)
-        if isinstance(uric_acid_payload, bytes):
-            uric_acid_data = _parse_protobuf_fields(uric_acid_payload)
-            uric_acid = _first_field(uric_acid_data, 1, 5)
-            if isinstance(uric_acid, int):
-                readings.append(
-                    self._build_reading(
-                        device_no,
-                        self._parse_datetime(
-                            _first_field(uric_acid_data, 2, 2),
-                            required=True,
-                        ),
-                        MetricType.URIC_ACID,
-                        uric_acid,
-                        sequence=sequence,
-                        external_event_id=external_event_id,
-                        raw_values={"uric_acid": uric_acid},
-                    )
+        uric_acid_payload = health.get("uric_acid")
+        if uric_acid_payload is not None:
+            uric_acid_data = _decode_fields(uric_acid_payload, _THIRD_PARTY_TIMED_VALUE)
+            uric_acid = uric_acid_data.get("value")
+            if uric_acid is not None:
+                add(
+                    self._parse_datetime(uric_acid_data.get("measured_at"), required=True),
+                    MetricType.URIC_ACID,
+                    uric_acid,
+                    {"uric_acid": uric_acid},
                 )
 
         return readings
@@ -716,31 +700,29 @@ class IwownHealthDataAdapter:
             step_aggregation=step_aggregation,
         )
 
-    @staticmethod
     def _parse_datetime(
-        value: int | bytes | None,
+        self,
+        value: int | memoryview | None,
         *,
         required: bool = False,
     ) -> datetime:
-        if not isinstance(value, bytes):
+        if not isinstance(value, memoryview):
             if required:
                 raise DeviceCallbackParseError("Missing IWOWN measurement time")
             return timezone.now()
-        date_time = _parse_protobuf_fields(value)
-        rt_time_payload = _first_field(date_time, 1, 2)
-        if not isinstance(rt_time_payload, bytes):
+        rt_time_payload = _decode_fields(value, _DATE_TIME).get("rt_time")
+        if rt_time_payload is None:
             if required:
                 raise DeviceCallbackParseError("Invalid IWOWN measurement time")
             return timezone.now()
-        rt_time = _parse_protobuf_fields(rt_time_payload)
-        seconds = _first_field(rt_time, 1, 5)
-        if not isinstance(seconds, int):
+        seconds = _decode_fields(rt_time_payload, _RT_TIME).get("seconds")
+        if seconds is None:
             if required:
                 raise DeviceCallbackParseError("Invalid IWOWN measurement timestamp")
             return timezone.now()
 
         wall_clock = datetime.fromtimestamp(seconds, tz=UTC).replace(tzinfo=None)
-        return timezone.make_aware(wall_clock, timezone.get_current_timezone())
+        return timezone.make_aware(wall_clock, self._current_timezone)
 
 
 class IwownDeviceInfoAdapter:
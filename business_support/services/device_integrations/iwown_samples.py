@@ -0,0 +1,114 @@
+"""Encode representative IWOWN pb uploads for benchmarks and load replays.
+
+Field numbers mirror the layouts decoded in ``iwown.py``; measurement times are
+encoded the way the watch sends them (local wall clock stored as UTC seconds).
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+from datetime import UTC, datetime
+from typing import Iterable, Sequence
+
+from django.utils import timezone
+
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _varint_field(field_number: int, value: int) -> bytes:
+    return _varint(field_number << 3) + _varint(value)
+
+
+def _fixed32_field(field_number: int, value: int) -> bytes:
+    return _varint((field_number << 3) | 5) + struct.pack("<I", value)
+
+
+def _message_field(field_number: int, payload: bytes) -> bytes:
+    return _varint((field_number << 3) | 2) + _varint(len(payload)) + payload
+
+
+def _date_time(measured_at: datetime) -> bytes:
+    if timezone.is_aware(measured_at):
+        measured_at = timezone.localtime(measured_at)
+    wall_clock = int(measured_at.replace(tzinfo=UTC).timestamp())
+    return _message_field(1, _fixed32_field(1, wall_clock)) + _fixed32_field(2, 8 * 3600)
+
+
+def build_iwown_packet(option: int, payload: bytes) -> bytes:
+    return b"DT" + struct.pack("<HHH", len(payload), 0, option) + payload
+
+
+def build_iwown_body(device_id: str, packets: Iterable[bytes]) -> bytes:
+    encoded_device_id = device_id.encode("ascii")
+    if len(encoded_device_id) != 15:
+        raise ValueError("IWOWN device ID must be exactly 15 bytes")
+    return encoded_device_id + b"".join(packets)
+
+
+def build_historical_health_packet(
+    measured_at: datetime, sequence: int, rng: random.Random
+) -> bytes:
+    """Watch history record (option 0x80, data type 0) with HR, BP and SpO2."""
+    heart = rng.randint(60, 100)
+    oxygen = rng.randint(92, 99)
+    health = (
+        _message_field(1, _date_time(measured_at))
+        + _message_field(4, _fixed32_field(1, heart - 5) + _fixed32_field(2, heart + 10) + _fixed32_field(3, heart))
+        + _message_field(6, _fixed32_field(1, rng.randint(105, 150)) + _fixed32_field(2, rng.randint(65, 95)))
+        + _message_field(12, _fixed32_field(1, oxygen - 2) + _fixed32_field(2, oxygen + 1) + _fixed32_field(3, oxygen))
+    )
+    history = _fixed32_field(1, sequence) + _message_field(3, health)
+    return build_iwown_packet(0x80, _varint_field(1, 0) + _message_field(4, history))
+
+
+def build_third_party_scale_packet(
+    measured_at: datetime, sequence: int, rng: random.Random
+) -> bytes:
+    """Paired scale record (option 0x80, data type 14) carrying a weight in kg."""
+    scale = (
+        _fixed32_field(1, rng.randint(45, 85))
+        + _fixed32_field(2, 500)
+        + _fixed32_field(3, 0)
+        + _fixed32_field(4, 22)
+        + _message_field(5, _date_time(measured_at))
+    )
+    health = (
+        _message_field(1, b"IWOWN SCALE")
+        + _message_field(2, b"AA:BB:CC:DD:EE:FF")
+        + _fixed32_field(3, 1)
+        + _fixed32_field(4, 1)
+        + _message_field(6, scale)
+    )
+    history = _fixed32_field(1, sequence) + _message_field(16, _message_field(1, health))
+    return build_iwown_packet(0x80, _varint_field(1, 14) + _message_field(4, history))
+
+
+def build_realtime_steps_packet(measured_at: datetime, steps: int) -> bytes:
+    """Realtime cumulative step report (option 0x0A)."""
+    report = _message_field(5, _fixed32_field(1, steps)) + _message_field(6, _date_time(measured_at))
+    return build_iwown_packet(0x0A, report)
+
+
+def build_historical_backlog_body(
+    device_id: str,
+    measured_at: Sequence[datetime],
+    rng: random.Random,
+    *,
+    first_sequence: int = 0,
+) -> bytes:
+    """One upload replaying a backlog of watch history records."""
+    return build_iwown_body(
+        device_id,
+        (
+            build_historical_health_packet(moment, first_sequence + index, rng)
+            for index, moment in enumerate(measured_at)
+        ),
+    )
@@ -0,0 +1,302 @@
+"""Append-only, compressed archive of raw device callback bodies.
+
+Each process appends to its own gzip segment (no cross-process lock) from a
+background thread, so callbacks never wait on disk. Segments rotate by size,
+and every rotation prunes segments older than
+``DEVICE_PAYLOAD_ARCHIVE_MAX_AGE_DAYS`` or beyond
+``DEVICE_PAYLOAD_ARCHIVE_MAX_TOTAL_BYTES`` (oldest first); a plain-text ``.idx`` sidecar lists the SHA-256 of every body in the segment,
+so a body logged as ``post_body_sha256`` can be found and replayed into
+ingestion with ``manage.py replay_device_payloads``.
+
+Record framing inside a segment: one JSON header line, the raw body bytes
+(``body_bytes`` long), then ``\\n``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from lung_cancer_care.logging_utils import BackgroundBatchWriter
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg.gz"
+INDEX_SUFFIX = ".idx"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_TOTAL_BYTES = 2 * 1024 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArchivedPayload:
+    sha256: str
+    provider: str
+    endpoint: str
+    content_type: str
+    received_at: str
+    body_bytes: int
+    truncated: bool
+    body: bytes
+    segment: str
+
+
+class PayloadSegmentArchive:
+    """Writes framed payload records into size-rotated gzip segments of one process."""
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self._segment_path: Optional[Path] = None
+        self._raw: Optional[IO[bytes]] = None
+        self._stream: Optional[gzip.GzipFile] = None
+        self._index: Optional[IO[str]] = None
+        self._sequence = 0
+        self._pid = os.getpid()
+
+    def _open_segment(self) -> None:
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            prune_segments(self.directory, self.max_age_days, self.max_total_bytes)
+        except OSError:
+            logger.warning({"event": "device_payload_archive_prune_failed"}, exc_info=True)
+        self._sequence += 1
+        stem = "{stamp}-{host}-{pid}-{seq:04d}".format(
+            stamp=timezone.localtime().strftime("%Y%m%d-%H%M%S"),
+            host=socket.gethostname(),
+            pid=os.getpid(),
+            seq=self._sequence,
+        )
+        self._segment_path = self.directory / f"{stem}{SEGMENT_SUFFIX}"
+        self._raw = open(self._segment_path, "ab")
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        self._index = open(self.directory / f"{stem}{INDEX_SUFFIX}", "a", encoding="utf-8")
+
+    def write_batch(self, entries: List[Dict[str, Any]]) -> None:
+        if self._pid != os.getpid():
+            # fork 出的子进程不续写父进程的段，换用自己的文件。
+            self._stream = self._raw = self._index = None
+            self._pid = os.getpid()
+        if self._stream is None or self._raw.tell() >= self.segment_bytes:
+            self._open_segment()
+        for entry in entries:
+            body = entry.pop("body")
+            self._stream.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+            self._stream.write(body + b"\n")
+            self._index.write(
+                f"{entry['sha256']}\t{entry['provider']}\t{entry['endpoint']}\t"
+                f"{entry['received_at']}\t{entry['body_bytes']}\n"
+            )
+        # 每批同步刷新一次压缩流：进程崩溃最多丢失当前批次，读取方也能读到已写完的记录。
+        self._stream.flush(zlib.Z_SYNC_FLUSH)
+        self._raw.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._raw.close()
+            self._index.close()
+        self._stream = self._raw = self._index = None
+
+
+def prune_segments(directory: Path, max_age_days: int, max_total_bytes: int) -> List[str]:
+    """
+    Delete segments (with their index) older than ``max_age_days``, then the
+    oldest remaining ones until the archive fits ``max_total_bytes``.
+
+    A limit of 0 disables that check. Returns the names of deleted segments.
+    """
+    directory = Path(directory)
+    entries = []
+    for segment in sorted(directory.glob(f"*{SEGMENT_SUFFIX}")):
+        index = segment.with_name(segment.name[: -len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+        try:
+            stat = segment.stat()
+            size = stat.st_size + (index.stat().st_size if index.exists() else 0)
+        except FileNotFoundError:
+            continue  # 其它进程刚清理过
+        entries.append((stat.st_mtime, segment.name, segment, index, size))
+    # 按最后写入时间排序：各进程的段名时间戳只代表创建时间。
+    entries.sort()
+
+    cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+    total = sum(entry[4] for entry in entries)
+    removed = []
+    for mtime, name, segment, index, size in entries:
+        expired = cutoff is not None and mtime < cutoff
+        oversized = bool(max_total_bytes) and total > max_total_bytes
+        if not expired and not oversized:
+            break
+        segment.unlink(missing_ok=True)
+        index.unlink(missing_ok=True)
+        total -= size
+        removed.append(name)
+    if removed:
+        logger.info({"event": "device_payload_archive_pruned", "segments": removed})
+    return removed
+
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {"key": None, "archive": None, "writer": None}
+
+
+def _archive_settings() -> tuple:
+    return (
+        str(getattr(settings, "DEVICE_PAYLOAD_ARCHIVE_DIR", "") or ""),
+        int(getattr(settings, "DEVICE_PAYLOAD_ARCHIVE_SEGMENT_BYTES", DEFAULT_SEGMENT_BYTES)),
+        int(getattr(settings, "DEVICE_PAYLOAD_ARCHIVE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)),
+        int(getattr(settings, "DEVICE_PAYLOAD_ARCHIVE_MAX_TOTAL_BYTES", DEFAULT_MAX_TOTAL_BYTES)),
+    )
+
+
+def _get_writer() -> Optional[BackgroundBatchWriter]:
+    key = _archive_settings()
+    if not key[0]:
+        return None
+    if _state["key"] != key:
+        with _lock:
+            if _state["key"] != key:
+                if _state["writer"] is not None:
+                    _state["writer"].stop()
+                    _state["archive"].close()
+                archive = PayloadSegmentArchive(Path(key[0]), key[1], key[2], key[3])
+                _state["archive"] = archive
+                _state["writer"] = BackgroundBatchWriter(
+                    archive.write_batch,
+                    name="device-payload-archive",
+                    batch_size=64,
+                    queue_size=2000,
+                )
+                _state["key"] = key
+    return _state["writer"]
+
+
+@atexit.register
+def _shutdown() -> None:
+    writer, archive = _state["writer"], _state["archive"]
+    if writer is not None:
+        writer.stop()
+        archive.close()
+
+
+def is_payload_archive_enabled() -> bool:
+    return bool(_archive_settings()[0])
+
+
+def archive_device_payload(
+    *,
+    provider: str,
+    endpoint: str,
+    body: bytes,
+    content_type: str,
+    sha256: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Queue one raw callback body for the archive and return its SHA-256.
+
+    Returns None when the archive is disabled or its queue is full; the body
+    is capped at ``DEVICE_PAYLOAD_ARCHIVE_MAX_BODY_BYTES`` while the hash
+    always covers the complete request.
+    """
+    writer = _get_writer()
+    if writer is None:
+        return None
+    digest = sha256 or hashlib.sha256(body).hexdigest()
+    max_bytes = int(getattr(settings, "DEVICE_PAYLOAD_ARCHIVE_MAX_BODY_BYTES", DEFAULT_MAX_BODY_BYTES))
+    stored = body[:max_bytes]
+    accepted = writer.submit(
+        {
+            "sha256": digest,
+            "provider": provider,
+            "endpoint": endpoint,
+            "content_type": content_type,
+            "received_at": timezone.now().isoformat(),
+            "body_bytes": len(stored),
+            "truncated": len(stored) != len(body),
+            "body": stored,
+        }
+    )
+    if not accepted:
+        logger.warning({"event": "device_payload_archive_dropped", "provider": provider, "sha256": digest})
+        return None
+    return digest
+
+
+def flush_payload_archive() -> None:
+    """Block until queued bodies are written (shutdown, tests, replay tooling)."""
+    writer = _state["writer"]
+    if writer is not None:
+        writer.flush()
+
+
+def _read_segment(path: Path) -> Iterator[ArchivedPayload]:
+    with gzip.open(path, "rb") as stream:
+        try:
+            while True:
+                header_line = stream.readline()
+                if not header_line:
+                    return
+                header = json.loads(header_line)
+                body = stream.read(header["body_bytes"])
+                stream.read(1)
+                yield ArchivedPayload(body=body, segment=path.name, **header)
+        except EOFError:
+            # 写入中的段没有 gzip 尾部；已同步刷新的完整记录都已读出。
+            return
+
+
+def _segments_with(directory: Path, sha256: str) -> List[Path]:
+    segments = []
+    for index_path in sorted(directory.glob(f"*{INDEX_SUFFIX}")):
+        with open(index_path, encoding="utf-8") as index:
+            if any(line.startswith(sha256) for line in index):
+                segments.append(index_path.with_name(index_path.name[: -len(INDEX_SUFFIX)] + SEGMENT_SUFFIX))
+    return segments
+
+
+def iter_archived_payloads(
+    sha256: Optional[str] = None,
+    directory: Optional[Path] = None,
+) -> Iterator[ArchivedPayload]:
+    """
+    Yield archived bodies, oldest segment first.
+
+    With ``sha256`` (a full hash or a prefix) only segments whose index lists
+    a matching hash are decompressed.
+    """
+    root = Path(directory or _archive_settings()[0])
+    if not root.is_dir():
+        return
+    if sha256:
+        segments = _segments_with(root, sha256.lower())
+    else:
+        segments = sorted(root.glob(f"*{SEGMENT_SUFFIX}"))
+    for segment in segments:
+        for payload in _read_segment(segment):
+            if not sha256 or payload.sha256.startswith(sha256.lower()):
+                yield payload
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 from .hrt import HrtCallbackAdapter
+from .iwown import IwownHealthDataAdapter
 
 
 _ADAPTERS = {
     "HRT": HrtCallbackAdapter,
+    "IWOWN": IwownHealthDataAdapter,
 }
 
 
+def register_device_provider_adapter(provider_code: str, adapter_class) -> None:
+    """Register (or replace) the callback adapter class for a device provider."""
+    _ADAPTERS[(provider_code or "").strip().upper()] = adapter_class
+
+
 def get_device_provider_adapter(provider_code: str):
     code = (provider_code or "").strip().upper()
     try:
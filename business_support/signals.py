@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from business_support.models import Device, DeviceProvider
+from business_support.services.device_binding_cache import invalidate_device_bindings
+
+# 仅刷新活跃时间的保存不影响绑定关系，无需失效缓存。
+_BINDING_NEUTRAL_FIELDS = frozenset({"last_active_at"})
+
+
+@receiver(post_save, sender=Device)
+def _invalidate_device_binding_on_save(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= _BINDING_NEUTRAL_FIELDS:
+        return
+    invalidate_device_bindings()
+
+
+@receiver(post_delete, sender=Device)
+@receiver(post_save, sender=DeviceProvider)
+@receiver(post_delete, sender=DeviceProvider)
+def _invalidate_device_binding(sender, **kwargs):
+    invalidate_device_bindings()
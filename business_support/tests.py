@@ -2,11 +2,15 @@ import base64
 import hashlib
 import json
 import struct
-from datetime import UTC, datetime
+import threading
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
+from io import StringIO
+from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
 from django.contrib import admin
+from django.core.management import call_command
 from django.db import connection
 from django.test import Client, RequestFactory, TestCase, override_settings
 from django.test.utils import CaptureQueriesContext
@@ -468,6 +472,40 @@ class IwownPostBodyLoggingTests(TestCase):
         )
 
 
+    def test_archive_mode_logs_hash_only_and_archives_the_complete_body(self):
+        from business_support.services.device_integrations.iwown import (
+            log_iwown_post_body,
+        )
+        from business_support.services.device_integrations.payload_archive import (
+            flush_payload_archive,
+            iter_archived_payloads,
+        )
+
+        body = b"DT" + bytes(range(256)) * 8
+
+        with TemporaryDirectory() as archive_dir, override_settings(DEVICE_PAYLOAD_ARCHIVE_DIR=archive_dir):
+            with self.assertLogs(
+                "business_support.services.device_integrations.iwown",
+                level="INFO",
+            ) as captured:
+                log_iwown_post_body(
+                    endpoint="pb/upload",
+                    body=body,
+                    content_type="application/x-www-form-urlencoded",
+                )
+            flush_payload_archive()
+            sha256 = hashlib.sha256(body).hexdigest()
+            archived = list(iter_archived_payloads(sha256[:12]))
+
+        log_record = captured.records[-1]
+        self.assertEqual(log_record.msg["post_body_sha256"], sha256)
+        self.assertTrue(log_record.msg["post_body_archived"])
+        self.assertNotIn("post_body_base64", log_record.msg)
+        self.assertEqual(len(archived), 1)
+        self.assertEqual(archived[0].body, body)
+        self.assertEqual(archived[0].endpoint, "pb/upload")
+        self.assertFalse(archived[0].truncated)
+
 class IwownHealthDataAdapterTests(TestCase):
     device_id = "860132060872223"
 
@@ -778,6 +816,73 @@ class IwownHealthDataAdapterTests(TestCase):
         self.assertEqual(len(event_ids), 1)
         self.assertTrue(next(iter(event_ids)).startswith("0x80:14:26:"))
 
+    def test_backlog_upload_decodes_every_history_record(self):
+        import random
+
+        from business_support.services.device_integrations.iwown import (
+            IwownHealthDataAdapter,
+        )
+        from business_support.services.device_integrations.iwown_samples import (
+            build_historical_backlog_body,
+        )
+
+        moments = [datetime(2026, 7, 18, 8, 0) + timedelta(minutes=10 * i) for i in range(40)]
+        body = build_historical_backlog_body(self.device_id, moments, random.Random(1))
+
+        result = IwownHealthDataAdapter().parse_body(body)
+
+        self.assertEqual(len(result.raw_payload["packet_options"]), 40)
+        self.assertEqual(len(result.readings), 120)
+        self.assertEqual(
+            [reading.raw_payload["sequence"] for reading in result.readings[::3]],
+            list(range(40)),
+        )
+        self.assertEqual(
+            timezone.localtime(result.readings[-1].measured_at).replace(tzinfo=None),
+            moments[-1],
+        )
+
+    def test_decoder_skips_unknown_fields_and_rejects_truncation(self):
+        from business_support.services.device_integrations.base import (
+            DeviceCallbackParseError,
+        )
+        from business_support.services.device_integrations.iwown import (
+            _decode_fields,
+            _schema,
+        )
+
+        schema = _schema(value=(2, 5), nested=(3, 2))
+        data = (
+            _proto_varint_field(1, 300)
+            + struct.pack("<B", (4 << 3) | 1)
+            + struct.pack("<Q", 7)
+            + _proto_fixed32_field(2, 61)
+            + _proto_message_field(3, b"abc")
+            + _proto_fixed32_field(2, 99)
+        )
+
+        fields = _decode_fields(data, schema)
+
+        self.assertEqual(fields["value"], 61)
+        self.assertEqual(bytes(fields["nested"]), b"abc")
+        with self.assertRaises(DeviceCallbackParseError):
+            _decode_fields(data[:-2], schema)
+        with self.assertRaises(DeviceCallbackParseError):
+            _decode_fields(_proto_varint(3 << 3 | 2) + _proto_varint(10) + b"ab", schema)
+
+    def test_registry_resolves_iwown_adapter(self):
+        from business_support.services.device_integrations.iwown import (
+            IwownHealthDataAdapter,
+        )
+        from business_support.services.device_integrations.registry import (
+            get_device_provider_adapter,
+        )
+
+        adapter = get_device_provider_adapter("iwown")
+
+        self.assertIsInstance(adapter, IwownHealthDataAdapter)
+        self.assertEqual(adapter.error_response("bad").content, b"\x02")
+
 
 class IwownHealthDataCallbackTests(TestCase):
     device_id = "860132060872223"
@@ -916,6 +1021,67 @@ class IwownHealthDataCallbackTests(TestCase):
             )
         )
 
+    async def test_pb_upload_is_served_by_async_view(self):
+        response = await self.async_client.post(
+            reverse("iwown_health_data_upload"),
+            data=_iwown_five_metric_body(self.device_id),
+            content_type="application/x-www-form-urlencoded",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"\x00")
+        metric_types = {
+            metric_type
+            async for metric_type in HealthMetric.objects.filter(
+                patient=self.patient
+            ).values_list("metric_type", flat=True)
+        }
+        self.assertEqual(len(metric_types), 5)
+
+    def test_callback_work_runs_on_bounded_executor_when_enabled(self):
+        from asgiref.sync import async_to_sync
+
+        from business_support.services.device_integrations import executor
+
+        self.addCleanup(setattr, executor, "_executor", None)
+        with override_settings(DEVICE_CALLBACK_EXECUTOR_WORKERS=2):
+            thread_name = async_to_sync(executor.run_device_callback_work)(
+                lambda: threading.current_thread().name
+            )
+            pool = executor.get_device_callback_executor()
+
+        self.assertTrue(thread_name.startswith("device-callback"))
+        self.assertEqual(pool._max_workers, 2)
+        pool.shutdown()
+
+    def test_archived_pb_upload_replays_into_ingestion(self):
+        from business_support.models import DeviceMetricReceipt
+        from business_support.services.device_integrations.payload_archive import (
+            flush_payload_archive,
+        )
+
+        body = _iwown_five_metric_body(self.device_id)
+
+        with TemporaryDirectory() as archive_dir, override_settings(DEVICE_PAYLOAD_ARCHIVE_DIR=archive_dir):
+            self.client.post(
+                reverse("iwown_health_data_upload"),
+                data=body,
+                content_type="application/x-www-form-urlencoded",
+            )
+            flush_payload_archive()
+            HealthMetric.objects.filter(patient=self.patient).delete()
+            DeviceMetricReceipt.objects.filter(device=self.device).delete()
+            out = StringIO()
+            call_command(
+                "replay_device_payloads",
+                hashlib.sha256(body).hexdigest()[:16],
+                "--commit",
+                stdout=out,
+            )
+
+        self.assertIn("created 5", out.getvalue())
+        self.assertEqual(HealthMetric.objects.filter(patient=self.patient).count(), 5)
+
     def test_pb_upload_returns_iwown_error_bytes_for_malformed_packets(self):
         upload_url = reverse("iwown_health_data_upload")
         invalid_prefix = _iwown_body(
@@ -1672,6 +1838,64 @@ class DeviceMetricIngestionTests(TestCase):
         )
 
 
+    def test_unknown_device_is_rejected_from_binding_cache_without_device_queries(self):
+        from business_support.services.device_integrations.base import DeviceMetricReading
+        from health_data.services.device_metric_ingestion import DeviceMetricIngestionService
+
+        reading = DeviceMetricReading(
+            provider_code="HRT",
+            device_no="IMEI-HRT-NOT-REGISTERED",
+            measured_at=self.measured_at,
+            metric_type=MetricType.HEART_RATE,
+            value_main=Decimal("72"),
+        )
+
+        first_result = DeviceMetricIngestionService.ingest_readings([reading])
+        with CaptureQueriesContext(connection) as captured:
+            second_result = DeviceMetricIngestionService.ingest_readings([reading])
+
+        self.assertEqual(first_result.skipped_count, 1)
+        self.assertEqual(second_result.skipped_count, 1)
+        self.assertFalse(
+            [query["sql"] for query in captured.captured_queries if "business_support_device" in query["sql"]]
+        )
+
+    def test_unbind_invalidates_cached_device_binding(self):
+        from business_support.service.device import unbind_device
+        from business_support.services.device_integrations.base import DeviceMetricReading
+        from health_data.services.device_metric_ingestion import DeviceMetricIngestionService
+
+        def reading(event_id):
+            return DeviceMetricReading(
+                provider_code="HRT",
+                device_no=self.device.imei,
+                measured_at=self.measured_at,
+                metric_type=MetricType.HEART_RATE,
+                value_main=Decimal("72"),
+                external_event_id=event_id,
+            )
+
+        bound_result = DeviceMetricIngestionService.ingest_readings([reading("hrt:cache-1")])
+        unbind_device(self.device.imei, self.patient.id)
+        unbound_result = DeviceMetricIngestionService.ingest_readings([reading("hrt:cache-2")])
+
+        self.assertEqual(bound_result.created_count, 1)
+        self.assertEqual(unbound_result.created_count, 0)
+        self.assertEqual(unbound_result.skipped_count, 1)
+
+    def test_admin_bulk_deactivate_invalidates_cached_device_binding(self):
+        from business_support.services.device_binding_cache import resolve_device_binding
+
+        self.device.current_patient = None
+        self.device.save(update_fields=["current_patient"])
+        self.assertTrue(resolve_device_binding("HRT", self.device.imei).device_active)
+
+        model_admin = DeviceAdmin(Device, admin.site)
+        with patch.object(model_admin, "log_change"):
+            model_admin._soft_delete_queryset(None, Device.objects.filter(pk=self.device.pk))
+
+        self.assertFalse(resolve_device_binding("HRT", self.device.imei).device_active)
+
 class HrtDeviceCallbackViewTests(TestCase):
     def setUp(self):
         from business_support.models import DeviceProvider
@@ -1719,6 +1943,73 @@ class HrtDeviceCallbackViewTests(TestCase):
         )
 
 
+    @override_settings(SMARTWATCH_CONFIG={"APP_KEY": "app-key", "APP_SECRET": "hrt-secret", "API_BASE_URL": "https://example.test"})
+    def test_deviceupload_archives_only_signed_bodies(self):
+        from business_support.services.device_integrations.payload_archive import (
+            flush_payload_archive,
+            iter_archived_payloads,
+        )
+
+        signed = _hrt_body({"eventType": 1, "data": {"type": "WATCH", "deviceNo": self.device.imei}})
+        unsigned = _hrt_body({"eventType": 1, "data": {"type": "WATCH", "deviceNo": "forged"}})
+
+        with TemporaryDirectory() as archive_dir, override_settings(DEVICE_PAYLOAD_ARCHIVE_DIR=archive_dir):
+            self.client.post(
+                reverse("device_upload_root"),
+                data=unsigned,
+                content_type="application/json",
+                **_signed_headers(unsigned, "wrong-secret"),
+            )
+            self.client.post(
+                reverse("device_upload_root"),
+                data=signed,
+                content_type="application/json",
+                **_signed_headers(signed, "hrt-secret"),
+            )
+            flush_payload_archive()
+            archived = [payload.body for payload in iter_archived_payloads()]
+
+        self.assertEqual(archived, [signed])
+
+
+class DevicePayloadArchivePruneTests(TestCase):
+    def _write_segment(self, directory, stem, size, age_days=0):
+        import os
+        from pathlib import Path
+
+        segment = Path(directory) / f"{stem}.seg.gz"
+        segment.write_bytes(b"x" * size)
+        (Path(directory) / f"{stem}.idx").write_text("", encoding="utf-8")
+        mtime = timezone.now().timestamp() - age_days * 86400
+        os.utime(segment, (mtime, mtime))
+        return segment
+
+    def test_prunes_expired_segments_then_oldest_beyond_total_size(self):
+        from pathlib import Path
+
+        from business_support.services.device_integrations.payload_archive import prune_segments
+
+        with TemporaryDirectory() as archive_dir:
+            self._write_segment(archive_dir, "expired", 10, age_days=40)
+            self._write_segment(archive_dir, "older", 100, age_days=2)
+            self._write_segment(archive_dir, "newer", 100, age_days=1)
+
+            removed = prune_segments(Path(archive_dir), max_age_days=30, max_total_bytes=150)
+            remaining = sorted(path.name for path in Path(archive_dir).iterdir())
+
+        self.assertEqual(removed, ["expired.seg.gz", "older.seg.gz"])
+        self.assertEqual(remaining, ["newer.idx", "newer.seg.gz"])
+
+    def test_zero_limits_keep_everything(self):
+        from pathlib import Path
+
+        from business_support.services.device_integrations.payload_archive import prune_segments
+
+        with TemporaryDirectory() as archive_dir:
+            self._write_segment(archive_dir, "ancient", 100, age_days=400)
+            self.assertEqual(prune_segments(Path(archive_dir), max_age_days=0, max_total_bytes=0), [])
+
+
 class HrtDeviceCallbackIntegrationTests(TestCase):
     def setUp(self):
         from business_support.models import DeviceProvider
@@ -1,9 +1,19 @@
+"""Device vendor callback endpoints.
+
+The views are async so the ASGI device worker pool (``gunicorn_device_config.py``)
+can hold many slow vendor uploads on one event loop; the request body is
+already buffered by the ASGI handler, and parsing, logging and ingestion run
+through ``run_device_callback_work`` on a bounded executor. Under WSGI Django
+adapts them transparently.
+"""
+
 import logging
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
 from business_support.services.device_integrations.base import DeviceCallbackParseError
+from business_support.services.device_integrations.executor import run_device_callback_work
 from business_support.services.device_integrations.iwown import (
     IwownDeviceInfoAdapter,
     IwownHealthDataAdapter,
@@ -11,6 +21,7 @@ from business_support.services.device_integrations.iwown import (
     build_iwown_device_log_fields,
     log_iwown_post_body,
 )
+from business_support.services.device_integrations.payload_archive import archive_device_payload
 from business_support.services.device_integrations.registry import get_device_provider_adapter
 from health_data.services.device_metric_ingestion import DeviceMetricIngestionService
 
@@ -18,11 +29,12 @@ logger = logging.getLogger(__name__)
 
 
 @csrf_exempt
-def iwown_alarm_upload_callback(request):
+async def iwown_alarm_upload_callback(request):
     """Acknowledge IWOWN alarm uploads without processing them for now."""
     adapter = IwownHealthDataAdapter()
     if request.method == "POST":
-        log_iwown_post_body(
+        await run_device_callback_work(
+            log_iwown_post_body,
             endpoint="alarm/upload",
             body=request.body,
             content_type=request.content_type or "",
@@ -31,10 +43,11 @@ def iwown_alarm_upload_callback(request):
 
 
 @csrf_exempt
-def iwown_sleep_result_callback(request):
+async def iwown_sleep_result_callback(request):
     """Return a no-data sleep result until IWOWN sleep processing is supported."""
     if request.method == "POST":
-        log_iwown_post_body(
+        await run_device_callback_work(
+            log_iwown_post_body,
             endpoint="health/sleep",
             body=request.body,
             content_type=request.content_type or "",
@@ -43,43 +56,57 @@ def iwown_sleep_result_callback(request):
 
 
 @csrf_exempt
-def iwown_device_info_callback(request):
+async def iwown_device_info_callback(request):
     """Receive and log IWOWN device-information uploads."""
     adapter = IwownDeviceInfoAdapter()
     if request.method != "POST":
         return adapter.invalid_response(status=405)
-    body = request.body
+    return await run_device_callback_work(
+        _handle_iwown_device_info,
+        adapter,
+        request.body,
+        request.content_type or "",
+    )
+
+
+def _handle_iwown_device_info(adapter, body: bytes, content_type: str):
     log_iwown_post_body(
         endpoint="deviceinfo/upload",
         body=body,
-        content_type=request.content_type or "",
+        content_type=content_type,
     )
     try:
         payload = adapter.parse_body(body)
     except DeviceCallbackParseError as exc:
         adapter.log_invalid(
             body,
-            content_type=request.content_type or "",
+            content_type=content_type,
             error=exc,
         )
         return adapter.invalid_response()
     adapter.log_received(
         payload,
         body_bytes=len(body),
-        content_type=request.content_type or "",
+        content_type=content_type,
     )
     return adapter.success_response()
 
 
 @csrf_exempt
-def iwown_health_data_callback(request):
+async def iwown_health_data_callback(request):
     """Receive IWOWN binary health packets and ingest supported metrics."""
-    adapter = IwownHealthDataAdapter()
+    adapter = get_device_provider_adapter(IwownHealthDataAdapter.provider_code)
     if request.method != "POST":
         return adapter.invalid_data_response(status=405)
+    return await run_device_callback_work(
+        _handle_iwown_health_data,
+        adapter,
+        request.body,
+        request.content_type or "",
+    )
+
 
-    body = request.body
-    content_type = request.content_type or ""
+def _handle_iwown_health_data(adapter, body: bytes, content_type: str):
     log_iwown_post_body(
         endpoint="pb/upload",
         body=body,
@@ -127,7 +154,7 @@ def iwown_health_data_callback(request):
 
 
 @csrf_exempt  # 必须免除 CSRF，因为是外部服务器调用
-def smartwatch_data_callback(request, provider="HRT"):
+async def smartwatch_data_callback(request, provider="HRT"):
     if request.method != "POST":
         return JsonResponse({"errorCode": 1, "msg": "Method not allowed"})
 
@@ -137,8 +164,19 @@ def smartwatch_data_callback(request, provider="HRT"):
         logger.warning("未知设备厂商回调 provider=%s", provider)
         return JsonResponse({"errorCode": 1, "msg": "Unsupported device provider"})
 
+    return await run_device_callback_work(_handle_smartwatch_data, adapter, request)
+
+
+def _handle_smartwatch_data(adapter, request):
     if not adapter.verify_signature(request):
         return adapter.error_response("Signature verification failed")
+    # 仅归档验签通过的报文，未认证请求不能写入归档目录。
+    archive_device_payload(
+        provider=adapter.provider_code,
+        endpoint="deviceupload",
+        body=request.body,
+        content_type=request.content_type or "",
+    )
 
     try:
         payload = adapter.parse_body(request.body)
@@ -23,6 +23,25 @@ from users import choices as user_choices
 from users.models import CustomUser, DoctorStudio, PatientProfile, PatientRelation
 
 
+# 咨询会话按开始时间划分的时段（左闭右开，单位：小时）。
+CHAT_TIME_SLOTS = ("0-7", "7-10", "10-13", "13-18", "18-21", "21-24")
+
+
+def annotate_session_time_slot(sessions, tz):
+    """为 ConversationSession 查询集标注 slot 字段（按 start_at 所在时段，取值见 CHAT_TIME_SLOTS）。"""
+    return sessions.annotate(hour=ExtractHour("start_at", tzinfo=tz)).annotate(
+        slot=Case(
+            When(hour__lt=7, then=Value("0-7")),
+            When(hour__lt=10, then=Value("7-10")),
+            When(hour__lt=13, then=Value("10-13")),
+            When(hour__lt=18, then=Value("13-18")),
+            When(hour__lt=21, then=Value("18-21")),
+            default=Value("21-24"),
+            output_field=CharField(),
+        )
+    )
+
+
 class ChatService:
     """聊天领域服务，负责会话与消息处理。"""
 
@@ -697,27 +716,9 @@ class ChatService:
             if item["month"]
         ]
 
-        slot_defaults = {
-            "0-7": 0,
-            "7-10": 0,
-            "10-13": 0,
-            "13-18": 0,
-            "18-21": 0,
-            "21-24": 0,
-        }
+        slot_defaults = {slot: 0 for slot in CHAT_TIME_SLOTS}
         slot_rows = (
-            sessions.annotate(hour=ExtractHour("start_at", tzinfo=tz))
-            .annotate(
-                slot=Case(
-                    When(hour__lt=7, then=Value("0-7")),
-                    When(hour__lt=10, then=Value("7-10")),
-                    When(hour__lt=13, then=Value("10-13")),
-                    When(hour__lt=18, then=Value("13-18")),
-                    When(hour__lt=21, then=Value("18-21")),
-                    default=Value("21-24"),
-                    output_field=CharField(),
-                )
-            )
+            annotate_session_time_slot(sessions, tz)
             .values("slot")
             .annotate(count=Count("id"))
         )
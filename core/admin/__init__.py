@@ -8,3 +8,4 @@ from .medication import MedicationAdmin  # noqa: F401
 from .checkup import CheckupLibraryAdmin  # noqa: F401
 from .standard_field import StandardFieldAdmin, StandardFieldAliasAdmin  # noqa: F401
 from .questionnaire import QuestionnaireAdmin, QuestionnaireQuestionAdmin  # noqa: F401
+from .job_run import JobRunAdmin  # noqa: F401
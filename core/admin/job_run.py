@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from core.models import JobRun
+from core.service.job_ledger import get_job_trends
+
+TREND_DAY_OPTIONS = (7, 30, 90)
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    change_list_template = "admin/core/jobrun/change_list.html"
+    list_display = (
+        "job_name",
+        "status",
+        "started_at",
+        "duration_display",
+        "baseline_p95_display",
+        "exceeded_p95",
+        "query_count",
+        "rows_display",
+        "peak_rss_display",
+        "hostname",
+    )
+    list_filter = ("job_name", "status", "exceeded_p95")
+    search_fields = ("job_name", "error")
+    date_hierarchy = "started_at"
+    readonly_fields = [field.name for field in JobRun._meta.fields]
+
+    @admin.display(description="耗时", ordering="duration_ms")
+    def duration_display(self, obj):
+        return _format_ms(obj.duration_ms)
+
+    @admin.display(description="历史 P95")
+    def baseline_p95_display(self, obj):
+        return _format_ms(obj.baseline_p95_ms)
+
+    @admin.display(description="影响行数")
+    def rows_display(self, obj):
+        return "，".join(f"{key}={value}" for key, value in (obj.rows or {}).items()) or "-"
+
+    @admin.display(description="内存峰值", ordering="peak_rss_kb")
+    def peak_rss_display(self, obj):
+        if obj.peak_rss_kb is None:
+            return "-"
+        return f"{obj.peak_rss_kb / 1024:.1f} MB"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom = [
+            path(
+                "trends/",
+                self.admin_site.admin_view(self.trends_view),
+                name="core_jobrun_trends",
+            )
+        ]
+        return custom + urls
+
+    def trends_view(self, request):
+        # 【业务逻辑】按任务汇总最近 N 天的运行次数、P50/P95 耗时与每日最大耗时柱状趋势
+        try:
+            days = int(request.GET.get("days", 30))
+        except ValueError:
+            days = 30
+        if days not in TREND_DAY_OPTIONS:
+            days = 30
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "定时任务运行趋势",
+            "opts": self.model._meta,
+            "days": days,
+            "day_options": TREND_DAY_OPTIONS,
+            "trends": get_job_trends(days=days),
+            "p95_window": getattr(settings, "JOB_LEDGER_P95_WINDOW", 30),
+        }
+        return TemplateResponse(request, "admin/core/jobrun/trends.html", context)
+
+
+def _format_ms(value):
+    if value is None:
+        return "-"
+    if value >= 60_000:
+        return f"{value / 60_000:.1f} 分钟"
+    if value >= 1000:
+        return f"{value / 1000:.1f} 秒"
+    return f"{value} 毫秒"
@@ -8,6 +8,7 @@ from django.template.response import TemplateResponse
 from django.urls import reverse
 
 from core.models import Medication
+from core.service.catalog import bump_catalog_version
 
 
 @admin.register(Medication)
@@ -172,6 +173,8 @@ class MedicationAdmin(admin.ModelAdmin):
             return 0
         ids = [obj.pk for obj in objs]
         self.model.objects.filter(pk__in=ids).update(is_active=False)
+        # 批量 update 不触发 post_save，需手动刷新目录缓存版本
+        bump_catalog_version()
         for obj in objs:
             obj.is_active = False
             self.log_change(request, obj, "标记为未启用（软删除）")
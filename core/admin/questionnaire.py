@@ -3,6 +3,7 @@
 from django.contrib import admin, messages
 
 from core.models import Questionnaire, QuestionnaireOption, QuestionnaireQuestion
+from core.service.catalog import bump_catalog_version
 
 
 class QuestionnaireOptionInline(admin.TabularInline):
@@ -65,11 +66,13 @@ class QuestionnaireAdmin(admin.ModelAdmin):
     @admin.action(description="标记为启用")
     def mark_active(self, request, queryset):
         updated = queryset.update(is_active=True)
+        bump_catalog_version()
         self.message_user(request, f"已启用 {updated} 个问卷。", messages.SUCCESS)
 
     @admin.action(description="标记为停用")
     def mark_inactive(self, request, queryset):
         updated = queryset.update(is_active=False)
+        bump_catalog_version()
         self.message_user(request, f"已停用 {updated} 个问卷。", messages.SUCCESS)
 
     def delete_model(self, request, obj):
@@ -5,6 +5,7 @@ from django.contrib import admin, messages
 from django.forms.models import BaseInlineFormSet
 
 from core.models import CheckupFieldMapping, StandardField, StandardFieldAlias
+from core.service.catalog import bump_catalog_version
 from core.utils.normalization import normalize_standard_field_name
 
 
@@ -199,11 +200,13 @@ class StandardFieldAdmin(admin.ModelAdmin):
     @admin.action(description="标记为启用")
     def mark_active(self, request, queryset):
         updated = queryset.update(is_active=True)
+        bump_catalog_version()
         self.message_user(request, f"已启用 {updated} 个标准字段。", messages.SUCCESS)
 
     @admin.action(description="标记为停用")
     def mark_inactive(self, request, queryset):
         updated = queryset.update(is_active=False)
+        bump_catalog_version()
         self.message_user(request, f"已停用 {updated} 个标准字段。", messages.SUCCESS)
 
 
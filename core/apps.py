@@ -13,3 +13,4 @@ class CoreConfig(AppConfig):
             import core.admin  # noqa: F401
         except ImportError:
             pass
+        import core.signals  # noqa: F401
@@ -0,0 +1,176 @@
+"""Benchmark chat-notification latency while the AI extraction queue is saturated.
+
+在进程内用 memory:// 传输启动真实的 Celery worker（线程池），以项目的任务名投递：
+先一次性压入 --ai-tasks 个识图任务（每个休眠 --ai-seconds，模拟 120 秒的大模型调用），
+随后每隔 --interval 秒投递一条未读提醒，统计提醒从投递到开始执行的等待时间。
+
+- shared：所有任务进入同一队列，由一个进程池消费（线程数 = ai + notifications 进程池之和，
+  预取为 Celery 默认值 4），即拆分前的部署方式；
+- dedicated：按 CELERY_TASK_ROUTES 路由，ai / notifications 各自按 WORKER_POOLS 启动进程池；
+- dedicated-idle：同 dedicated，但不投递识图任务，作为提醒延迟的基线。
+
+不访问数据库与 Redis。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import ExitStack
+from typing import Dict, List, Tuple
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.service.load_scenarios import LOAD_PERCENTILES, StepStats
+from lung_cancer_care.settings.task_queues import (
+    QUEUE_AI,
+    QUEUE_DEFAULT,
+    QUEUE_NOTIFICATIONS,
+    WORKER_POOLS,
+)
+
+_AI_TASK = "ai_vision.extract_report_image"
+_NOTIFICATION_TASK = "wx.send_chat_unread_notification"
+_MODES = ("dedicated-idle", "dedicated", "shared")
+_CELERY_DEFAULT_PREFETCH = 4
+
+
+class _Probe:
+    """记录提醒任务的等待时间；识图任务只占用 worker。"""
+
+    def __init__(self) -> None:
+        self.stats = StepStats()
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.expected = 0
+
+    def record(self, published_at: float) -> None:
+        with self.lock:
+            self.stats.durations_ms.append((time.perf_counter() - published_at) * 1000)
+            if len(self.stats.durations_ms) >= self.expected:
+                self.done.set()
+
+
+# Celery worker 会把首个启动的 app 的任务表缓存为进程级全局变量，后续模式仍执行首轮注册的函数；
+# 任务体因此从这里读取当前模式的探针与识图耗时，而不是闭包捕获。
+_current: Dict[str, object] = {"probe": None, "ai_seconds": 0.0}
+
+
+def _build_app(mode: str) -> Celery:
+    app = Celery(f"benchmark_celery_queues_{mode}", broker="memory://", set_as_current=False)
+    routes = {} if mode == "shared" else {
+        name: route for name, route in settings.CELERY_TASK_ROUTES.items() if name in (_AI_TASK, _NOTIFICATION_TASK)
+    }
+    app.conf.update(
+        task_default_queue=QUEUE_DEFAULT,
+        task_routes=routes,
+        task_ignore_result=True,
+        broker_connection_retry_on_startup=True,
+        # memory:// 默认每秒轮询一次，会掩盖排队等待时间。
+        broker_transport_options={"polling_interval": 0.005},
+        worker_hijack_root_logger=False,
+    )
+
+    @app.task(name=_AI_TASK)
+    def extract_report_image(published_at: float) -> None:
+        time.sleep(_current["ai_seconds"])
+
+    @app.task(name=_NOTIFICATION_TASK)
+    def send_chat_unread_notification(published_at: float) -> None:
+        _current["probe"].record(published_at)
+
+    return app
+
+
+def _pools_for(mode: str) -> List[Tuple[List[str], int, int]]:
+    """返回 (消费队列, 并发, 预取) 列表。"""
+    ai, notifications = WORKER_POOLS[QUEUE_AI], WORKER_POOLS[QUEUE_NOTIFICATIONS]
+    if mode == "shared":
+        concurrency = ai["concurrency"] + notifications["concurrency"]
+        return [([QUEUE_DEFAULT], concurrency, _CELERY_DEFAULT_PREFETCH)]
+    return [
+        ([QUEUE_AI], ai["concurrency"], ai["prefetch_multiplier"]),
+        ([QUEUE_NOTIFICATIONS], notifications["concurrency"], notifications["prefetch_multiplier"]),
+    ]
+
+
+def _purge(app: Celery) -> None:
+    with app.connection_for_write() as connection:
+        channel = connection.default_channel
+        for queue in (QUEUE_DEFAULT, QUEUE_AI, QUEUE_NOTIFICATIONS):
+            channel.queue_purge(queue)
+
+
+class Command(BaseCommand):
+    help = "Compare chat notification latency on shared and dedicated Celery queues under AI load."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--ai-tasks", type=int, default=120, help="AI extractions queued at once.")
+        parser.add_argument("--ai-seconds", type=float, default=0.5, help="Simulated duration of one extraction.")
+        parser.add_argument("--notifications", type=int, default=40, help="Notifications published during the burst.")
+        parser.add_argument("--interval", type=float, default=0.05, help="Seconds between notifications.")
+        parser.add_argument("--timeout", type=float, default=300.0, help="Maximum seconds to wait per mode.")
+        parser.add_argument(
+            "--mode",
+            action="append",
+            dest="modes",
+            choices=_MODES,
+            help="Topology to benchmark; repeatable. Defaults to all.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["ai_tasks"] < 0 or options["notifications"] <= 0 or options["ai_seconds"] < 0:
+            raise CommandError("--notifications must be positive; --ai-tasks and --ai-seconds non-negative.")
+        results: Dict[str, dict] = {}
+        for mode in options.get("modes") or _MODES:
+            results[mode] = self._run_mode(mode, options)
+            self._write_report(mode, results[mode])
+        if "dedicated" in results and "shared" in results:
+            shared_p95 = results["shared"]["p95_ms"] or 0
+            dedicated_p95 = results["dedicated"]["p95_ms"] or 0
+            self.stdout.write(
+                self.style.SUCCESS(f"Notification p95: shared {shared_p95}ms -> dedicated {dedicated_p95}ms.")
+            )
+
+    def _run_mode(self, mode: str, options) -> dict:
+        probe = _Probe()
+        probe.expected = options["notifications"]
+        _current.update(probe=probe, ai_seconds=options["ai_seconds"])
+        app = _build_app(mode)
+        ai_tasks = 0 if mode == "dedicated-idle" else options["ai_tasks"]
+        with ExitStack() as stack:
+            for queues, concurrency, prefetch in _pools_for(mode):
+                stack.enter_context(
+                    start_worker(
+                        app,
+                        concurrency=concurrency,
+                        pool="threads",
+                        perform_ping_check=False,
+                        shutdown_timeout=max(10.0, options["ai_seconds"] * 4),
+                        queues=queues,
+                        prefetch_multiplier=prefetch,
+                        loglevel="ERROR",
+                    )
+                )
+            ai_task, notification_task = app.tasks[_AI_TASK], app.tasks[_NOTIFICATION_TASK]
+            for _ in range(ai_tasks):
+                ai_task.delay(time.perf_counter())
+            for _ in range(options["notifications"]):
+                notification_task.delay(time.perf_counter())
+                time.sleep(options["interval"])
+            finished = probe.done.wait(options["timeout"])
+            # 未执行的识图任务直接丢弃，worker 只需等待进行中的任务结束。
+            _purge(app)
+        summary = probe.stats.summary()
+        summary["timed_out"] = not finished
+        return summary
+
+    def _write_report(self, mode: str, summary: dict) -> None:
+        latency = " ".join(f"p{percentile}={summary[f'p{percentile}_ms']}ms" for percentile in LOAD_PERCENTILES)
+        suffix = " (timed out)" if summary["timed_out"] else ""
+        self.stdout.write(
+            f"{mode}: {summary['count']} notification(s), wait {latency} max={summary['max_ms']}ms{suffix}"
+        )
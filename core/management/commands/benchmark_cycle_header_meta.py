@@ -0,0 +1,75 @@
+"""Benchmark ChinaCalendarService cycle header construction.
+
+对比逐日查询节假日库（旧实现）与年度元数据表切片两种方式构建疗程表头的耗时，
+覆盖 21 天至 2 年的疗程长度；不访问数据库。
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.service.china_calendar import ChinaCalendarService
+
+DEFAULT_CYCLE_LENGTHS = (21, 90, 180, 365, 730)
+
+
+def _legacy_header_days(start_date: date, cycle_days: int) -> list[dict]:
+    header_days = []
+    for offset in range(cycle_days):
+        day_meta = ChinaCalendarService._compute_day_meta(start_date + timedelta(days=offset))
+        day_meta["day_index"] = offset + 1
+        header_days.append(day_meta)
+    return header_days
+
+
+class Command(BaseCommand):
+    help = "Compare per-day holiday lookups with the memoized day-metadata table for cycle headers."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--cycle-days",
+            type=int,
+            action="append",
+            help="Cycle length to benchmark; repeat for several (default 21/90/180/365/730).",
+        )
+        parser.add_argument("--start", default="2025-01-01", help="Cycle start date, YYYY-MM-DD.")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options) -> None:
+        try:
+            start_date = date.fromisoformat(options["start"])
+        except ValueError as exc:
+            raise CommandError("Invalid --start, expected YYYY-MM-DD.") from exc
+        repeat = options["repeat"]
+        cycle_lengths = options.get("cycle_days") or DEFAULT_CYCLE_LENGTHS
+        if repeat <= 0 or any(length <= 0 for length in cycle_lengths):
+            raise CommandError("--repeat and --cycle-days must be positive.")
+
+        ChinaCalendarService.clear_day_meta_cache()
+        started_at = time.perf_counter()
+        ChinaCalendarService.build_cycle_header_meta(start_date, max(cycle_lengths))
+        cold_ms = (time.perf_counter() - started_at) * 1000
+        self.stdout.write(f"Year tables built on first use in {cold_ms:.1f} ms.")
+
+        self.stdout.write(f"{'days':>6}{'legacy ms':>12}{'table ms':>12}{'speedup':>10}")
+        for cycle_days in cycle_lengths:
+            legacy = self._best_of(repeat, lambda: _legacy_header_days(start_date, cycle_days))
+            table = self._best_of(
+                repeat, lambda: ChinaCalendarService.build_cycle_header_meta(start_date, cycle_days)
+            )
+            self.stdout.write(
+                f"{cycle_days:>6}{legacy * 1000:>12.3f}{table * 1000:>12.3f}{legacy / table:>9.1f}x"
+            )
+
+    @staticmethod
+    def _best_of(repeat: int, func) -> float:
+        best = None
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started_at
+            best = elapsed if best is None else min(best, elapsed)
+        return best
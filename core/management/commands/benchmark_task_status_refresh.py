@@ -0,0 +1,128 @@
+"""Benchmark full-table vs incremental DailyTask status refresh.
+
+在事务中批量造数、分别计时后整体回滚，不会留下测试数据。
+建议在与生产同构的数据库上执行，例如 --tasks 10000000。
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import DailyTask, choices
+from core.service import tasks as task_service
+from users.models import PatientProfile
+
+
+class _Rollback(Exception):
+    """用于在计时完成后回滚造数事务。"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark legacy full refresh against the incremental task status engine."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--tasks", type=int, default=100000, help="Synthetic task count.")
+        parser.add_argument("--patients", type=int, default=1000, help="Synthetic patient count.")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="History span in days; tasks are spread over the past N days.",
+        )
+        parser.add_argument("--batch-size", type=int, default=task_service.TASK_STATUS_BATCH_SIZE)
+        parser.add_argument("--seed", type=int, default=2024)
+
+    def handle(self, *args, **options) -> None:
+        task_count = options["tasks"]
+        patient_count = options["patients"]
+        if task_count <= 0 or patient_count <= 0 or options["days"] <= 0:
+            raise CommandError("--tasks, --patients and --days must be positive.")
+
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, options) -> None:
+        rng = random.Random(options["seed"])
+        today = timezone.localdate()
+        # 模拟昨日已刷新过一次：状态与流转日期均以昨天为基准。
+        yesterday = today - timedelta(days=1)
+        task_types = list(choices.PlanItemCategory.values)
+
+        patients = PatientProfile.objects.bulk_create(
+            [
+                PatientProfile(phone=f"199{index:08d}", name=f"压测患者{index}")
+                for index in range(options["patients"])
+            ],
+            batch_size=1000,
+        )
+        patient_ids = [patient.id for patient in patients]
+
+        started_at = time.monotonic()
+        chunk = []
+        for index in range(options["tasks"]):
+            task_date = today - timedelta(days=rng.randint(-7, options["days"]))
+            task_type = rng.choice(task_types)
+            completed = task_date <= yesterday and rng.random() < 0.6
+            chunk.append(
+                DailyTask(
+                    patient_id=rng.choice(patient_ids),
+                    task_date=task_date,
+                    task_type=task_type,
+                    title="压测任务",
+                    status=(
+                        choices.TaskStatus.COMPLETED
+                        if completed
+                        else task_service.resolve_task_status(
+                            task_type=task_type,
+                            task_date=task_date,
+                            as_of_date=yesterday,
+                        )
+                    ),
+                    status_transition_date=(
+                        None
+                        if completed
+                        else task_service.resolve_next_status_transition_date(
+                            task_type=task_type,
+                            task_date=task_date,
+                            as_of_date=yesterday,
+                        )
+                    ),
+                )
+            )
+            if len(chunk) >= 5000:
+                DailyTask.objects.bulk_create(chunk)
+                chunk = []
+        if chunk:
+            DailyTask.objects.bulk_create(chunk)
+        self.stdout.write(
+            f"Seeded {options['tasks']} task(s) in {time.monotonic() - started_at:.1f}s."
+        )
+
+        # 先跑增量引擎，再跑全量重算（后者会重置流转日期）。
+        started_at = time.monotonic()
+        transitioned = task_service.advance_task_statuses(
+            as_of_date=today,
+            batch_size=options["batch_size"],
+        )
+        incremental_seconds = time.monotonic() - started_at
+
+        started_at = time.monotonic()
+        legacy_updated = task_service._recompute_task_statuses(as_of_date=today)
+        legacy_seconds = time.monotonic() - started_at
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"incremental: {transitioned} transitioned in {incremental_seconds * 1000:.0f}ms; "
+                f"full refresh: {legacy_updated} updated in {legacy_seconds * 1000:.0f}ms."
+            )
+        )
@@ -0,0 +1,80 @@
+"""Check that plan-item DailyTasks match the full scheduling rules.
+
+按全量口径重新计算计划条目的未来任务，与增量对账后的实际任务逐条比对；
+发现不一致时输出明细并以非零状态退出，`--fix` 会对不一致条目重新对账。
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.service.task_scheduler import (
+    find_plan_task_inconsistencies,
+    reconcile_plan_item_tasks,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare plan-item DailyTasks with the expected schedule (default: from today)."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--date",
+            dest="from_date",
+            help="Start date in YYYY-MM-DD format. Defaults to today.",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Reconcile inconsistent plan items after reporting them.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Maximum number of inconsistent plan items to print.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        from_date = date.today()
+        raw_date = options.get("from_date")
+        if raw_date:
+            try:
+                from_date = datetime.strptime(raw_date, "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("Invalid --date, expected YYYY-MM-DD.") from exc
+
+        inconsistencies = find_plan_task_inconsistencies(from_date)
+        if not inconsistencies:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Plan tasks are consistent from {from_date.isoformat()}."
+                )
+            )
+            return
+
+        for plan_item_id, (missing, extra) in list(inconsistencies.items())[: options["limit"]]:
+            self.stdout.write(
+                f"plan_item={plan_item_id} "
+                f"missing={[d.isoformat() for d in sorted(missing)]} "
+                f"extra={[d.isoformat() for d in sorted(extra)]}"
+            )
+
+        if not options.get("fix"):
+            raise CommandError(
+                f"{len(inconsistencies)} plan item(s) inconsistent from {from_date.isoformat()}."
+            )
+
+        created_total = deleted_total = 0
+        for plan_item_id in inconsistencies:
+            created, deleted = reconcile_plan_item_tasks(plan_item_id, from_date=from_date)
+            created_total += created
+            deleted_total += deleted
+        self.stdout.write(
+            self.style.WARNING(
+                f"Reconciled {len(inconsistencies)} plan item(s): "
+                f"created {created_total}, deleted {deleted_total} task(s)."
+            )
+        )
@@ -9,6 +9,7 @@ from datetime import date, datetime
 
 from django.core.management.base import BaseCommand, CommandError
 
+from core.service.job_ledger import track_job_run
 from core.service.task_scheduler import generate_daily_tasks_for_date
 from core.service.tasks import refresh_task_statuses
 from patient_alerts.services.behavior_alerts import BehaviorAlertService
@@ -25,12 +26,18 @@ class Command(BaseCommand):
             dest="task_date",
             help="Target date in YYYY-MM-DD format. Defaults to today.",
         )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Reconcile every schedulable plan item instead of only the dirty set.",
+        )
         parser.add_argument(
             "--sync-membership",
             action="store_true",
             help="Sync membership_expire_at based on paid orders (legacy data alignment).",
         )
 
+    @track_job_run()
     def handle(self, *args, **options) -> None:
         task_date = date.today()
         raw_date = options.get("task_date")
@@ -40,21 +47,27 @@ class Command(BaseCommand):
             except ValueError as exc:
                 raise CommandError("Invalid --date, expected YYYY-MM-DD.") from exc
 
-        created_count = generate_daily_tasks_for_date(task_date)
+        with self.job_run.phase("generate_tasks"):
+            created_count = generate_daily_tasks_for_date(task_date, full=options.get("full", False))
+        self.job_run.add_rows("tasks_generated", created_count)
         self.stdout.write(
             self.style.SUCCESS(
                 f"Generated {created_count} daily task(s) for {task_date.isoformat()}."
             )
         )
 
-        refreshed_count = refresh_task_statuses(as_of_date=task_date)
+        with self.job_run.phase("refresh_statuses"):
+            refreshed_count = refresh_task_statuses(as_of_date=task_date)
+        self.job_run.add_rows("statuses_refreshed", refreshed_count)
         self.stdout.write(
             self.style.SUCCESS(
                 f"Refreshed {refreshed_count} daily task status(es)."
             )
         )
 
-        sent_count = send_daily_task_creation_messages(task_date)
+        with self.job_run.phase("creation_messages"):
+            sent_count = send_daily_task_creation_messages(task_date)
+        self.job_run.add_rows("messages_sent", sent_count)
         self.stdout.write(
             self.style.SUCCESS(
                 f"Sent {sent_count} daily task creation message(s)."
@@ -62,7 +75,9 @@ class Command(BaseCommand):
         )
 
         if options.get("sync_membership"):
-            updated_count, cleared_count = PatientService().sync_membership_expire_at()
+            with self.job_run.phase("sync_membership"):
+                updated_count, cleared_count = PatientService().sync_membership_expire_at()
+            self.job_run.add_rows("memberships_updated", updated_count + cleared_count)
             self.stdout.write(
                 self.style.SUCCESS(
                     "Synced membership_expire_at for "
@@ -70,7 +85,9 @@ class Command(BaseCommand):
                 )
             )
 
-        alerts = BehaviorAlertService.run()
+        with self.job_run.phase("behavior_alerts"):
+            alerts = BehaviorAlertService.run()
+        self.job_run.add_rows("behavior_alerts", len(alerts))
         self.stdout.write(
             self.style.SUCCESS(
                 f"Generated {len(alerts)} behavior alert(s)."
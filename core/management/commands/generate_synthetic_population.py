@@ -0,0 +1,89 @@
+"""Generate (or purge) a synthetic patient population for load and capacity tests.
+
+数据直接写入当前数据库且不会回滚，请只在压测库 / 本地库执行；
+合成数据可通过 --purge 一次性清理。
+DEBUG 关闭时（生产配置）拒绝执行，压测库确需运行时显式传入 --allow-production。
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.service.synthetic_population import (
+    SyntheticPopulationOptions,
+    generate_synthetic_population,
+    purge_synthetic_population,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate patients, plans, months of tasks, metrics, alerts, chats, reports and orders."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--patients", type=int, default=200, help="Synthetic patient count.")
+        parser.add_argument(
+            "--doctors",
+            type=int,
+            default=0,
+            help="Synthetic doctor count; defaults to one doctor per 500 patients.",
+        )
+        parser.add_argument("--months", type=int, default=3, help="History span in months.")
+        parser.add_argument(
+            "--device-ratio",
+            type=float,
+            default=0.6,
+            help="Share of patients wearing a watch that uploads metrics.",
+        )
+        parser.add_argument("--family-ratio", type=float, default=0.3)
+        parser.add_argument("--batch-size", type=int, default=200, help="Patients per transaction.")
+        parser.add_argument("--seed", type=int, default=2024)
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete previously generated synthetic data instead of generating.",
+        )
+        parser.add_argument(
+            "--allow-production",
+            action="store_true",
+            help="Run even when settings.DEBUG is off (dedicated load-test databases only).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if not settings.DEBUG and not options["allow_production"]:
+            raise CommandError(
+                "settings.DEBUG is off; refusing to write or purge synthetic data. "
+                "Pass --allow-production only against a dedicated load-test database."
+            )
+
+        if options["purge"]:
+            removed = purge_synthetic_population()
+            self.stdout.write(self.style.SUCCESS(f"Purged {removed} synthetic patient(s)."))
+            return
+
+        if options["patients"] <= 0 or options["months"] <= 0 or options["batch_size"] <= 0:
+            raise CommandError("--patients, --months and --batch-size must be positive.")
+        for ratio_option in ("device_ratio", "family_ratio"):
+            if not 0 <= options[ratio_option] <= 1:
+                raise CommandError(f"--{ratio_option.replace('_', '-')} must be between 0 and 1.")
+
+        started_at = time.monotonic()
+        result = generate_synthetic_population(
+            SyntheticPopulationOptions(
+                patients=options["patients"],
+                doctors=options["doctors"],
+                months=options["months"],
+                device_ratio=options["device_ratio"],
+                family_ratio=options["family_ratio"],
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+            ),
+            log=self.stdout.write,
+        )
+        elapsed = time.monotonic() - started_at
+
+        for key, value in result.counts.items():
+            self.stdout.write(f"{key:>16}: {value}")
+        self.stdout.write(self.style.SUCCESS(f"Synthetic population generated in {elapsed:.1f}s."))
@@ -6,6 +6,7 @@ from datetime import datetime
 
 from django.core.management.base import BaseCommand
 
+from core.service.job_ledger import track_job_run
 from core.service.treatment_cycle import refresh_expired_treatment_cycles
 
 
@@ -20,6 +21,7 @@ class Command(BaseCommand):
             help="Optional date in YYYY-MM-DD format.",
         )
 
+    @track_job_run()
     def handle(self, *args, **options):
         raw_date = options.get("date")
         task_date = None
@@ -29,7 +31,9 @@ class Command(BaseCommand):
             except ValueError as exc:
                 raise ValueError("Invalid date format, use YYYY-MM-DD.") from exc
 
-        updated_count = refresh_expired_treatment_cycles(task_date=task_date)
+        with self.job_run.phase("refresh_cycles"):
+            updated_count = refresh_expired_treatment_cycles(task_date=task_date)
+        self.job_run.add_rows("cycles_completed", updated_count)
         self.stdout.write(
             self.style.SUCCESS(f"Updated {updated_count} expired treatment cycles.")
         )
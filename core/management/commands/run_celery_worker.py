@@ -0,0 +1,57 @@
+"""按队列启动 Celery worker 进程池。
+
+每个队列单独一个进程池，并发与预取取自 settings/task_queues.py 的 WORKER_POOLS：
+
+    python manage.py run_celery_worker --queue ai
+    python manage.py run_celery_worker --queue notifications
+    python manage.py run_celery_worker --queue ingestion
+    python manage.py run_celery_worker --queue maintenance
+
+--print 只输出等价的 celery 命令行（供 supervisor / systemd 配置参考），不启动 worker。
+"""
+
+from __future__ import annotations
+
+import shlex
+from typing import List
+
+from django.core.management.base import BaseCommand
+
+from lung_cancer_care.settings.task_queues import WORKER_POOLS, worker_queues
+
+
+def build_worker_argv(queue: str, concurrency: int | None = None, loglevel: str = "INFO") -> List[str]:
+    pool = WORKER_POOLS[queue]
+    return [
+        "worker",
+        "--queues",
+        ",".join(worker_queues(queue)),
+        "--concurrency",
+        str(concurrency or pool["concurrency"]),
+        "--prefetch-multiplier",
+        str(pool["prefetch_multiplier"]),
+        "--hostname",
+        f"{queue}@%h",
+        "--loglevel",
+        loglevel,
+    ]
+
+
+class Command(BaseCommand):
+    help = "Start a Celery worker pool for one queue with its configured concurrency and prefetch."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--queue", required=True, choices=sorted(WORKER_POOLS))
+        parser.add_argument("--concurrency", type=int, default=None, help="Override the pool size.")
+        parser.add_argument("--loglevel", default="INFO")
+        parser.add_argument("--print", action="store_true", dest="print_only", help="Print the celery command only.")
+
+    def handle(self, *args, **options) -> None:
+        argv = build_worker_argv(options["queue"], options["concurrency"], options["loglevel"])
+        if options["print_only"]:
+            self.stdout.write(shlex.join(["celery", "-A", "lung_cancer_care", *argv]))
+            return
+
+        from lung_cancer_care.celery import app
+
+        app.worker_main(argv=argv)
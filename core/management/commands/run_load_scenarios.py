@@ -0,0 +1,85 @@
+"""Run scripted load scenarios against the synthetic population and report latency.
+
+请先执行 generate_synthetic_population 生成合成人群；场景会真实写入体征数据，
+请只在压测库 / 本地库执行。
+"""
+
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.service.load_scenarios import (
+    LOAD_PERCENTILES,
+    LOAD_SCENARIOS,
+    default_load_host,
+    run_load_scenario,
+)
+
+
+class Command(BaseCommand):
+    help = "Replay patient check-in, doctor triage and device backlog scenarios and report latency."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=sorted(LOAD_SCENARIOS),
+            help="Scenario to run; repeat for several. Defaults to all scenarios.",
+        )
+        parser.add_argument("--iterations", type=int, default=50, help="Iterations per scenario.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Worker threads per scenario.")
+        parser.add_argument("--host", default=None, help="Host header; must be in ALLOWED_HOSTS.")
+        parser.add_argument("--seed", type=int, default=2024)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options) -> None:
+        if options["iterations"] <= 0 or options["concurrency"] <= 0:
+            raise CommandError("--iterations and --concurrency must be positive.")
+        if connection.vendor == "sqlite" and options["concurrency"] > 1:
+            self.stderr.write(
+                self.style.WARNING(
+                    "SQLite serialises writers; concurrent write steps may fail with "
+                    "'database is locked'. Use --concurrency 1 or a MySQL stand-in."
+                )
+            )
+
+        reports = []
+        for name in options.get("scenarios") or LOAD_SCENARIOS:
+            try:
+                reports.append(
+                    run_load_scenario(
+                        name,
+                        iterations=options["iterations"],
+                        concurrency=options["concurrency"],
+                        host=options["host"] or default_load_host(),
+                        seed=options["seed"],
+                    )
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports, ensure_ascii=False, indent=2))
+            return
+        for report in reports:
+            self._write_report(report)
+
+    def _write_report(self, report: dict) -> None:
+        self.stdout.write(
+            f"{report['scenario']}: {report['requests']} request(s), {report['errors']} error(s), "
+            f"{report['throughput_rps']} req/s over {report['elapsed_s']}s "
+            f"(concurrency {report['concurrency']})"
+        )
+        columns = "".join(f"{f'p{percentile}':>9}" for percentile in LOAD_PERCENTILES)
+        self.stdout.write(f"  {'step':<22}{'count':>7}{'errors':>8}{columns}{'max':>9}")
+        for step, stats in report["steps"].items():
+            values = "".join(f"{stats[f'p{percentile}_ms']:>9.1f}" for percentile in LOAD_PERCENTILES)
+            self.stdout.write(
+                f"  {step:<22}{stats['count']:>7}{stats['errors']:>8}{values}{stats['max_ms']:>9.1f}"
+            )
+        style = self.style.SUCCESS if not report["errors"] else self.style.WARNING
+        self.stdout.write(style(f"  {report['scenario']} done."))
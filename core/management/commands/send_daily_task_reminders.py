@@ -6,6 +6,7 @@ from datetime import date, datetime
 
 from django.core.management.base import BaseCommand, CommandError
 
+from core.service.job_ledger import track_job_run
 from wx.services import send_daily_task_reminder_messages
 
 
@@ -19,6 +20,7 @@ class Command(BaseCommand):
             help="Target date in YYYY-MM-DD format. Defaults to today.",
         )
 
+    @track_job_run()
     def handle(self, *args, **options) -> None:
         task_date = date.today()
         raw_date = options.get("task_date")
@@ -28,7 +30,9 @@ class Command(BaseCommand):
             except ValueError as exc:
                 raise CommandError("Invalid --date, expected YYYY-MM-DD.") from exc
 
-        sent_count = send_daily_task_reminder_messages(task_date)
+        with self.job_run.phase("send_reminders"):
+            sent_count = send_daily_task_reminder_messages(task_date)
+        self.job_run.add_rows("messages_sent", sent_count)
         self.stdout.write(
             self.style.SUCCESS(
                 f"Sent {sent_count} daily task reminder message(s)."
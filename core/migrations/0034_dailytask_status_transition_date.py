@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:11
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 50000
+TASK_STATUS_COMPLETED = 1
+
+
+def backfill_transition_date(apps, schema_editor):
+    """未完成的存量任务统一置为 task_date，首次状态刷新时由引擎重新计算。"""
+    DailyTask = apps.get_model("core", "DailyTask")
+    last_id = 0
+    while True:
+        batch_ids = list(
+            DailyTask.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:BACKFILL_BATCH_SIZE]
+        )
+        if not batch_ids:
+            break
+        DailyTask.objects.filter(
+            id__gte=batch_ids[0],
+            id__lte=batch_ids[-1],
+        ).exclude(status=TASK_STATUS_COMPLETED).update(
+            status_transition_date=models.F("task_date")
+        )
+        last_id = batch_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_seed_general_monitoring_templates'),
+        ('users', '0021_patientprofile_general_monitoring_baselines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailytask',
+            name='status_transition_date',
+            field=models.DateField(blank=True, help_text='下一次需要重新计算状态的日期；已完成、已终止的任务为空。', null=True, verbose_name='状态流转日期'),
+        ),
+        migrations.AddIndex(
+            model_name='dailytask',
+            index=models.Index(fields=['status_transition_date'], name='idx_core_task_transition'),
+        ),
+        migrations.AddIndex(
+            model_name='dailytask',
+            index=models.Index(fields=['patient', 'status_transition_date'], name='idx_core_task_patient_trans'),
+        ),
+        migrations.RunPython(backfill_transition_date, migrations.RunPython.noop),
+    ]
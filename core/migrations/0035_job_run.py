@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_dailytask_status_transition_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_name', models.CharField(help_text='通常为管理命令名称。', max_length=100, verbose_name='任务名称')),
+                ('status', models.CharField(choices=[('running', '运行中'), ('success', '成功'), ('failed', '失败')], default='running', max_length=16, verbose_name='运行状态')),
+                ('started_at', models.DateTimeField(verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True, verbose_name='耗时(毫秒)')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='SQL 次数')),
+                ('rows', models.JSONField(blank=True, default=dict, help_text='按指标记录的行数，例如 {"generated": 1200}。', verbose_name='影响行数')),
+                ('phases', models.JSONField(blank=True, default=list, help_text='按执行顺序记录的阶段列表：name / duration_ms / query_count。', verbose_name='阶段耗时')),
+                ('peak_rss_kb', models.PositiveIntegerField(blank=True, null=True, verbose_name='内存峰值(KB)')),
+                ('arguments', models.JSONField(blank=True, default=dict, verbose_name='运行参数')),
+                ('error', models.TextField(blank=True, verbose_name='错误信息')),
+                ('baseline_p95_ms', models.PositiveIntegerField(blank=True, help_text='本次运行结束时同名任务历史成功运行的 P95 耗时；样本不足时为空。', null=True, verbose_name='历史 P95 耗时(毫秒)')),
+                ('exceeded_p95', models.BooleanField(default=False, verbose_name='超出历史 P95')),
+                ('hostname', models.CharField(blank=True, max_length=100, verbose_name='运行主机')),
+            ],
+            options={
+                'verbose_name': '定时任务运行记录',
+                'verbose_name_plural': '定时任务运行记录',
+                'db_table': 'core_job_runs',
+                'ordering': ('-started_at',),
+                'indexes': [models.Index(fields=['job_name', '-started_at'], name='idx_core_job_run_name_start')],
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ from .questionnaire_option import QuestionnaireOption
 from .treatment_cycle import TreatmentCycle
 from .plan_item import PlanItem
 from .tasks import DailyTask
+from .job_run import JobRun
 from . import choices
 
 __all__ = [
@@ -25,5 +26,6 @@ __all__ = [
     "TreatmentCycle",
     "PlanItem",
     "DailyTask",
+    "JobRun",
     "choices",
 ]
@@ -0,0 +1,59 @@
+"""定时任务（管理命令）运行台账模型。"""
+
+from django.db import models
+
+
+class JobRun(models.Model):
+    """一次管理命令运行的耗时、阶段、行数、SQL 次数与内存峰值记录。"""
+
+    class Status(models.TextChoices):
+        RUNNING = "running", "运行中"
+        SUCCESS = "success", "成功"
+        FAILED = "failed", "失败"
+
+    job_name = models.CharField("任务名称", max_length=100, help_text="通常为管理命令名称。")
+    status = models.CharField(
+        "运行状态",
+        max_length=16,
+        choices=Status.choices,
+        default=Status.RUNNING,
+    )
+    started_at = models.DateTimeField("开始时间")
+    finished_at = models.DateTimeField("结束时间", null=True, blank=True)
+    duration_ms = models.PositiveIntegerField("耗时(毫秒)", null=True, blank=True)
+    query_count = models.PositiveIntegerField("SQL 次数", default=0)
+    rows = models.JSONField(
+        "影响行数",
+        blank=True,
+        default=dict,
+        help_text="按指标记录的行数，例如 {\"generated\": 1200}。",
+    )
+    phases = models.JSONField(
+        "阶段耗时",
+        blank=True,
+        default=list,
+        help_text="按执行顺序记录的阶段列表：name / duration_ms / query_count。",
+    )
+    peak_rss_kb = models.PositiveIntegerField("内存峰值(KB)", null=True, blank=True)
+    arguments = models.JSONField("运行参数", blank=True, default=dict)
+    error = models.TextField("错误信息", blank=True)
+    baseline_p95_ms = models.PositiveIntegerField(
+        "历史 P95 耗时(毫秒)",
+        null=True,
+        blank=True,
+        help_text="本次运行结束时同名任务历史成功运行的 P95 耗时；样本不足时为空。",
+    )
+    exceeded_p95 = models.BooleanField("超出历史 P95", default=False)
+    hostname = models.CharField("运行主机", max_length=100, blank=True)
+
+    class Meta:
+        db_table = "core_job_runs"
+        verbose_name = "定时任务运行记录"
+        verbose_name_plural = "定时任务运行记录"
+        ordering = ("-started_at",)
+        indexes = [
+            models.Index(fields=["job_name", "-started_at"], name="idx_core_job_run_name_start"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.job_name}@{self.started_at:%Y-%m-%d %H:%M}"
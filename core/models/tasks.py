@@ -1,6 +1,7 @@
 """每日任务实例模型。"""
 
 from django.db import models
+from django.utils import timezone
 
 from . import choices
 
@@ -55,6 +56,12 @@ class DailyTask(models.Model):
         default=choices.TaskStatus.PENDING,
     )
     completed_at = models.DateTimeField("完成时间", null=True, blank=True)
+    status_transition_date = models.DateField(
+        "状态流转日期",
+        null=True,
+        blank=True,
+        help_text="下一次需要重新计算状态的日期；已完成、已终止的任务为空。",
+    )
     is_locked = models.BooleanField("是否锁定", default=False)
     related_report_type = models.PositiveSmallIntegerField(
         "关联报告类型",
@@ -80,11 +87,23 @@ class DailyTask(models.Model):
         verbose_name_plural = "每日任务"
         indexes = [
             models.Index(fields=["patient", "task_date"], name="idx_core_task_patient_date"),
+            models.Index(fields=["status_transition_date"], name="idx_core_task_transition"),
+            models.Index(
+                fields=["patient", "status_transition_date"],
+                name="idx_core_task_patient_trans",
+            ),
         ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.task_date} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        # 新建或被重置的未完成任务交给状态引擎：不晚于今天重新计算一次状态，
+        # 由引擎写入准确的下一次流转日期。
+        if self.status != choices.TaskStatus.COMPLETED and self.status_transition_date is None:
+            self.status_transition_date = min(self.task_date, timezone.localdate())
+        super().save(*args, **kwargs)
+
     # 业务辅助方法
     @property
     def is_completed(self) -> bool:
@@ -0,0 +1,332 @@
+"""带击穿保护的读穿缓存：单飞锁、概率提前刷新、过期值兜底、大对象压缩与按命名空间计数。
+
+缓存值以信封 (标记, 新鲜截止时间戳, 计算耗时, 是否压缩, 载荷) 存储，实际 TTL = ttl + stale_ttl：
+
+- 新鲜期内按 XFetch 算法以计算耗时为尺度随机提前刷新，热点键不会在同一时刻集中过期；
+- 需要刷新时只有拿到 "<key>:lock" 的请求回源，其余请求直接返回旧值（stale-while-revalidate）；
+- 完全未命中时拿不到锁的请求短暂轮询等待持锁者写回，超时后才自行回源；
+- Redis 故障时直接回源，不影响业务。
+
+显式失效（删除键或递增版本号）仍立即生效：被删除的键不会再返回旧值。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# 超过该字节数（pickle 后）的载荷按需 zlib 压缩；调用方传 compress_min_bytes 启用。
+DEFAULT_COMPRESS_MIN_BYTES = 16 * 1024
+_ZLIB_LEVEL = 6
+_ENVELOPE_TAG = "lcc-cache:1"
+_LOCK_SUFFIX = ":lock"
+_WAIT_POLL_SECONDS = 0.02
+
+STATUS_HIT = "hit"
+STATUS_STALE = "stale"
+STATUS_WAIT = "wait"
+STATUS_MISS = "miss"
+STATUS_REFRESH = "refresh"
+STATUS_BYPASS = "bypass"
+_STATUSES = (STATUS_HIT, STATUS_STALE, STATUS_WAIT, STATUS_MISS, STATUS_REFRESH, STATUS_BYPASS)
+
+_CACHE_DOWN = object()
+
+# 进程级计数：命名空间 → 各状态次数与累计耗时。
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+class CacheFetch(NamedTuple):
+    value: Any
+    status: str
+    compute_ms: float
+
+
+def _record(namespace: str, counts: Dict[str, int], lookup_ms: float, compute_ms: float) -> None:
+    with _stats_lock:
+        bucket = _stats.get(namespace)
+        if bucket is None:
+            bucket = _stats[namespace] = {
+                **{name: 0 for name in _STATUSES},
+                "lookup_ms": 0.0,
+                "compute_ms": 0.0,
+            }
+        for status, count in counts.items():
+            bucket[status] += count
+        bucket["lookup_ms"] += lookup_ms
+        bucket["compute_ms"] += compute_ms
+
+
+def get_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    【功能说明】
+    - 返回当前进程各命名空间的缓存计数快照。
+
+    【返回值说明】
+    - {namespace: {hit/stale/wait/miss/refresh/bypass: 次数, lookup_ms/compute_ms: 累计毫秒}}。
+    """
+    with _stats_lock:
+        return {namespace: dict(bucket) for namespace, bucket in _stats.items()}
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def _pack(value: Any, ttl: int, compute_seconds: float, compress_min_bytes: Optional[int]) -> tuple:
+    payload, compressed = value, False
+    if compress_min_bytes is not None:
+        raw = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(raw) >= compress_min_bytes:
+            packed = zlib.compress(raw, _ZLIB_LEVEL)
+            if len(packed) < len(raw):
+                payload, compressed = packed, True
+    return (_ENVELOPE_TAG, time.time() + ttl, compute_seconds, compressed, payload)
+
+
+def _unpack(envelope: tuple) -> Any:
+    payload = envelope[4]
+    return pickle.loads(zlib.decompress(payload)) if envelope[3] else payload
+
+
+def _is_envelope(obj: Any) -> bool:
+    return isinstance(obj, tuple) and len(obj) == 5 and obj[0] == _ENVELOPE_TAG
+
+
+def _needs_refresh(envelope: tuple, beta: float, now: float) -> bool:
+    fresh_until, compute_seconds = envelope[1], envelope[2]
+    if now >= fresh_until:
+        return True
+    if beta <= 0 or compute_seconds <= 0:
+        return False
+    # XFetch：越接近过期、回源越慢，越可能提前刷新。
+    return now - compute_seconds * beta * math.log(1.0 - random.random()) >= fresh_until
+
+
+def _acquire(lock_key: str, lock_timeout: int) -> bool:
+    try:
+        return bool(cache.add(lock_key, 1, lock_timeout))
+    except Exception:  # pragma: no cover - Redis 故障时不加锁直接回源
+        logger.warning("cache lock acquire failed key=%s", lock_key, exc_info=True)
+        return True
+
+
+def _release(lock_key: str) -> None:
+    try:
+        cache.delete(lock_key)
+    except Exception:  # pragma: no cover - 锁会按 lock_timeout 自动过期
+        logger.warning("cache lock release failed key=%s", lock_key, exc_info=True)
+
+
+def _store_timeout(ttl: int, stale_ttl: Optional[int]) -> int:
+    return ttl + (ttl if stale_ttl is None else stale_ttl)
+
+
+def _compute(fetcher: Callable[[], Any]) -> tuple:
+    started = time.perf_counter()
+    value = fetcher()
+    return value, time.perf_counter() - started
+
+
+def _compute_and_store(
+    key: str,
+    fetcher: Callable[[], Any],
+    ttl: int,
+    stale_ttl: Optional[int],
+    compress_min_bytes: Optional[int],
+    store: bool = True,
+) -> tuple:
+    value, compute_seconds = _compute(fetcher)
+    if store:
+        try:
+            cache.set(
+                key,
+                _pack(value, ttl, compute_seconds, compress_min_bytes),
+                _store_timeout(ttl, stale_ttl),
+            )
+        except Exception:  # pragma: no cover - 写缓存失败不影响本次结果
+            logger.warning("cache write failed key=%s", key, exc_info=True)
+    return value, compute_seconds * 1000
+
+
+def _wait_for(key: str, wait_timeout: float) -> Any:
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(_WAIT_POLL_SECONDS)
+        try:
+            envelope = cache.get(key)
+        except Exception:  # pragma: no cover
+            return None
+        if _is_envelope(envelope):
+            return envelope
+    return None
+
+
+def fetch_cached(
+    key: str,
+    fetcher: Callable[[], Any],
+    ttl: int,
+    *,
+    namespace: str,
+    bypass: bool = False,
+    stale_ttl: Optional[int] = None,
+    beta: float = 1.0,
+    lock_timeout: int = 10,
+    wait_timeout: float = 2.0,
+    compress_min_bytes: Optional[int] = None,
+) -> CacheFetch:
+    """
+    【功能说明】
+    - 读穿缓存：命中返回缓存值，否则由单个请求调用 fetcher 回源并写回。
+
+    【使用方法】
+    - fetch_cached(key, lambda: get_daily_plan_summary(patient), 30, namespace="home.plan").value
+
+    【参数说明】
+    - ttl: 新鲜期秒数；stale_ttl: 新鲜期后仍可作为兜底返回的秒数，默认等于 ttl。
+    - namespace: 计数用命名空间。
+    - bypass: True 时跳过读取，直接回源并写回。
+    - beta: 提前刷新系数，0 关闭提前刷新。
+    - lock_timeout: 回源锁自动过期秒数；wait_timeout: 未命中且未拿到锁时的最长等待秒数。
+    - compress_min_bytes: 启用压缩的载荷字节阈值，None 不压缩。
+
+    【返回值说明】
+    - CacheFetch(value, status, compute_ms)，status 取 hit/stale/wait/miss/refresh/bypass。
+    """
+    if bypass:
+        value, compute_ms = _compute_and_store(key, fetcher, ttl, stale_ttl, compress_min_bytes)
+        _record(namespace, {STATUS_BYPASS: 1}, 0.0, compute_ms)
+        return CacheFetch(value, STATUS_BYPASS, compute_ms)
+
+    started = time.perf_counter()
+    try:
+        envelope = cache.get(key)
+    except Exception:  # pragma: no cover - Redis 故障时直接回源
+        logger.warning("cache read failed key=%s", key, exc_info=True)
+        envelope = _CACHE_DOWN
+    lookup_ms = (time.perf_counter() - started) * 1000
+
+    if envelope is _CACHE_DOWN:
+        value, compute_ms = _compute_and_store(key, fetcher, ttl, stale_ttl, compress_min_bytes, store=False)
+        _record(namespace, {STATUS_MISS: 1}, lookup_ms, compute_ms)
+        return CacheFetch(value, STATUS_MISS, compute_ms)
+
+    lock_key = f"{key}{_LOCK_SUFFIX}"
+    if _is_envelope(envelope):
+        if not _needs_refresh(envelope, beta, time.time()):
+            _record(namespace, {STATUS_HIT: 1}, lookup_ms, 0.0)
+            return CacheFetch(_unpack(envelope), STATUS_HIT, 0.0)
+        if not _acquire(lock_key, lock_timeout):
+            _record(namespace, {STATUS_STALE: 1}, lookup_ms, 0.0)
+            return CacheFetch(_unpack(envelope), STATUS_STALE, 0.0)
+        status = STATUS_REFRESH
+    elif _acquire(lock_key, lock_timeout):
+        status = STATUS_MISS
+    else:
+        envelope = _wait_for(key, wait_timeout)
+        lookup_ms = (time.perf_counter() - started) * 1000
+        if envelope is not None:
+            _record(namespace, {STATUS_WAIT: 1}, lookup_ms, 0.0)
+            return CacheFetch(_unpack(envelope), STATUS_WAIT, 0.0)
+        # 持锁者超时未写回：自行回源，避免请求无限等待。
+        value, compute_ms = _compute_and_store(key, fetcher, ttl, stale_ttl, compress_min_bytes)
+        _record(namespace, {STATUS_MISS: 1}, lookup_ms, compute_ms)
+        return CacheFetch(value, STATUS_MISS, compute_ms)
+
+    try:
+        value, compute_ms = _compute_and_store(key, fetcher, ttl, stale_ttl, compress_min_bytes)
+    finally:
+        _release(lock_key)
+    _record(namespace, {status: 1}, lookup_ms, compute_ms)
+    return CacheFetch(value, status, compute_ms)
+
+
+def fetch_cached_many(
+    keys: Dict[Hashable, str],
+    fetch_missing: Callable[[list], Dict[Hashable, Any]],
+    ttl: int,
+    *,
+    namespace: str,
+    stale_ttl: Optional[int] = None,
+    beta: float = 1.0,
+    lock_timeout: int = 10,
+    compress_min_bytes: Optional[int] = None,
+) -> Dict[Hashable, Any]:
+    """
+    【功能说明】
+    - 批量读穿缓存：一次 get_many 读取，未命中（及需刷新）的条目由 fetch_missing 一次性回源。
+    - 需刷新的条目若锁已被其它请求持有，直接返回旧值；完全未命中的条目总是回源。
+
+    【参数说明】
+    - keys: {标识: 缓存键}。
+    - fetch_missing: 接收标识列表，返回 {标识: 值}，须覆盖全部传入标识。
+    - 其余参数同 fetch_cached。
+
+    【返回值说明】
+    - {标识: 值}。
+    """
+    started = time.perf_counter()
+    try:
+        envelopes = cache.get_many(list(keys.values()))
+    except Exception:  # pragma: no cover - Redis 故障时直接回源
+        logger.warning("cache read failed namespace=%s", namespace, exc_info=True)
+        return fetch_missing(list(keys))
+    lookup_ms = (time.perf_counter() - started) * 1000
+
+    now = time.time()
+    values: Dict[Hashable, Any] = {}
+    to_fetch: list = []
+    locked: list = []
+    counts = {STATUS_HIT: 0, STATUS_STALE: 0, STATUS_MISS: 0, STATUS_REFRESH: 0}
+    for ident, key in keys.items():
+        envelope = envelopes.get(key)
+        if not _is_envelope(envelope):
+            to_fetch.append(ident)
+            counts[STATUS_MISS] += 1
+        elif not _needs_refresh(envelope, beta, now):
+            values[ident] = _unpack(envelope)
+            counts[STATUS_HIT] += 1
+        elif _acquire(f"{key}{_LOCK_SUFFIX}", lock_timeout):
+            to_fetch.append(ident)
+            locked.append(key)
+            counts[STATUS_REFRESH] += 1
+        else:
+            values[ident] = _unpack(envelope)
+            counts[STATUS_STALE] += 1
+
+    compute_ms = 0.0
+    if to_fetch:
+        try:
+            fresh, compute_seconds = _compute(lambda: fetch_missing(to_fetch))
+        finally:
+            for key in locked:
+                _release(f"{key}{_LOCK_SUFFIX}")
+        compute_ms = compute_seconds * 1000
+        # 批量回源耗时按条目均摊，作为各条目的提前刷新尺度。
+        per_item_seconds = compute_seconds / len(to_fetch)
+        try:
+            cache.set_many(
+                {
+                    keys[ident]: _pack(fresh[ident], ttl, per_item_seconds, compress_min_bytes)
+                    for ident in to_fetch
+                },
+                _store_timeout(ttl, stale_ttl),
+            )
+        except Exception:  # pragma: no cover - 写缓存失败不影响本次结果
+            logger.warning("cache write failed namespace=%s", namespace, exc_info=True)
+        values.update({ident: fresh[ident] for ident in to_fetch})
+
+    _record(namespace, counts, lookup_ms, compute_ms)
+    return values
@@ -0,0 +1,340 @@
+"""标准库目录缓存服务（复查项目 / 监测模板 / 问卷）。
+
+复查项目库、监测模板、问卷模板属于低频变更的参考数据，却在归档、指标页、
+监测写入、问卷页等几乎每个请求中被重复读取。本模块提供进程内缓存：
+
+- 每个 gunicorn/celery 进程各自持有一份目录快照，命中时仅为字典读取；
+- 全局版本号存放在 Redis（Django cache）中，后台保存/删除时通过信号递增；
+- 进程每隔 CATALOG_VERSION_CHECK_INTERVAL_SECONDS 秒比对一次版本号，
+  版本变化即整体丢弃本地快照，下次访问时重新构建。
+
+若当前事务已写入目录数据，事务剩余部分的读取直接查库，既保证读到
+自己的写入，也避免把未提交（可能回滚）的数据放进进程缓存。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Prefetch
+
+from core.models import (
+    CheckupLibrary,
+    MonitoringTemplate,
+    Questionnaire,
+    QuestionnaireOption,
+    QuestionnaireQuestion,
+)
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_CACHE_KEY = "core:catalog:version"
+# 两次版本比对之间的最长间隔；后台改动在该时间内传播到所有进程。
+CATALOG_VERSION_CHECK_INTERVAL_SECONDS = 5
+# Redis 不可用时的兜底：本地快照最长保留时间。
+CATALOG_LOCAL_MAX_AGE_SECONDS = 300
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {
+    "version": None,
+    "checked_at": 0.0,
+    "built_at": 0.0,
+    "entries": {},
+}
+# 记录“已写入目录数据”的最外层事务块（数据库连接本身即线程隔离）。
+_txn_state = threading.local()
+
+
+def _current_outer_atomic():
+    if not connection.in_atomic_block or not connection.atomic_blocks:
+        return None
+    return connection.atomic_blocks[0]
+
+
+def mark_catalog_dirty_in_transaction() -> None:
+    """标记当前事务已改动目录数据，事务结束前的读取绕过进程缓存。"""
+    outer_atomic = _current_outer_atomic()
+    if outer_atomic is not None:
+        _txn_state.dirty_atomic = outer_atomic
+
+
+def _should_bypass_process_cache() -> bool:
+    outer_atomic = _current_outer_atomic()
+    if outer_atomic is None:
+        return False
+    return getattr(_txn_state, "dirty_atomic", None) is outer_atomic
+
+
+def _read_remote_version() -> Optional[int]:
+    try:
+        value = cache.get(CATALOG_VERSION_CACHE_KEY)
+    except Exception:  # pragma: no cover - Redis 故障时降级为本地 TTL
+        logger.warning("catalog version read failed", exc_info=True)
+        return None
+    return int(value) if value is not None else 0
+
+
+def clear_local_catalog_cache() -> None:
+    """丢弃当前进程内的目录快照（不影响其它进程）。"""
+    with _lock:
+        _state["entries"] = {}
+        _state["version"] = None
+        _state["checked_at"] = 0.0
+        _state["built_at"] = 0.0
+
+
+def bump_catalog_version() -> None:
+    """
+    【功能说明】
+    - 递增全局目录版本号，并清空当前进程快照；
+    - 其它进程在下一次版本比对时丢弃各自的快照。
+
+    【使用方法】
+    - 由 core.signals 在目录模型保存/删除提交后调用；
+    - queryset.update() 不触发信号，批量更新后需手动调用。
+    """
+    clear_local_catalog_cache()
+    _txn_state.dirty_atomic = None
+    try:
+        if not cache.add(CATALOG_VERSION_CACHE_KEY, 1, timeout=None):
+            cache.incr(CATALOG_VERSION_CACHE_KEY)
+    except Exception:  # pragma: no cover - Redis 故障时仅依赖本地 TTL
+        logger.warning("catalog version bump failed", exc_info=True)
+
+
+def _sync_local_version() -> None:
+    now = time.monotonic()
+    if now - _state["checked_at"] < CATALOG_VERSION_CHECK_INTERVAL_SECONDS:
+        return
+    remote_version = _read_remote_version()
+    with _lock:
+        expired = now - _state["built_at"] > CATALOG_LOCAL_MAX_AGE_SECONDS
+        if remote_version is None:
+            if expired:
+                _state["entries"] = {}
+                _state["built_at"] = now
+        elif remote_version != _state["version"]:
+            _state["entries"] = {}
+            _state["version"] = remote_version
+            _state["built_at"] = now
+        _state["checked_at"] = now
+
+
+def get_or_build(name: str, builder: Callable[[], Any]) -> Any:
+    """
+    【功能说明】
+    - 读取名为 name 的目录快照；不存在时调用 builder 构建并缓存。
+    - 返回值为进程共享对象，调用方只读使用，需要修改时请自行拷贝。
+
+    【参数说明】
+    - name: str，快照名称，模块内唯一。
+    - builder: Callable[[], Any]，无参构建函数，只访问目录类数据。
+    """
+    if _should_bypass_process_cache():
+        return builder()
+
+    _sync_local_version()
+    entries = _state["entries"]
+    if name in entries:
+        return entries[name]
+
+    value = builder()
+    with _lock:
+        _state["entries"][name] = value
+    return value
+
+
+def _build_checkup_libraries() -> List[CheckupLibrary]:
+    return list(CheckupLibrary.objects.all())
+
+
+def _build_monitoring_templates() -> List[MonitoringTemplate]:
+    return list(MonitoringTemplate.objects.all().order_by("sort_order", "name", "id"))
+
+
+def _build_questionnaires() -> List[Questionnaire]:
+    return list(Questionnaire.objects.all().order_by("sort_order", "name", "id"))
+
+
+def _build_questionnaires_with_questions() -> List[Questionnaire]:
+    options_qs = QuestionnaireOption.objects.order_by("seq", "id")
+    questions_qs = QuestionnaireQuestion.objects.order_by("seq", "id").prefetch_related(
+        Prefetch("options", queryset=options_qs)
+    )
+    return list(
+        Questionnaire.objects.filter(is_active=True)
+        .order_by("sort_order", "name", "id")
+        .prefetch_related(Prefetch("questions", queryset=questions_qs))
+    )
+
+
+@dataclass(frozen=True)
+class QuestionnaireGraph:
+    """
+    单个问卷的只读题目/选项图，供提交校验与算分在内存中完成。
+
+    - questions: 按 seq、id 排序的题目；
+    - questions_by_id / options_by_id: 主键索引；
+    - option_values_by_question: {题目 ID: 该题全部选项 value}，用于 EQ-5D-5L 配置校验。
+    """
+
+    questionnaire: Questionnaire
+    questions: Tuple[QuestionnaireQuestion, ...]
+    questions_by_id: Mapping[int, QuestionnaireQuestion]
+    options_by_id: Mapping[int, QuestionnaireOption]
+    option_values_by_question: Mapping[int, Tuple[str, ...]]
+
+
+def _build_questionnaire_graph(questionnaire_id: int) -> QuestionnaireGraph:
+    questionnaire = Questionnaire.objects.get(id=questionnaire_id)
+    questions = tuple(
+        QuestionnaireQuestion.objects.filter(questionnaire_id=questionnaire.id).order_by(
+            "seq", "id"
+        )
+    )
+    questions_by_id = {question.id: question for question in questions}
+    options_by_id: Dict[int, QuestionnaireOption] = {}
+    option_values: Dict[int, List[str]] = {}
+    options = QuestionnaireOption.objects.filter(
+        question_id__in=list(questions_by_id)
+    ).order_by("seq", "id")
+    for option in options:
+        # 复用同一题目实例，避免访问 option.question 时再查库。
+        option.question = questions_by_id[option.question_id]
+        options_by_id[option.id] = option
+        option_values.setdefault(option.question_id, []).append(option.value)
+    return QuestionnaireGraph(
+        questionnaire=questionnaire,
+        questions=questions,
+        questions_by_id=MappingProxyType(questions_by_id),
+        options_by_id=MappingProxyType(options_by_id),
+        option_values_by_question=MappingProxyType(
+            {question_id: tuple(values) for question_id, values in option_values.items()}
+        ),
+    )
+
+
+class CatalogService:
+    """目录数据只读访问入口，结果来自进程内快照。"""
+
+    @staticmethod
+    def get_checkup_libraries(*, active_only: bool = False) -> List[CheckupLibrary]:
+        """
+        【功能说明】
+        - 返回复查项目库（按 sort_order、name 排序）。
+
+        【参数说明】
+        - active_only: bool，是否仅返回启用项目。
+        """
+        items = get_or_build("checkup_libraries", _build_checkup_libraries)
+        if active_only:
+            return [item for item in items if item.is_active]
+        return list(items)
+
+    @staticmethod
+    def get_checkup_library(pk: int | str | None) -> Optional[CheckupLibrary]:
+        """按主键返回复查项目；不存在或主键非法时返回 None。"""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        by_id = get_or_build(
+            "checkup_libraries_by_id",
+            lambda: {item.id: item for item in CatalogService.get_checkup_libraries()},
+        )
+        return by_id.get(pk)
+
+    @staticmethod
+    def get_checkup_libraries_by_ids(ids: Iterable[int]) -> Dict[int, CheckupLibrary]:
+        """批量按主键返回复查项目，语义同 QuerySet.in_bulk。"""
+        result = {}
+        for pk in ids:
+            item = CatalogService.get_checkup_library(pk)
+            if item is not None:
+                result[item.id] = item
+        return result
+
+    @staticmethod
+    def get_checkup_library_map_by_name() -> Dict[str, CheckupLibrary]:
+        """返回 {项目名称: CheckupLibrary}，重名时以排序靠后的为准（同原有字典推导）。"""
+        by_name = get_or_build(
+            "checkup_libraries_by_name",
+            lambda: {item.name: item for item in CatalogService.get_checkup_libraries()},
+        )
+        return dict(by_name)
+
+    @staticmethod
+    def get_monitoring_templates(*, active_only: bool = False) -> List[MonitoringTemplate]:
+        """返回监测模板（按 sort_order、name 排序）。"""
+        items = get_or_build("monitoring_templates", _build_monitoring_templates)
+        if active_only:
+            return [item for item in items if item.is_active]
+        return list(items)
+
+    @staticmethod
+    def get_monitoring_template_ids(codes: Iterable[str]) -> List[int]:
+        """
+        【功能说明】
+        - 按监测编码返回模板 ID 列表（不区分启用状态，与原查询口径一致）。
+
+        【参数说明】
+        - codes: Iterable[str]，MonitoringTemplate.code 集合。
+        """
+        code_set = set(codes)
+        return [
+            item.id
+            for item in CatalogService.get_monitoring_templates()
+            if item.code in code_set
+        ]
+
+    @staticmethod
+    def get_monitoring_template_code_map() -> Dict[int, str]:
+        """返回 {模板 ID: 监测编码}。"""
+        code_map = get_or_build(
+            "monitoring_template_codes",
+            lambda: {
+                item.id: item.code for item in CatalogService.get_monitoring_templates()
+            },
+        )
+        return dict(code_map)
+
+    @staticmethod
+    def get_questionnaires(*, active_only: bool = False) -> List[Questionnaire]:
+        """返回问卷模板（按 sort_order、name 排序），不含题目。"""
+        items = get_or_build("questionnaires", _build_questionnaires)
+        if active_only:
+            return [item for item in items if item.is_active]
+        return list(items)
+
+    @staticmethod
+    def get_active_questionnaires_with_questions() -> List[Questionnaire]:
+        """返回启用中的问卷模板，题目与选项已按 seq 预加载。"""
+        return list(
+            get_or_build(
+                "questionnaires_with_questions",
+                _build_questionnaires_with_questions,
+            )
+        )
+
+    @staticmethod
+    def get_questionnaire_graph(questionnaire_id: int | str) -> QuestionnaireGraph:
+        """
+        【功能说明】
+        - 返回问卷的只读题目/选项图，按目录版本缓存（后台修改题目、选项后自动失效）。
+        - 不区分启用状态，与按主键直接查询问卷的口径一致。
+
+        【异常说明】
+        - 问卷不存在或主键非法：抛出 Questionnaire.DoesNotExist / ValueError（同 objects.get）。
+        """
+        questionnaire_id = int(questionnaire_id)
+        return get_or_build(
+            f"questionnaire_graph:{questionnaire_id}",
+            lambda: _build_questionnaire_graph(questionnaire_id),
+        )
@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import Iterable, List, TypedDict
 
 from core.models import CheckupLibrary
+from core.service.catalog import CatalogService
 
 
 class CheckupPlanItem(TypedDict):
@@ -32,7 +33,7 @@ def get_active_checkup_library() -> List[CheckupPlanItem]:
       - schedule: 推荐执行天数模板。
     """
 
-    qs: Iterable[CheckupLibrary] = CheckupLibrary.objects.filter(is_active=True)
+    qs: Iterable[CheckupLibrary] = CatalogService.get_checkup_libraries(active_only=True)
 
     items: List[CheckupPlanItem] = []
     for item in qs:
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import calendar
 import logging
-from datetime import date, timedelta
+import threading
+from datetime import date
 
 try:
     import chinese_calendar
@@ -13,9 +15,15 @@ logger = logging.getLogger(__name__)
 
 
 class ChinaCalendarService:
-    """中国节假日/周末判定服务。"""
+    """中国节假日/周末判定服务。
+
+    每日元数据按自然年整年预计算为元组（下标为当年第几天 - 1），每个进程每年只构建一次；
+    疗程表头按日期区间切片拷贝，不再逐日查询节假日库。
+    """
 
     _MISSING_DEPENDENCY_WARNED = False
+    _DAY_META_TABLES: dict[int, tuple[dict, ...]] = {}
+    _DAY_META_TABLES_LOCK = threading.Lock()
     _UNSUPPORTED_YEARS_WARNED: set[int] = set()
     _WEEKEND_NAME_MAP = {
         5: "周六",
@@ -34,6 +42,34 @@ class ChinaCalendarService:
 
     @classmethod
     def get_day_meta(cls, target_date: date) -> dict:
+        table = cls._get_year_table(target_date.year)
+        return dict(table[target_date.timetuple().tm_yday - 1])
+
+    @classmethod
+    def clear_day_meta_cache(cls) -> None:
+        """清空已构建的年度表（节假日库升级或测试替换依赖后使用）。"""
+        with cls._DAY_META_TABLES_LOCK:
+            cls._DAY_META_TABLES = {}
+
+    @classmethod
+    def _get_year_table(cls, year: int) -> tuple[dict, ...]:
+        table = cls._DAY_META_TABLES.get(year)
+        if table is not None:
+            return table
+        with cls._DAY_META_TABLES_LOCK:
+            table = cls._DAY_META_TABLES.get(year)
+            if table is None:
+                first_day = date(year, 1, 1)
+                day_count = 366 if calendar.isleap(year) else 365
+                table = tuple(
+                    cls._compute_day_meta(date.fromordinal(first_day.toordinal() + offset))
+                    for offset in range(day_count)
+                )
+                cls._DAY_META_TABLES = {**cls._DAY_META_TABLES, year: table}
+        return table
+
+    @classmethod
+    def _compute_day_meta(cls, target_date: date) -> dict:
         weekday = target_date.weekday()
         is_weekend = weekday >= 5
         weekend_name = cls._WEEKEND_NAME_MAP.get(weekday, "")
@@ -84,11 +120,16 @@ class ChinaCalendarService:
             return {"header_days": [], "header_week_ranges": []}
 
         header_days: list[dict] = []
-        for offset in range(cycle_days_int):
-            target_date = start_date + timedelta(days=offset)
-            day_meta = cls.get_day_meta(target_date)
-            day_meta["day_index"] = offset + 1
-            header_days.append(day_meta)
+        current = start_date
+        while len(header_days) < cycle_days_int:
+            table = cls._get_year_table(current.year)
+            start_index = current.timetuple().tm_yday - 1
+            chunk = table[start_index : start_index + cycle_days_int - len(header_days)]
+            for day_meta in chunk:
+                header_days.append({**day_meta, "day_index": len(header_days) + 1})
+            if current.year == date.max.year:
+                break
+            current = date(current.year + 1, 1, 1)
 
         header_week_ranges: list[dict] = []
         for start_idx in range(0, len(header_days), 7):
@@ -0,0 +1,382 @@
+"""
+【模块说明】定时任务运行台账。
+
+生产环境的定时任务都是管理命令（generate_daily_tasks、send_daily_task_reminders 等），
+此前只在 stdout 打印最终数量，耗时翻倍也无人察觉。本模块为每次运行写一条 JobRun：
+
+- 开始 / 结束时间、总耗时、SQL 次数、进程内存峰值、错误堆栈；
+- 阶段耗时（record.phase("...")）与各阶段影响行数（record.add_rows("...", n)）；
+- 结束时与同名任务历史成功运行的 P95 比较，超出阈值写标记、打 WARNING 日志并可推送群机器人；
+- 结束时清理同名任务超过 JOB_RUN_RETENTION_DAYS 天的旧记录，台账不会无限增长。
+
+【使用方法】
+    class Command(BaseCommand):
+        @track_job_run()
+        def handle(self, *args, **options):
+            with self.job_run.phase("generate"):
+                count = generate(...)
+            self.job_run.add_rows("generated", count)
+
+服务层代码可通过 job_phase("...") / record_job_rows("...", n) 向当前运行追加记录，
+不在台账作用域内时两者均为空操作。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import socket
+import sys
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+from typing import Callable, Iterator
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import JobRun
+
+try:  # pragma: no cover - Windows 无 resource 模块
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+ERROR_MAX_CHARS = 4000
+# BaseCommand 注入的通用参数，不写入台账。
+_IGNORED_OPTIONS = {
+    "verbosity",
+    "settings",
+    "pythonpath",
+    "traceback",
+    "no_color",
+    "force_color",
+    "skip_checks",
+    "stdout",
+    "stderr",
+}
+
+_current_job: ContextVar["JobRecorder | None"] = ContextVar("current_job", default=None)
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:  # pragma: no cover
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节。
+    return int(peak // 1024) if sys.platform == "darwin" else int(peak)
+
+
+def _json_safe_options(options: dict) -> dict:
+    safe = {}
+    for key, value in options.items():
+        if key in _IGNORED_OPTIONS:
+            continue
+        if value is None or isinstance(value, (bool, int, float, str)):
+            safe[key] = value
+        else:
+            safe[key] = str(value)
+    return safe
+
+
+def percentile(values: list[int], pct: float) -> int | None:
+    """最近秩法百分位；空列表返回 None。"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class JobRecorder:
+    """单次运行的内存记录器；JOB_LEDGER_ENABLED 关闭时同样可用，只是不落库。"""
+
+    def __init__(self, job_name: str) -> None:
+        self.job_name = job_name
+        self.query_count = 0
+        self.rows: dict[str, int] = {}
+        self.phases: list[dict] = []
+        self.run: JobRun | None = None
+        self._phase_stack: list[dict] = []
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.query_count += 1
+        for phase in self._phase_stack:
+            phase["query_count"] += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[dict]:
+        """记录一个阶段的耗时与 SQL 次数；阶段可嵌套，按结束顺序写入。"""
+        entry = {"name": name, "duration_ms": 0, "query_count": 0}
+        self._phase_stack.append(entry)
+        started = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["duration_ms"] = int((time.perf_counter() - started) * 1000)
+            self._phase_stack.remove(entry)
+            self.phases.append(entry)
+
+    def add_rows(self, key: str, count: int | None) -> None:
+        """累加某项指标的影响行数。"""
+        self.rows[key] = self.rows.get(key, 0) + int(count or 0)
+
+
+def current_job() -> JobRecorder | None:
+    """返回当前作用域内的运行记录器；不在台账作用域内返回 None。"""
+    return _current_job.get()
+
+
+@contextmanager
+def job_phase(name: str) -> Iterator[dict | None]:
+    """服务层使用的阶段记录；不在台账作用域内时为空操作。"""
+    recorder = current_job()
+    if recorder is None:
+        yield None
+        return
+    with recorder.phase(name) as entry:
+        yield entry
+
+
+def record_job_rows(key: str, count: int | None) -> None:
+    """服务层使用的行数记录；不在台账作用域内时为空操作。"""
+    recorder = current_job()
+    if recorder is not None:
+        recorder.add_rows(key, count)
+
+
+def _ledger_enabled() -> bool:
+    return getattr(settings, "JOB_LEDGER_ENABLED", True)
+
+
+def _start_run(job_name: str, arguments: dict) -> JobRun | None:
+    if not _ledger_enabled():
+        return None
+    try:
+        return JobRun.objects.create(
+            job_name=job_name,
+            started_at=timezone.now(),
+            arguments=arguments,
+            hostname=socket.gethostname()[:100],
+        )
+    except Exception:  # pragma: no cover - 台账写入失败不影响任务本身
+        logger.warning("job ledger start failed job=%s", job_name, exc_info=True)
+        return None
+
+
+def historical_p95_ms(job_name: str, exclude_id: int | None = None) -> int | None:
+    """
+    【功能说明】
+    - 取同名任务最近 JOB_LEDGER_P95_WINDOW 次成功运行的 P95 耗时；
+    - 样本少于 JOB_LEDGER_P95_MIN_RUNS 时返回 None，避免新任务误报。
+    """
+    window = getattr(settings, "JOB_LEDGER_P95_WINDOW", 30)
+    min_runs = getattr(settings, "JOB_LEDGER_P95_MIN_RUNS", 5)
+    durations = list(
+        JobRun.objects.filter(
+            job_name=job_name,
+            status=JobRun.Status.SUCCESS,
+            duration_ms__isnull=False,
+        )
+        .exclude(pk=exclude_id)
+        .order_by("-started_at")
+        .values_list("duration_ms", flat=True)[:window]
+    )
+    if len(durations) < min_runs:
+        return None
+    return percentile(durations, 95)
+
+
+def _send_duration_alert(run: JobRun) -> None:
+    message = (
+        f"定时任务 {run.job_name} 耗时 {run.duration_ms}ms，"
+        f"超出历史 P95 {run.baseline_p95_ms}ms（运行记录 #{run.pk}，主机 {run.hostname or '-'}）"
+    )
+    logger.warning("job run exceeded p95 job=%s run_id=%s: %s", run.job_name, run.pk, message)
+    webhook_url = getattr(settings, "JOB_LEDGER_ALERT_WEBHOOK_URL", "")
+    if not webhook_url:
+        return
+    import requests
+
+    try:
+        # 企业微信 / 钉钉群机器人通用的文本消息格式。
+        requests.post(
+            webhook_url,
+            json={"msgtype": "text", "text": {"content": message}},
+            timeout=5,
+        )
+    except Exception:  # pragma: no cover - 告警推送失败仅记录日志
+        logger.warning("job ledger alert webhook failed job=%s", run.job_name, exc_info=True)
+
+
+def purge_expired_job_runs(job_name: str | None = None) -> int:
+    """
+    【功能说明】
+    - 删除开始时间早于 JOB_RUN_RETENTION_DAYS 天的运行记录；配置为 0 时不清理。
+    - 指定 job_name 时只清理该任务，走 (job_name, started_at) 索引。
+
+    【返回值说明】
+    - int：删除的记录数。
+    """
+    retention_days = getattr(settings, "JOB_RUN_RETENTION_DAYS", 180)
+    if not retention_days:
+        return 0
+    runs = JobRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=retention_days))
+    if job_name is not None:
+        runs = runs.filter(job_name=job_name)
+    deleted, _ = runs.delete()
+    return deleted
+
+
+def _finish_run(recorder: JobRecorder, started: float, error: str) -> None:
+    run = recorder.run
+    if run is None:
+        return
+    run.finished_at = timezone.now()
+    run.duration_ms = int((time.perf_counter() - started) * 1000)
+    run.status = JobRun.Status.FAILED if error else JobRun.Status.SUCCESS
+    run.error = error[-ERROR_MAX_CHARS:]
+    run.query_count = recorder.query_count
+    run.rows = recorder.rows
+    run.phases = recorder.phases
+    run.peak_rss_kb = _peak_rss_kb()
+    try:
+        if run.status == JobRun.Status.SUCCESS:
+            run.baseline_p95_ms = historical_p95_ms(run.job_name, exclude_id=run.pk)
+            factor = getattr(settings, "JOB_LEDGER_P95_ALERT_FACTOR", 1.2)
+            run.exceeded_p95 = bool(
+                run.baseline_p95_ms is not None
+                and run.duration_ms > run.baseline_p95_ms * factor
+            )
+        run.save()
+    except Exception:  # pragma: no cover - 台账写入失败不影响任务本身
+        logger.warning("job ledger finish failed job=%s", run.job_name, exc_info=True)
+        return
+    if run.exceeded_p95:
+        _send_duration_alert(run)
+    try:
+        purge_expired_job_runs(run.job_name)
+    except Exception:  # pragma: no cover - 清理失败下次运行再试
+        logger.warning("job ledger purge failed job=%s", run.job_name, exc_info=True)
+
+
+@contextmanager
+def record_job_run(job_name: str, arguments: dict | None = None) -> Iterator[JobRecorder]:
+    """
+    【功能说明】
+    - 以上下文管理器形式记录一次运行；异常会写入台账后原样抛出。
+
+    【使用方法】
+    - with record_job_run("backfill_x") as job: ...
+    """
+    recorder = JobRecorder(job_name)
+    recorder.run = _start_run(job_name, _json_safe_options(arguments or {}))
+    token = _current_job.set(recorder)
+    started = time.perf_counter()
+    error = ""
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder._count_query))
+            yield recorder
+    except BaseException:
+        error = traceback.format_exc()
+        raise
+    finally:
+        _current_job.reset(token)
+        _finish_run(recorder, started, error)
+
+
+def track_job_run(job_name: str | None = None) -> Callable:
+    """
+    【功能说明】
+    - 管理命令 handle() 装饰器：整个 handle 记为一次运行，记录器挂在 self.job_run 上。
+
+    【参数说明】
+    - job_name: 台账中的任务名称，默认取命令模块名（即 manage.py 子命令名）。
+    """
+
+    def decorator(handle: Callable) -> Callable:
+        @wraps(handle)
+        def _wrapped(self, *args, **options):
+            name = job_name or self.__module__.rsplit(".", 1)[-1]
+            with record_job_run(name, options) as recorder:
+                self.job_run = recorder
+                return handle(self, *args, **options)
+
+        return _wrapped
+
+    return decorator
+
+
+def get_job_trends(days: int = 30) -> list[dict]:
+    """
+    【功能说明】
+    - 汇总最近 days 天各任务的运行次数、失败次数、超标次数、平均耗时与每日最大耗时，供后台趋势页展示。
+    - 汇总与按日统计均在数据库分组完成；P95 取告警基线口径（最近 JOB_LEDGER_P95_WINDOW 次成功运行）。
+
+    【返回值说明】
+    - List[dict]，按任务名称排序；daily 为 [{date, duration_ms, status, bar_pct}]，按日期升序，
+      当天有失败运行时 status 为 failed。
+    """
+    runs = JobRun.objects.filter(started_at__gte=timezone.now() - timedelta(days=days))
+    success = Q(status=JobRun.Status.SUCCESS)
+    summaries = list(
+        runs.values("job_name")
+        .annotate(
+            runs=Count("id"),
+            failures=Count("id", filter=Q(status=JobRun.Status.FAILED)),
+            exceeded=Count("id", filter=Q(exceeded_p95=True)),
+            avg_ms=Avg("duration_ms", filter=success),
+            last_run_id=Max("id"),
+        )
+        .order_by("job_name")
+    )
+    daily_rows = (
+        runs.annotate(day=TruncDate("started_at"))
+        .values("job_name", "day")
+        .annotate(
+            duration_ms=Max("duration_ms"),
+            failures=Count("id", filter=Q(status=JobRun.Status.FAILED)),
+        )
+        .order_by("job_name", "day")
+    )
+    daily_by_job: dict[str, list[dict]] = {}
+    for row in daily_rows:
+        daily_by_job.setdefault(row["job_name"], []).append(
+            {
+                "date": row["day"],
+                "duration_ms": row["duration_ms"] or 0,
+                "status": JobRun.Status.FAILED if row["failures"] else JobRun.Status.SUCCESS,
+            }
+        )
+    last_runs = JobRun.objects.in_bulk([summary["last_run_id"] for summary in summaries])
+
+    trends = []
+    for summary in summaries:
+        daily = daily_by_job.get(summary["job_name"], [])
+        peak = max((item["duration_ms"] for item in daily), default=0) or 1
+        for item in daily:
+            item["bar_pct"] = max(2, round(item["duration_ms"] * 100 / peak))
+        trends.append(
+            {
+                "job_name": summary["job_name"],
+                "runs": summary["runs"],
+                "failures": summary["failures"],
+                "exceeded": summary["exceeded"],
+                "avg_ms": round(summary["avg_ms"]) if summary["avg_ms"] is not None else None,
+                "p95_ms": historical_p95_ms(summary["job_name"]),
+                "last_run": last_runs.get(summary["last_run_id"]),
+                "daily": daily,
+            }
+        )
+    return trends
@@ -0,0 +1,293 @@
+"""脚本化压测场景：以 Django 测试客户端在进程内回放典型请求序列，统计吞吐与延迟。
+
+不依赖外部压测工具，单台 Linux 机器即可针对 SQLite / MySQL 压测库执行；
+请求完整经过中间件、视图、模板与数据库，但不包含网络与 WSGI 服务器开销。
+场景账号取自 generate_synthetic_population 生成的合成人群。
+
+- patient_morning_checkin：患者打开首页、健康日历，录入血氧与血压；
+- doctor_triage：医生打开工作台、患者列表、待办，再逐个查看患者工作台与指标页；
+- device_backlog_replay：手表离线后补传多条历史健康数据包。
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from business_support.services.device_integrations.iwown_samples import build_historical_backlog_body
+from core.service.synthetic_population import (
+    SYNTHETIC_DEVICE_PREFIX,
+    SYNTHETIC_USERNAME_PREFIX,
+)
+
+LOAD_PERCENTILES = (50, 95, 99)
+
+
+def default_load_host() -> str:
+    """压测请求默认使用的 Host：ALLOWED_HOSTS 中第一个非通配项。"""
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != "*":
+            return host.lstrip(".")
+    # ALLOWED_HOSTS 为空时 DEBUG 模式只放行 localhost。
+    return "localhost"
+
+
+@dataclass
+class StepStats:
+    durations_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.durations_ms)
+        result = {"count": len(ordered), "errors": self.errors}
+        for percentile in LOAD_PERCENTILES:
+            result[f"p{percentile}_ms"] = (
+                round(ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)], 1)
+                if ordered
+                else None
+            )
+        result["max_ms"] = round(ordered[-1], 1) if ordered else None
+        return result
+
+
+class ScenarioContext:
+    """单个工作线程的场景上下文：独立的测试客户端与计时记录。"""
+
+    def __init__(self, host: str, rng: random.Random, stats: Dict[str, StepStats], lock: threading.Lock):
+        self.client = Client(HTTP_HOST=host)
+        self.rng = rng
+        self._stats = stats
+        self._lock = lock
+
+    def request(
+        self,
+        step: str,
+        method: str,
+        path: str,
+        *,
+        expect: Optional[Callable] = None,
+        **kwargs,
+    ):
+        started_at = time.perf_counter()
+        error = False
+        response = None
+        try:
+            response = getattr(self.client, method)(path, **kwargs)
+            # 不跟随重定向：3xx 多为登录态失效，同样计为错误。
+            error = response.status_code >= 300 or (expect is not None and not expect(response))
+        except Exception:
+            error = True
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        with self._lock:
+            stats = self._stats.setdefault(step, StepStats())
+            stats.durations_ms.append(elapsed_ms)
+            stats.errors += int(error)
+        return response
+
+
+def _json_success(response) -> bool:
+    try:
+        return response.json().get("status") == "success"
+    except ValueError:
+        return False
+
+
+def _synthetic_patients():
+    from users.models import PatientProfile
+
+    return list(
+        PatientProfile.objects.filter(
+            user__username__startswith=SYNTHETIC_USERNAME_PREFIX, is_active=True
+        )
+        .select_related("user")
+        .order_by("id")
+    )
+
+
+def _synthetic_doctors():
+    from users.models import DoctorProfile
+
+    return list(
+        DoctorProfile.objects.filter(user__username__startswith=SYNTHETIC_USERNAME_PREFIX)
+        .select_related("user")
+        .order_by("id")
+    )
+
+
+def _synthetic_device_ids() -> List[str]:
+    from business_support.models import Device
+
+    return list(
+        Device.objects.filter(
+            sn__startswith=SYNTHETIC_DEVICE_PREFIX, current_patient__isnull=False
+        ).values_list("imei", flat=True)
+    )
+
+
+def _patient_morning_checkin(context: ScenarioContext, actors: Sequence) -> None:
+    patient = context.rng.choice(actors)
+    context.client.force_login(patient.user)
+    now = timezone.localtime()
+    context.request("patient_home", "get", reverse("web_patient:patient_home"))
+    context.request("health_calendar", "get", reverse("web_patient:health_calendar"))
+    context.request(
+        "record_spo2",
+        "post",
+        reverse("web_patient:record_spo2"),
+        data={"spo2": context.rng.randint(90, 99), "record_time": now.strftime("%Y-%m-%d %H:%M")},
+        HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        expect=_json_success,
+    )
+    context.request(
+        "record_bp",
+        "post",
+        reverse("web_patient:record_bp"),
+        data={
+            "ssy": context.rng.randint(105, 150),
+            "szy": context.rng.randint(65, 95),
+            "heart": context.rng.randint(60, 100),
+            "record_time": now.strftime("%Y-%m-%d %H:%M"),
+        },
+        HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        expect=_json_success,
+    )
+
+
+def _doctor_triage(context: ScenarioContext, actors: Sequence) -> None:
+    from users.models import PatientProfile
+
+    doctor = context.rng.choice(actors)
+    context.client.force_login(doctor.user)
+    context.request("doctor_workspace", "get", reverse("web_doctor:doctor_workspace"))
+    context.request("patient_list", "get", reverse("web_doctor:doctor_workspace_patient_list"))
+    context.request("todo_list", "get", reverse("web_doctor:doctor_todo_list"))
+    patient_ids = list(
+        PatientProfile.objects.filter(doctor=doctor, is_active=True).values_list("id", flat=True)[:50]
+    )
+    for patient_id in context.rng.sample(patient_ids, min(3, len(patient_ids))):
+        context.request(
+            "patient_workspace", "get", reverse("web_doctor:patient_workspace", args=[patient_id])
+        )
+        context.request(
+            "patient_indicators",
+            "get",
+            reverse("web_doctor:patient_workspace_section", args=[patient_id, "indicators"]),
+        )
+
+
+def _device_backlog_replay(context: ScenarioContext, actors: Sequence) -> None:
+    device_id = context.rng.choice(actors)
+    # 离线约一天后补传：每 30 分钟一条，分 4 次上传。
+    base = timezone.localtime() - timedelta(hours=24)
+    for chunk in range(4):
+        moments = [base + timedelta(minutes=30 * (chunk * 12 + slot)) for slot in range(12)]
+        context.request(
+            "iwown_pb_upload",
+            "post",
+            reverse("iwown_health_data_upload"),
+            data=build_historical_backlog_body(device_id, moments, context.rng, first_sequence=chunk * 12),
+            content_type="application/x-www-form-urlencoded",
+            expect=lambda response: response.content == b"\x00",
+        )
+
+
+@dataclass(frozen=True)
+class LoadScenario:
+    name: str
+    load_actors: Callable[[], Sequence]
+    run_iteration: Callable[[ScenarioContext, Sequence], None]
+
+
+LOAD_SCENARIOS: Dict[str, LoadScenario] = {
+    scenario.name: scenario
+    for scenario in (
+        LoadScenario("patient_morning_checkin", _synthetic_patients, _patient_morning_checkin),
+        LoadScenario("doctor_triage", _synthetic_doctors, _doctor_triage),
+        LoadScenario("device_backlog_replay", _synthetic_device_ids, _device_backlog_replay),
+    )
+}
+
+
+def run_load_scenario(
+    name: str,
+    *,
+    iterations: int,
+    concurrency: int = 1,
+    host: str = "testserver",
+    seed: int = 2024,
+) -> dict:
+    """
+    【功能说明】
+    - 以 concurrency 个线程（各自独立的测试客户端与数据库连接）共执行 iterations 次场景，
+      汇总每个请求步骤的次数、错误数、p50/p95/p99/最大耗时与整体吞吐。
+    - concurrency=1 时在当前线程执行，可在测试事务内运行。
+
+    【参数说明】
+    - name: str，LOAD_SCENARIOS 中的场景名。
+    - iterations: int，场景总执行次数。
+    - concurrency: int，并发线程数。
+    - host: str，请求 Host 头，需在 ALLOWED_HOSTS 内。
+    - seed: int，随机种子。
+
+    【返回值说明】
+    - dict：{scenario, iterations, concurrency, elapsed_s, requests, errors,
+      throughput_rps, steps: {step: {count, errors, p50_ms, p95_ms, p99_ms, max_ms}}}。
+
+    【异常说明】
+    - 场景不存在或缺少合成数据时抛出 ValueError。
+    """
+    try:
+        scenario = LOAD_SCENARIOS[name]
+    except KeyError as exc:
+        raise ValueError(f"未知压测场景: {name}") from exc
+    actors = scenario.load_actors()
+    if not actors:
+        raise ValueError(f"场景 {name} 缺少合成数据，请先执行 generate_synthetic_population。")
+
+    stats: Dict[str, StepStats] = {}
+    lock = threading.Lock()
+    worker_count = max(1, min(concurrency, iterations))
+    shares = [iterations // worker_count + (index < iterations % worker_count) for index in range(worker_count)]
+
+    def worker(index: int) -> None:
+        context = ScenarioContext(host, random.Random(seed + index), stats, lock)
+        try:
+            for _ in range(shares[index]):
+                scenario.run_iteration(context, actors)
+        finally:
+            if worker_count > 1:
+                connections.close_all()
+
+    started_at = time.perf_counter()
+    if worker_count == 1:
+        worker(0)
+    else:
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(worker_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    requests = sum(len(step.durations_ms) for step in stats.values())
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "concurrency": worker_count,
+        "elapsed_s": round(elapsed, 3),
+        "requests": requests,
+        "errors": sum(step.errors for step in stats.values()),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else None,
+        "steps": {step: step_stats.summary() for step, step_stats in stats.items()},
+    }
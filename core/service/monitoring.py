@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import List
 
 from core.models import MonitoringTemplate
+from core.service.catalog import CatalogService
 
 
 class MonitoringService:
@@ -21,6 +22,4 @@ class MonitoringService:
         【返回参数说明】
         - 返回 List[MonitoringTemplate]。
         """
-        return list(
-            MonitoringTemplate.objects.filter(is_active=True).order_by("sort_order", "name")
-        )
+        return CatalogService.get_monitoring_templates(active_only=True)
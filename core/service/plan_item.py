@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import logging
 from datetime import date
 from typing import Any, Dict, List, Optional, Tuple
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
@@ -17,6 +19,44 @@ from core.models import (
     TreatmentCycle,
     choices,
 )
+from core.service.cache_fetch import DEFAULT_COMPRESS_MIN_BYTES, fetch_cached
+from core.service.catalog import CATALOG_VERSION_CACHE_KEY, CatalogService
+from core.service.task_scheduler import notify_plan_items_changed
+
+logger = logging.getLogger(__name__)
+
+# 计划视图缓存：疗程计划版本号 + 目录版本号进入键名，计划或标准库写入后旧键自然失效。
+PLAN_VIEW_CACHE_TTL_SECONDS = 10 * 60
+_PLAN_VERSION_KEY = "core:plan:version:{cycle_id}"
+_PLAN_VIEW_KEY = "core:plan:view:{patient_id}:{cycle_id}:{version}:{catalog_version}"
+
+
+def _incr_cycle_plan_version(cycle_id: int) -> None:
+    key = _PLAN_VERSION_KEY.format(cycle_id=cycle_id)
+    try:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception:  # pragma: no cover - Redis 故障时缓存读取同样降级查库
+        logger.warning("plan version bump failed cycle_id=%s", cycle_id, exc_info=True)
+
+
+def invalidate_cycle_plan_view(cycle_id: int | None) -> None:
+    """
+    【功能说明】
+    - 递增疗程计划版本号，使该疗程已缓存的计划视图全部失效。
+    - 写入时立即递增一次，保证本进程随后的读取拿到新数据；事务提交后再递增一次，
+      丢弃其它进程在提交前用旧数据重建的缓存。
+
+    【使用方法】
+    - PlanItem / TreatmentCycle 的保存、删除信号自动调用；
+      bulk_create、queryset.update 等绕过信号的批量写入需手动调用。
+    """
+    if not cycle_id:
+        return
+    _incr_cycle_plan_version(cycle_id)
+    transaction.on_commit(lambda: _incr_cycle_plan_version(cycle_id))
+
+
 class PlanItemService:
     """Service layer for CRUD-like interactions on plan items."""
 
@@ -58,7 +98,7 @@ class PlanItemService:
                 plan_map.get((choices.PlanItemCategory.CHECKUP, chk.id)),
                 cycle.cycle_days,
             )
-            for chk in CheckupLibrary.objects.filter(is_active=True).order_by("sort_order", "name")
+            for chk in CatalogService.get_checkup_libraries(active_only=True)
         ]
         questionnaires = [
             cls._build_questionnaire_payload(
@@ -66,7 +106,7 @@ class PlanItemService:
                 plan_map.get((choices.PlanItemCategory.QUESTIONNAIRE, q.id)),
                 cycle.cycle_days,
             )
-            for q in Questionnaire.objects.filter(is_active=True).order_by("sort_order", "name")
+            for q in CatalogService.get_questionnaires(active_only=True)
         ]
         monitorings = [
             cls._build_monitoring_payload(
@@ -74,7 +114,7 @@ class PlanItemService:
                 plan_map.get((choices.PlanItemCategory.MONITORING, tpl.id)),
                 cycle.cycle_days,
             )
-            for tpl in MonitoringTemplate.objects.filter(is_active=True).order_by("sort_order", "name")
+            for tpl in CatalogService.get_monitoring_templates(active_only=True)
         ]
 
         return {
@@ -93,6 +133,41 @@ class PlanItemService:
             "monitorings": monitorings,
         }
 
+    @classmethod
+    def get_cached_cycle_plan_view(cls, cycle: TreatmentCycle) -> Dict[str, Any]:
+        """
+        【功能说明】
+        - get_cycle_plan_view 的缓存版本，供医生端计划表等 HTMX 局部刷新复用。
+        - 缓存键由 患者 × 疗程 × 计划版本号 × 目录版本号 组成，无需显式删除旧键。
+
+        【参数说明】
+        - cycle: TreatmentCycle 实例（需带 patient_id）。
+
+        【返回参数说明】
+        - 与 get_cycle_plan_view 相同的 dict。
+        """
+
+        version_key = _PLAN_VERSION_KEY.format(cycle_id=cycle.id)
+        try:
+            versions = cache.get_many([version_key, CATALOG_VERSION_CACHE_KEY])
+        except Exception:  # pragma: no cover - Redis 故障时直接查库
+            logger.warning("plan view cache read failed cycle_id=%s", cycle.id, exc_info=True)
+            return cls.get_cycle_plan_view(cycle.id)
+
+        cache_key = _PLAN_VIEW_KEY.format(
+            patient_id=cycle.patient_id,
+            cycle_id=cycle.id,
+            version=int(versions.get(version_key) or 0),
+            catalog_version=int(versions.get(CATALOG_VERSION_CACHE_KEY) or 0),
+        )
+        return fetch_cached(
+            cache_key,
+            lambda: cls.get_cycle_plan_view(cycle.id),
+            PLAN_VIEW_CACHE_TTL_SECONDS,
+            namespace="core.plan_view",
+            compress_min_bytes=DEFAULT_COMPRESS_MIN_BYTES,
+        ).value
+
     @classmethod
     @transaction.atomic
     def toggle_item_status(
@@ -166,6 +241,8 @@ class PlanItemService:
                 plan.schedule_days = schedule
                 plan.updated_by = user
                 plan.save(update_fields=["status", "schedule_days", "updated_by", "updated_at"])
+        if plan:
+            notify_plan_items_changed([plan.id])
         return plan
 
     @classmethod
@@ -211,9 +288,11 @@ class PlanItemService:
         else:
             update_fields = ["schedule_days", "updated_by", "updated_at"]
         plan.save(update_fields=update_fields)
+        notify_plan_items_changed([plan.id])
         return plan
 
     @classmethod
+    @transaction.atomic
     def update_item_field(cls, plan_item_id: int, field_name: str, value: Any, user: Any) -> PlanItem:
         """
         【功能说明】
@@ -237,6 +316,7 @@ class PlanItemService:
         setattr(plan, field_name, value)
         plan.updated_by = user
         plan.save(update_fields=[field_name, "updated_by", "updated_at"])
+        notify_plan_items_changed([plan.id])
         return plan
 
     @classmethod
@@ -277,6 +357,11 @@ class PlanItemService:
             )
 
         PlanItem.objects.bulk_create(cloned_items)
+        invalidate_cycle_plan_view(target_cycle.id)
+        # MySQL 的 bulk_create 不回填主键，按目标疗程重新取 ID。
+        notify_plan_items_changed(
+            PlanItem.objects.filter(cycle=target_cycle).values_list("id", flat=True)
+        )
         return len(cloned_items)
 
     # ------------------------------------------------------------------
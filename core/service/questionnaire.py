@@ -12,6 +12,7 @@ from core.models import (
     QuestionnaireOption,
     QuestionnaireQuestion,
 )
+from core.service.catalog import CatalogService
 
 
 class QuestionnaireService:
@@ -46,9 +47,7 @@ class QuestionnaireService:
         >>> qs = QuestionnaireService.get_active_questionnaires()
         >>> for q in qs:
         """
-        return list(
-            Questionnaire.objects.filter(is_active=True).order_by("sort_order", "name")
-        )
+        return CatalogService.get_questionnaires(active_only=True)
 
     @staticmethod
     def get_questionnaire_detail(questionnaire_id: int) -> Optional[Dict[str, Any]]:
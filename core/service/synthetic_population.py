@@ -0,0 +1,690 @@
+"""压测 / 容量评估用的合成人群数据生成。
+
+按与线上相近的结构与频率批量造数：医生与工作室、销售、患者及家属账号、订单、
+工作室归属、连续疗程与计划条目、数月的每日任务、设备与手工体征、异常预警、
+咨询会话与消息、复查报告上传。
+
+- 全部通过 bulk_create 分批写入，不触发 post_save 信号（不会写缓存脏集合、
+  不会发送通知）；生成后如需月度快照请单独执行 refresh_patient_monthly_stats；
+- MySQL 的 bulk_create 不回填主键，后续依赖主键的数据均按唯一字段回查；
+- 合成账号用户名以 SYNTHETIC_USERNAME_PREFIX 开头、设备 SN 以 SYNTHETIC_DEVICE_PREFIX 开头，
+  purge_synthetic_population 据此清理。
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import (
+    DailyTask,
+    Medication,
+    MonitoringTemplate,
+    PlanItem,
+    TreatmentCycle,
+    choices as core_choices,
+)
+from core.service import tasks as task_service
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_USERNAME_PREFIX = "synthetic_"
+SYNTHETIC_DEVICE_PREFIX = "SYN-"
+SYNTHETIC_PRODUCT_NAME = "合成压测服务包"
+SYNTHETIC_PHONE_PREFIX = "17"
+SYNTHETIC_CYCLE_DAYS = 21
+
+# 设备体征的日采集频次（条/天），与手表默认上报节奏接近。
+DEVICE_DAILY_CADENCE = {
+    "M_HR": 12,
+    "M_SPO2": 4,
+    "M_BP": 2,
+    "M_STEPS": 1,
+}
+# 手工监测项目及对应取值区间（主值、副值）。
+MANUAL_METRIC_RANGES = {
+    "M_TEMP": ((36.0, 37.6), None),
+    "M_WEIGHT": ((45.0, 85.0), None),
+}
+DEVICE_METRIC_RANGES = {
+    "M_HR": ((55, 110), None),
+    "M_SPO2": ((89, 99), None),
+    "M_BP": ((100, 165), (60, 100)),
+    "M_STEPS": ((500, 12000), None),
+}
+SPO2_ALERT_THRESHOLD = 92
+
+
+@dataclass
+class SyntheticPopulationOptions:
+    patients: int = 200
+    doctors: int = 0
+    months: int = 3
+    device_ratio: float = 0.6
+    family_ratio: float = 0.3
+    chat_sessions_per_week: float = 1.0
+    seed: int = 2024
+    batch_size: int = 200
+
+
+@dataclass
+class SyntheticPopulationResult:
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, key: str, value: int) -> None:
+        self.counts[key] = self.counts.get(key, 0) + value
+
+
+@contextmanager
+def _keep_explicit_timestamps(*model_fields):
+    """bulk_create 期间临时关闭 auto_now/auto_now_add，使回填的历史时间生效。"""
+    saved = []
+    for model, field_name in model_fields:
+        model_field = model._meta.get_field(field_name)
+        saved.append((model_field, model_field.auto_now, model_field.auto_now_add))
+        model_field.auto_now = model_field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for model_field, auto_now, auto_now_add in saved:
+            model_field.auto_now = auto_now
+            model_field.auto_now_add = auto_now_add
+
+
+def _aware(day: date, hour: int, minute: int = 0) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def _uniform(rng: random.Random, bounds) -> Decimal:
+    return Decimal(str(round(rng.uniform(*bounds), 1)))
+
+
+class _PopulationBuilder:
+    def __init__(self, options: SyntheticPopulationOptions, log: Callable[[str], None]):
+        self.options = options
+        self.log = log
+        self.rng = random.Random(options.seed)
+        self.today = timezone.localdate()
+        self.history_start = self.today - timedelta(days=options.months * 30)
+        self.run_tag = uuid.uuid4().hex[:8]
+        self.result = SyntheticPopulationResult()
+        self.phone_base = int(self.run_tag, 16) % 10**4 * 10**4
+
+    def _phone(self, segment: int, index: int) -> str:
+        # 17 + 号段位（0 患者 / 1 医护销售）+ 8 位序号，同一批次内不重复。
+        return f"{SYNTHETIC_PHONE_PREFIX}{segment}{self.phone_base + index:08d}"
+
+    # ---- 共享数据 ----
+
+    def prepare_shared(self) -> None:
+        from business_support.models import DeviceProvider
+        from market.models import Product
+        from users import choices
+        from users.models import CustomUser, DoctorProfile, DoctorStudio, SalesProfile
+
+        doctor_count = self.options.doctors or max(1, self.options.patients // 500)
+        self.doctors = []
+        for index in range(doctor_count):
+            user = CustomUser.objects.create_user(
+                username=f"{SYNTHETIC_USERNAME_PREFIX}{self.run_tag}_doctor_{index}",
+                password=None,
+                user_type=choices.UserType.DOCTOR,
+                phone=self._phone(1, index),
+                wx_nickname=f"合成医生{index}",
+            )
+            doctor = DoctorProfile.objects.create(
+                user=user, name=f"合成医生{index}", hospital="合成医院", department="肿瘤科"
+            )
+            studio = DoctorStudio.objects.create(
+                name=f"合成工作室{index}",
+                code=f"SYN{self.run_tag[:6]}{index:04d}",
+                owner_doctor=doctor,
+            )
+            doctor.studio = studio
+            doctor.save(update_fields=["studio"])
+            self.doctors.append(doctor)
+        sales_user = CustomUser.objects.create_user(
+            username=f"{SYNTHETIC_USERNAME_PREFIX}{self.run_tag}_sales",
+            password=None,
+            user_type=choices.UserType.SALES,
+            phone=self._phone(1, doctor_count),
+            wx_nickname="合成销售",
+        )
+        self.sales = SalesProfile.objects.create(user=sales_user, name="合成销售")
+        self.sales.doctors.add(*self.doctors)
+        self.result.add("doctors", doctor_count)
+
+        self.product, _ = Product.objects.get_or_create(
+            name=SYNTHETIC_PRODUCT_NAME,
+            defaults={"price": Decimal("199.00"), "duration_days": 365, "is_active": False},
+        )
+        self.medication = Medication.objects.filter(is_active=True).order_by("id").first()
+        if self.medication is None:
+            self.medication = Medication.objects.create(
+                name="合成测试药物", name_abbr="HCCSYW", default_dosage="10mg", default_frequency="qd"
+            )
+        codes = list(DEVICE_DAILY_CADENCE) + list(MANUAL_METRIC_RANGES)
+        self.monitoring_templates = list(
+            MonitoringTemplate.objects.filter(code__in=codes, is_active=True).order_by("sort_order", "id")
+        )
+        self.provider = DeviceProvider.objects.filter(code="IWOWN").first()
+
+    # ---- 患者批次 ----
+
+    def build_batch(self, offset: int, size: int) -> None:
+        from users import choices
+        from users.models import CustomUser, PatientProfile, PatientRelation
+
+        rng = self.rng
+        prefix = f"{SYNTHETIC_USERNAME_PREFIX}{self.run_tag}_p"
+        usernames = [f"{prefix}{offset + index}" for index in range(size)]
+        CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=username,
+                    user_type=choices.UserType.PATIENT,
+                    wx_openid=f"{username}_openid",
+                    wx_nickname=f"合成患者{offset + index}",
+                )
+                for index, username in enumerate(usernames)
+            ]
+        )
+        user_ids = dict(
+            CustomUser.objects.filter(username__in=usernames).values_list("username", "id")
+        )
+        profiles = []
+        for index, username in enumerate(usernames):
+            doctor = self.doctors[(offset + index) % len(self.doctors)]
+            profiles.append(
+                PatientProfile(
+                    user_id=user_ids[username],
+                    phone=self._phone(0, offset + index),
+                    name=f"合成患者{offset + index}",
+                    gender=rng.choice(choices.Gender.values),
+                    birth_date=date(rng.randint(1945, 1985), rng.randint(1, 12), rng.randint(1, 28)),
+                    doctor=doctor,
+                    sales=self.sales,
+                )
+            )
+        PatientProfile.objects.bulk_create(profiles)
+        patients = list(
+            PatientProfile.objects.filter(user_id__in=user_ids.values())
+            .select_related("doctor", "user")
+            .order_by("id")
+        )
+        PatientProfile.objects.filter(id__in=[p.id for p in patients]).update(
+            created_at=_aware(self.history_start, 9)
+        )
+        self.result.add("patients", len(patients))
+
+        # 家属账号与授权关系
+        family_users = []
+        family_for = []
+        for patient in patients:
+            if rng.random() < self.options.family_ratio:
+                family_users.append(
+                    CustomUser(
+                        username=f"{patient.user.username}_family",
+                        user_type=choices.UserType.PATIENT,
+                        wx_openid=f"{patient.user.username}_family_openid",
+                    )
+                )
+                family_for.append(patient)
+        CustomUser.objects.bulk_create(family_users)
+        family_ids = dict(
+            CustomUser.objects.filter(
+                username__in=[user.username for user in family_users]
+            ).values_list("username", "id")
+        )
+        PatientRelation.objects.bulk_create(
+            [
+                PatientRelation(
+                    patient=patient,
+                    user_id=family_ids[f"{patient.user.username}_family"],
+                    relation_type=rng.choice(
+                        [choices.RelationType.CHILD, choices.RelationType.SPOUSE]
+                    ),
+                    name=f"{patient.name}家属",
+                    phone="",
+                )
+                for patient in family_for
+            ]
+        )
+        self.result.add("relations", len(family_for))
+
+        self._build_orders_and_assignments(patients)
+        self._build_plans_and_tasks(patients)
+        device_patients = self._build_devices(patients)
+        self._build_metrics_and_alerts(patients, device_patients)
+        self._build_chats(patients)
+        self._build_reports(patients)
+
+    def _build_orders_and_assignments(self, patients) -> None:
+        from chat.models import PatientStudioAssignment
+        from market.models import Order
+
+        paid_at = _aware(self.history_start, 10)
+        Order.objects.bulk_create(
+            [
+                Order(
+                    order_no=f"SYN{self.run_tag}{patient.id:010d}",
+                    patient=patient,
+                    product=self.product,
+                    amount=self.product.price,
+                    status=Order.Status.PAID,
+                    paid_at=paid_at,
+                )
+                for patient in patients
+            ]
+        )
+        PatientStudioAssignment.objects.bulk_create(
+            [
+                PatientStudioAssignment(
+                    patient=patient, studio_id=patient.doctor.studio_id, start_at=paid_at
+                )
+                for patient in patients
+            ]
+        )
+        self.result.add("orders", len(patients))
+
+    def _build_plans_and_tasks(self, patients) -> None:
+        cycles = []
+        cycle_start = self.history_start
+        while cycle_start <= self.today:
+            cycle_end = cycle_start + timedelta(days=SYNTHETIC_CYCLE_DAYS - 1)
+            for patient in patients:
+                cycles.append(
+                    TreatmentCycle(
+                        patient=patient,
+                        name=f"合成疗程{cycle_start:%Y%m%d}",
+                        start_date=cycle_start,
+                        end_date=cycle_end,
+                        cycle_days=SYNTHETIC_CYCLE_DAYS,
+                        status=(
+                            core_choices.TreatmentCycleStatus.COMPLETED
+                            if cycle_end < self.today
+                            else core_choices.TreatmentCycleStatus.IN_PROGRESS
+                        ),
+                    )
+                )
+            cycle_start = cycle_end + timedelta(days=1)
+        TreatmentCycle.objects.bulk_create(cycles)
+        saved_cycles = list(TreatmentCycle.objects.filter(patient__in=patients))
+
+        all_days = list(range(1, SYNTHETIC_CYCLE_DAYS + 1))
+        plan_items = []
+        for cycle in saved_cycles:
+            plan_items.append(
+                PlanItem(
+                    cycle=cycle,
+                    category=core_choices.PlanItemCategory.MEDICATION,
+                    template_id=self.medication.id,
+                    item_name=self.medication.name,
+                    drug_dosage=self.medication.default_dosage or "",
+                    drug_usage=self.medication.default_frequency or "",
+                    schedule_days=all_days,
+                )
+            )
+            for template in self.monitoring_templates:
+                plan_items.append(
+                    PlanItem(
+                        cycle=cycle,
+                        category=core_choices.PlanItemCategory.MONITORING,
+                        template_id=template.id,
+                        item_name=template.name,
+                        schedule_days=template.schedule_days_template or all_days[::3],
+                    )
+                )
+        PlanItem.objects.bulk_create(plan_items, batch_size=2000)
+        self.result.add("cycles", len(saved_cycles))
+        self.result.add("plan_items", len(plan_items))
+
+        # 每名患者固定一个依从倾向，使人群依从率呈现分布而非均匀随机。
+        adherence = {patient.id: self.rng.betavariate(5, 2) for patient in patients}
+        yesterday = self.today - timedelta(days=1)
+        tasks = []
+        for item in PlanItem.objects.filter(cycle__in=saved_cycles).select_related("cycle"):
+            for day_index in item.schedule_days:
+                task_date = item.cycle.start_date + timedelta(days=day_index - 1)
+                completed = task_date <= yesterday and self.rng.random() < adherence[item.cycle.patient_id]
+                status = (
+                    core_choices.TaskStatus.COMPLETED
+                    if completed
+                    else task_service.resolve_task_status(
+                        task_type=item.category, task_date=task_date, as_of_date=self.today
+                    )
+                )
+                tasks.append(
+                    DailyTask(
+                        patient_id=item.cycle.patient_id,
+                        plan_item=item,
+                        task_date=task_date,
+                        task_type=item.category,
+                        title=item.item_name,
+                        status=status,
+                        completed_at=_aware(task_date, 9) if completed else None,
+                        status_transition_date=(
+                            None
+                            if completed
+                            else task_service.resolve_next_status_transition_date(
+                                task_type=item.category, task_date=task_date, as_of_date=self.today
+                            )
+                        ),
+                    )
+                )
+            if len(tasks) >= 5000:
+                DailyTask.objects.bulk_create(tasks)
+                self.result.add("tasks", len(tasks))
+                tasks = []
+        DailyTask.objects.bulk_create(tasks)
+        self.result.add("tasks", len(tasks))
+
+    def _build_devices(self, patients) -> List:
+        from business_support.models import Device
+        from business_support.services.device_binding_cache import invalidate_device_bindings
+
+        device_patients = [p for p in patients if self.rng.random() < self.options.device_ratio]
+        Device.objects.bulk_create(
+            [
+                Device(
+                    sn=f"{SYNTHETIC_DEVICE_PREFIX}{self.run_tag}-{patient.id}",
+                    imei=f"99{int(self.run_tag, 16) % 10**5:05d}{patient.id:08d}"[-15:],
+                    provider=self.provider,
+                    current_patient=patient,
+                    bind_at=_aware(self.history_start, 11),
+                )
+                for patient in device_patients
+            ]
+        )
+        # bulk_create 不触发信号，手动失效设备绑定缓存。
+        invalidate_device_bindings()
+        self.result.add("devices", len(device_patients))
+        return device_patients
+
+    def _build_metrics_and_alerts(self, patients, device_patients) -> None:
+        from health_data.models import HealthMetric, MetricSource
+        from patient_alerts.models import AlertEventType, AlertLevel, AlertStatus, PatientAlert
+
+        rng = self.rng
+        device_ids = {patient.id for patient in device_patients}
+        metrics = []
+        alerts = []
+        for patient in patients:
+            day = self.history_start
+            while day <= self.today:
+                if patient.id in device_ids:
+                    for metric_type, per_day in DEVICE_DAILY_CADENCE.items():
+                        main_range, sub_range = DEVICE_METRIC_RANGES[metric_type]
+                        for slot in range(per_day):
+                            hour = 8 + slot * 14 // per_day
+                            value = Decimal(rng.randint(*main_range))
+                            metrics.append(
+                                HealthMetric(
+                                    patient=patient,
+                                    metric_type=metric_type,
+                                    source=MetricSource.DEVICE,
+                                    value_main=value,
+                                    value_sub=Decimal(rng.randint(*sub_range)) if sub_range else None,
+                                    measured_at=_aware(day, hour, rng.randint(0, 59)),
+                                )
+                            )
+                            if metric_type == "M_SPO2" and value < SPO2_ALERT_THRESHOLD:
+                                alerts.append(
+                                    PatientAlert(
+                                        patient=patient,
+                                        doctor=patient.doctor,
+                                        event_type=AlertEventType.DATA,
+                                        event_level=(
+                                            AlertLevel.MODERATE if value < 90 else AlertLevel.MILD
+                                        ),
+                                        event_title="血氧偏低",
+                                        event_content=f"血氧 {value}%",
+                                        event_time=_aware(day, hour, 30),
+                                        status=(
+                                            AlertStatus.COMPLETED
+                                            if day < self.today - timedelta(days=3)
+                                            else AlertStatus.PENDING
+                                        ),
+                                    )
+                                )
+                for metric_type, (main_range, _) in MANUAL_METRIC_RANGES.items():
+                    if rng.random() < 0.4:
+                        metrics.append(
+                            HealthMetric(
+                                patient=patient,
+                                metric_type=metric_type,
+                                source=MetricSource.MANUAL,
+                                value_main=_uniform(rng, main_range),
+                                measured_at=_aware(day, 7, rng.randint(0, 59)),
+                            )
+                        )
+                if day.weekday() == 0 and rng.random() < 0.2:
+                    alerts.append(
+                        PatientAlert(
+                            patient=patient,
+                            doctor=patient.doctor,
+                            event_type=AlertEventType.BEHAVIOR,
+                            event_level=AlertLevel.MILD,
+                            event_title="连续未完成任务",
+                            event_time=_aware(day, 10),
+                            status=AlertStatus.PENDING,
+                        )
+                    )
+                if len(metrics) >= 10000:
+                    HealthMetric.objects.bulk_create(metrics)
+                    self.result.add("metrics", len(metrics))
+                    metrics = []
+                day += timedelta(days=1)
+        HealthMetric.objects.bulk_create(metrics)
+        self.result.add("metrics", len(metrics))
+        PatientAlert.objects.bulk_create(alerts, batch_size=2000)
+        self.result.add("alerts", len(alerts))
+
+    def _build_chats(self, patients) -> None:
+        from chat.models import (
+            Conversation,
+            ConversationSession,
+            ConversationType,
+            Message,
+            MessageSenderRole,
+        )
+
+        rng = self.rng
+        Conversation.objects.bulk_create(
+            [
+                Conversation(
+                    type=ConversationType.PATIENT_STUDIO,
+                    patient=patient,
+                    studio_id=patient.doctor.studio_id,
+                    created_by=patient.user,
+                )
+                for patient in patients
+            ]
+        )
+        conversations = {
+            conversation.patient_id: conversation
+            for conversation in Conversation.objects.filter(
+                patient__in=patients, type=ConversationType.PATIENT_STUDIO
+            )
+        }
+        weeks = max(1, (self.today - self.history_start).days // 7)
+        messages = []
+        sessions = []
+        for patient in patients:
+            conversation = conversations[patient.id]
+            studio_name = patient.doctor.studio.name if patient.doctor.studio_id else ""
+            for week in range(weeks):
+                if rng.random() >= self.options.chat_sessions_per_week:
+                    continue
+                start_at = _aware(
+                    self.history_start + timedelta(days=week * 7 + rng.randint(0, 6)),
+                    rng.randint(7, 22),
+                    rng.randint(0, 59),
+                )
+                count = rng.randint(2, 6)
+                for index in range(count):
+                    from_patient = index % 2 == 0
+                    sent_at = start_at + timedelta(minutes=3 * index)
+                    messages.append(
+                        Message(
+                            conversation=conversation,
+                            sender=patient.user if from_patient else patient.doctor.user,
+                            sender_role_snapshot=(
+                                MessageSenderRole.PATIENT
+                                if from_patient
+                                else MessageSenderRole.DIRECTOR
+                            ),
+                            sender_display_name_snapshot=(
+                                patient.name if from_patient else patient.doctor.name
+                            ),
+                            studio_name_snapshot=studio_name,
+                            text_content="合成咨询消息",
+                            created_at=sent_at,
+                            updated_at=sent_at,
+                        )
+                    )
+                sessions.append(
+                    ConversationSession(
+                        conversation=conversation,
+                        patient=patient,
+                        conversation_type=ConversationType.PATIENT_STUDIO,
+                        start_at=start_at,
+                        end_at=start_at + timedelta(minutes=3 * (count - 1)),
+                        message_count=count,
+                    )
+                )
+        with _keep_explicit_timestamps((Message, "created_at"), (Message, "updated_at")):
+            Message.objects.bulk_create(messages, batch_size=2000)
+        ConversationSession.objects.bulk_create(sessions, batch_size=2000)
+        touched = []
+        for session in sessions:
+            conversation = session.conversation
+            if conversation.last_message_at is None or session.end_at > conversation.last_message_at:
+                conversation.last_message_at = session.end_at
+                touched.append(conversation)
+        Conversation.objects.bulk_update(set(touched), ["last_message_at"], batch_size=2000)
+        self.result.add("messages", len(messages))
+        self.result.add("chat_sessions", len(sessions))
+
+    def _build_reports(self, patients) -> None:
+        from health_data.models import ReportImage, ReportUpload, UploaderRole, UploadSource
+
+        rng = self.rng
+        uploads = []
+        upload_days = []
+        for patient in patients:
+            day = self.history_start + timedelta(days=rng.randint(0, 29))
+            while day <= self.today:
+                uploads.append(
+                    ReportUpload(
+                        patient=patient,
+                        upload_source=UploadSource.PERSONAL_CENTER,
+                        uploader=patient.user,
+                        uploader_role=UploaderRole.PATIENT,
+                        created_at=_aware(day, 20),
+                    )
+                )
+                upload_days.append(day)
+                day += timedelta(days=30)
+        with _keep_explicit_timestamps((ReportUpload, "created_at")):
+            ReportUpload.objects.bulk_create(uploads, batch_size=2000)
+        saved = list(
+            ReportUpload.objects.filter(patient__in=patients).order_by("patient_id", "created_at")
+        )
+        images = []
+        for upload in saved:
+            report_day = timezone.localtime(upload.created_at).date()
+            archived = report_day < self.today - timedelta(days=7)
+            for index in range(rng.randint(1, 3)):
+                images.append(
+                    ReportImage(
+                        upload=upload,
+                        image_url=f"https://example.invalid/synthetic/{upload.id}/{index}.jpg",
+                        record_type=ReportImage.RecordType.CHECKUP if archived else None,
+                        report_date=report_day if archived else None,
+                    )
+                )
+        ReportImage.objects.bulk_create(images, batch_size=2000)
+        self.result.add("report_uploads", len(saved))
+        self.result.add("report_images", len(images))
+
+
+def generate_synthetic_population(
+    options: SyntheticPopulationOptions,
+    *,
+    log: Optional[Callable[[str], None]] = None,
+) -> SyntheticPopulationResult:
+    """
+    【功能说明】
+    - 按 options 生成一批合成人群及其历史数据，每批患者一个事务。
+
+    【参数说明】
+    - options: SyntheticPopulationOptions，规模、时间跨度、设备/家属比例、随机种子等。
+    - log: Callable[[str], None] | None，进度输出回调。
+
+    【返回值说明】
+    - SyntheticPopulationResult：各类数据的写入条数。
+    """
+    log = log or (lambda message: None)
+    builder = _PopulationBuilder(options, log)
+    with transaction.atomic():
+        builder.prepare_shared()
+    for offset in range(0, options.patients, options.batch_size):
+        size = min(options.batch_size, options.patients - offset)
+        with transaction.atomic():
+            builder.build_batch(offset, size)
+        log(f"generated patients {offset + size}/{options.patients}")
+    logger.info("synthetic population generated", extra={"counts": builder.result.counts})
+    return builder.result
+
+
+def iter_synthetic_patient_ids(batch_size: int = 1000) -> Iterable[List[int]]:
+    from users.models import PatientProfile
+
+    queryset = PatientProfile.objects.filter(
+        user__username__startswith=SYNTHETIC_USERNAME_PREFIX
+    ).order_by("id")
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def purge_synthetic_population() -> int:
+    """
+    【功能说明】
+    - 删除全部合成数据：合成患者（级联其任务、体征、会话等）、订单、设备与合成账号。
+
+    【返回值说明】
+    - int：删除的合成患者数。
+    """
+    from business_support.models import Device, DeviceMetricReceipt
+    from market.models import Order, Product
+    from users.models import CustomUser, DoctorStudio, PatientProfile
+
+    removed = 0
+    for ids in iter_synthetic_patient_ids():
+        with transaction.atomic():
+            Order.objects.filter(patient_id__in=ids).delete()
+            PatientProfile.objects.filter(id__in=ids).delete()
+        removed += len(ids)
+    DeviceMetricReceipt.objects.filter(device__sn__startswith=SYNTHETIC_DEVICE_PREFIX).delete()
+    Device.objects.filter(sn__startswith=SYNTHETIC_DEVICE_PREFIX).delete()
+    DoctorStudio.objects.filter(
+        owner_doctor__user__username__startswith=SYNTHETIC_USERNAME_PREFIX
+    ).delete()
+    CustomUser.objects.filter(username__startswith=SYNTHETIC_USERNAME_PREFIX).delete()
+    Product.objects.filter(name=SYNTHETIC_PRODUCT_NAME, orders__isnull=True).delete()
+    return removed
@@ -9,65 +9,98 @@
   1 表示 `TreatmentCycle.start_date` 当天，N 表示第 N 天；
 - 已生成的历史 `DailyTask` 不会被计划的后续修改回写；
 - 对同一天、同一条计划多次调用应保持幂等，不重复生成任务。
+
+【增量对账】
+- 计划编辑后由 `notify_plan_items_changed` 标记脏集合，并在事务提交后
+  只对账该条目的未来任务；
+- 夜间 `generate_daily_tasks_for_date` 仅复核脏集合中的条目，
+  `check_plan_task_consistency` 命令用于核对增量结果与全量口径一致。
 """
 
 from __future__ import annotations
 
+import logging
 from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from django.db import models, transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from core.models import choices, DailyTask, PlanItem, TreatmentCycle
+from core.service.catalog import CatalogService
+from core.service.tasks import invalidate_adherence_cache, resolve_task_status
+
+logger = logging.getLogger(__name__)
 
-from core.models import CheckupLibrary, choices, DailyTask, PlanItem, TreatmentCycle
-from core.service.tasks import resolve_task_status
+# 待复核的计划条目 ID 集合（Redis Set）：计划变更时写入，对账完成后移除。
+PLAN_ITEM_DIRTY_SET_KEY = "core:plan_item:dirty"
+
+_REMOVABLE_STATUSES = [
+    choices.TaskStatus.PENDING,
+    choices.TaskStatus.NOT_STARTED,
+    choices.TaskStatus.TERMINATED,
+]
 
 
 @transaction.atomic
-def generate_daily_tasks_for_date(task_date: date = date.today()) -> int:
+def generate_daily_tasks_for_date(task_date: date = date.today(), *, full: bool = False) -> int:
     """为指定日期生成每日任务（含未来任务）。
 
     【业务说明】
     - 基于治疗疗程与计划条目生成“治疗计划任务”（包含用药/复查/问卷/监测等类别）；
     - 所有任务最终统一落地到 `DailyTask`，调用入口保持单一。
+    - 计划编辑时已按条目增量对账（见 `reconcile_plan_item_tasks`），
+      夜间任务只复核脏集合中的计划条目；`full=True` 或脏集合不可读时退回全量对账。
 
     Args:
         task_date: 任务生成起始日期。
+        full: 是否对所有进行中疗程的计划条目做全量对账。
 
     Returns:
         实际新生成的 `DailyTask` 数量（计划任务）。
     """
 
-    created_count = 0
     _cleanup_plan_item_tasks_for_date(task_date)
-    created_count += _generate_plan_item_tasks_for_date(task_date)
+
+    plan_item_ids = None if full else get_dirty_plan_item_ids()
+    if plan_item_ids is None:
+        plan_item_ids = _get_schedulable_plan_item_ids(task_date)
+
+    created_count = 0
+    for plan_item_id in plan_item_ids:
+        created, _ = reconcile_plan_item_tasks(plan_item_id, from_date=task_date)
+        created_count += created
+
+    if plan_item_ids:
+        transaction.on_commit(lambda: clear_dirty_plan_items(plan_item_ids))
     return created_count
 
 
 def _cleanup_plan_item_tasks_for_date(task_date: date) -> None:
-    """清理已失效的计划任务（仅删除未完成任务）。"""
-
-    removable_statuses = [
-        choices.TaskStatus.PENDING,
-        choices.TaskStatus.NOT_STARTED,
-        choices.TaskStatus.TERMINATED,
-    ]
+    """清理已删除/停用计划与终止疗程的未完成任务（调度日变化由逐条对账处理）。"""
 
     # 已删除计划项（plan_item 为空）的未来任务直接清理
-    DailyTask.objects.filter(
-        plan_item__isnull=True,
-        task_date__gte=task_date,
-        status__in=removable_statuses,
-    ).delete()
+    _delete_tasks(
+        DailyTask.objects.filter(
+            plan_item__isnull=True,
+            task_date__gte=task_date,
+            status__in=_REMOVABLE_STATUSES,
+        )
+    )
 
     # 停用计划项的未来任务清理
     disabled_plan_item_ids = list(
         PlanItem.objects.filter(status=choices.PlanItemStatus.DISABLED).values_list("id", flat=True)
     )
     if disabled_plan_item_ids:
-        DailyTask.objects.filter(
-            plan_item_id__in=disabled_plan_item_ids,
-            task_date__gte=task_date,
-            status__in=removable_statuses,
-        ).delete()
+        _delete_tasks(
+            DailyTask.objects.filter(
+                plan_item_id__in=disabled_plan_item_ids,
+                task_date__gte=task_date,
+                status__in=_REMOVABLE_STATUSES,
+            )
+        )
 
     # 终止疗程：清理未开始任务
     terminated_cycle_ids = list(
@@ -76,101 +109,299 @@ def _cleanup_plan_item_tasks_for_date(task_date: date) -> None:
         ).values_list("id", flat=True)
     )
     if terminated_cycle_ids:
-        DailyTask.objects.filter(
-            plan_item__cycle_id__in=terminated_cycle_ids,
-            status=choices.TaskStatus.NOT_STARTED,
-        ).delete()
-
-    # 清理调度日被移除的任务（仅针对进行中疗程）
-    active_plan_items = (
-        PlanItem.objects.filter(
-            status=choices.PlanItemStatus.ACTIVE,
-            cycle__status=choices.TreatmentCycleStatus.IN_PROGRESS,
-        )
-        .select_related("cycle")
-    )
-    for item in active_plan_items:
-        cycle = item.cycle
-        cycle_end = cycle.end_date or (
-            cycle.start_date + timedelta(days=cycle.cycle_days - 1)
+        _delete_tasks(
+            DailyTask.objects.filter(
+                plan_item__cycle_id__in=terminated_cycle_ids,
+                status=choices.TaskStatus.NOT_STARTED,
+            )
         )
 
-        valid_dates = set()
-        for day_index in item.schedule_days or []:
-            if day_index <= 0:
-                continue
-            task_date_for_item = cycle.start_date + timedelta(days=day_index - 1)
-            if task_date_for_item < task_date or task_date_for_item > cycle_end:
-                continue
-            valid_dates.add(task_date_for_item)
 
-        tasks = DailyTask.objects.filter(
-            plan_item=item,
-            task_date__gte=task_date,
-            status__in=removable_statuses,
-        )
-        if valid_dates:
-            tasks = tasks.exclude(task_date__in=valid_dates)
-        tasks.delete()
+def _delete_tasks(queryset) -> int:
+    """删除任务并失效受影响患者的依从性缓存。"""
+    patient_ids = set(queryset.order_by().values_list("patient_id", flat=True).distinct())
+    if not patient_ids:
+        return 0
+    deleted, _ = queryset.delete()
+    for patient_id in patient_ids:
+        _invalidate_patient_caches(patient_id, deleted)
+    return deleted
 
 
-def _generate_plan_item_tasks_for_date(task_date: date) -> int:
-    """生成基于 PlanItem 的治疗计划任务（从 task_date 起的未来任务）。"""
+def _get_schedulable_plan_item_ids(task_date: date) -> List[int]:
+    """返回从 task_date 起仍可能产生任务的计划条目 ID（全量对账的候选集合）。"""
 
-    cycles = (
-        TreatmentCycle.objects.exclude(
-            status__in=[
+    return list(
+        PlanItem.objects.exclude(
+            cycle__status__in=[
                 choices.TreatmentCycleStatus.COMPLETED,
                 choices.TreatmentCycleStatus.TERMINATED,
             ]
         )
-        .filter(models.Q(end_date__isnull=True) | models.Q(end_date__gte=task_date))
-        .prefetch_related("plan_items")
+        .filter(
+            models.Q(cycle__end_date__isnull=True) | models.Q(cycle__end_date__gte=task_date)
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
     )
 
-    created_count = 0
 
-    for cycle in cycles:
-        cycle_end = cycle.end_date or (
-            cycle.start_date + timedelta(days=cycle.cycle_days - 1)
-        )
-        if cycle_end < task_date:
-            continue
+def _resolve_cycle_end(cycle: TreatmentCycle) -> date:
+    return cycle.end_date or (cycle.start_date + timedelta(days=cycle.cycle_days - 1))
+
 
-        start_date = max(task_date, cycle.start_date)
+def resolve_expected_task_dates(plan_item: PlanItem, from_date: date) -> Set[date]:
+    """
+    【功能说明】
+    - 计算计划条目从 from_date 起应存在任务的日期集合。
+    - 停用条目、已完成/已终止疗程返回空集合。
 
-        plan_items = [
-            item
-            for item in cycle.plan_items.all()
-            if item.status == choices.PlanItemStatus.ACTIVE
-        ]
+    【参数说明】
+    - plan_item: PlanItem，需已加载 cycle。
+    - from_date: date，起始日期（含）。
+    """
 
-        for item in plan_items:
-            if not item.schedule_days:
-                continue
+    cycle = plan_item.cycle
+    if plan_item.status != choices.PlanItemStatus.ACTIVE:
+        return set()
+    if cycle.status in (
+        choices.TreatmentCycleStatus.COMPLETED,
+        choices.TreatmentCycleStatus.TERMINATED,
+    ):
+        return set()
+
+    cycle_end = _resolve_cycle_end(cycle)
+    start_date = max(from_date, cycle.start_date)
+    expected = set()
+    for day_index in plan_item.schedule_days or []:
+        if day_index <= 0:
+            continue
+        task_date_for_item = cycle.start_date + timedelta(days=day_index - 1)
+        if start_date <= task_date_for_item <= cycle_end:
+            expected.add(task_date_for_item)
+    return expected
 
-            for day_index in item.schedule_days:
-                if day_index <= 0:
-                    continue
-                task_date_for_item = cycle.start_date + timedelta(days=day_index - 1)
-                if task_date_for_item < start_date or task_date_for_item > cycle_end:
-                    continue
 
+def reconcile_plan_item_tasks(
+    plan_item_id: int,
+    *,
+    from_date: Optional[date] = None,
+) -> Tuple[int, int]:
+    """
+    【功能说明】
+    - 将单个计划条目从 from_date 起的 DailyTask 与当前计划对齐：
+      删除已不在调度日内的未完成任务，批量补建缺失任务。
+    - 已完成任务与 from_date 之前的任务不受影响；重复调用保持幂等。
+    - 终止疗程沿用夜间清理口径：删除该条目全部未开始任务，不再补建；
+      已完成疗程不做任何改动。
+
+    【参数说明】
+    - plan_item_id: int，计划条目 ID；条目不存在时直接返回。
+    - from_date: date | None，对账起始日期，默认今天。
+
+    【返回值说明】
+    - (created, deleted)：新建与删除的任务数量。
+    """
+
+    from_date = from_date or timezone.localdate()
+    with transaction.atomic():
+        # 行锁串行化同一条目的并发对账，避免重复补建。
+        plan_item = (
+            PlanItem.objects.select_for_update()
+            .select_related("cycle")
+            .filter(pk=plan_item_id)
+            .first()
+        )
+        if plan_item is None:
+            return 0, 0
+        cycle = plan_item.cycle
+
+        if cycle.status == choices.TreatmentCycleStatus.TERMINATED:
+            deleted, _ = DailyTask.objects.filter(
+                plan_item=plan_item,
+                status=choices.TaskStatus.NOT_STARTED,
+            ).delete()
+            _invalidate_patient_caches(cycle.patient_id, deleted)
+            return 0, deleted
+        if cycle.status == choices.TreatmentCycleStatus.COMPLETED:
+            return 0, 0
+
+        expected_dates = resolve_expected_task_dates(plan_item, from_date)
+        existing_dates = set(
+            DailyTask.objects.filter(
+                plan_item=plan_item,
+                task_date__gte=from_date,
+            ).values_list("task_date", flat=True)
+        )
+
+        deleted = 0
+        stale_dates = existing_dates - expected_dates
+        if stale_dates:
+            deleted, _ = DailyTask.objects.filter(
+                plan_item=plan_item,
+                task_date__in=stale_dates,
+                status__in=_REMOVABLE_STATUSES,
+            ).delete()
+
+        missing_dates = sorted(expected_dates - existing_dates)
+        if missing_dates:
+            today = timezone.localdate()
+            new_tasks = []
+            for task_date_for_item in missing_dates:
                 status = resolve_task_status(
-                    task_type=item.category,
+                    task_type=plan_item.category,
                     task_date=task_date_for_item,
-                    as_of_date=task_date,
+                    as_of_date=from_date,
                 )
-                _, created = DailyTask.objects.get_or_create(
-                    patient=cycle.patient,
-                    plan_item=item,
-                    task_date=task_date_for_item,
-                    defaults=_build_task_defaults_from_plan_item(item, status=status),
+                new_tasks.append(
+                    DailyTask(
+                        patient_id=cycle.patient_id,
+                        plan_item=plan_item,
+                        task_date=task_date_for_item,
+                        # bulk_create 不经过 save()，此处与 DailyTask.save 的口径保持一致。
+                        status_transition_date=min(task_date_for_item, today),
+                        **_build_task_defaults_from_plan_item(plan_item, status=status),
+                    )
                 )
-                if created:
-                    created_count += 1
+            DailyTask.objects.bulk_create(new_tasks)
 
-    return created_count
+        _invalidate_patient_caches(cycle.patient_id, deleted + len(missing_dates))
+    return len(missing_dates), deleted
+
+
+def find_plan_task_inconsistencies(
+    from_date: date,
+    *,
+    batch_size: int = 500,
+) -> Dict[int, Tuple[Set[date], Set[date]]]:
+    """
+    【功能说明】
+    - 按全量口径重新计算每个计划条目从 from_date 起应有的任务日期，
+      与实际 DailyTask 对比，用于核对增量对账结果。
+
+    【参数说明】
+    - from_date: date，核对起始日期（含）。
+    - batch_size: int，每批加载的计划条目数量。
+
+    【返回值说明】
+    - {plan_item_id: (缺失日期集合, 多余日期集合)}，仅包含不一致的条目；
+      多余日期只统计可删除（未完成）的任务，终止疗程统计未开始任务。
+    """
+
+    plan_items = (
+        PlanItem.objects.exclude(cycle__status=choices.TreatmentCycleStatus.COMPLETED)
+        .select_related("cycle")
+        .order_by("id")
+    )
+    result: Dict[int, Tuple[Set[date], Set[date]]] = {}
+    last_id = 0
+    while True:
+        batch = list(plan_items.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        actual: Dict[int, Dict[date, int]] = {}
+        rows = DailyTask.objects.filter(
+            plan_item_id__in=[item.id for item in batch],
+            task_date__gte=from_date,
+        ).values_list("plan_item_id", "task_date", "status")
+        for plan_item_id, task_date_for_item, status in rows:
+            actual.setdefault(plan_item_id, {})[task_date_for_item] = status
+
+        for item in batch:
+            tasks_by_date = actual.get(item.id, {})
+            if item.cycle.status == choices.TreatmentCycleStatus.TERMINATED:
+                missing: Set[date] = set()
+                extra = {
+                    day
+                    for day, status in tasks_by_date.items()
+                    if status == choices.TaskStatus.NOT_STARTED
+                }
+            else:
+                expected = resolve_expected_task_dates(item, from_date)
+                missing = expected - set(tasks_by_date)
+                extra = {
+                    day
+                    for day, status in tasks_by_date.items()
+                    if day not in expected and status in _REMOVABLE_STATUSES
+                }
+            if missing or extra:
+                result[item.id] = (missing, extra)
+    return result
+
+
+def _invalidate_patient_caches(patient_id: int, changed: int) -> None:
+    if changed:
+        transaction.on_commit(lambda patient_id=patient_id: invalidate_adherence_cache(patient_id))
+
+
+def mark_plan_items_dirty(plan_item_ids: Iterable[int]) -> None:
+    """
+    【功能说明】
+    - 将计划条目加入脏集合，夜间任务据此复核；Redis 不可用时仅记录日志，
+      夜间任务读取失败会自动退回全量对账。
+    """
+
+    plan_item_ids = [int(pk) for pk in plan_item_ids if pk]
+    if not plan_item_ids:
+        return
+    try:
+        get_redis_connection("default").sadd(PLAN_ITEM_DIRTY_SET_KEY, *plan_item_ids)
+    except Exception:  # pragma: no cover - Redis 故障时由全量对账兜底
+        logger.warning("plan item dirty mark failed ids=%s", plan_item_ids, exc_info=True)
+
+
+def clear_dirty_plan_items(plan_item_ids: Iterable[int]) -> None:
+    plan_item_ids = [int(pk) for pk in plan_item_ids]
+    if not plan_item_ids:
+        return
+    try:
+        get_redis_connection("default").srem(PLAN_ITEM_DIRTY_SET_KEY, *plan_item_ids)
+    except Exception:  # pragma: no cover - 残留的脏标记只会多复核一次
+        logger.warning("plan item dirty clear failed ids=%s", plan_item_ids, exc_info=True)
+
+
+def get_dirty_plan_item_ids() -> Optional[List[int]]:
+    """返回脏集合中的计划条目 ID；Redis 不可读时返回 None。"""
+
+    try:
+        members = get_redis_connection("default").smembers(PLAN_ITEM_DIRTY_SET_KEY)
+    except Exception:  # pragma: no cover - 由调用方退回全量对账
+        logger.warning("plan item dirty set read failed", exc_info=True)
+        return None
+    return sorted(int(member) for member in members)
+
+
+def notify_plan_items_changed(plan_item_ids: Iterable[int]) -> None:
+    """
+    【功能说明】
+    - 计划条目变更事件：立即标记脏集合，并在事务提交后逐条增量对账。
+    - 对账成功后移出脏集合；失败只记录日志，留给夜间任务复核。
+
+    【使用方法】
+    - 由 PlanItemService 在修改计划后调用，需在写入所在事务内调用。
+    """
+
+    plan_item_ids = sorted({int(pk) for pk in plan_item_ids if pk})
+    if not plan_item_ids:
+        return
+    mark_plan_items_dirty(plan_item_ids)
+
+    def _reconcile() -> None:
+        for plan_item_id in plan_item_ids:
+            try:
+                created, deleted = reconcile_plan_item_tasks(plan_item_id)
+            except Exception:
+                logger.exception("plan item reconcile failed plan_item_id=%s", plan_item_id)
+                continue
+            clear_dirty_plan_items([plan_item_id])
+            logger.info(
+                "plan item tasks reconciled",
+                extra={"plan_item_id": plan_item_id, "tasks_created": created, "tasks_deleted": deleted},
+            )
+
+    transaction.on_commit(_reconcile)
 
 
 def _build_task_defaults_from_plan_item(plan_item: PlanItem, *, status: int) -> dict:
@@ -196,7 +427,7 @@ def _build_task_defaults_from_plan_item(plan_item: PlanItem, *, status: int) ->
     # 检查任务从检查库模板继承关联报告类型
     related_report_type = None
     if plan_item.category == choices.PlanItemCategory.CHECKUP:
-        template = CheckupLibrary.objects.filter(pk=plan_item.template_id).first()
+        template = CatalogService.get_checkup_library(plan_item.template_id)
         if template:
             related_report_type = template.related_report_type
 
@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
+import logging
+import time
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, Iterable, List
 
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.functions import Least
 from django.utils import timezone
 
-from core.models import DailyTask, MonitoringTemplate, TreatmentCycle, choices
+from core.models import DailyTask, TreatmentCycle, choices
+from core.service.cache_fetch import DEFAULT_COMPRESS_MIN_BYTES, fetch_cached_many
+from core.service.catalog import CatalogService
 from health_data.models import MetricType
 from health_data.services.monitoring_catalog import resolve_monitoring_definition
 from users.models import PatientProfile
 
+logger = logging.getLogger(__name__)
 
 _SUMMARY_TITLE_BY_TYPE = {
     choices.PlanItemCategory.MEDICATION: "用药提醒",
@@ -44,6 +52,18 @@ _DEFAULT_DATE_BACKLOG_TASK_TYPES = (
     choices.PlanItemCategory.QUESTIONNAIRE,
 )
 
+# 增量状态引擎每批处理的任务数上限。
+TASK_STATUS_BATCH_SIZE = 1000
+
+# 依从性分组统计缓存：键含当天日期，跨天自然失效；任务完成时递增患者版本号。
+ADHERENCE_CACHE_TTL_SECONDS = 60 * 60 * 24
+# 区间计划摘要的最大跨度（月视图含前后补齐的日期）。
+PLAN_SUMMARY_RANGE_MAX_DAYS = 62
+# 过期后仅在其它请求回源期间兜底返回旧值，无需与 TTL 一样长。
+ADHERENCE_STALE_TTL_SECONDS = 10 * 60
+_ADHERENCE_VERSION_KEY = "core:adherence:version:{patient_id}"
+_ADHERENCE_COUNTS_KEY = "core:adherence:counts:{patient_id}:v{version}:{today}:{start}:{end}"
+
 # TODO 查询复查档案的记录数（需要支持到二级分类）。
 # TODO 根据日期来查询复查的图像。
 
@@ -169,6 +189,111 @@ def get_daily_plan_summary(
             continue
         tasks_by_type[task.task_type].append(task)
 
+    return _summarize_plan_tasks(tasks_by_type)
+
+
+
+def get_plan_summaries_for_range(
+    patient: PatientProfile,
+    start_date: date,
+    end_date: date,
+) -> Dict[date, List[Dict[str, Any]]]:
+    """
+    【功能说明】
+    - 批量返回日期区间内每天的计划摘要，供健康日历月视图、一周预览等使用。
+    - 每天的结果与 get_daily_plan_summary(patient, task_date=该天) 一致：
+      疗程外的日期为空列表，仅统计当天任务，状态按“以该天为基准”计算。
+    - 只读：状态在内存中按 resolve_task_status 推算，不回写数据库；
+      整个区间只查询一次疗程与一次 DailyTask。
+
+    【使用方法】
+    - get_plan_summaries_for_range(patient, date(2025, 1, 1), date(2025, 1, 31))
+
+    【参数说明】
+    - patient: PatientProfile，当前患者。
+    - start_date / end_date: date，闭区间，跨度不超过 PLAN_SUMMARY_RANGE_MAX_DAYS 天。
+
+    【返回值说明】
+    - Dict[date, List[dict]]，包含区间内每一天，元素结构同 get_daily_plan_summary。
+
+    【异常说明】
+    - start_date 晚于 end_date 或跨度超限：抛出 ValueError。
+    """
+    if start_date > end_date:
+        raise ValueError("start_date 不能晚于 end_date")
+    day_count = (end_date - start_date).days + 1
+    if day_count > PLAN_SUMMARY_RANGE_MAX_DAYS:
+        raise ValueError(f"日期跨度不能超过 {PLAN_SUMMARY_RANGE_MAX_DAYS} 天")
+
+    cycles = list(
+        TreatmentCycle.objects.filter(patient=patient, start_date__lte=end_date)
+        .filter(models.Q(end_date__isnull=True) | models.Q(end_date__gte=start_date))
+        .values_list("start_date", "end_date")
+    )
+    days = [start_date + timedelta(days=offset) for offset in range(day_count)]
+    summaries: Dict[date, List[Dict[str, Any]]] = {day: [] for day in days}
+    in_cycle_days = {
+        day
+        for day in days
+        if any(
+            cycle_start <= day and (cycle_end is None or cycle_end >= day)
+            for cycle_start, cycle_end in cycles
+        )
+    }
+    if not in_cycle_days:
+        return summaries
+
+    task_types = _resolve_summary_task_types(is_default_date=False, in_cycle=True)
+    tasks = (
+        DailyTask.objects.filter(
+            patient=patient,
+            task_date__range=(min(in_cycle_days), max(in_cycle_days)),
+            task_type__in=task_types,
+        )
+        .select_related("plan_item")
+        .order_by("task_date", "id")
+    )
+    tasks_by_day: Dict[date, Dict[int, List[DailyTask]]] = {}
+    for task in tasks:
+        if task.task_date not in in_cycle_days:
+            continue
+        if task.status != choices.TaskStatus.COMPLETED:
+            task.status = resolve_task_status(
+                task_type=task.task_type,
+                task_date=task.task_date,
+                as_of_date=task.task_date,
+            )
+        if task.status in (choices.TaskStatus.NOT_STARTED, choices.TaskStatus.TERMINATED):
+            continue
+        day_tasks = tasks_by_day.setdefault(
+            task.task_date,
+            {task_type: [] for task_type in task_types},
+        )
+        day_tasks[task.task_type].append(task)
+
+    needs_template_codes = any(
+        task.plan_item_id
+        for tasks_by_type in tasks_by_day.values()
+        for task in tasks_by_type.get(choices.PlanItemCategory.MONITORING, [])
+    )
+    template_code_map = (
+        CatalogService.get_monitoring_template_code_map() if needs_template_codes else None
+    )
+    for day, tasks_by_type in tasks_by_day.items():
+        summaries[day] = _summarize_plan_tasks(tasks_by_type, template_code_map)
+    return summaries
+
+
+def _summarize_plan_tasks(
+    tasks_by_type: Dict[int, List[DailyTask]],
+    template_code_map: Dict[int, str] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    【功能说明】
+    - 将按类型分组的任务转换为计划摘要：用药/复查/问卷每类一条，监测逐条返回。
+    - get_daily_plan_summary 与 get_plan_summaries_for_range 共用，保证两者输出一致。
+    - template_code_map 未传入时按需读取监测模板编码（区间查询传入以只读取一次）。
+    """
     summary: List[Dict[str, Any]] = []
     # 用药/复查/问卷：每类只保留一条摘要。
     for task_type in (
@@ -219,9 +344,13 @@ def get_daily_plan_summary(
         for task in monitoring_tasks
         if task.plan_item_id and task.plan_item.template_id
     }
-    metric_type_by_template_id = dict(
-        MonitoringTemplate.objects.filter(id__in=template_ids).values_list("id", "code")
-    )
+    if template_ids and template_code_map is None:
+        template_code_map = CatalogService.get_monitoring_template_code_map()
+    metric_type_by_template_id = {
+        template_id: template_code_map[template_id]
+        for template_id in template_ids
+        if template_id in template_code_map
+    }
     for task in monitoring_tasks:
         metric_type = None
         if task.plan_item_id:
@@ -281,52 +410,215 @@ def resolve_task_status(
     return choices.TaskStatus.PENDING
 
 
-def refresh_task_statuses(
+def resolve_next_status_transition_date(
+    *,
+    task_type: int,
+    task_date: date,
+    as_of_date: date,
+) -> date | None:
+    """
+    【功能说明】
+    - 计算任务在 as_of_date 之后下一次状态变化的日期。
+
+    【规则说明】
+    - 未开始（task_date > as_of_date）：task_date 当天变为未完成。
+    - 未完成：超出有效期的次日（task_date + 最大逾期天数 + 1）变为已终止。
+    - 已终止：不再变化，返回 None。
+    """
+    if task_date > as_of_date:
+        return task_date
+    window_start, _ = resolve_task_valid_window(
+        task_type=task_type,
+        as_of_date=as_of_date,
+    )
+    if task_date < window_start:
+        return None
+    return task_date + timedelta(days=_get_task_max_overdue_days(task_type) + 1)
+
+
+def advance_task_statuses(
     *,
     as_of_date: date | None = None,
     patient_id: int | None = None,
+    patient_ids: Iterable[int] | None = None,
+    batch_size: int = TASK_STATUS_BATCH_SIZE,
 ) -> int:
     """
     【功能说明】
-    - 按任务类型与有效期刷新任务状态。
+    - 增量状态引擎：只处理 status_transition_date <= as_of_date 的未完成任务，
+      按批重新计算状态并写入下一次流转日期。
+    - 依赖 (status_transition_date) / (patient, status_transition_date) 索引，
+      扫描量与“今天到期的任务数”成正比，与历史任务总量无关。
 
-    【规则说明】
-    - task_date > as_of_date：未开始。
-    - task_date <= as_of_date 且超出有效期：已终止。
-    - task_date <= as_of_date 且在有效期内：未完成。
-    - 已完成任务保持不变。
+    【参数说明】
+    - as_of_date: date | None，默认今天。
+    - patient_id / patient_ids: 仅处理指定患者。
+    - batch_size: int，每批处理的任务数上限。
+
+    【返回值说明】
+    - int：状态实际发生变化的任务数。
     """
     if as_of_date is None:
         as_of_date = timezone.localdate()
 
+    due_qs = DailyTask.objects.filter(status_transition_date__lte=as_of_date).exclude(
+        status=choices.TaskStatus.COMPLETED
+    )
+    if patient_id is not None:
+        due_qs = due_qs.filter(patient_id=patient_id)
+    if patient_ids is not None:
+        due_qs = due_qs.filter(patient_id__in=list(patient_ids))
+
+    started_at = time.monotonic()
+    scanned = 0
+    transitioned = 0
+    batches = 0
+    while True:
+        rows = list(
+            due_qs.order_by("status_transition_date", "id").values_list(
+                "id", "patient_id", "task_type", "task_date", "status"
+            )[:batch_size]
+        )
+        if not rows:
+            break
+        batches += 1
+        scanned += len(rows)
+
+        # 同一 (新状态, 下次流转日) 的任务合并为一条 UPDATE。
+        ids_by_target: Dict[tuple[int, date | None], List[int]] = defaultdict(list)
+        changed_patient_ids: set[int] = set()
+        for task_id, task_patient_id, task_type, task_date, status in rows:
+            new_status = resolve_task_status(
+                task_type=task_type,
+                task_date=task_date,
+                as_of_date=as_of_date,
+            )
+            next_transition_date = resolve_next_status_transition_date(
+                task_type=task_type,
+                task_date=task_date,
+                as_of_date=as_of_date,
+            )
+            if new_status != status:
+                transitioned += 1
+                changed_patient_ids.add(task_patient_id)
+            ids_by_target[(new_status, next_transition_date)].append(task_id)
+
+        for (new_status, next_transition_date), task_ids in ids_by_target.items():
+            DailyTask.objects.filter(id__in=task_ids).exclude(
+                status=choices.TaskStatus.COMPLETED
+            ).update(status=new_status, status_transition_date=next_transition_date)
+        _invalidate_adherence_on_commit(changed_patient_ids)
+
+        if len(rows) < batch_size:
+            break
+
+    if batches and patient_id is None and patient_ids is None:
+        logger.info(
+            "daily task status advanced",
+            extra={
+                "as_of_date": as_of_date.isoformat(),
+                "rows_scanned": scanned,
+                "rows_transitioned": transitioned,
+                "batches": batches,
+                "duration_ms": int((time.monotonic() - started_at) * 1000),
+            },
+        )
+    return transitioned
+
+
+def _recompute_task_statuses(
+    *,
+    as_of_date: date,
+    patient_id: int | None = None,
+    patient_ids: Iterable[int] | None = None,
+) -> int:
+    """
+    【功能说明】
+    - 以任意日期为基准全量重算任务状态（可回退），用于查询历史/未来某天的计划。
+    - 被改动的任务流转日期重置为 min(task_date, 今天)，今天起由增量引擎重新校正；
+      as_of_date 在未来时，task_date 晚于今天的任务也不会错过今天的校正。
+    """
     base_qs = DailyTask.objects.exclude(status=choices.TaskStatus.COMPLETED)
     if patient_id is not None:
         base_qs = base_qs.filter(patient_id=patient_id)
+    if patient_ids is not None:
+        base_qs = base_qs.filter(patient_id__in=list(patient_ids))
 
+    reset_transition = Least(
+        models.F("task_date"),
+        models.Value(timezone.localdate(), output_field=models.DateField()),
+    )
     updated = 0
+    changed_patient_ids: set[int] = set()
     for task_type, max_overdue_days in _TASK_MAX_OVERDUE_DAYS.items():
         type_qs = base_qs.filter(task_type=task_type)
         expired_before = as_of_date - timedelta(days=max_overdue_days)
-
-        updated += (
-            type_qs.filter(task_date__gt=as_of_date)
-            .exclude(status=choices.TaskStatus.NOT_STARTED)
-            .update(status=choices.TaskStatus.NOT_STARTED)
-        )
-        updated += (
-            type_qs.filter(task_date__lt=expired_before)
-            .exclude(status=choices.TaskStatus.TERMINATED)
-            .update(status=choices.TaskStatus.TERMINATED)
-        )
-        updated += (
-            type_qs.filter(task_date__gte=expired_before, task_date__lte=as_of_date)
-            .exclude(status=choices.TaskStatus.PENDING)
-            .update(status=choices.TaskStatus.PENDING)
+        targets = (
+            (
+                type_qs.filter(task_date__gt=as_of_date),
+                choices.TaskStatus.NOT_STARTED,
+            ),
+            (
+                type_qs.filter(task_date__lt=expired_before),
+                choices.TaskStatus.TERMINATED,
+            ),
+            (
+                type_qs.filter(task_date__gte=expired_before, task_date__lte=as_of_date),
+                choices.TaskStatus.PENDING,
+            ),
         )
+        for target_qs, target_status in targets:
+            target_qs = target_qs.exclude(status=target_status)
+            # 先取受影响患者再更新，用于失效依从性缓存。
+            target_patient_ids = set(
+                target_qs.order_by().values_list("patient_id", flat=True).distinct()
+            )
+            if not target_patient_ids:
+                continue
+            updated += target_qs.update(
+                status=target_status,
+                status_transition_date=reset_transition,
+            )
+            changed_patient_ids |= target_patient_ids
 
+    _invalidate_adherence_on_commit(changed_patient_ids)
     return updated
 
 
+def refresh_task_statuses(
+    *,
+    as_of_date: date | None = None,
+    patient_id: int | None = None,
+    patient_ids: Iterable[int] | None = None,
+) -> int:
+    """
+    【功能说明】
+    - 按任务类型与有效期刷新任务状态。
+    - 以今天为基准时走增量状态引擎（advance_task_statuses）；
+      其它日期走全量重算，保持“按指定日期查看”的既有语义。
+
+    【规则说明】
+    - task_date > as_of_date：未开始。
+    - task_date <= as_of_date 且超出有效期：已终止。
+    - task_date <= as_of_date 且在有效期内：未完成。
+    - 已完成任务保持不变。
+    """
+    if as_of_date is None:
+        as_of_date = timezone.localdate()
+
+    if as_of_date == timezone.localdate():
+        return advance_task_statuses(
+            as_of_date=as_of_date,
+            patient_id=patient_id,
+            patient_ids=patient_ids,
+        )
+    return _recompute_task_statuses(
+        as_of_date=as_of_date,
+        patient_id=patient_id,
+        patient_ids=patient_ids,
+    )
+
+
 def _resolve_task_date(occurred_at: datetime | None) -> date:
     """
     【功能说明】
@@ -426,10 +718,12 @@ def complete_daily_medication_tasks(
         ],
     )
     task_id = tasks.values_list("id", flat=True).first()
-    tasks.update(
+    if tasks.update(
         status=choices.TaskStatus.COMPLETED,
         completed_at=completed_at,
-    )
+        status_transition_date=None,
+    ):
+        _invalidate_adherence_on_commit([patient_id])
     return task_id
 
 
@@ -442,9 +736,7 @@ def _get_monitoring_tasks_queryset(
     completed_at = _resolve_completed_at(occurred_at)
     task_date = _resolve_task_date(completed_at)
 
-    template_ids = list(
-        MonitoringTemplate.objects.filter(code=metric_type).values_list("id", flat=True)
-    )
+    template_ids = CatalogService.get_monitoring_template_ids([metric_type])
     if not template_ids:
         return DailyTask.objects.none(), completed_at
 
@@ -483,13 +775,20 @@ def complete_daily_monitoring_tasks(
         metric_type=metric_type,
         occurred_at=occurred_at,
     )
-    return tasks.filter(
+    updated_count = tasks.filter(
         status__in=[
             choices.TaskStatus.PENDING,
             choices.TaskStatus.NOT_STARTED,
             choices.TaskStatus.TERMINATED,
         ]
-    ).update(status=choices.TaskStatus.COMPLETED, completed_at=completed_at)
+    ).update(
+        status=choices.TaskStatus.COMPLETED,
+        completed_at=completed_at,
+        status_transition_date=None,
+    )
+    if updated_count:
+        _invalidate_adherence_on_commit([patient_id])
+    return updated_count
 
 
 def complete_daily_monitoring_tasks_with_latest_task_id(
@@ -525,7 +824,13 @@ def complete_daily_monitoring_tasks_with_latest_task_id(
             choices.TaskStatus.NOT_STARTED,
             choices.TaskStatus.TERMINATED,
         ]
-    ).update(status=choices.TaskStatus.COMPLETED, completed_at=completed_at)
+    ).update(
+        status=choices.TaskStatus.COMPLETED,
+        completed_at=completed_at,
+        status_transition_date=None,
+    )
+    if updated_count:
+        _invalidate_adherence_on_commit([patient_id])
     return updated_count, latest_task_id
 
 
@@ -570,7 +875,10 @@ def complete_daily_questionnaire_tasks(
     updated_count = tasks.update(
         status=choices.TaskStatus.COMPLETED,
         completed_at=completed_at,
+        status_transition_date=None,
     )
+    if updated_count:
+        _invalidate_adherence_on_commit([patient_id])
     return updated_count, task_id
 
 
@@ -602,7 +910,7 @@ def complete_daily_checkup_tasks(
     if not target_date:
         return 0
 
-    return DailyTask.objects.filter(
+    updated_count = DailyTask.objects.filter(
         patient_id=patient_id,
         task_date=target_date,
         task_type=choices.PlanItemCategory.CHECKUP,
@@ -610,7 +918,14 @@ def complete_daily_checkup_tasks(
             choices.TaskStatus.PENDING,
             choices.TaskStatus.NOT_STARTED,
         ],
-    ).update(status=choices.TaskStatus.COMPLETED, completed_at=completed_at)
+    ).update(
+        status=choices.TaskStatus.COMPLETED,
+        completed_at=completed_at,
+        status_transition_date=None,
+    )
+    if updated_count:
+        _invalidate_adherence_on_commit([patient_id])
+    return updated_count
 
 
 def _resolve_adherence_date_range(
@@ -641,6 +956,268 @@ def _resolve_adherence_date_range(
     return start_date, end_date
 
 
+def _empty_adherence_result(
+    adherence_type: int | str,
+    start_date: date,
+    end_date: date,
+) -> dict:
+    return {
+        "type": adherence_type,
+        "start_date": start_date,
+        "end_date": end_date,
+        "total": 0,
+        "completed": 0,
+        "rate": None,
+    }
+
+
+def _clamp_adherence_date_range(
+    start_date: date | None,
+    end_date: date | None,
+) -> tuple[date, date, bool]:
+    """
+    【功能说明】
+    - 解析统计区间并将结束日期截断到今天（未来任务不参与统计）。
+
+    【返回值说明】
+    - (start_date, end_date, is_empty)：is_empty=True 表示截断后区间为空。
+    """
+    start_date, end_date = _resolve_adherence_date_range(start_date, end_date)
+    today = timezone.localdate()
+    if end_date > today:
+        end_date = today
+        if start_date > end_date:
+            return start_date, end_date, True
+    return start_date, end_date, False
+
+
+def _validate_adherence_type(adherence_type: int | str) -> None:
+    if adherence_type == MONITORING_ADHERENCE_ALL:
+        return
+    if adherence_type in choices.PlanItemCategory.values:
+        return
+    if adherence_type in MetricType.values:
+        return
+    raise ValueError("不支持的依从性类型")
+
+
+def invalidate_adherence_cache(patient_id: int) -> None:
+    """
+    【功能说明】
+    - 递增患者依从性缓存版本号，使该患者已缓存的统计全部失效。
+
+    【使用方法】
+    - 任何 DailyTask 状态写入（完成、状态流转/重算、任务增删）后调用；
+      在事务内写入时须经 transaction.on_commit 调用，避免提交前被并发读回旧数据。
+    """
+    key = _ADHERENCE_VERSION_KEY.format(patient_id=patient_id)
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+def _invalidate_adherence_on_commit(patient_ids: Iterable[int]) -> None:
+    for patient_id in set(patient_ids):
+        transaction.on_commit(
+            lambda patient_id=patient_id: invalidate_adherence_cache(patient_id)
+        )
+
+
+def _build_adherence_counts_cache_key(
+    patient_id: int,
+    version: int,
+    start_date: date,
+    end_date: date,
+) -> str:
+    return _ADHERENCE_COUNTS_KEY.format(
+        patient_id=patient_id,
+        version=version,
+        today=timezone.localdate().strftime("%Y%m%d"),
+        start=start_date.strftime("%Y%m%d"),
+        end=end_date.strftime("%Y%m%d"),
+    )
+
+
+def _query_adherence_counts(
+    patient_ids: list[int],
+    start_date: date,
+    end_date: date,
+) -> dict[int, dict[tuple[int, int | None], tuple[int, int]]]:
+    """
+    【功能说明】
+    - 单条分组查询统计区间内任务数：按 患者 × 任务类型 × 模板 × 状态 聚合。
+
+    【返回值说明】
+    - {patient_id: {(task_type, template_id): (total, completed)}}，
+      未开始任务不计入；非监测任务的 template_id 同样保留，供按类型汇总。
+    """
+    counts: dict[int, dict[tuple[int, int | None], list[int]]] = {
+        patient_id: {} for patient_id in patient_ids
+    }
+    rows = (
+        DailyTask.objects.filter(
+            patient_id__in=patient_ids,
+            task_date__range=(start_date, end_date),
+        )
+        .exclude(status=choices.TaskStatus.NOT_STARTED)
+        .values("patient_id", "task_type", "plan_item__template_id", "status")
+        .annotate(task_count=models.Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        bucket = counts[row["patient_id"]].setdefault(
+            (row["task_type"], row["plan_item__template_id"]),
+            [0, 0],
+        )
+        bucket[0] += row["task_count"]
+        if row["status"] == choices.TaskStatus.COMPLETED:
+            bucket[1] += row["task_count"]
+    return {
+        patient_id: {key: (total, completed) for key, (total, completed) in buckets.items()}
+        for patient_id, buckets in counts.items()
+    }
+
+
+def _load_adherence_counts(
+    patient_ids: list[int],
+    start_date: date,
+    end_date: date,
+    use_cache: bool,
+) -> dict[int, dict[tuple[int, int | None], tuple[int, int]]]:
+    if not use_cache:
+        return _query_adherence_counts(patient_ids, start_date, end_date)
+
+    versions = cache.get_many(
+        [_ADHERENCE_VERSION_KEY.format(patient_id=patient_id) for patient_id in patient_ids]
+    )
+    key_by_patient = {
+        patient_id: _build_adherence_counts_cache_key(
+            patient_id,
+            int(versions.get(_ADHERENCE_VERSION_KEY.format(patient_id=patient_id)) or 0),
+            start_date,
+            end_date,
+        )
+        for patient_id in patient_ids
+    }
+    return fetch_cached_many(
+        key_by_patient,
+        lambda missing_ids: _query_adherence_counts(missing_ids, start_date, end_date),
+        ADHERENCE_CACHE_TTL_SECONDS,
+        namespace="core.adherence_counts",
+        stale_ttl=ADHERENCE_STALE_TTL_SECONDS,
+        compress_min_bytes=DEFAULT_COMPRESS_MIN_BYTES,
+    )
+
+
+def _summarize_adherence(
+    counts: dict[tuple[int, int | None], tuple[int, int]],
+    adherence_type: int | str,
+    start_date: date,
+    end_date: date,
+    template_ids_by_code: dict[str, set[int]],
+) -> dict:
+    # 任务类型（用药/复查/问卷/监测）按类型汇总；具体监测项与综合监测按模板汇总。
+    template_ids: set[int] | None = None
+    if adherence_type in choices.PlanItemCategory.values:
+        task_type = adherence_type
+    else:
+        task_type = choices.PlanItemCategory.MONITORING
+        codes = (
+            MONITORING_ADHERENCE_TYPES
+            if adherence_type == MONITORING_ADHERENCE_ALL
+            else (adherence_type,)
+        )
+        template_ids = set().union(*(template_ids_by_code.get(code, set()) for code in codes))
+
+    total = 0
+    completed = 0
+    for (bucket_type, template_id), (bucket_total, bucket_completed) in counts.items():
+        if bucket_type != task_type:
+            continue
+        if template_ids is not None and template_id not in template_ids:
+            continue
+        total += bucket_total
+        completed += bucket_completed
+    return {
+        "type": adherence_type,
+        "start_date": start_date,
+        "end_date": end_date,
+        "total": total,
+        "completed": completed,
+        "rate": None if total == 0 else completed / total,
+    }
+
+
+def get_adherence_metrics_for_patients(
+    patient_ids: Iterable[int],
+    adherence_types: Iterable[int | str],
+    start_date: date | None = None,
+    end_date: date | None = None,
+    refresh: bool = True,
+    use_cache: bool = False,
+) -> dict[int, list[dict]]:
+    """
+    【功能说明】
+    - 批量计算多名患者的多种依从性：整个区间只执行一次分组查询
+      （患者 × 任务类型 × 模板 × 状态），再在内存中按类型汇总。
+    - 监测模板编码映射来自 CatalogService，不额外查库。
+
+    【使用方法】
+    - get_adherence_metrics_for_patients([1, 2], [PlanItemCategory.MEDICATION, MONITORING_ADHERENCE_ALL])
+
+    【参数说明】
+    - patient_ids: Iterable[int]，患者 ID 集合。
+    - adherence_types: Iterable[int | str]，依从性类型集合（复用现有枚举）。
+    - start_date / end_date: date | None，统计区间（含起止）。
+    - refresh: bool，统计前是否刷新任务状态。
+    - use_cache: bool，是否使用按患者、按天缓存的分组结果；
+      任务状态写入时通过 invalidate_adherence_cache 失效。
+
+    【返回值说明】
+    - {patient_id: List[dict]}，列表按传入类型顺序，结构同 get_adherence_metrics。
+
+    【异常说明】
+    - 不支持的依从性类型：抛出 ValueError。
+    """
+    patient_ids = list(dict.fromkeys(int(patient_id) for patient_id in patient_ids))
+    adherence_types = list(adherence_types)
+    for adherence_type in adherence_types:
+        _validate_adherence_type(adherence_type)
+    if not patient_ids:
+        return {}
+
+    if refresh:
+        refresh_task_statuses(as_of_date=timezone.localdate(), patient_ids=patient_ids)
+
+    start_date, end_date, is_empty = _clamp_adherence_date_range(start_date, end_date)
+    if is_empty:
+        return {
+            patient_id: [
+                _empty_adherence_result(adherence_type, start_date, end_date)
+                for adherence_type in adherence_types
+            ]
+            for patient_id in patient_ids
+        }
+
+    template_ids_by_code: dict[str, set[int]] = {}
+    for template in CatalogService.get_monitoring_templates():
+        template_ids_by_code.setdefault(template.code, set()).add(template.id)
+
+    counts_by_patient = _load_adherence_counts(patient_ids, start_date, end_date, use_cache)
+    return {
+        patient_id: [
+            _summarize_adherence(
+                counts_by_patient.get(patient_id, {}),
+                adherence_type,
+                start_date,
+                end_date,
+                template_ids_by_code,
+            )
+            for adherence_type in adherence_types
+        ]
+        for patient_id in patient_ids
+    }
+
+
 def get_adherence_metrics(
     patient_id: int,
     adherence_type: int | str,
@@ -684,83 +1261,13 @@ def get_adherence_metrics(
     【异常说明】
     - 不支持的依从性类型：抛出 ValueError。
     """
-    if refresh:
-        refresh_task_statuses(as_of_date=timezone.localdate(), patient_id=patient_id)
-
-    start_date, end_date = _resolve_adherence_date_range(start_date, end_date)
-    today = timezone.localdate()
-    if end_date > today:
-        end_date = today
-        if start_date > end_date:
-            return {
-                "type": adherence_type,
-                "start_date": start_date,
-                "end_date": end_date,
-                "total": 0,
-                "completed": 0,
-                "rate": None,
-            }
-
-    base_qs = DailyTask.objects.filter(
-        patient_id=patient_id,
-        task_date__range=(start_date, end_date),
-    )
-
-    if adherence_type == MONITORING_ADHERENCE_ALL:
-        template_ids = list(
-            MonitoringTemplate.objects.filter(code__in=MONITORING_ADHERENCE_TYPES)
-            .values_list("id", flat=True)
-        )
-        if not template_ids:
-            return {
-                "type": adherence_type,
-                "start_date": start_date,
-                "end_date": end_date,
-                "total": 0,
-                "completed": 0,
-                "rate": None,
-            }
-        task_qs = base_qs.filter(
-            task_type=choices.PlanItemCategory.MONITORING,
-            plan_item__template_id__in=template_ids,
-        )
-    elif adherence_type in choices.PlanItemCategory.values:
-        task_qs = base_qs.filter(task_type=adherence_type)
-    elif adherence_type in MetricType.values:
-        template_ids = list(
-            MonitoringTemplate.objects.filter(code=adherence_type).values_list(
-                "id", flat=True
-            )
-        )
-        if not template_ids:
-            return {
-                "type": adherence_type,
-                "start_date": start_date,
-                "end_date": end_date,
-                "total": 0,
-                "completed": 0,
-                "rate": None,
-            }
-        task_qs = base_qs.filter(
-            task_type=choices.PlanItemCategory.MONITORING,
-            plan_item__template_id__in=template_ids,
-        )
-    else:
-        raise ValueError("不支持的依从性类型")
-
-    task_qs = task_qs.exclude(status=choices.TaskStatus.NOT_STARTED)
-    total = task_qs.count()
-    completed = task_qs.filter(status=choices.TaskStatus.COMPLETED).count()
-    rate = None if total == 0 else completed / total
-
-    return {
-        "type": adherence_type,
-        "start_date": start_date,
-        "end_date": end_date,
-        "total": total,
-        "completed": completed,
-        "rate": rate,
-    }
+    return get_adherence_metrics_for_patients(
+        [patient_id],
+        [adherence_type],
+        start_date=start_date,
+        end_date=end_date,
+        refresh=refresh,
+    )[int(patient_id)][0]
 
 
 def get_adherence_metrics_batch(
@@ -768,30 +1275,27 @@ def get_adherence_metrics_batch(
     adherence_types: Iterable[int | str],
     start_date: date | None = None,
     end_date: date | None = None,
+    use_cache: bool = False,
 ) -> list[dict]:
     """
     【功能说明】
     - 批量计算同一患者的多种依从性，按传入类型顺序返回列表。
+    - 所有类型共用一次分组查询，见 get_adherence_metrics_for_patients。
 
     【参数说明】
     - patient: PatientProfile | int，患者对象或患者 ID。
     - adherence_types: Iterable[int | str]，依从性类型集合（复用现有枚举）。
     - start_date / end_date: date | None，统计区间（含起止）。
+    - use_cache: bool，是否使用按患者、按天缓存的统计结果。
 
     【返回值说明】
     - List[dict]，每项结构同 get_adherence_metrics 返回值。
     """
     patient_id = patient.id if isinstance(patient, PatientProfile) else int(patient)
-    refresh_task_statuses(as_of_date=timezone.localdate(), patient_id=patient_id)
-    results = []
-    for adherence_type in adherence_types:
-        results.append(
-            get_adherence_metrics(
-                patient_id=patient_id,
-                adherence_type=adherence_type,
-                start_date=start_date,
-                end_date=end_date,
-                refresh=False,
-            )
-        )
-    return results
+    return get_adherence_metrics_for_patients(
+        [patient_id],
+        adherence_types,
+        start_date=start_date,
+        end_date=end_date,
+        use_cache=use_cache,
+    )[patient_id]
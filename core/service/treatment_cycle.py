@@ -11,6 +11,8 @@ from django.db import transaction
 
 from core.models import PlanItem, TreatmentCycle
 from core.models import choices
+from core.service.plan_item import invalidate_cycle_plan_view
+from core.service.task_scheduler import mark_plan_items_dirty
 from users.models import CustomUser, PatientProfile
 
 MIN_TREATMENT_CYCLE_DAYS = 2
@@ -250,6 +252,8 @@ def refresh_expired_treatment_cycles(task_date: Optional[date] = None) -> int:
     """
     【功能说明】
     - 将已过期但状态仍为“进行中”的疗程更新为“已结束”。
+    - queryset.update 不触发 post_save，需手动失效这些疗程的计划视图缓存，
+      并将其计划条目加入脏集合，交给夜间任务复核。
 
     【参数说明】
     - task_date: date | None，用于指定检查日期；默认使用今天。
@@ -259,9 +263,21 @@ def refresh_expired_treatment_cycles(task_date: Optional[date] = None) -> int:
     """
 
     today = task_date or date.today()
-    return (
+    cycle_ids = list(
         TreatmentCycle.objects.filter(
             status=choices.TreatmentCycleStatus.IN_PROGRESS,
             end_date__lt=today,
-        ).update(status=choices.TreatmentCycleStatus.COMPLETED)
+        ).values_list("id", flat=True)
     )
+    if not cycle_ids:
+        return 0
+    updated = TreatmentCycle.objects.filter(
+        id__in=cycle_ids,
+        status=choices.TreatmentCycleStatus.IN_PROGRESS,
+    ).update(status=choices.TreatmentCycleStatus.COMPLETED)
+    for cycle_id in cycle_ids:
+        invalidate_cycle_plan_view(cycle_id)
+    mark_plan_items_dirty(
+        PlanItem.objects.filter(cycle_id__in=cycle_ids).values_list("id", flat=True)
+    )
+    return updated
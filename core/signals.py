@@ -0,0 +1,71 @@
+"""core 应用信号：目录类数据变更后递增目录缓存版本号；计划变更后标记待复核条目并使计划视图缓存失效。"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import (
+    CheckupFieldMapping,
+    CheckupLibrary,
+    Medication,
+    MonitoringTemplate,
+    PlanItem,
+    Questionnaire,
+    QuestionnaireOption,
+    QuestionnaireQuestion,
+    StandardField,
+    TreatmentCycle,
+)
+from core.service.catalog import bump_catalog_version, mark_catalog_dirty_in_transaction
+from core.service.plan_item import invalidate_cycle_plan_view
+from core.service.task_scheduler import mark_plan_items_dirty
+
+CATALOG_MODELS = (
+    CheckupLibrary,
+    MonitoringTemplate,
+    Questionnaire,
+    QuestionnaireQuestion,
+    QuestionnaireOption,
+    CheckupFieldMapping,
+    StandardField,
+    # 药物库不进目录快照，但计划视图缓存键带目录版本号，药物变更同样需要递增。
+    Medication,
+)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalog_on_change(sender, **kwargs):
+    if sender not in CATALOG_MODELS:
+        return
+    mark_catalog_dirty_in_transaction()
+    # 提交后再递增版本，避免其它进程在提交前用旧数据重建快照。
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=PlanItem)
+def mark_plan_item_dirty_on_save(sender, instance, **kwargs):
+    # 后台或脚本直接保存的计划不经过 PlanItemService，交给夜间任务复核。
+    mark_plan_items_dirty([instance.pk])
+
+
+@receiver(post_save, sender=TreatmentCycle)
+def mark_cycle_plan_items_dirty_on_save(sender, instance, created, **kwargs):
+    # 疗程日期或状态变化会影响其下全部计划条目的任务日期。
+    if created:
+        return
+    mark_plan_items_dirty(
+        PlanItem.objects.filter(cycle_id=instance.pk).values_list("id", flat=True)
+    )
+
+
+@receiver(post_save, sender=PlanItem)
+@receiver(post_delete, sender=PlanItem)
+def invalidate_plan_view_on_plan_item_change(sender, instance, **kwargs):
+    invalidate_cycle_plan_view(instance.cycle_id)
+
+
+@receiver(post_save, sender=TreatmentCycle)
+@receiver(post_delete, sender=TreatmentCycle)
+def invalidate_plan_view_on_cycle_change(sender, instance, **kwargs):
+    invalidate_cycle_plan_view(instance.pk)
@@ -0,0 +1,11 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+
+register = template.Library()
+
+
+@register.simple_tag
+def echarts_bundle_url():
+    """页面唯一使用的 ECharts 构建（settings.ECHARTS_BUNDLE）的静态地址。"""
+    return static(settings.ECHARTS_BUNDLE)
@@ -0,0 +1,141 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.service import cache_fetch
+from core.service.cache_fetch import fetch_cached, fetch_cached_many, get_cache_stats, reset_cache_stats
+
+
+class FetchCachedTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.addCleanup(cache.clear)
+        self.addCleanup(reset_cache_stats)
+
+    def test_miss_then_hit_and_counts_per_namespace(self):
+        calls = []
+
+        def fetcher():
+            calls.append(1)
+            return {"plans": [1, 2]}
+
+        first = fetch_cached("k:1", fetcher, 30, namespace="test.plan", beta=0)
+        second = fetch_cached("k:1", fetcher, 30, namespace="test.plan", beta=0)
+
+        self.assertEqual((first.status, second.status), ("miss", "hit"))
+        self.assertEqual(second.value, {"plans": [1, 2]})
+        self.assertEqual(len(calls), 1)
+        stats = get_cache_stats()["test.plan"]
+        self.assertEqual((stats["miss"], stats["hit"]), (1, 1))
+        self.assertGreaterEqual(stats["compute_ms"], 0)
+
+    def test_bypass_recomputes_and_refreshes_cache(self):
+        fetch_cached("k:2", lambda: "old", 30, namespace="test")
+        result = fetch_cached("k:2", lambda: "new", 30, namespace="test", bypass=True)
+        self.assertEqual((result.status, result.value), ("bypass", "new"))
+        self.assertEqual(fetch_cached("k:2", lambda: "other", 30, namespace="test", beta=0).value, "new")
+
+    def test_expired_value_is_served_stale_while_lock_is_held(self):
+        fetch_cached("k:3", lambda: "old", 30, namespace="test")
+        cache.add("k:3:lock", 1, 100)
+        with patch.object(cache_fetch.time, "time", return_value=time.time() + 45):
+            result = fetch_cached("k:3", lambda: "new", 30, namespace="test")
+        self.assertEqual((result.status, result.value), ("stale", "old"))
+
+    def test_expired_value_is_refreshed_by_lock_holder(self):
+        fetch_cached("k:4", lambda: "old", 30, namespace="test")
+        with patch.object(cache_fetch.time, "time", return_value=time.time() + 45):
+            result = fetch_cached("k:4", lambda: "new", 30, namespace="test")
+        self.assertEqual((result.status, result.value), ("refresh", "new"))
+        self.assertIsNone(cache.get("k:4:lock"))
+
+    def test_early_refresh_probability_grows_with_compute_time(self):
+        envelope = cache_fetch._pack("v", 30, 5.0, None)
+        now = envelope[1] - 1
+        with patch.object(cache_fetch.random, "random", return_value=0.5):
+            self.assertTrue(cache_fetch._needs_refresh(envelope, 1.0, now))
+            self.assertFalse(cache_fetch._needs_refresh(envelope, 0, now))
+        slow_far = cache_fetch._pack("v", 30, 0.01, None)
+        with patch.object(cache_fetch.random, "random", return_value=0.5):
+            self.assertFalse(cache_fetch._needs_refresh(slow_far, 1.0, slow_far[1] - 10))
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        gate = threading.Event()
+
+        def fetcher():
+            calls.append(1)
+            gate.wait(1)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(fetch_cached("k:5", fetcher, 30, namespace="test")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({result.value for result in results}, {"value"})
+        self.assertEqual(sorted(result.status for result in results), ["miss"] + ["wait"] * 4)
+
+    def test_large_payload_is_compressed(self):
+        payload = {"rows": ["same text"] * 5000}
+        fetch_cached("k:6", lambda: payload, 30, namespace="test", compress_min_bytes=1024)
+        stored = cache.get("k:6")
+        self.assertTrue(stored[3])
+        self.assertIsInstance(stored[4], bytes)
+        self.assertEqual(fetch_cached("k:6", lambda: None, 30, namespace="test", beta=0).value, payload)
+
+    def test_fetcher_error_releases_lock(self):
+        with self.assertRaises(RuntimeError):
+            fetch_cached("k:7", lambda: (_ for _ in ()).throw(RuntimeError("db down")), 30, namespace="test")
+        self.assertIsNone(cache.get("k:7:lock"))
+
+    def test_legacy_payload_is_treated_as_miss(self):
+        cache.set("k:8", {"value": "legacy"}, 30)
+        result = fetch_cached("k:8", lambda: "fresh", 30, namespace="test")
+        self.assertEqual((result.status, result.value), ("miss", "fresh"))
+
+
+class FetchCachedManyTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.addCleanup(cache.clear)
+        self.addCleanup(reset_cache_stats)
+
+    def test_only_missing_entries_are_fetched_in_one_call(self):
+        batches = []
+
+        def fetch_missing(ids):
+            batches.append(sorted(ids))
+            return {ident: ident * 10 for ident in ids}
+
+        keys = {1: "m:1", 2: "m:2"}
+        self.assertEqual(fetch_cached_many(keys, fetch_missing, 30, namespace="test.many", beta=0), {1: 10, 2: 20})
+        keys[3] = "m:3"
+        self.assertEqual(
+            fetch_cached_many(keys, fetch_missing, 30, namespace="test.many", beta=0),
+            {1: 10, 2: 20, 3: 30},
+        )
+
+        self.assertEqual(batches, [[1, 2], [3]])
+        stats = get_cache_stats()["test.many"]
+        self.assertEqual((stats["miss"], stats["hit"]), (3, 2))
+
+    def test_expired_entry_locked_elsewhere_is_served_stale(self):
+        fetch_cached_many({1: "m:1"}, lambda ids: {1: "old"}, 30, namespace="test")
+        cache.add("m:1:lock", 1, 100)
+        with patch.object(cache_fetch.time, "time", return_value=time.time() + 45):
+            values = fetch_cached_many({1: "m:1"}, lambda ids: {1: "new"}, 30, namespace="test")
+        self.assertEqual(values, {1: "old"})
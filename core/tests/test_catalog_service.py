@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.models import CheckupLibrary, MonitoringTemplate
+from core.service import catalog
+from core.service.catalog import (
+    CATALOG_VERSION_CACHE_KEY,
+    CatalogService,
+    bump_catalog_version,
+    clear_local_catalog_cache,
+)
+
+
+class CatalogServiceTests(TestCase):
+    def setUp(self):
+        self.checkup = CheckupLibrary.objects.create(
+            name="目录缓存测试CT",
+            code="CATALOG_TEST_CT",
+            sort_order=999,
+        )
+        self.template = MonitoringTemplate.objects.create(
+            name="目录缓存测试监测",
+            code="CATALOG_TEST_M",
+        )
+        # 模拟事务提交后的版本递增，使后续读取进入进程缓存。
+        bump_catalog_version()
+
+    def tearDown(self):
+        # 测试数据随事务回滚，避免快照泄漏到其它用例。
+        clear_local_catalog_cache()
+
+    def test_repeated_reads_are_served_from_process_cache(self):
+        CatalogService.get_checkup_library(self.checkup.id)
+        CatalogService.get_monitoring_template_ids(["CATALOG_TEST_M"])
+
+        with self.assertNumQueries(0):
+            item = CatalogService.get_checkup_library(self.checkup.id)
+            by_name = CatalogService.get_checkup_library_map_by_name()
+            template_ids = CatalogService.get_monitoring_template_ids(["CATALOG_TEST_M"])
+
+        self.assertEqual(item.code, "CATALOG_TEST_CT")
+        self.assertEqual(by_name["目录缓存测试CT"].id, self.checkup.id)
+        self.assertEqual(template_ids, [self.template.id])
+
+    def test_write_in_current_transaction_bypasses_process_cache(self):
+        CatalogService.get_checkup_library(self.checkup.id)
+
+        self.checkup.name = "目录缓存测试CT-改名"
+        self.checkup.save()
+
+        item = CatalogService.get_checkup_library(self.checkup.id)
+        self.assertEqual(item.name, "目录缓存测试CT-改名")
+
+    def test_remote_version_bump_invalidates_local_snapshot(self):
+        self.assertIsNotNone(CatalogService.get_checkup_library(self.checkup.id))
+        # 其它进程的后台修改：本进程未收到信号，只能感知 Redis 版本号变化。
+        CheckupLibrary.objects.filter(pk=self.checkup.pk).update(is_active=False)
+        cache.incr(CATALOG_VERSION_CACHE_KEY)
+
+        with patch.object(catalog, "CATALOG_VERSION_CHECK_INTERVAL_SECONDS", 0):
+            active_ids = {
+                item.id for item in CatalogService.get_checkup_libraries(active_only=True)
+            }
+
+        self.assertNotIn(self.checkup.id, active_ids)
+
+    def test_returned_mappings_are_copies(self):
+        by_name = CatalogService.get_checkup_library_map_by_name()
+        by_name.pop("目录缓存测试CT")
+
+        self.assertIn("目录缓存测试CT", CatalogService.get_checkup_library_map_by_name())
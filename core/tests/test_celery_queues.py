@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from lung_cancer_care.celery import app as celery_app
+from lung_cancer_care.settings.task_queues import (
+    PRIORITY_HIGH,
+    QUEUE_AI,
+    QUEUE_NOTIFICATIONS,
+    TASK_QUEUE_MAP,
+    WORKER_POOLS,
+)
+
+
+class CeleryQueueTopologyTests(SimpleTestCase):
+    def test_every_project_task_has_an_explicit_route(self):
+        celery_app.loader.import_default_modules()
+        project_tasks = {name for name in celery_app.tasks if not name.startswith("celery.")}
+
+        self.assertTrue(project_tasks)
+        self.assertEqual(project_tasks - set(TASK_QUEUE_MAP), set())
+        self.assertTrue({queue for queue, _ in TASK_QUEUE_MAP.values()} <= set(WORKER_POOLS))
+
+    def test_router_sends_ai_and_notifications_to_separate_queues(self):
+        router = celery_app.amqp.router
+
+        ai_route = router.route({}, "ai_vision.extract_report_image")
+        notification_route = router.route({}, "wx.send_chat_unread_notification")
+
+        self.assertEqual(ai_route["queue"].name, QUEUE_AI)
+        self.assertEqual(notification_route["queue"].name, QUEUE_NOTIFICATIONS)
+        self.assertEqual(notification_route["priority"], PRIORITY_HIGH)
+
+    def test_broker_results_and_cache_use_separate_redis_databases(self):
+        databases = {
+            settings.CELERY_BROKER_URL.rsplit("/", 1)[-1],
+            settings.CELERY_RESULT_BACKEND.rsplit("/", 1)[-1],
+            settings.REDIS_DB,
+        }
+
+        self.assertEqual(len(databases), 3)
+
+    def test_run_celery_worker_prints_pool_command(self):
+        stdout = StringIO()
+
+        call_command("run_celery_worker", "--queue", "maintenance", "--print", stdout=stdout)
+
+        command = stdout.getvalue().strip()
+        self.assertIn("--queues maintenance,default", command)
+        self.assertIn(f"--concurrency {WORKER_POOLS['maintenance']['concurrency']}", command)
+        self.assertIn("--prefetch-multiplier 1", command)
+        self.assertIn("--hostname maintenance@%h", command)
@@ -61,3 +61,27 @@ class ChinaCalendarServiceTests(SimpleTestCase):
         self.assertEqual(meta["weekend_name"], "周六")
         self.assertEqual(meta["holiday_name"], "")
         self.assertEqual(meta["highlight_reason"], "周六")
+
+    def test_cycle_header_across_years_matches_per_day_lookup(self):
+        start = date(2025, 12, 20)
+        header = ChinaCalendarService.build_cycle_header_meta(start, 400)
+
+        days = header["header_days"]
+        self.assertEqual(len(days), 400)
+        self.assertEqual(days[0]["date"], start)
+        self.assertEqual(days[-1]["date"], date(2027, 1, 23))
+        self.assertEqual([day["day_index"] for day in days[:3]], [1, 2, 3])
+        for offset in (0, 12, 13, 132, 399):
+            expected = ChinaCalendarService._compute_day_meta(days[offset]["date"])
+            expected["day_index"] = offset + 1
+            self.assertEqual(days[offset], expected)
+        self.assertEqual(len(header["header_week_ranges"]), 58)
+
+    def test_cached_day_meta_is_copied_per_caller(self):
+        first = ChinaCalendarService.build_cycle_header_meta(date(2026, 5, 1), 3)
+        first["header_days"][0]["highlight_reason"] = "changed"
+        ChinaCalendarService.get_day_meta(date(2026, 5, 1))["holiday_name"] = "changed"
+
+        second = ChinaCalendarService.build_cycle_header_meta(date(2026, 5, 1), 3)
+        self.assertEqual(second["header_days"][0]["highlight_reason"], "劳动节")
+        self.assertEqual(ChinaCalendarService.get_day_meta(date(2026, 5, 1))["holiday_name"], "劳动节")
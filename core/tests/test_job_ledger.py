@@ -0,0 +1,207 @@
+import time
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import JobRun, TreatmentCycle
+from core.models import choices as core_choices
+from core.service.job_ledger import (
+    get_job_trends,
+    historical_p95_ms,
+    job_phase,
+    percentile,
+    purge_expired_job_runs,
+    record_job_rows,
+    record_job_run,
+)
+from users.models import CustomUser, PatientProfile
+
+
+def _seed_runs(job_name, durations):
+    start = timezone.now() - timedelta(days=len(durations))
+    for offset, duration_ms in enumerate(durations):
+        JobRun.objects.create(
+            job_name=job_name,
+            status=JobRun.Status.SUCCESS,
+            started_at=start + timedelta(days=offset),
+            duration_ms=duration_ms,
+        )
+
+
+class JobLedgerTests(TestCase):
+    def test_successful_run_records_phases_rows_and_queries(self):
+        with record_job_run("demo", {"date": "2026-01-01", "verbosity": 1}) as job:
+            with job.phase("load"):
+                list(PatientProfile.objects.all())
+                list(PatientProfile.objects.all())
+            with job_phase("count"):
+                PatientProfile.objects.count()
+            record_job_rows("patients", 3)
+            job.add_rows("patients", 2)
+
+        run = JobRun.objects.get(job_name="demo")
+        self.assertEqual(run.status, JobRun.Status.SUCCESS)
+        self.assertEqual(run.query_count, 3)
+        self.assertEqual(run.rows, {"patients": 5})
+        self.assertEqual(
+            [(phase["name"], phase["query_count"]) for phase in run.phases],
+            [("load", 2), ("count", 1)],
+        )
+        self.assertEqual(run.arguments, {"date": "2026-01-01"})
+        self.assertIsNotNone(run.duration_ms)
+        self.assertIsNotNone(run.finished_at)
+        self.assertGreater(run.peak_rss_kb, 0)
+
+    def test_failed_run_records_error_and_reraises(self):
+        with self.assertRaises(RuntimeError):
+            with record_job_run("demo_fail"):
+                raise RuntimeError("wechat timeout")
+
+        run = JobRun.objects.get(job_name="demo_fail")
+        self.assertEqual(run.status, JobRun.Status.FAILED)
+        self.assertIn("wechat timeout", run.error)
+        self.assertFalse(run.exceeded_p95)
+
+    def test_helpers_are_noops_outside_a_run(self):
+        with job_phase("orphan") as entry:
+            record_job_rows("rows", 1)
+        self.assertIsNone(entry)
+        self.assertFalse(JobRun.objects.exists())
+
+    @override_settings(JOB_LEDGER_ENABLED=False)
+    def test_disabled_ledger_writes_nothing(self):
+        with record_job_run("demo") as job:
+            job.add_rows("rows", 1)
+        self.assertFalse(JobRun.objects.exists())
+
+    def test_percentile_uses_nearest_rank(self):
+        self.assertEqual(percentile(list(range(1, 21)), 95), 19)
+        self.assertEqual(percentile([5], 95), 5)
+        self.assertIsNone(percentile([], 95))
+
+    @override_settings(JOB_LEDGER_P95_MIN_RUNS=3)
+    def test_historical_p95_requires_min_runs(self):
+        _seed_runs("nightly", [10, 20])
+        self.assertIsNone(historical_p95_ms("nightly"))
+        _seed_runs("nightly", [30])
+        self.assertEqual(historical_p95_ms("nightly"), 30)
+
+    @override_settings(
+        JOB_LEDGER_P95_MIN_RUNS=3,
+        JOB_LEDGER_P95_ALERT_FACTOR=1.0,
+        JOB_LEDGER_ALERT_WEBHOOK_URL="https://hooks.example.com/robot",
+    )
+    def test_run_slower_than_p95_is_flagged_and_alerted(self):
+        _seed_runs("nightly", [1, 1, 1])
+
+        with patch("requests.post") as post, self.assertLogs("core.service.job_ledger", level="WARNING"):
+            with record_job_run("nightly"):
+                time.sleep(0.02)
+
+        run = JobRun.objects.filter(job_name="nightly").order_by("-started_at").first()
+        self.assertTrue(run.exceeded_p95)
+        self.assertEqual(run.baseline_p95_ms, 1)
+        post.assert_called_once()
+        self.assertIn("nightly", post.call_args.kwargs["json"]["text"]["content"])
+
+    @override_settings(JOB_LEDGER_P95_MIN_RUNS=3)
+    def test_run_within_p95_is_not_flagged(self):
+        _seed_runs("nightly", [60_000, 60_000, 60_000])
+
+        with patch("requests.post") as post:
+            with record_job_run("nightly"):
+                pass
+
+        run = JobRun.objects.filter(job_name="nightly").order_by("-started_at").first()
+        self.assertFalse(run.exceeded_p95)
+        post.assert_not_called()
+
+    @override_settings(JOB_RUN_RETENTION_DAYS=30)
+    def test_finished_run_purges_expired_runs_of_same_job(self):
+        expired_at = timezone.now() - timedelta(days=31)
+        JobRun.objects.create(job_name="nightly", status=JobRun.Status.SUCCESS, started_at=expired_at)
+        JobRun.objects.create(job_name="other", status=JobRun.Status.SUCCESS, started_at=expired_at)
+        _seed_runs("nightly", [10])
+
+        with record_job_run("nightly"):
+            pass
+
+        self.assertEqual(JobRun.objects.filter(job_name="nightly").count(), 2)
+        self.assertFalse(JobRun.objects.filter(job_name="nightly", started_at=expired_at).exists())
+        self.assertTrue(JobRun.objects.filter(job_name="other").exists())
+        self.assertEqual(purge_expired_job_runs(), 1)
+
+    @override_settings(JOB_RUN_RETENTION_DAYS=0)
+    def test_zero_retention_keeps_all_runs(self):
+        JobRun.objects.create(
+            job_name="nightly",
+            status=JobRun.Status.SUCCESS,
+            started_at=timezone.now() - timedelta(days=3650),
+        )
+        self.assertEqual(purge_expired_job_runs(), 0)
+        self.assertTrue(JobRun.objects.exists())
+
+    def test_management_command_is_recorded(self):
+        patient = PatientProfile.objects.create(name="台账患者", phone="13800000071")
+        TreatmentCycle.objects.create(
+            patient=patient,
+            name="已过期疗程",
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 1, 21),
+            status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+
+        call_command("refresh_treatment_cycle_status", "--date", "2026-02-01", stdout=StringIO())
+
+        run = JobRun.objects.get(job_name="refresh_treatment_cycle_status")
+        self.assertEqual(run.status, JobRun.Status.SUCCESS)
+        self.assertEqual(run.rows, {"cycles_completed": 1})
+        self.assertEqual([phase["name"] for phase in run.phases], ["refresh_cycles"])
+        self.assertEqual(run.arguments, {"date": "2026-02-01"})
+
+
+class JobRunTrendsAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser(
+            username="ledger_admin",
+            password="password",
+            phone="13900002071",
+        )
+        self.client.force_login(self.admin_user)
+
+    @override_settings(JOB_LEDGER_P95_MIN_RUNS=3)
+    def test_trends_summarize_recent_runs_per_job(self):
+        _seed_runs("nightly", [100, 200, 300])
+        JobRun.objects.create(
+            job_name="nightly",
+            status=JobRun.Status.FAILED,
+            started_at=timezone.now(),
+            duration_ms=50,
+        )
+
+        with self.assertNumQueries(4):
+            trends = get_job_trends(days=30)
+
+        self.assertEqual(len(trends), 1)
+        nightly = trends[0]
+        self.assertEqual((nightly["runs"], nightly["failures"]), (4, 1))
+        self.assertEqual((nightly["avg_ms"], nightly["p95_ms"]), (200, 300))
+        self.assertEqual(nightly["last_run"].status, JobRun.Status.FAILED)
+        self.assertEqual(len(nightly["daily"]), 4)
+        self.assertEqual(nightly["daily"][-1]["status"], JobRun.Status.FAILED)
+        self.assertEqual(nightly["daily"][-2]["bar_pct"], 100)
+
+    def test_trends_admin_page_renders(self):
+        _seed_runs("generate_daily_tasks", [1200, 1500])
+
+        response = self.client.get(reverse("admin:core_jobrun_trends"), {"days": 7})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "generate_daily_tasks")
+        changelist = self.client.get(reverse("admin:core_jobrun_changelist"))
+        self.assertContains(changelist, reverse("admin:core_jobrun_trends"))
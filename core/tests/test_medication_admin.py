@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from django.contrib.admin.sites import AdminSite
+from django.test import RequestFactory, TestCase
+
+from core.admin.medication import MedicationAdmin
+from core.models import Medication
+from users.models import CustomUser
+
+
+class MedicationAdminSoftDeleteTests(TestCase):
+    def setUp(self):
+        self.admin = MedicationAdmin(Medication, AdminSite())
+        self.admin_user = CustomUser.objects.create_superuser(
+            username="medication_admin",
+            password="strong-pass-123",
+            phone="13900002100",
+        )
+        self.request = RequestFactory().post("/admin/core/medication/")
+        self.request.user = self.admin_user
+        self.active = Medication.objects.create(name="后台软删药物A", name_abbr="HTRSA")
+        self.other = Medication.objects.create(name="后台软删药物B", name_abbr="HTRSB")
+
+    def test_bulk_soft_delete_bumps_catalog_version(self):
+        with patch("core.admin.medication.bump_catalog_version") as bump:
+            removed = self.admin._soft_delete_queryset(self.request, Medication.objects.all())
+
+        self.assertEqual(removed, 2)
+        bump.assert_called_once_with()
+        self.assertFalse(Medication.objects.filter(is_active=True).exists())
+
+    def test_bulk_soft_delete_without_active_rows_skips_bump(self):
+        Medication.objects.update(is_active=False)
+
+        with patch("core.admin.medication.bump_catalog_version") as bump:
+            removed = self.admin._soft_delete_queryset(self.request, Medication.objects.all())
+
+        self.assertEqual(removed, 0)
+        bump.assert_not_called()
@@ -0,0 +1,93 @@
+import io
+import json
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from business_support.models import Device
+from core.models import DailyTask
+from core.service.load_scenarios import run_load_scenario
+from core.service.synthetic_population import (
+    SyntheticPopulationOptions,
+    generate_synthetic_population,
+    purge_synthetic_population,
+)
+from health_data.models import HealthMetric
+from market.models import Order
+from users.models import CustomUser, PatientProfile
+
+
+class SyntheticPopulationTests(TestCase):
+    def setUp(self):
+        self.result = generate_synthetic_population(
+            SyntheticPopulationOptions(patients=5, months=1, device_ratio=1.0, batch_size=2, seed=7)
+        )
+
+    def test_generates_linked_population(self):
+        counts = self.result.counts
+        self.assertEqual(counts["patients"], 5)
+        self.assertEqual(PatientProfile.objects.filter(user__username__startswith="synthetic_").count(), 5)
+        self.assertEqual(Order.objects.count(), 5)
+        self.assertEqual(Device.objects.filter(current_patient__isnull=False).count(), 5)
+        self.assertEqual(DailyTask.objects.count(), counts["tasks"])
+        self.assertEqual(HealthMetric.objects.count(), counts["metrics"])
+        # 每台手表每天至少上报 19 条（心率 12、血氧 4、血压 2、步数 1）。
+        self.assertGreaterEqual(counts["metrics"], 5 * 30 * 19)
+        self.assertGreater(counts["tasks"], 0)
+        self.assertGreater(counts["messages"], 0)
+        self.assertGreater(counts["report_images"], 0)
+
+    @patch("web_patient.views.home.generate_menu_auth_url", return_value="/wx/menu")
+    def test_scenarios_run_without_errors(self, _menu_url):
+        for name in ("patient_morning_checkin", "doctor_triage", "device_backlog_replay"):
+            report = run_load_scenario(name, iterations=2)
+            self.assertEqual(report["errors"], 0, msg=json.dumps(report, ensure_ascii=False))
+            self.assertGreater(report["requests"], 0)
+            for stats in report["steps"].values():
+                self.assertLessEqual(stats["p50_ms"], stats["max_ms"])
+
+    def test_command_report_and_purge(self):
+        stdout = io.StringIO()
+        call_command(
+            "run_load_scenarios",
+            "--scenario",
+            "device_backlog_replay",
+            "--iterations",
+            "1",
+            "--concurrency",
+            "1",
+            "--json",
+            stdout=stdout,
+        )
+        report = json.loads(stdout.getvalue())[0]
+        self.assertEqual(report["steps"]["iwown_pb_upload"]["count"], 4)
+
+        self.assertEqual(purge_synthetic_population(), 5)
+        self.assertFalse(CustomUser.objects.filter(username__startswith="synthetic_").exists())
+        self.assertFalse(Device.objects.filter(sn__startswith="SYN-").exists())
+        self.assertFalse(Order.objects.exists())
+
+
+class SyntheticPopulationCommandGuardTests(TestCase):
+    @override_settings(DEBUG=False)
+    def test_refuses_without_debug_or_explicit_flag(self):
+        for extra in ([], ["--purge"]):
+            with self.subTest(extra=extra), self.assertRaises(CommandError):
+                call_command("generate_synthetic_population", "--patients", "1", *extra, stdout=io.StringIO())
+        self.assertFalse(CustomUser.objects.filter(username__startswith="synthetic_").exists())
+
+    @override_settings(DEBUG=False)
+    def test_allow_production_flag_runs_generate_and_purge(self):
+        options = ["--patients", "2", "--months", "1", "--allow-production"]
+        call_command("generate_synthetic_population", *options, stdout=io.StringIO())
+        self.assertEqual(PatientProfile.objects.filter(user__username__startswith="synthetic_").count(), 2)
+
+        call_command("generate_synthetic_population", "--purge", "--allow-production", stdout=io.StringIO())
+        self.assertFalse(CustomUser.objects.filter(username__startswith="synthetic_").exists())
+
+    @override_settings(DEBUG=True)
+    def test_debug_settings_allow_purge(self):
+        stdout = io.StringIO()
+        call_command("generate_synthetic_population", "--purge", stdout=stdout)
+        self.assertIn("Purged 0", stdout.getvalue())
@@ -1,6 +1,10 @@
-from datetime import date
+from datetime import date, timedelta
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from core.models import DailyTask, MonitoringTemplate, PlanItem, TreatmentCycle, choices
 from core.service import tasks as task_service
@@ -245,3 +249,165 @@ class TaskAdherenceServiceTest(TestCase):
         self.assertEqual(result[1]["rate"], 1.0)
         self.assertEqual(result[2]["type"], choices.PlanItemCategory.QUESTIONNAIRE)
         self.assertEqual(result[2]["rate"], 0.0)
+
+    def test_get_adherence_metrics_batch_runs_single_grouped_query(self):
+        DailyTask.objects.create(
+            patient=self.patient,
+            task_date=self.start_date,
+            task_type=choices.PlanItemCategory.MEDICATION,
+            title="药物A",
+            status=choices.TaskStatus.COMPLETED,
+        )
+        adherence_types = [
+            choices.PlanItemCategory.MEDICATION,
+            choices.PlanItemCategory.CHECKUP,
+            choices.PlanItemCategory.QUESTIONNAIRE,
+            task_service.MONITORING_ADHERENCE_ALL,
+            *task_service.MONITORING_ADHERENCE_TYPES,
+        ]
+        task_service.get_adherence_metrics_batch(
+            patient=self.patient,
+            adherence_types=adherence_types,
+            start_date=self.start_date,
+            end_date=self.end_date,
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            task_service.get_adherence_metrics_batch(
+                patient=self.patient,
+                adherence_types=adherence_types,
+                start_date=self.start_date,
+                end_date=self.end_date,
+            )
+
+        selects = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT")
+            and "core_daily_tasks" in query["sql"]
+            and "COUNT(" in query["sql"].upper()
+        ]
+        self.assertEqual(len(selects), 1)
+
+    def test_get_adherence_metrics_for_patients(self):
+        other_patient = PatientProfile.objects.create(
+            phone="13900000007",
+            name="依从性测试患者2",
+        )
+        for patient, status in (
+            (self.patient, choices.TaskStatus.COMPLETED),
+            (other_patient, choices.TaskStatus.PENDING),
+        ):
+            DailyTask.objects.create(
+                patient=patient,
+                task_date=self.start_date,
+                task_type=choices.PlanItemCategory.MEDICATION,
+                title="药物A",
+                status=status,
+            )
+
+        result = task_service.get_adherence_metrics_for_patients(
+            [self.patient.id, other_patient.id],
+            [choices.PlanItemCategory.MEDICATION, choices.PlanItemCategory.CHECKUP],
+            start_date=self.start_date,
+            end_date=self.end_date,
+        )
+
+        self.assertEqual(result[self.patient.id][0]["rate"], 1.0)
+        self.assertEqual(result[other_patient.id][0]["rate"], 0.0)
+        self.assertIsNone(result[other_patient.id][1]["rate"])
+
+    def test_get_adherence_metrics_for_patients_rejects_unknown_type(self):
+        with self.assertRaises(ValueError):
+            task_service.get_adherence_metrics_for_patients([self.patient.id], ["UNKNOWN"])
+
+    def test_cached_adherence_is_invalidated_on_task_completion(self):
+        today = timezone.localdate()
+        DailyTask.objects.create(
+            patient=self.patient,
+            task_date=today,
+            task_type=choices.PlanItemCategory.MEDICATION,
+            title="药物A",
+            status=choices.TaskStatus.PENDING,
+        )
+
+        before = task_service.get_adherence_metrics_batch(
+            patient=self.patient,
+            adherence_types=[choices.PlanItemCategory.MEDICATION],
+            start_date=today,
+            end_date=today,
+            use_cache=True,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            task_service.complete_daily_medication_tasks(self.patient.id)
+        after = task_service.get_adherence_metrics_batch(
+            patient=self.patient,
+            adherence_types=[choices.PlanItemCategory.MEDICATION],
+            start_date=today,
+            end_date=today,
+            use_cache=True,
+        )
+
+        self.assertEqual(before[0]["completed"], 0)
+        self.assertEqual(after[0]["completed"], 1)
+
+    def _adherence_version(self):
+        return cache.get(task_service._ADHERENCE_VERSION_KEY.format(patient_id=self.patient.id))
+
+    def test_task_completion_invalidates_adherence_only_after_commit(self):
+        DailyTask.objects.create(
+            patient=self.patient,
+            task_date=timezone.localdate(),
+            task_type=choices.PlanItemCategory.MEDICATION,
+            title="药物A",
+            status=choices.TaskStatus.PENDING,
+        )
+        version = self._adherence_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            task_service.complete_daily_medication_tasks(self.patient.id)
+            self.assertEqual(self._adherence_version(), version)
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertNotEqual(self._adherence_version(), version)
+
+    def test_status_transitions_invalidate_adherence_cache(self):
+        today = timezone.localdate()
+        task = DailyTask.objects.create(
+            patient=self.patient,
+            task_date=today - timedelta(days=30),
+            task_type=choices.PlanItemCategory.MEDICATION,
+            title="药物A",
+            status=choices.TaskStatus.PENDING,
+        )
+        DailyTask.objects.filter(pk=task.pk).update(status_transition_date=today)
+
+        # 增量引擎：过期任务流转为已终止。
+        version = self._adherence_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            task_service.refresh_task_statuses(as_of_date=today, patient_id=self.patient.id)
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.TERMINATED)
+        self.assertNotEqual(self._adherence_version(), version)
+
+        # 按历史日期全量重算：任务重置为未开始。
+        version = self._adherence_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            task_service.refresh_task_statuses(
+                as_of_date=today - timedelta(days=31),
+                patient_id=self.patient.id,
+            )
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.NOT_STARTED)
+        self.assertNotEqual(self._adherence_version(), version)
+
+        # 状态无变化时不失效。
+        version = self._adherence_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            task_service.refresh_task_statuses(
+                as_of_date=today - timedelta(days=31),
+                patient_id=self.patient.id,
+            )
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self._adherence_version(), version)
@@ -1,11 +1,29 @@
 """generate_daily_tasks_for_date 调度函数测试。"""
 
 from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
 
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache
 from django.test import TestCase
+from django_redis import get_redis_connection
 
 from core.models import DailyTask, PlanItem, TreatmentCycle, choices
-from core.service.task_scheduler import generate_daily_tasks_for_date
+from core.service import task_scheduler
+from core.service.plan_item import PlanItemService
+from core.service.tasks import _ADHERENCE_VERSION_KEY
+from core.service.task_scheduler import (
+    PLAN_ITEM_DIRTY_SET_KEY,
+    find_plan_task_inconsistencies,
+    generate_daily_tasks_for_date,
+    get_dirty_plan_item_ids,
+    mark_plan_items_dirty,
+)
+from core.service.treatment_cycle import refresh_expired_treatment_cycles
+from users import choices as user_choices
 from users.models import PatientProfile
 
 
@@ -13,6 +31,7 @@ class TaskSchedulerTest(TestCase):
     """测试每日任务调度服务。"""
 
     def setUp(self) -> None:
+        get_redis_connection("default").delete(PLAN_ITEM_DIRTY_SET_KEY)
         # 基础患者档案
         self.patient = PatientProfile.objects.create(
             phone="13800000000",
@@ -131,6 +150,17 @@ class TaskSchedulerTest(TestCase):
             ).exists()
         )
 
+    def test_cleanup_invalidates_adherence_cache_of_affected_patients(self):
+        generate_daily_tasks_for_date(self.cycle_start_date)
+        self.plan_item.delete()
+        version_key = _ADHERENCE_VERSION_KEY.format(patient_id=self.patient.id)
+        version = cache.get(version_key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_daily_tasks_for_date(self.cycle_start_date + timedelta(days=1))
+
+        self.assertNotEqual(cache.get(version_key), version)
+
     def test_cleanup_terminated_cycle_deletes_not_started_tasks(self):
         task_date = self.cycle_start_date
         future_date = self.cycle_start_date + timedelta(days=2)
@@ -160,3 +190,131 @@ class TaskSchedulerTest(TestCase):
                 task_date=task_date,
             ).exists()
         )
+
+
+class PlanItemIncrementalReconcileTest(TestCase):
+    """计划编辑触发的增量对账与夜间脏集合复核。"""
+
+    def setUp(self) -> None:
+        get_redis_connection("default").delete(PLAN_ITEM_DIRTY_SET_KEY)
+        self.actor = get_user_model().objects.create_user(
+            username="reconcile_doctor",
+            password="password",
+            user_type=user_choices.UserType.DOCTOR,
+            phone="13900000031",
+        )
+        self.patient = PatientProfile.objects.create(phone="13800000031", name="对账患者")
+        self.today = date.today()
+        self.cycle = TreatmentCycle.objects.create(
+            patient=self.patient,
+            name="进行中疗程",
+            start_date=self.today,
+            cycle_days=10,
+            status=choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+        self.plan_item = PlanItem.objects.create(
+            cycle=self.cycle,
+            category=choices.PlanItemCategory.MEDICATION,
+            template_id=1,
+            item_name="化疗用药B",
+            schedule_days=[1, 3],
+            status=choices.PlanItemStatus.ACTIVE,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_daily_tasks_for_date(self.today)
+
+    def _task_dates(self):
+        return set(
+            DailyTask.objects.filter(plan_item=self.plan_item).values_list("task_date", flat=True)
+        )
+
+    def test_toggle_schedule_day_reconciles_only_that_item_on_commit(self):
+        self.assertEqual(get_dirty_plan_item_ids(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanItemService.toggle_schedule_day(self.plan_item.id, 5, True, self.actor)
+        self.assertEqual(
+            self._task_dates(),
+            {self.today, self.today + timedelta(days=2), self.today + timedelta(days=4)},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanItemService.toggle_schedule_day(self.plan_item.id, 3, False, self.actor)
+        self.assertEqual(self._task_dates(), {self.today, self.today + timedelta(days=4)})
+        self.assertEqual(get_dirty_plan_item_ids(), [])
+        self.assertEqual(find_plan_task_inconsistencies(self.today), {})
+
+    def test_disable_item_removes_future_tasks_and_keeps_completed(self):
+        DailyTask.objects.filter(plan_item=self.plan_item, task_date=self.today).update(
+            status=choices.TaskStatus.COMPLETED
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanItemService.toggle_item_status(
+                self.cycle.id,
+                choices.PlanItemCategory.MEDICATION,
+                1,
+                False,
+                self.actor,
+            )
+
+        self.assertEqual(self._task_dates(), {self.today})
+
+    def test_nightly_run_only_verifies_dirty_items(self):
+        # 绕过信号的批量更新不会进入脏集合，夜间增量复核不会处理。
+        PlanItem.objects.filter(pk=self.plan_item.pk).update(schedule_days=[1, 3, 6])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(generate_daily_tasks_for_date(self.today), 0)
+        self.assertEqual(
+            find_plan_task_inconsistencies(self.today),
+            {self.plan_item.id: ({self.today + timedelta(days=5)}, set())},
+        )
+
+        self.assertEqual(generate_daily_tasks_for_date(self.today, full=True), 1)
+        self.assertEqual(find_plan_task_inconsistencies(self.today), {})
+
+    def test_nightly_run_keeps_items_marked_dirty_during_reconcile(self):
+        mark_plan_items_dirty([self.plan_item.id])
+
+        def _reconcile_and_mark_other(plan_item_id, **kwargs):
+            # 对账期间其它计划被编辑，新写入的脏标记需保留到下一次复核。
+            mark_plan_items_dirty([self.plan_item.id + 1000])
+            return reconcile(plan_item_id, **kwargs)
+
+        reconcile = task_scheduler.reconcile_plan_item_tasks
+        with patch.object(
+            task_scheduler, "reconcile_plan_item_tasks", side_effect=_reconcile_and_mark_other
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                generate_daily_tasks_for_date(self.today)
+
+        self.assertEqual(get_dirty_plan_item_ids(), [self.plan_item.id + 1000])
+
+    def test_expired_cycle_marks_its_plan_items_dirty(self):
+        TreatmentCycle.objects.filter(pk=self.cycle.pk).update(
+            start_date=self.today - timedelta(days=10),
+            end_date=self.today - timedelta(days=1),
+        )
+
+        self.assertEqual(refresh_expired_treatment_cycles(self.today), 1)
+        self.assertEqual(get_dirty_plan_item_ids(), [self.plan_item.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_daily_tasks_for_date(self.today)
+        self.assertEqual(get_dirty_plan_item_ids(), [])
+
+    def test_consistency_command_reports_and_fixes(self):
+        PlanItem.objects.filter(pk=self.plan_item.pk).update(schedule_days=[1])
+
+        with self.assertRaises(CommandError):
+            call_command("check_plan_task_consistency", stdout=StringIO())
+
+        out = StringIO()
+        call_command("check_plan_task_consistency", "--fix", stdout=out)
+        self.assertIn("deleted 1", out.getvalue())
+        self.assertEqual(self._task_dates(), {self.today})
+
+        out = StringIO()
+        call_command("check_plan_task_consistency", stdout=out)
+        self.assertIn("consistent", out.getvalue())
@@ -0,0 +1,163 @@
+"""Incremental DailyTask status engine tests."""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import DailyTask, choices
+from core.service import tasks as task_service
+from users.models import PatientProfile
+
+
+class TaskStatusEngineTest(TestCase):
+    """验证基于 status_transition_date 的增量状态刷新。"""
+
+    def setUp(self) -> None:
+        self.patient = PatientProfile.objects.create(phone="13900000028", name="状态引擎患者")
+        self.today = timezone.localdate()
+
+    def _create_task(self, *, task_type, offset_days, status=choices.TaskStatus.PENDING):
+        return DailyTask.objects.create(
+            patient=self.patient,
+            task_date=self.today + timedelta(days=offset_days),
+            task_type=task_type,
+            title="任务",
+            status=status,
+        )
+
+    def test_new_task_is_due_no_later_than_today(self):
+        future = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=2,
+            status=choices.TaskStatus.NOT_STARTED,
+        )
+        past = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=-2,
+        )
+        self.assertEqual(future.status_transition_date, self.today)
+        self.assertEqual(past.status_transition_date, past.task_date)
+
+        task_service.advance_task_statuses(as_of_date=self.today)
+        future.refresh_from_db()
+        self.assertEqual(future.status, choices.TaskStatus.NOT_STARTED)
+        self.assertEqual(future.status_transition_date, future.task_date)
+
+    def test_advance_sets_status_and_next_transition(self):
+        future = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=2,
+            status=choices.TaskStatus.PENDING,
+        )
+        checkup = self._create_task(
+            task_type=choices.PlanItemCategory.CHECKUP,
+            offset_days=-3,
+            status=choices.TaskStatus.NOT_STARTED,
+        )
+        expired = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=-1,
+        )
+
+        transitioned = task_service.advance_task_statuses(as_of_date=self.today)
+
+        self.assertEqual(transitioned, 3)
+        future.refresh_from_db()
+        checkup.refresh_from_db()
+        expired.refresh_from_db()
+        self.assertEqual(future.status, choices.TaskStatus.NOT_STARTED)
+        self.assertEqual(future.status_transition_date, future.task_date)
+        self.assertEqual(checkup.status, choices.TaskStatus.PENDING)
+        self.assertEqual(checkup.status_transition_date, checkup.task_date + timedelta(days=7))
+        self.assertEqual(expired.status, choices.TaskStatus.TERMINATED)
+        self.assertIsNone(expired.status_transition_date)
+
+    def test_task_walks_through_lifecycle(self):
+        task = self._create_task(
+            task_type=choices.PlanItemCategory.QUESTIONNAIRE,
+            offset_days=1,
+            status=choices.TaskStatus.NOT_STARTED,
+        )
+
+        task_service.advance_task_statuses(as_of_date=self.today)
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.NOT_STARTED)
+
+        task_service.advance_task_statuses(as_of_date=self.today + timedelta(days=1))
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.PENDING)
+
+        task_service.advance_task_statuses(as_of_date=self.today + timedelta(days=7))
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.PENDING)
+
+        task_service.advance_task_statuses(as_of_date=self.today + timedelta(days=8))
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.TERMINATED)
+
+    def test_rows_not_due_are_not_scanned(self):
+        for offset in range(-5, 0):
+            self._create_task(task_type=choices.PlanItemCategory.MEDICATION, offset_days=offset)
+        task_service.advance_task_statuses(as_of_date=self.today)
+
+        # 全部已终止且无后续流转：仅剩一次空批次查询。
+        with self.assertNumQueries(1):
+            self.assertEqual(task_service.advance_task_statuses(as_of_date=self.today), 0)
+
+    def test_processes_in_bounded_batches(self):
+        for offset in range(-5, 0):
+            self._create_task(task_type=choices.PlanItemCategory.MEDICATION, offset_days=offset)
+
+        transitioned = task_service.advance_task_statuses(as_of_date=self.today, batch_size=2)
+
+        self.assertEqual(transitioned, 5)
+        self.assertFalse(
+            DailyTask.objects.exclude(status=choices.TaskStatus.TERMINATED).exists()
+        )
+
+    def test_completed_tasks_are_left_untouched(self):
+        task = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=-3,
+            status=choices.TaskStatus.COMPLETED,
+        )
+        task_service.advance_task_statuses(as_of_date=self.today)
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.COMPLETED)
+
+    def test_refresh_for_other_date_resets_transition_for_engine(self):
+        task = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=-1,
+        )
+        task_service.refresh_task_statuses(as_of_date=self.today)
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.TERMINATED)
+
+        # 回看昨天：全量重算把任务恢复为未完成，并让增量引擎重新接管。
+        task_service.refresh_task_statuses(as_of_date=self.today - timedelta(days=1))
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.PENDING)
+        self.assertEqual(task.status_transition_date, task.task_date)
+
+        task_service.refresh_task_statuses(as_of_date=self.today)
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.TERMINATED)
+
+    def test_refresh_for_future_date_keeps_task_due_today(self):
+        task = self._create_task(
+            task_type=choices.PlanItemCategory.MEDICATION,
+            offset_days=1,
+        )
+
+        # 预生成明天的任务：全量重算把明天的任务置为未完成，流转日期不晚于今天。
+        task_service.refresh_task_statuses(as_of_date=self.today + timedelta(days=1))
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.PENDING)
+        self.assertEqual(task.status_transition_date, self.today)
+
+        task_service.refresh_task_statuses(as_of_date=self.today)
+        task.refresh_from_db()
+        self.assertEqual(task.status, choices.TaskStatus.NOT_STARTED)
+        self.assertEqual(task.status_transition_date, task.task_date)
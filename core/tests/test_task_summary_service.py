@@ -7,7 +7,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from core.models import DailyTask, PlanItem, Questionnaire, TreatmentCycle, choices
-from core.service.tasks import get_daily_plan_summary
+from core.service.tasks import get_daily_plan_summary, get_plan_summaries_for_range
 from users.models import PatientProfile
 
 
@@ -513,3 +513,87 @@ class TaskSummaryServiceTest(TestCase):
                 for item in summary
             )
         )
+
+
+class PlanSummaryRangeTest(TestCase):
+    """验证区间计划摘要与逐日 get_daily_plan_summary 结果一致。"""
+
+    def setUp(self) -> None:
+        self.patient = PatientProfile.objects.create(phone="13900000005", name="区间患者")
+        self.cycle_start = date(2025, 1, 3)
+        TreatmentCycle.objects.create(
+            patient=self.patient,
+            name="第1疗程",
+            start_date=self.cycle_start,
+            end_date=date(2025, 1, 8),
+            status=choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+        self.questionnaire = Questionnaire.objects.create(name="随访问卷R", code="Q_RANGE", is_active=True)
+        for offset in range(6):
+            task_date = self.cycle_start + timedelta(days=offset)
+            DailyTask.objects.create(
+                patient=self.patient,
+                task_date=task_date,
+                task_type=choices.PlanItemCategory.MEDICATION,
+                title="用药提醒",
+                status=choices.TaskStatus.COMPLETED if offset % 2 else choices.TaskStatus.TERMINATED,
+            )
+            DailyTask.objects.create(
+                patient=self.patient,
+                task_date=task_date,
+                task_type=choices.PlanItemCategory.MONITORING,
+                title="测量体温",
+                status=choices.TaskStatus.NOT_STARTED,
+            )
+        DailyTask.objects.create(
+            patient=self.patient,
+            task_date=self.cycle_start,
+            task_type=choices.PlanItemCategory.CHECKUP,
+            title="复查CT",
+            status=choices.TaskStatus.TERMINATED,
+        )
+        # 疗程外的任务不应出现在摘要中。
+        DailyTask.objects.create(
+            patient=self.patient,
+            task_date=date(2025, 1, 10),
+            task_type=choices.PlanItemCategory.MEDICATION,
+            title="用药提醒",
+            status=choices.TaskStatus.PENDING,
+        )
+
+    def test_range_matches_per_day_summary(self):
+        start, end = date(2025, 1, 1), date(2025, 1, 10)
+        with patch("core.service.tasks.timezone.localdate", return_value=date(2025, 1, 20)):
+            summaries = get_plan_summaries_for_range(self.patient, start, end)
+            per_day = {
+                start + timedelta(days=offset): get_daily_plan_summary(
+                    self.patient,
+                    task_date=start + timedelta(days=offset),
+                )
+                for offset in range(10)
+            }
+
+        self.assertEqual(list(summaries), list(per_day))
+        self.assertEqual(summaries, per_day)
+        self.assertEqual(summaries[date(2025, 1, 1)], [])
+        self.assertEqual(summaries[date(2025, 1, 10)], [])
+        self.assertEqual(
+            [item["status"] for item in summaries[self.cycle_start]],
+            [choices.TaskStatus.PENDING, choices.TaskStatus.PENDING, choices.TaskStatus.PENDING],
+        )
+
+    def test_range_is_read_only_and_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            get_plan_summaries_for_range(self.patient, date(2025, 1, 1), date(2025, 1, 31))
+        self.assertTrue(
+            DailyTask.objects.filter(
+                patient=self.patient,
+                status=choices.TaskStatus.NOT_STARTED,
+            ).exists()
+        )
+
+    def test_range_rejects_invalid_window(self):
+        with self.assertRaises(ValueError):
+            get_plan_summaries_for_range(self.patient, date(2025, 1, 5), date(2025, 1, 1))
+        with self.assertRaises(ValueError):
+            get_plan_summaries_for_range(self.patient, date(2025, 1, 1), date(2025, 6, 1))
@@ -271,6 +271,35 @@ class TreatmentCycleStatusJobTest(TestCase):
         self.assertEqual(updated_count, 1)
         self.assertEqual(expired_cycle.status, choices.TreatmentCycleStatus.COMPLETED)
 
+    def test_refresh_expired_treatment_cycles_invalidates_plan_view(self):
+        patient = PatientProfile.objects.create(
+            phone="13900000012",
+            name="缓存患者",
+        )
+        expired_cycle = TreatmentCycle.objects.create(
+            patient=patient,
+            name="过期疗程",
+            start_date=date.today() - timedelta(days=10),
+            end_date=date.today() - timedelta(days=1),
+            cycle_days=10,
+            status=choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+        TreatmentCycle.objects.create(
+            patient=patient,
+            name="进行中疗程",
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=9),
+            cycle_days=10,
+            status=choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+
+        with patch(
+            "core.service.treatment_cycle.invalidate_cycle_plan_view"
+        ) as invalidate:
+            refresh_expired_treatment_cycles()
+
+        invalidate.assert_called_once_with(expired_cycle.id)
+
 
 class TreatmentCycleCreateFromSourceTest(TestCase):
     def setUp(self) -> None:
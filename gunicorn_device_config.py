@@ -0,0 +1,33 @@
+# gunicorn_device_config.py
+# 设备厂商回调专用进程池（ASGI）：
+#   gunicorn -c gunicorn_device_config.py lung_cancer_care.asgi:application
+# nginx 将 /deviceupload/ 转发到本端口，医生端 / 患者端仍由 gunicorn_config.py 的同步进程处理，
+# 厂商重试与大批量历史补传不再占用网页请求的 worker。
+import multiprocessing
+import os
+
+# 监听地址和端口（与网页进程 8000 端口分开）
+bind = "0.0.0.0:8010"
+
+# 事件循环 worker：单进程即可同时挂起大量慢速上传，进程数按 CPU 核心数即可
+workers = multiprocessing.cpu_count()
+
+# 需安装 uvicorn-worker（uvicorn 自带的 uvicorn.workers 已弃用）
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# 每个进程内阻塞工作（解析 / 入库）的线程池大小，即单进程最多占用的数据库连接数
+raw_env = [
+    "DEVICE_CALLBACK_EXECUTOR_WORKERS=%s" % os.getenv("DEVICE_CALLBACK_EXECUTOR_WORKERS", "8"),
+]
+
+# 日志配置
+accesslog = "/data/projects/lung_cancer_care/logs/gunicorn_device_access.log"
+errorlog = "/data/projects/lung_cancer_care/logs/gunicorn_device_error.log"
+loglevel = "info"
+
+# 进程名
+proc_name = "gunicorn_lung_cancer_care_device"
+
+# 大批量历史补传解析耗时较长，超时放宽到 60 秒
+timeout = 60
+graceful_timeout = 30
@@ -0,0 +1 @@
+"""Health data app management package."""
@@ -0,0 +1 @@
+"""Management commands for health_data app."""
@@ -0,0 +1,45 @@
+"""Generate thumbnail / medium / WebP renditions for existing report images.
+
+上线衍生图功能后执行一次：默认提交 Celery 任务分批补齐（每批完成后自动续排下一批），
+--sync 在当前进程内逐批执行并输出进度。
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from health_data.services.report_renditions import backfill_report_image_renditions
+
+
+class Command(BaseCommand):
+    help = "Backfill ReportImage renditions for images uploaded before the rendition pipeline."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--after-id", type=int, default=0, help="Resume after this ReportImage id.")
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Run inline instead of dispatching the Celery backfill task.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive.")
+        after_id = options["after_id"]
+
+        if not options["sync"]:
+            from health_data.tasks import backfill_report_image_renditions_task
+
+            backfill_report_image_renditions_task.delay(after_id, batch_size)
+            self.stdout.write(f"Queued rendition backfill after id {after_id}.")
+            return
+
+        total = 0
+        while after_id is not None:
+            generated, next_after_id = backfill_report_image_renditions(after_id, batch_size)
+            total += generated
+            self.stdout.write(f"Batch after id {after_id}: {generated} image(s) rendered.")
+            after_id = next_after_id
+        self.stdout.write(self.style.SUCCESS(f"Rendered {total} image(s)."))
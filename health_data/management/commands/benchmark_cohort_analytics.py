@@ -0,0 +1,180 @@
+"""Benchmark cohort analytics panel views over a large synthetic panel.
+
+在事务中批量造数（患者、月度快照、指标汇总、预警）、计时后整体回滚，不会留下测试数据。
+建议在与生产同构的数据库上执行；默认 50000 名患者，单次面板统计超过 --budget-ms 时以非零状态退出。
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from health_data.models import PatientMetricMonthlyStat, PatientMonthlyStat
+from health_data.services.cohort_analytics import (
+    COHORT_METRIC_BINS,
+    COHORT_SCOPE_DOCTOR,
+    COHORT_SCOPE_SALES,
+    COHORT_SCOPE_STUDIO,
+    build_cohort_analytics,
+)
+from health_data.services.monthly_stats import month_start
+from patient_alerts.models import AlertEventType, AlertLevel, AlertStatus, PatientAlert
+from users import choices
+from users.models import CustomUser, DoctorProfile, DoctorStudio, PatientProfile, SalesProfile
+
+
+class _Rollback(Exception):
+    """用于在计时完成后回滚造数事务。"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark doctor/studio/sales cohort analytics over a synthetic patient panel."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--patients", type=int, default=50000, help="Synthetic patient count.")
+        parser.add_argument(
+            "--alerts-per-patient",
+            type=float,
+            default=2.0,
+            help="Average alerts per patient in the benchmark month.",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per scope.")
+        parser.add_argument(
+            "--budget-ms",
+            type=int,
+            default=1000,
+            help="Fail when the slowest panel view exceeds this many milliseconds.",
+        )
+        parser.add_argument("--seed", type=int, default=2024)
+
+    def handle(self, *args, **options) -> None:
+        if options["patients"] <= 0 or options["repeat"] <= 0:
+            raise CommandError("--patients and --repeat must be positive.")
+
+        timings = {}
+        try:
+            with transaction.atomic():
+                timings = self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        slowest = max(timings.values())
+        if slowest > options["budget_ms"]:
+            raise CommandError(
+                f"Slowest panel view took {slowest:.0f}ms, budget is {options['budget_ms']}ms."
+            )
+
+    def _run(self, options) -> dict:
+        rng = random.Random(options["seed"])
+        month = month_start(month_start(timezone.localdate()) - timedelta(days=1))
+        event_time = timezone.make_aware(
+            timezone.datetime.combine(month + timedelta(days=14), timezone.datetime.min.time())
+        )
+
+        doctor_user = CustomUser.objects.create_user(
+            user_type=choices.UserType.DOCTOR, phone="19900000001", wx_nickname="压测医生"
+        )
+        doctor = DoctorProfile.objects.create(user=doctor_user, name="压测医生", hospital="压测医院")
+        studio = DoctorStudio.objects.create(name="压测工作室", code="BENCH034", owner_doctor=doctor)
+        DoctorProfile.objects.filter(pk=doctor.pk).update(studio=studio)
+        sales_user = CustomUser.objects.create_user(
+            user_type=choices.UserType.SALES, phone="19900000002", wx_nickname="压测销售"
+        )
+        sales = SalesProfile.objects.create(user=sales_user, name="压测销售")
+
+        started_at = time.monotonic()
+        patients = PatientProfile.objects.bulk_create(
+            [
+                PatientProfile(
+                    phone=f"198{index:08d}",
+                    name=f"压测患者{index}",
+                    doctor=doctor,
+                    sales=sales,
+                )
+                for index in range(options["patients"])
+            ],
+            batch_size=2000,
+        )
+        patient_ids = [patient.id for patient in patients]
+
+        snapshots = []
+        metric_rows = []
+        for patient_id in patient_ids:
+            medication_total = rng.randint(0, 60)
+            monitoring_total = rng.randint(0, 30)
+            snapshots.append(
+                PatientMonthlyStat(
+                    patient_id=patient_id,
+                    month=month,
+                    medication_task_total=medication_total,
+                    medication_task_completed=rng.randint(0, medication_total),
+                    monitoring_task_total=monitoring_total,
+                    monitoring_task_completed=rng.randint(0, monitoring_total),
+                )
+            )
+            for metric_type, (low, high, width) in COHORT_METRIC_BINS.items():
+                if rng.random() < 0.5:
+                    continue
+                value = Decimal(str(round(rng.uniform(float(low - width), float(high + width)), 2)))
+                metric_rows.append(
+                    PatientMetricMonthlyStat(
+                        patient_id=patient_id,
+                        month=month,
+                        metric_type=metric_type,
+                        reading_count=rng.randint(1, 60),
+                        value_avg=value,
+                        value_min=value,
+                        value_max=value,
+                    )
+                )
+        PatientMonthlyStat.objects.bulk_create(snapshots, batch_size=5000)
+        PatientMetricMonthlyStat.objects.bulk_create(metric_rows, batch_size=5000)
+
+        event_types = list(AlertEventType.values)
+        event_levels = list(AlertLevel.values)
+        PatientAlert.objects.bulk_create(
+            [
+                PatientAlert(
+                    patient_id=rng.choice(patient_ids),
+                    doctor=doctor,
+                    event_type=rng.choice(event_types),
+                    event_level=rng.choice(event_levels),
+                    event_title="压测预警",
+                    event_time=event_time,
+                    status=AlertStatus.PENDING,
+                )
+                for _ in range(int(options["patients"] * options["alerts_per_patient"]))
+            ],
+            batch_size=5000,
+        )
+        self.stdout.write(
+            f"Seeded {len(patient_ids)} patient(s), {len(metric_rows)} metric row(s) "
+            f"in {time.monotonic() - started_at:.1f}s."
+        )
+
+        timings = {}
+        for scope, scope_id in (
+            (COHORT_SCOPE_DOCTOR, doctor.id),
+            (COHORT_SCOPE_STUDIO, studio.id),
+            (COHORT_SCOPE_SALES, sales.id),
+        ):
+            best = None
+            for _ in range(options["repeat"]):
+                started_at = time.monotonic()
+                result = build_cohort_analytics(scope, scope_id, month)
+                elapsed = (time.monotonic() - started_at) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[scope] = best
+            self.stdout.write(
+                f"{scope}: {result['patient_count']} patient(s), "
+                f"median medication adherence {result['adherence']['medication']['percentiles'][50]}%, "
+                f"{result['alerts']['alert_count']} alert(s) in {best:.0f}ms."
+            )
+        return timings
@@ -0,0 +1,189 @@
+"""Benchmark doctor image-archive page weight before and after report image renditions.
+
+在事务中为一名患者造 --images 张报告图片（共用一张手机尺寸的合成原图），渲染医生端图片档案的
+全部分页，统计 HTML 字节、宫格实际会下载的图片字节与渲染耗时；随后执行衍生图补齐再测一次。
+媒体文件写入临时目录，数据在结束时整体回滚。
+"""
+
+from __future__ import annotations
+
+import html
+import math
+import re
+import statistics
+import time
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.service.load_scenarios import default_load_host
+from health_data.models import ReportImage, ReportUpload, UploaderRole, UploadSource
+from health_data.services.report_renditions import _storage_path_for, backfill_report_image_renditions
+from users import choices
+from users.models import CustomUser, DoctorProfile, PatientProfile
+
+# 医生端宫格的 CSS 宽度（与模板中的 sizes="240px" 一致）与每页上传批次数。
+_TILE_CSS_WIDTH = 240
+_UPLOADS_PER_PAGE = 10
+_PICTURE_RE = re.compile(r"<picture>(.*?)</picture>", re.S)
+_WEBP_SOURCE_RE = re.compile(r'<source type="image/webp" srcset="([^"]+)"')
+_IMG_SRCSET_RE = re.compile(r'<img[^>]*\ssrcset="([^"]+)"')
+_IMG_SRC_RE = re.compile(r'<img[^>]*\ssrc="([^"]+)"')
+
+
+class _Rollback(Exception):
+    """用于在计时完成后回滚造数事务。"""
+
+
+def _phone_photo(width: int, height: int) -> bytes:
+    """生成带噪点的手机尺寸 JPEG，压缩后体积与真实拍摄的报告照片相近。"""
+    noise = Image.effect_noise((width, height), 40)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    buffer = BytesIO()
+    Image.merge("RGB", (gradient, noise, gradient)).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _pick_candidate(srcset: str, target_width: int) -> str:
+    candidates = []
+    for item in srcset.split(","):
+        url, _, descriptor = item.strip().rpartition(" ")
+        candidates.append((int(descriptor.rstrip("w")), url))
+    candidates.sort()
+    for width, url in candidates:
+        if width >= target_width:
+            return url
+    return candidates[-1][1]
+
+
+class Command(BaseCommand):
+    help = "Benchmark doctor image archive page bytes and render time for a patient with many report images."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--images", type=int, default=200, help="Report images for the patient.")
+        parser.add_argument("--per-upload", type=int, default=10, help="Images per upload batch.")
+        parser.add_argument("--width", type=int, default=3024, help="Source photo width.")
+        parser.add_argument("--height", type=int, default=4032, help="Source photo height.")
+        parser.add_argument("--dpr", type=float, default=2.0, help="Device pixel ratio used to pick srcset candidates.")
+        parser.add_argument("--host", default=None, help="Host header; must be in ALLOWED_HOSTS.")
+
+    def handle(self, *args, **options) -> None:
+        if options["images"] <= 0 or options["per_upload"] <= 0:
+            raise CommandError("--images and --per-upload must be positive.")
+        with TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            try:
+                with transaction.atomic():
+                    self._run(options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _run(self, options) -> None:
+        doctor_user = CustomUser.objects.create_user(
+            username="bench_report_images_doctor",
+            user_type=choices.UserType.DOCTOR,
+            phone="19900000043",
+        )
+        doctor = DoctorProfile.objects.create(user=doctor_user, name="压测医生")
+        patient = PatientProfile.objects.create(phone="19800000043", name="压测患者", doctor=doctor)
+
+        photo = _phone_photo(options["width"], options["height"])
+        image_url = default_storage.url(
+            default_storage.save("reports/benchmark/original.jpg", ContentFile(photo))
+        )
+        upload_count = math.ceil(options["images"] / options["per_upload"])
+        remaining = options["images"]
+        for _ in range(upload_count):
+            upload = ReportUpload.objects.create(
+                patient=patient,
+                upload_source=UploadSource.PERSONAL_CENTER,
+                uploader_role=UploaderRole.PATIENT,
+            )
+            batch = min(options["per_upload"], remaining)
+            ReportImage.objects.bulk_create(
+                [ReportImage(upload=upload, image_url=image_url) for _ in range(batch)]
+            )
+            remaining -= batch
+        self.stdout.write(
+            f"Seeded {options['images']} image(s) in {upload_count} upload(s); "
+            f"source photo {len(photo) / 1024 / 1024:.1f} MB."
+        )
+
+        client = Client(HTTP_HOST=options["host"] or default_load_host())
+        client.force_login(doctor_user)
+        pages = math.ceil(upload_count / _UPLOADS_PER_PAGE)
+        target_width = int(_TILE_CSS_WIDTH * options["dpr"])
+
+        before = self._measure(client, patient, pages, target_width)
+        started_at = time.perf_counter()
+        after_id: Optional[int] = 0
+        rendered = 0
+        while after_id is not None:
+            generated, after_id = backfill_report_image_renditions(after_id, 50)
+            rendered += generated
+        rendition_ms = (time.perf_counter() - started_at) * 1000
+        after = self._measure(client, patient, pages, target_width)
+
+        self._write_report("originals", before)
+        self._write_report("renditions", after)
+        self.stdout.write(
+            f"Rendered {rendered} image(s) in {rendition_ms:.0f}ms "
+            f"({rendition_ms / max(rendered, 1):.0f}ms per image)."
+        )
+        if before["image_bytes"]:
+            saved = 1 - after["image_bytes"] / before["image_bytes"]
+            self.stdout.write(self.style.SUCCESS(f"Tile image bytes reduced by {saved:.1%}."))
+
+    def _measure(self, client: Client, patient, pages: int, target_width: int) -> Dict[str, float]:
+        url = reverse("web_doctor:patient_workspace_section", args=[patient.id, "reports"])
+        html_bytes = 0
+        image_bytes = 0
+        tiles = 0
+        durations: List[float] = []
+        sizes: Dict[str, int] = {}
+        for page in range(1, pages + 1):
+            started_at = time.perf_counter()
+            response = client.get(url, {"tab": "images", "images_page": page})
+            durations.append((time.perf_counter() - started_at) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"Image archive page {page} returned {response.status_code}.")
+            content = response.content.decode("utf-8")
+            html_bytes += len(response.content)
+            for block in _PICTURE_RE.findall(content):
+                webp = _WEBP_SOURCE_RE.search(block)
+                srcset = _IMG_SRCSET_RE.search(block)
+                if webp:
+                    chosen = _pick_candidate(html.unescape(webp.group(1)), target_width)
+                elif srcset:
+                    chosen = _pick_candidate(html.unescape(srcset.group(1)), target_width)
+                else:
+                    chosen = html.unescape(_IMG_SRC_RE.search(block).group(1))
+                if chosen not in sizes:
+                    storage_path = _storage_path_for(chosen)
+                    sizes[chosen] = default_storage.size(storage_path) if storage_path else 0
+                image_bytes += sizes[chosen]
+                tiles += 1
+        return {
+            "pages": pages,
+            "tiles": tiles,
+            "html_bytes": html_bytes,
+            "image_bytes": image_bytes,
+            "render_p50_ms": statistics.median(durations),
+            "render_max_ms": max(durations),
+        }
+
+    def _write_report(self, label: str, result: Dict[str, float]) -> None:
+        self.stdout.write(
+            f"{label}: {result['pages']} page(s), {result['tiles']} tile(s), "
+            f"html {result['html_bytes'] / 1024:.0f} KB, "
+            f"tile images {result['image_bytes'] / 1024 / 1024:.1f} MB, "
+            f"render p50 {result['render_p50_ms']:.0f}ms max {result['render_max_ms']:.0f}ms"
+        )
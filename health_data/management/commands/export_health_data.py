@@ -0,0 +1,120 @@
+"""Stream a health data table to CSV, Parquet or Arrow for research and audit.
+
+按主键键集分页导出，内存占用恒定、不持有长事务；CSV 未指定 --output 时写到标准输出。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from health_data.services.cohort_analytics import (
+    COHORT_SCOPE_DOCTOR,
+    COHORT_SCOPE_SALES,
+    COHORT_SCOPE_STUDIO,
+)
+from health_data.services.data_export import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_DATASETS,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    stream_csv,
+    write_columnar,
+)
+
+
+def _parse_date(raw_value: str | None, option: str):
+    if not raw_value:
+        return None
+    try:
+        return datetime.strptime(raw_value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise CommandError(f"Invalid {option}, expected YYYY-MM-DD.") from exc
+
+
+class Command(BaseCommand):
+    help = "Export HealthMetric, checkup, questionnaire or DailyTask rows in constant memory."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("dataset", choices=sorted(EXPORT_DATASETS))
+        parser.add_argument("--format", dest="export_format", choices=EXPORT_FORMATS, default=EXPORT_FORMAT_CSV)
+        parser.add_argument("--output", help="Output file path. CSV defaults to stdout.")
+        parser.add_argument("--patient-ids", help="Comma separated patient IDs.")
+        cohort = parser.add_mutually_exclusive_group()
+        cohort.add_argument("--doctor", type=int, help="Only patients of this DoctorProfile ID.")
+        cohort.add_argument("--studio", type=int, help="Only patients of this DoctorStudio ID.")
+        cohort.add_argument("--sales", type=int, help="Only patients of this SalesProfile ID.")
+        parser.add_argument("--start", help="Start date in YYYY-MM-DD format (inclusive).")
+        parser.add_argument("--end", help="End date in YYYY-MM-DD format (inclusive).")
+        parser.add_argument(
+            "--metric-type",
+            action="append",
+            dest="metric_types",
+            help="Metric type filter for health_metrics; repeat for several types.",
+        )
+        parser.add_argument(
+            "--pseudonymize",
+            action="store_true",
+            help="Replace patient IDs with keyed pseudonyms and drop free-text columns.",
+        )
+        parser.add_argument("--salt", default="", help="Extra salt for pseudonyms.")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options) -> None:
+        export_format = options["export_format"]
+        if export_format != EXPORT_FORMAT_CSV and not options.get("output"):
+            raise CommandError("--output is required for parquet and arrow exports.")
+
+        patient_ids = None
+        if options.get("patient_ids"):
+            try:
+                patient_ids = [int(value) for value in options["patient_ids"].split(",") if value.strip()]
+            except ValueError as exc:
+                raise CommandError("Invalid --patient-ids, expected comma separated integers.") from exc
+
+        scope = scope_id = None
+        for candidate in (COHORT_SCOPE_DOCTOR, COHORT_SCOPE_STUDIO, COHORT_SCOPE_SALES):
+            if options.get(candidate) is not None:
+                scope, scope_id = candidate, options[candidate]
+
+        filters = {
+            "patient_ids": patient_ids,
+            "scope": scope,
+            "scope_id": scope_id,
+            "start_date": _parse_date(options.get("start"), "--start"),
+            "end_date": _parse_date(options.get("end"), "--end"),
+            "metric_types": options.get("metric_types"),
+            "pseudonymize": options["pseudonymize"],
+            "pseudonym_salt": options["salt"],
+            "chunk_size": options["chunk_size"],
+        }
+
+        try:
+            if export_format == EXPORT_FORMAT_CSV:
+                written = self._write_csv(options["dataset"], options.get("output"), filters)
+            else:
+                written = write_columnar(
+                    options["dataset"],
+                    options["output"],
+                    export_format=export_format,
+                    **filters,
+                )
+        except (ValueError, ImproperlyConfigured) as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stderr.write(f"Exported {written} {options['dataset']} row(s).")
+
+    def _write_csv(self, dataset: str, output: str | None, filters: dict) -> int:
+        written = -1  # 表头行不计入
+        if not output:
+            for line in stream_csv(dataset, **filters):
+                self.stdout.write(line, ending="")
+                written += 1
+            return written
+        with open(output, "w", encoding="utf-8", newline="") as handle:
+            for line in stream_csv(dataset, **filters):
+                handle.write(line)
+                written += 1
+        return written
@@ -0,0 +1,60 @@
+"""Refresh patient monthly statistics snapshots.
+
+每天凌晨执行：补齐已结束月份缺失的 PatientMonthlyStat，月初重算上月。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from health_data.services.monthly_stats import (
+    refresh_patient_monthly_stats,
+    resolve_months_to_refresh,
+)
+
+
+class Command(BaseCommand):
+    help = "Fill missing patient monthly stats snapshots for closed months."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--since",
+            dest="since",
+            help="First month to backfill in YYYY-MM format. Defaults to the lookback window.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute existing snapshots instead of only filling missing ones.",
+        )
+        parser.add_argument(
+            "--async",
+            dest="run_async",
+            action="store_true",
+            help="Dispatch one Celery task per month instead of running inline.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        since = None
+        raw_since = options.get("since")
+        if raw_since:
+            try:
+                since = datetime.strptime(raw_since, "%Y-%m").date()
+            except ValueError as exc:
+                raise CommandError("Invalid --since, expected YYYY-MM.") from exc
+
+        for month, recheck in resolve_months_to_refresh(timezone.localdate(), since=since):
+            rebuild = options.get("rebuild") or recheck
+            if options.get("run_async"):
+                from health_data.tasks import refresh_patient_monthly_stats_task
+
+                refresh_patient_monthly_stats_task.delay(month.isoformat(), rebuild=rebuild)
+                self.stdout.write(f"Queued monthly stats refresh for {month:%Y-%m}.")
+                continue
+            written = refresh_patient_monthly_stats(month, rebuild=rebuild)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote {written} monthly stats row(s) for {month:%Y-%m}.")
+            )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_data', '0027_healthmetric_measurement_context'),
+        ('users', '0021_patientprofile_general_monitoring_baselines'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientMonthlyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='自然月第一天。', verbose_name='统计月份')),
+                ('metric_upload_counts', models.JSONField(blank=True, default=dict, help_text='{指标类型: 上传条数}。', verbose_name='指标上传次数')),
+                ('questionnaire_counts', models.JSONField(blank=True, default=dict, help_text='{问卷 ID: 提交次数}，包含已停用问卷。', verbose_name='问卷提交次数')),
+                ('clinical_event_counts', models.JSONField(blank=True, default=dict, help_text='{事件类型: 次数}，按 event_date 统计。', verbose_name='诊疗事件次数')),
+                ('alert_counts', models.JSONField(blank=True, default=dict, help_text='{预警类型: 次数}，按 event_time 统计。', verbose_name='异常预警次数')),
+                ('chat_session_count', models.PositiveIntegerField(default=0, verbose_name='咨询会话数')),
+                ('chat_time_slots', models.JSONField(blank=True, default=dict, help_text='{时段: 会话数}，时段划分同 ChatService。', verbose_name='咨询时段分布')),
+                ('medication_task_total', models.PositiveIntegerField(default=0, verbose_name='用药任务数')),
+                ('medication_task_completed', models.PositiveIntegerField(default=0, verbose_name='用药任务完成数')),
+                ('monitoring_task_total', models.PositiveIntegerField(default=0, verbose_name='监测任务数')),
+                ('monitoring_task_completed', models.PositiveIntegerField(default=0, verbose_name='监测任务完成数')),
+                ('computed_at', models.DateTimeField(auto_now=True, verbose_name='计算时间')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_stats', to='users.patientprofile', verbose_name='患者')),
+            ],
+            options={
+                'verbose_name': '患者月度统计快照',
+                'verbose_name_plural': '患者月度统计快照',
+                'db_table': 'health_patient_monthly_stats',
+                'indexes': [models.Index(fields=['month'], name='idx_monthly_stat_month')],
+                'constraints': [models.UniqueConstraint(fields=('patient', 'month'), name='uniq_patient_monthly_stat')],
+            },
+        ),
+    ]
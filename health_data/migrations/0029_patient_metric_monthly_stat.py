@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_data', '0028_patient_monthly_stat'),
+        ('users', '0021_patientprofile_general_monitoring_baselines'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientMetricMonthlyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='自然月第一天。', verbose_name='统计月份')),
+                ('metric_type', models.CharField(max_length=50, verbose_name='指标类型')),
+                ('reading_count', models.PositiveIntegerField(default=0, verbose_name='有效读数条数')),
+                ('value_avg', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='主数值均值')),
+                ('value_min', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='主数值最小值')),
+                ('value_max', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='主数值最大值')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_monthly_stats', to='users.patientprofile', verbose_name='患者')),
+            ],
+            options={
+                'verbose_name': '患者月度指标汇总',
+                'verbose_name_plural': '患者月度指标汇总',
+                'db_table': 'health_patient_metric_monthly_stats',
+                'indexes': [models.Index(fields=['month', 'metric_type'], name='idx_metric_monthly_type')],
+                'constraints': [models.UniqueConstraint(fields=('patient', 'month', 'metric_type'), name='uniq_patient_metric_monthly_stat')],
+            },
+        ),
+    ]
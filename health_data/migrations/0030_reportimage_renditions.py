@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_data', '0029_patient_metric_monthly_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportimage',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='缩略图/中图/WebP 等衍生版本的访问地址，键为版本名；为空表示尚未生成。', verbose_name='衍生图片'),
+        ),
+    ]
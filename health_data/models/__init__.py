@@ -15,7 +15,15 @@ from .questionnaire_submission import QuestionnaireSubmission
 from .questionnaire_answer import QuestionnaireAnswer
 from .medical_history import MedicalHistory
 from .clinical_event import ClinicalEvent
-from .report_upload import AIParseStatus, ReportUpload, ReportImage, UploadSource, UploaderRole
+from .patient_monthly_stat import PatientMetricMonthlyStat, PatientMonthlyStat
+from .report_upload import (
+    REPORT_IMAGE_RENDITION_WIDTHS,
+    AIParseStatus,
+    ReportUpload,
+    ReportImage,
+    UploadSource,
+    UploaderRole,
+)
 
 __all__ = [
     "HealthMetric",
@@ -31,8 +39,11 @@ __all__ = [
     "QuestionnaireSubmission",
     "QuestionnaireAnswer",
     "ClinicalEvent",
+    "PatientMetricMonthlyStat",
+    "PatientMonthlyStat",
     "ReportUpload",
     "ReportImage",
+    "REPORT_IMAGE_RENDITION_WIDTHS",
     "AIParseStatus",
     "UploadSource",
     "UploaderRole",
@@ -0,0 +1,99 @@
+from django.db import models
+
+
+class PatientMonthlyStat(models.Model):
+    """患者按自然月的管理统计快照（仅已结束月份）。"""
+
+    patient = models.ForeignKey(
+        "users.PatientProfile",
+        on_delete=models.CASCADE,
+        related_name="monthly_stats",
+        verbose_name="患者",
+    )
+    month = models.DateField("统计月份", help_text="自然月第一天。")
+    metric_upload_counts = models.JSONField(
+        "指标上传次数",
+        default=dict,
+        blank=True,
+        help_text="{指标类型: 上传条数}。",
+    )
+    questionnaire_counts = models.JSONField(
+        "问卷提交次数",
+        default=dict,
+        blank=True,
+        help_text="{问卷 ID: 提交次数}，包含已停用问卷。",
+    )
+    clinical_event_counts = models.JSONField(
+        "诊疗事件次数",
+        default=dict,
+        blank=True,
+        help_text="{事件类型: 次数}，按 event_date 统计。",
+    )
+    alert_counts = models.JSONField(
+        "异常预警次数",
+        default=dict,
+        blank=True,
+        help_text="{预警类型: 次数}，按 event_time 统计。",
+    )
+    chat_session_count = models.PositiveIntegerField("咨询会话数", default=0)
+    chat_time_slots = models.JSONField(
+        "咨询时段分布",
+        default=dict,
+        blank=True,
+        help_text="{时段: 会话数}，时段划分同 ChatService。",
+    )
+    medication_task_total = models.PositiveIntegerField("用药任务数", default=0)
+    medication_task_completed = models.PositiveIntegerField("用药任务完成数", default=0)
+    monitoring_task_total = models.PositiveIntegerField("监测任务数", default=0)
+    monitoring_task_completed = models.PositiveIntegerField("监测任务完成数", default=0)
+    computed_at = models.DateTimeField("计算时间", auto_now=True)
+
+    class Meta:
+        db_table = "health_patient_monthly_stats"
+        verbose_name = "患者月度统计快照"
+        verbose_name_plural = "患者月度统计快照"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["patient", "month"], name="uniq_patient_monthly_stat"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["month"], name="idx_monthly_stat_month"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.patient_id} - {self.month:%Y-%m}"
+
+
+class PatientMetricMonthlyStat(models.Model):
+    """患者按自然月、按指标类型的数值汇总快照（仅已结束月份），供人群分布统计。"""
+
+    patient = models.ForeignKey(
+        "users.PatientProfile",
+        on_delete=models.CASCADE,
+        related_name="metric_monthly_stats",
+        verbose_name="患者",
+    )
+    month = models.DateField("统计月份", help_text="自然月第一天。")
+    metric_type = models.CharField("指标类型", max_length=50)
+    reading_count = models.PositiveIntegerField("有效读数条数", default=0)
+    value_avg = models.DecimalField("主数值均值", max_digits=10, decimal_places=2)
+    value_min = models.DecimalField("主数值最小值", max_digits=10, decimal_places=2)
+    value_max = models.DecimalField("主数值最大值", max_digits=10, decimal_places=2)
+
+    class Meta:
+        db_table = "health_patient_metric_monthly_stats"
+        verbose_name = "患者月度指标汇总"
+        verbose_name_plural = "患者月度指标汇总"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["patient", "month", "metric_type"],
+                name="uniq_patient_metric_monthly_stat",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["month", "metric_type"], name="idx_metric_monthly_type"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.patient_id} - {self.month:%Y-%m} - {self.metric_type}"
@@ -29,6 +29,10 @@ class AIParseStatus(models.TextChoices):
     FAILED = "FAILED", "解析失败"
 
 
+# 报告图片衍生版本的目标宽度（像素）；每个宽度同时生成 JPEG 与 WebP（键名加 _webp 后缀）。
+REPORT_IMAGE_RENDITION_WIDTHS = {"thumb": 480, "medium": 1280}
+
+
 class ReportUpload(models.Model):
     """报告上传批次：一次上传动作，对应多张图片，供图片档案分组展示。"""
 
@@ -232,6 +236,12 @@ class ReportImage(models.Model):
         blank=True,
         help_text="最后一次人工修订保存时间。",
     )
+    renditions = models.JSONField(
+        "衍生图片",
+        default=dict,
+        blank=True,
+        help_text="缩略图/中图/WebP 等衍生版本的访问地址，键为版本名；为空表示尚未生成。",
+    )
 
     class Meta:
         db_table = "health_report_images"
@@ -249,6 +259,35 @@ class ReportImage(models.Model):
     def __str__(self) -> str:  # pragma: no cover - 后台展示
         return f"{self.upload_id} - {self.image_url}"
 
+    @staticmethod
+    def thumbnail_url_for(image_url: str, renditions: dict | None) -> str:
+        """供 values() 查询结果使用的缩略图地址解析。"""
+        return (renditions or {}).get("thumb") or image_url
+
+    @property
+    def thumbnail_url(self) -> str:
+        """列表/宫格展示用的缩略图地址；未生成衍生版本时回退原图。"""
+        return self.thumbnail_url_for(self.image_url, self.renditions)
+
+    def _rendition_srcset(self, suffix: str = "") -> str:
+        renditions = self.renditions or {}
+        candidates = [
+            f"{renditions[name + suffix]} {width}w"
+            for name, width in REPORT_IMAGE_RENDITION_WIDTHS.items()
+            if renditions.get(name + suffix)
+        ]
+        return ", ".join(candidates)
+
+    @property
+    def srcset(self) -> str:
+        """JPEG 衍生版本的 srcset；未生成时为空字符串。"""
+        return self._rendition_srcset()
+
+    @property
+    def webp_srcset(self) -> str:
+        """WebP 衍生版本的 srcset；未生成时为空字符串。"""
+        return self._rendition_srcset("_webp")
+
     def get_effective_structured_json(self) -> dict[str, Any] | None:
         if isinstance(self.reviewed_structured_json, dict):
             return self.reviewed_structured_json
@@ -0,0 +1,254 @@
+"""报告归档后台任务：复查指标/任务联动与 AI 结构化结果同步。
+
+归档请求只负责提交图片归档状态；以下副作用在事务提交后交给 Celery：
+
+- 复查图片按 (患者, 报告日期, 复查项目) 生成 HealthMetric，并完成匹配的复查任务；
+- 已有 AI 结构化结果的图片重新同步检查结果。
+
+两类处理都可重复执行：已关联指标的图片会被跳过，结构化结果同步为整体重建。
+任务进度写入 Django cache，供医生端状态接口轮询。
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from health_data.models import HealthMetric, MetricSource, MetricType, ReportImage
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_JOB_CACHE_KEY = "health_data:archive_job:{job_id}"
+ARCHIVE_JOB_TTL_SECONDS = 60 * 60 * 24
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCESS = "success"
+JOB_STATUS_FAILED = "failed"
+
+
+def new_archive_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _save_job_state(job_id: str, state: dict) -> None:
+    try:
+        cache.set(
+            ARCHIVE_JOB_CACHE_KEY.format(job_id=job_id),
+            state,
+            ARCHIVE_JOB_TTL_SECONDS,
+        )
+    except Exception:  # pragma: no cover - 进度仅用于展示，Redis 故障不影响归档
+        logger.warning("archive job state write failed job_id=%s", job_id, exc_info=True)
+
+
+def get_archive_job_status(job_id: str) -> Optional[dict]:
+    """
+    【功能说明】
+    - 返回归档后台任务进度；任务不存在或已过期时返回 None。
+
+    【返回值说明】
+    - dict：status（pending/running/success/failed）、total、done、failed_image_ids，
+      以及投递时记录的 patient_id / doctor_id（供状态接口校验归属）。
+    """
+    if not job_id:
+        return None
+    return cache.get(ARCHIVE_JOB_CACHE_KEY.format(job_id=job_id))
+
+
+def _resolve_measured_at(report_date: date) -> datetime:
+    measured_at = datetime.combine(report_date, time.min)
+    if settings.USE_TZ:
+        measured_at = timezone.make_aware(measured_at, timezone.get_current_timezone())
+    return measured_at
+
+
+def apply_checkup_archive_side_effects(image_ids: Iterable[int]) -> int:
+    """
+    【功能说明】
+    - 为已归档、尚未关联指标的复查图片生成 HealthMetric，并完成匹配的复查任务。
+    - 同一 (患者, 报告日期, 复查项目) 的图片共用一条指标记录。
+
+    【幂等说明】
+    - 图片行加锁后只处理 health_metric 为空的记录，重复执行或任务重试不会重复建指标。
+
+    【返回值说明】
+    - int：本次新建的指标数量。
+    """
+    from core.models import DailyTask
+    from core.models.choices import PlanItemCategory, TaskStatus
+    from core.service.tasks import invalidate_adherence_cache
+
+    image_ids = list(image_ids)
+    if not image_ids:
+        return 0
+
+    created = 0
+    with transaction.atomic():
+        images = list(
+            ReportImage.objects.select_for_update()
+            .select_related("upload")
+            .filter(
+                id__in=image_ids,
+                record_type=ReportImage.RecordType.CHECKUP,
+                checkup_item__isnull=False,
+                report_date__isnull=False,
+                archived_at__isnull=False,
+                health_metric__isnull=True,
+            )
+            .order_by("id")
+        )
+        groups: Dict[tuple[int, date, int], List[ReportImage]] = {}
+        for image in images:
+            group_key = (image.upload.patient_id, image.report_date, image.checkup_item_id)
+            groups.setdefault(group_key, []).append(image)
+
+        now = timezone.now()
+        for (patient_id, report_date, checkup_item_id), grouped_images in groups.items():
+            metric = HealthMetric.objects.create(
+                patient_id=patient_id,
+                metric_type=MetricType.CHECKUP,
+                source=MetricSource.MANUAL,
+                measured_at=_resolve_measured_at(report_date),
+            )
+            created += 1
+            ReportImage.objects.filter(
+                id__in=[image.id for image in grouped_images]
+            ).update(health_metric=metric)
+
+            window_start = report_date - timedelta(days=6)
+            task = (
+                DailyTask.objects.filter(
+                    patient_id=patient_id,
+                    task_type=PlanItemCategory.CHECKUP,
+                    task_date__range=(window_start, report_date),
+                    status__in=[TaskStatus.PENDING, TaskStatus.NOT_STARTED],
+                )
+                .filter(
+                    Q(plan_item__template_id=checkup_item_id)
+                    | Q(interaction_payload__checkup_id=checkup_item_id)
+                )
+                .order_by("-task_date", "-id")
+                .first()
+            )
+            if task:
+                payload = task.interaction_payload or {}
+                payload["health_metric_id"] = metric.id
+                task.status = TaskStatus.COMPLETED
+                task.completed_at = now
+                task.interaction_payload = payload
+                task.save(update_fields=["status", "completed_at", "interaction_payload"])
+                metric.task_id = task.id
+                metric.save(update_fields=["task_id"])
+                transaction.on_commit(
+                    lambda patient_id=patient_id: invalidate_adherence_cache(patient_id)
+                )
+    return created
+
+
+def run_archive_job(
+    job_id: str,
+    checkup_image_ids: Iterable[int],
+    sync_image_ids: Iterable[int],
+) -> dict:
+    """
+    【功能说明】
+    - 执行一次归档后台任务：先处理复查指标/任务联动，再逐张同步 AI 结构化结果。
+    - 每完成一步更新一次进度；单张图片同步失败不影响其它图片。
+    """
+    from health_data.services.checkup_results import sync_lab_results_from_ai_json
+
+    checkup_image_ids = sorted(set(checkup_image_ids))
+    sync_image_ids = sorted(set(sync_image_ids))
+    previous = get_archive_job_status(job_id) or {}
+    state = {
+        "patient_id": previous.get("patient_id"),
+        "doctor_id": previous.get("doctor_id"),
+        "status": JOB_STATUS_RUNNING,
+        "total": (1 if checkup_image_ids else 0) + len(sync_image_ids),
+        "done": 0,
+        "failed_image_ids": [],
+    }
+    _save_job_state(job_id, state)
+
+    try:
+        if checkup_image_ids:
+            apply_checkup_archive_side_effects(checkup_image_ids)
+            state["done"] += 1
+            _save_job_state(job_id, state)
+
+        images = ReportImage.objects.select_related("upload", "checkup_item").filter(
+            id__in=sync_image_ids
+        )
+        for image in images:
+            try:
+                sync_lab_results_from_ai_json(image)
+            except Exception:
+                logger.exception("report_image sync after archive failed image_id=%s", image.id)
+                state["failed_image_ids"].append(image.id)
+            state["done"] += 1
+            _save_job_state(job_id, state)
+    except Exception:
+        state["status"] = JOB_STATUS_FAILED
+        _save_job_state(job_id, state)
+        raise
+
+    state["status"] = JOB_STATUS_FAILED if state["failed_image_ids"] else JOB_STATUS_SUCCESS
+    _save_job_state(job_id, state)
+    return state
+
+
+def enqueue_archive_job(
+    job_id: str,
+    *,
+    checkup_image_ids: Iterable[int] = (),
+    sync_image_ids: Iterable[int] = (),
+    patient_id: Optional[int] = None,
+    doctor_id: Optional[int] = None,
+) -> None:
+    """
+    【功能说明】
+    - 记录任务初始进度，并在当前事务提交后投递 Celery 任务。
+    - 投递失败（如 broker 不可用）时在当前进程内同步执行，保证副作用不丢失。
+
+    【参数说明】
+    - patient_id / doctor_id: 任务归属的患者与发起归档的医生，写入进度供状态接口校验。
+    """
+    checkup_image_ids = sorted(set(checkup_image_ids))
+    sync_image_ids = sorted(set(sync_image_ids))
+    if not checkup_image_ids and not sync_image_ids:
+        return
+
+    _save_job_state(
+        job_id,
+        {
+            "patient_id": patient_id,
+            "doctor_id": doctor_id,
+            "status": JOB_STATUS_PENDING,
+            "total": (1 if checkup_image_ids else 0) + len(sync_image_ids),
+            "done": 0,
+            "failed_image_ids": [],
+        },
+    )
+
+    def _dispatch() -> None:
+        from health_data.tasks import process_archive_job_task
+
+        try:
+            process_archive_job_task.delay(job_id, checkup_image_ids, sync_image_ids)
+        except Exception:
+            logger.warning("archive job enqueue failed, running inline job_id=%s", job_id, exc_info=True)
+            try:
+                run_archive_job(job_id, checkup_image_ids, sync_image_ids)
+            except Exception:
+                logger.exception("archive job inline run failed job_id=%s", job_id)
+
+    transaction.on_commit(_dispatch)
@@ -0,0 +1,269 @@
+"""人群（医生 / 工作室 / 销售名下患者）月度统计。
+
+面向工作室负责人等管理角色，一次查看整个名下患者群体的依从率分布、异常预警
+构成与指标数值分布，而不必逐个打开患者。
+
+统计全部在数据库中分组完成，Python 侧只处理固定数量的分桶行，不随患者数增长：
+
+- 依从率：基于 `PatientMonthlyStat` 的任务数/完成数，按整数百分比分桶计数，
+  百分位数由分桶直方图推出（精度 1%）；
+- 指标分布：基于 `PatientMetricMonthlyStat`，以每名患者当月主数值均值按
+  COHORT_METRIC_BINS 分桶；
+- 异常预警：直接按 PatientAlert 的类型与级别分组（预警量远小于指标量）。
+
+依从率与指标分布只覆盖已生成快照的已结束月份（见 monthly_stats），
+结果中的 snapshot_patient_count 可用于判断覆盖情况。
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Floor
+
+from health_data.models import MetricType, PatientMetricMonthlyStat, PatientMonthlyStat
+from health_data.services.monthly_stats import _datetime_range, month_start, next_month_start
+
+COHORT_SCOPE_DOCTOR = "doctor"
+COHORT_SCOPE_STUDIO = "studio"
+COHORT_SCOPE_SALES = "sales"
+
+# 人群范围 -> PatientProfile 上的过滤字段。
+_COHORT_SCOPE_FIELDS = {
+    COHORT_SCOPE_DOCTOR: "doctor_id",
+    COHORT_SCOPE_STUDIO: "doctor__studio_id",
+    COHORT_SCOPE_SALES: "sales_id",
+}
+
+COHORT_ADHERENCE_PERCENTILES = (10, 25, 50, 75, 90)
+
+# 指标分布分桶：(下界, 上界, 桶宽)；低于下界 / 不低于上界的归入首尾开放桶。
+COHORT_METRIC_BINS: Dict[str, Tuple[Decimal, Decimal, Decimal]] = {
+    MetricType.BLOOD_PRESSURE: (Decimal("90"), Decimal("180"), Decimal("10")),
+    MetricType.BLOOD_OXYGEN: (Decimal("88"), Decimal("100"), Decimal("1")),
+    MetricType.HEART_RATE: (Decimal("50"), Decimal("120"), Decimal("10")),
+    MetricType.STEPS: (Decimal("0"), Decimal("12000"), Decimal("2000")),
+    MetricType.WEIGHT: (Decimal("35"), Decimal("100"), Decimal("5")),
+    MetricType.BODY_TEMPERATURE: (Decimal("36"), Decimal("38.5"), Decimal("0.5")),
+    MetricType.BLOOD_GLUCOSE: (Decimal("4"), Decimal("14"), Decimal("1")),
+}
+
+_ADHERENCE_FIELDS = {
+    "medication": ("medication_task_total", "medication_task_completed"),
+    "monitoring": ("monitoring_task_total", "monitoring_task_completed"),
+}
+
+
+def build_cohort_filter(scope: str, scope_id: int, prefix: str = "") -> Q:
+    try:
+        field_name = _COHORT_SCOPE_FIELDS[scope]
+    except KeyError as exc:
+        raise ValueError(f"不支持的人群范围: {scope}") from exc
+    return Q(**{f"{prefix}{field_name}": scope_id})
+
+
+def _percentiles_from_histogram(
+    histogram: Dict[int, int], percentiles: Iterable[int]
+) -> Dict[int, Optional[int]]:
+    """按最近秩法从 {取值: 人数} 直方图计算百分位数。"""
+    total = sum(histogram.values())
+    result: Dict[int, Optional[int]] = {}
+    ordered = sorted(histogram.items())
+    for percentile in percentiles:
+        if not total:
+            result[percentile] = None
+            continue
+        rank = max(1, math.ceil(percentile / 100 * total))
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            if seen >= rank:
+                result[percentile] = value
+                break
+    return result
+
+
+def _build_adherence_distribution(snapshots, total_field: str, completed_field: str) -> dict:
+    rows = (
+        snapshots.filter(**{f"{total_field}__gt": 0})
+        .annotate(
+            rate_percent=Floor(
+                ExpressionWrapper(
+                    F(completed_field) * 100 / F(total_field),
+                    output_field=IntegerField(),
+                )
+            )
+        )
+        .values("rate_percent")
+        .annotate(patients=Count("id"))
+        .order_by()
+    )
+    histogram: Dict[int, int] = {}
+    for row in rows:
+        rate = min(max(int(row["rate_percent"]), 0), 100)
+        histogram[rate] = histogram.get(rate, 0) + row["patients"]
+    patient_count = sum(histogram.values())
+    mean = (
+        round(sum(rate * count for rate, count in histogram.items()) / patient_count, 1)
+        if patient_count
+        else None
+    )
+    return {
+        "patient_count": patient_count,
+        "mean_percent": mean,
+        "percentiles": _percentiles_from_histogram(histogram, COHORT_ADHERENCE_PERCENTILES),
+        "histogram": histogram,
+    }
+
+
+def _bin_labels(low: Decimal, high: Decimal, width: Decimal) -> List[str]:
+    labels = [f"<{low.normalize():f}"]
+    cursor = low
+    while cursor < high:
+        labels.append(f"{cursor.normalize():f}-{(cursor + width).normalize():f}")
+        cursor += width
+    labels.append(f">={high.normalize():f}")
+    return labels
+
+
+def _build_metric_histograms(
+    scope_filter: Q, month: date, metric_types: Iterable[str]
+) -> Dict[str, dict]:
+    metric_types = [metric_type for metric_type in metric_types if metric_type in COHORT_METRIC_BINS]
+    if not metric_types:
+        return {}
+    histograms: Dict[str, dict] = {}
+    for metric_type in metric_types:
+        labels = _bin_labels(*COHORT_METRIC_BINS[metric_type])
+        histograms[metric_type] = {"labels": labels, "counts": [0] * len(labels), "patient_count": 0}
+
+    # 各指标分桶参数不同，用 CASE 在同一次分组查询中完成全部指标的分桶。
+    decimal_field = DecimalField(max_digits=12, decimal_places=2)
+    low = Case(
+        *[When(metric_type=key, then=Value(COHORT_METRIC_BINS[key][0])) for key in metric_types],
+        output_field=decimal_field,
+    )
+    width = Case(
+        *[When(metric_type=key, then=Value(COHORT_METRIC_BINS[key][2])) for key in metric_types],
+        output_field=decimal_field,
+    )
+    rows = (
+        PatientMetricMonthlyStat.objects.filter(
+            scope_filter, month=month, metric_type__in=metric_types
+        )
+        .annotate(
+            bucket=Floor(ExpressionWrapper((F("value_avg") - low) / width, output_field=decimal_field))
+        )
+        .values("metric_type", "bucket")
+        .annotate(patients=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        histogram = histograms[row["metric_type"]]
+        # 下标 0 为开放下界桶，最后一个为开放上界桶。
+        index = min(max(int(row["bucket"]) + 1, 0), len(histogram["counts"]) - 1)
+        histogram["counts"][index] += row["patients"]
+        histogram["patient_count"] += row["patients"]
+    return histograms
+
+
+def _build_alert_breakdown(scope_filter: Q, month: date) -> dict:
+    from patient_alerts.models import PatientAlert
+
+    start_dt, end_dt = _datetime_range(month, next_month_start(month) - timedelta(days=1))
+    alerts = PatientAlert.objects.filter(
+        scope_filter,
+        event_time__gte=start_dt,
+        event_time__lte=end_dt,
+    )
+    rows = (
+        alerts.values("event_type", "event_level")
+        .annotate(alerts=Count("id"), patients=Count("patient_id", distinct=True))
+        .order_by("event_type", "event_level")
+    )
+    by_type_level = [
+        {
+            "event_type": row["event_type"],
+            "event_level": row["event_level"],
+            "alert_count": row["alerts"],
+            "patient_count": row["patients"],
+        }
+        for row in rows
+    ]
+    return {
+        "alert_count": sum(row["alert_count"] for row in by_type_level),
+        "patient_count": alerts.values("patient_id").distinct().count(),
+        "by_type_level": by_type_level,
+    }
+
+
+def build_cohort_analytics(
+    scope: str,
+    scope_id: int,
+    month: date,
+    *,
+    metric_types: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    【功能说明】
+    - 统计医生 / 工作室 / 销售名下在管患者在指定已结束自然月的人群分布：
+      依从率百分位与直方图、异常预警按类型与级别的构成、指标均值分布直方图。
+    - 每项统计为一次数据库分组查询，查询数与患者数无关。
+
+    【参数说明】
+    - scope: str，COHORT_SCOPE_DOCTOR / COHORT_SCOPE_STUDIO / COHORT_SCOPE_SALES。
+    - scope_id: int，对应的 DoctorProfile / DoctorStudio / SalesProfile ID。
+    - month: date，目标月份内任意一天。
+    - metric_types: Iterable[str] | None，需要分布的指标类型，默认 COHORT_METRIC_BINS 全部。
+
+    【返回值说明】
+    - dict：
+      - patient_count: 名下在管患者数；snapshot_patient_count: 当月已有快照的患者数；
+      - adherence: {"medication"|"monitoring": {patient_count, mean_percent,
+        percentiles: {10: int, ...}, histogram: {rate_percent: 人数}}}，
+        仅统计当月有该类任务的患者；
+      - alerts: {alert_count, patient_count, by_type_level: [...]}；
+      - metric_histograms: {metric_type: {labels, counts, patient_count}}。
+
+    【异常说明】
+    - scope 不受支持时抛出 ValueError。
+    """
+    from users.models import PatientProfile
+
+    month = month_start(month)
+    patient_filter = build_cohort_filter(scope, scope_id)
+    related_filter = build_cohort_filter(scope, scope_id, prefix="patient__")
+    related_filter &= Q(patient__is_active=True)
+
+    snapshots = PatientMonthlyStat.objects.filter(related_filter, month=month)
+    return {
+        "scope": scope,
+        "scope_id": scope_id,
+        "month": month,
+        "patient_count": PatientProfile.objects.filter(patient_filter, is_active=True).count(),
+        "snapshot_patient_count": snapshots.count(),
+        "adherence": {
+            key: _build_adherence_distribution(snapshots, total_field, completed_field)
+            for key, (total_field, completed_field) in _ADHERENCE_FIELDS.items()
+        },
+        "alerts": _build_alert_breakdown(related_filter, month),
+        "metric_histograms": _build_metric_histograms(
+            related_filter,
+            month,
+            COHORT_METRIC_BINS.keys() if metric_types is None else metric_types,
+        ),
+    }
@@ -0,0 +1,397 @@
+"""科研 / 审计用的健康数据批量导出（CSV 流式输出与 Parquet / Arrow 列式文件）。
+
+导出按主键键集分页（`pk > 上一页最大主键`，每页 chunk_size 行）逐页读取：
+
+- 每页是一条走主键索引的短查询，不持有长事务或长游标，不阻塞线上写入；
+- 任意时刻内存中只有一页数据，导出数百万行时内存占用恒定；
+- 页与页之间不是同一快照，导出期间新写入的数据可能出现在末尾页。
+
+筛选条件：患者 ID 或医生 / 工作室 / 销售人群、日期区间、指标类型（仅体征指标）。
+pseudonymize=True 时以 HMAC-SHA256 派生的假名替换患者 ID，并去除自由文本列。
+Parquet / Arrow 依赖可选的 pyarrow，未安装时抛出 ImproperlyConfigured。
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import hmac
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils import timezone
+
+from health_data.services.cohort_analytics import build_cohort_filter
+from health_data.services.monthly_stats import _datetime_range
+
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMAT_ARROW = "arrow"
+EXPORT_FORMATS = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_ARROW)
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """导出列：表头、ORM 取值路径、列类型（int/str/decimal/date/datetime）、是否为自由文本。"""
+
+    name: str
+    path: str
+    kind: str = "str"
+    sensitive: bool = False
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """可导出的数据集定义；columns 第一列必须是主键 id（键集分页依赖）。"""
+
+    label: str
+    model_path: str
+    patient_path: str
+    date_path: str
+    date_kind: str
+    columns: Tuple[ExportColumn, ...]
+    metric_type_path: Optional[str] = None
+
+    def get_queryset(self):
+        from django.apps import apps
+
+        return apps.get_model(self.model_path)._default_manager.all()
+
+
+EXPORT_DATASETS: Dict[str, ExportDataset] = {
+    "health_metrics": ExportDataset(
+        label="体征指标",
+        model_path="health_data.HealthMetric",
+        patient_path="patient",
+        date_path="measured_at",
+        date_kind="datetime",
+        metric_type_path="metric_type",
+        columns=(
+            ExportColumn("id", "id", "int"),
+            ExportColumn("patient_id", "patient_id", "int"),
+            ExportColumn("metric_type", "metric_type"),
+            ExportColumn("source", "source"),
+            ExportColumn("value_main", "value_main", "decimal"),
+            ExportColumn("value_sub", "value_sub", "decimal"),
+            ExportColumn("measurement_context", "measurement_context"),
+            ExportColumn("measured_at", "measured_at", "datetime"),
+            ExportColumn("task_id", "task_id", "int"),
+            ExportColumn("created_at", "created_at", "datetime"),
+        ),
+    ),
+    "checkup_results": ExportDataset(
+        label="结构化复查结果",
+        model_path="health_data.CheckupResultValue",
+        patient_path="patient",
+        date_path="report_date",
+        date_kind="date",
+        columns=(
+            ExportColumn("id", "id", "int"),
+            ExportColumn("patient_id", "patient_id", "int"),
+            ExportColumn("report_date", "report_date", "date"),
+            ExportColumn("checkup_item_code", "checkup_item__code"),
+            ExportColumn("standard_field_code", "standard_field__local_code"),
+            ExportColumn("normalized_name", "normalized_name"),
+            ExportColumn("value_numeric", "value_numeric", "decimal"),
+            ExportColumn("value_text", "value_text", sensitive=True),
+            ExportColumn("unit", "unit"),
+            ExportColumn("lower_bound", "lower_bound", "decimal"),
+            ExportColumn("upper_bound", "upper_bound", "decimal"),
+            ExportColumn("abnormal_flag", "abnormal_flag"),
+            ExportColumn("source_type", "source_type"),
+        ),
+    ),
+    "questionnaire_submissions": ExportDataset(
+        label="问卷提交记录",
+        model_path="health_data.QuestionnaireSubmission",
+        patient_path="patient",
+        date_path="created_at",
+        date_kind="datetime",
+        columns=(
+            ExportColumn("id", "id", "int"),
+            ExportColumn("patient_id", "patient_id", "int"),
+            ExportColumn("questionnaire_code", "questionnaire__code"),
+            ExportColumn("total_score", "total_score", "decimal"),
+            ExportColumn("task_id", "task_id", "int"),
+            ExportColumn("created_at", "created_at", "datetime"),
+        ),
+    ),
+    "questionnaire_answers": ExportDataset(
+        label="问卷回答明细",
+        model_path="health_data.QuestionnaireAnswer",
+        patient_path="submission__patient",
+        date_path="submission__created_at",
+        date_kind="datetime",
+        columns=(
+            ExportColumn("id", "id", "int"),
+            ExportColumn("submission_id", "submission_id", "int"),
+            ExportColumn("patient_id", "submission__patient_id", "int"),
+            ExportColumn("questionnaire_code", "submission__questionnaire__code"),
+            ExportColumn("question_id", "question_id", "int"),
+            ExportColumn("option_id", "option_id", "int"),
+            ExportColumn("option_score", "option__score", "decimal"),
+            ExportColumn("value_text", "value_text", sensitive=True),
+            ExportColumn("submitted_at", "submission__created_at", "datetime"),
+        ),
+    ),
+    "daily_tasks": ExportDataset(
+        label="每日任务",
+        model_path="core.DailyTask",
+        patient_path="patient",
+        date_path="task_date",
+        date_kind="date",
+        columns=(
+            ExportColumn("id", "id", "int"),
+            ExportColumn("patient_id", "patient_id", "int"),
+            ExportColumn("plan_item_id", "plan_item_id", "int"),
+            ExportColumn("task_date", "task_date", "date"),
+            ExportColumn("task_type", "task_type", "int"),
+            ExportColumn("title", "title"),
+            ExportColumn("status", "status", "int"),
+            ExportColumn("completed_at", "completed_at", "datetime"),
+        ),
+    ),
+}
+
+
+def get_export_dataset(name: str) -> ExportDataset:
+    try:
+        return EXPORT_DATASETS[name]
+    except KeyError as exc:
+        raise ValueError(f"不支持的导出数据集: {name}") from exc
+
+
+def pseudonymize_patient_id(patient_id: Optional[int], salt: str = "") -> str:
+    """同一密钥与 salt 下同一患者得到稳定假名，便于跨表关联但无法反推。"""
+    if patient_id is None:
+        return ""
+    key = f"{settings.SECRET_KEY}:{salt}".encode()
+    return hmac.new(key, str(patient_id).encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def get_export_columns(dataset: ExportDataset, *, pseudonymize: bool = False) -> List[ExportColumn]:
+    if not pseudonymize:
+        return list(dataset.columns)
+    columns = []
+    for column in dataset.columns:
+        if column.sensitive:
+            continue
+        if column.name == "patient_id":
+            column = ExportColumn("patient_pseudonym", column.path)
+        columns.append(column)
+    return columns
+
+
+def _build_export_queryset(
+    dataset: ExportDataset,
+    *,
+    patient_ids: Optional[Iterable[int]],
+    scope: Optional[str],
+    scope_id: Optional[int],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    metric_types: Optional[Sequence[str]],
+):
+    queryset = dataset.get_queryset()
+    if patient_ids is not None:
+        queryset = queryset.filter(**{f"{dataset.patient_path}_id__in": list(patient_ids)})
+    if scope:
+        queryset = queryset.filter(build_cohort_filter(scope, scope_id, prefix=f"{dataset.patient_path}__"))
+    if start_date or end_date:
+        date_filter = Q()
+        if dataset.date_kind == "datetime":
+            if start_date:
+                date_filter &= Q(**{f"{dataset.date_path}__gte": _datetime_range(start_date, start_date)[0]})
+            if end_date:
+                date_filter &= Q(**{f"{dataset.date_path}__lte": _datetime_range(end_date, end_date)[1]})
+        else:
+            if start_date:
+                date_filter &= Q(**{f"{dataset.date_path}__gte": start_date})
+            if end_date:
+                date_filter &= Q(**{f"{dataset.date_path}__lte": end_date})
+        queryset = queryset.filter(date_filter)
+    if metric_types:
+        if not dataset.metric_type_path:
+            raise ValueError(f"{dataset.label}不支持按指标类型筛选")
+        queryset = queryset.filter(**{f"{dataset.metric_type_path}__in": list(metric_types)})
+    return queryset.order_by("pk")
+
+
+def iter_export_batches(
+    dataset_name: str,
+    *,
+    patient_ids: Optional[Iterable[int]] = None,
+    scope: Optional[str] = None,
+    scope_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    metric_types: Optional[Sequence[str]] = None,
+    pseudonymize: bool = False,
+    pseudonym_salt: str = "",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[List[tuple]]:
+    """
+    【功能说明】
+    - 按主键键集分页逐页产出导出行，每页一条短查询，内存中最多一页数据。
+    - 行内列顺序与 get_export_columns(dataset, pseudonymize=...) 一致。
+
+    【参数说明】
+    - dataset_name: str，EXPORT_DATASETS 中的数据集名称。
+    - patient_ids: Iterable[int] | None，限定患者。
+    - scope / scope_id: 医生 / 工作室 / 销售人群（见 cohort_analytics）。
+    - start_date / end_date: date | None，按数据集日期字段筛选（含起止）。
+    - metric_types: Sequence[str] | None，指标类型，仅体征指标支持。
+    - pseudonymize: bool，是否以假名替换患者 ID 并去除自由文本列。
+    - pseudonym_salt: str，假名附加盐值，不同导出批次可使用不同 salt 防止关联。
+    - chunk_size: int，每页行数。
+
+    【返回值说明】
+    - Iterator[List[tuple]]：每页的行列表。
+
+    【异常说明】
+    - 数据集、人群范围不受支持或数据集不支持按指标类型筛选时抛出 ValueError。
+    """
+    dataset = get_export_dataset(dataset_name)
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正数")
+    queryset = _build_export_queryset(
+        dataset,
+        patient_ids=patient_ids,
+        scope=scope,
+        scope_id=scope_id,
+        start_date=start_date,
+        end_date=end_date,
+        metric_types=metric_types,
+    )
+    columns = get_export_columns(dataset, pseudonymize=pseudonymize)
+    values = queryset.values_list(*[column.path for column in columns])
+    patient_index = next(
+        (index for index, column in enumerate(columns) if column.name == "patient_pseudonym"),
+        None,
+    )
+
+    last_pk = None
+    while True:
+        page = values if last_pk is None else values.filter(pk__gt=last_pk)
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        if patient_index is not None:
+            rows = [
+                row[:patient_index]
+                + (pseudonymize_patient_id(row[patient_index], pseudonym_salt),)
+                + row[patient_index + 1 :]
+                for row in rows
+            ]
+        yield rows
+        if len(rows) < chunk_size:
+            return
+
+
+def _format_csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return (timezone.localtime(value) if timezone.is_aware(value) else value).isoformat()
+    if isinstance(value, (date, Decimal)):
+        return str(value)
+    return value
+
+
+class _Echo:
+    """csv.writer 需要的类文件对象，write 直接返回写入内容供生成器产出。"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(dataset_name: str, **filters) -> Iterator[str]:
+    """
+    【功能说明】
+    - 逐行产出 CSV 文本（首行为表头），可直接交给 StreamingHttpResponse 或写入文件。
+
+    【参数说明】
+    - dataset_name: str，数据集名称；filters 同 iter_export_batches。
+    """
+    dataset = get_export_dataset(dataset_name)
+    writer = csv.writer(_Echo())
+    columns = get_export_columns(dataset, pseudonymize=filters.get("pseudonymize", False))
+    yield writer.writerow([column.name for column in columns])
+    for rows in iter_export_batches(dataset_name, **filters):
+        for row in rows:
+            yield writer.writerow([_format_csv_value(value) for value in row])
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - 依赖未安装时
+        raise ImproperlyConfigured("Parquet/Arrow 导出需要安装 pyarrow") from exc
+    return pyarrow
+
+
+def _arrow_schema(pa, columns: Sequence[ExportColumn]):
+    types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "decimal": pa.float64(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us", tz=settings.TIME_ZONE),
+    }
+    return pa.schema([pa.field(column.name, types[column.kind]) for column in columns])
+
+
+def write_columnar(dataset_name: str, destination, *, export_format: str = EXPORT_FORMAT_PARQUET, **filters) -> int:
+    """
+    【功能说明】
+    - 以 Parquet 或 Arrow IPC 文件格式写出数据集，每页数据写成一个 record batch，
+      内存占用与总行数无关。
+
+    【参数说明】
+    - dataset_name: str，数据集名称。
+    - destination: str | 文件对象，输出位置。
+    - export_format: str，EXPORT_FORMAT_PARQUET 或 EXPORT_FORMAT_ARROW。
+    - filters: 同 iter_export_batches。
+
+    【返回值说明】
+    - int：写出的行数。
+
+    【异常说明】
+    - 未安装 pyarrow 时抛出 ImproperlyConfigured；格式不支持时抛出 ValueError。
+    """
+    if export_format not in (EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_ARROW):
+        raise ValueError(f"不支持的列式导出格式: {export_format}")
+    pa = _import_pyarrow()
+    dataset = get_export_dataset(dataset_name)
+    columns = get_export_columns(dataset, pseudonymize=filters.get("pseudonymize", False))
+    schema = _arrow_schema(pa, columns)
+
+    if export_format == EXPORT_FORMAT_PARQUET:
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(destination, schema)
+    else:
+        writer = pa.ipc.new_file(destination, schema)
+
+    written = 0
+    try:
+        for rows in iter_export_batches(dataset_name, **filters):
+            arrays = []
+            for index, column in enumerate(columns):
+                values = [row[index] for row in rows]
+                if column.kind == "decimal":
+                    values = [None if value is None else float(value) for value in values]
+                arrays.append(pa.array(values, type=schema.field(index).type))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            written += len(rows)
+    finally:
+        writer.close()
+    return written
@@ -9,7 +9,8 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
-from business_support.models import Device, DeviceMetricReceipt, DeviceProvider
+from business_support.models import Device, DeviceMetricReceipt
+from business_support.services.device_binding_cache import resolve_device_binding
 from business_support.services.device_integrations.base import (
     DeviceMetricReading,
     StepAggregationMode,
@@ -77,24 +78,8 @@ class DeviceMetricIngestionService:
         received_at: datetime | None = None,
     ):
         with transaction.atomic():
-            device = cls._find_device(reading, for_update=True)
-            if not device:
-                logger.warning(
-                    {
-                        "event": "device_metric_device_not_found",
-                        "provider": reading.provider_code,
-                        **_device_log_fields(reading.device_no),
-                    }
-                )
-                return None
-            if not device.is_active:
-                logger.info("设备 %s 已停用，跳过数据。", device.pk)
-                return None
-            if device.provider and not device.provider.is_active:
-                logger.info("设备厂商 %s 已停用，跳过数据。", device.provider.code)
-                return None
-            if not device.current_patient_id:
-                logger.info("设备 %s 未绑定患者，跳过数据。", device.pk)
+            device = cls._lock_bound_device(reading)
+            if device is None:
                 return None
 
             activity_at = received_at or timezone.now()
@@ -162,51 +147,50 @@ class DeviceMetricIngestionService:
             return metric
 
     @classmethod
-    def _find_device(
-        cls,
-        reading: DeviceMetricReading,
-        *,
-        for_update: bool = False,
-    ) -> Device | None:
-        provider_code = (reading.provider_code or "").strip().upper()
-        device_no = (reading.device_no or "").strip()
-        if not device_no:
-            return None
+    def _lock_bound_device(cls, reading: DeviceMetricReading) -> Device | None:
+        """
+        Resolve the reading's device through the binding cache, then lock it.
 
-        provider_id = (
-            DeviceProvider.objects.filter(code=provider_code)
-            .values_list("pk", flat=True)
-            .first()
-        )
-        if provider_id is None:
+        Unknown, inactive and unbound devices are rejected from the cache
+        without touching the database. The cache only routes: the locked row
+        is re-checked, so a stale positive entry can never attach a reading
+        to a device that was deactivated or unbound in the meantime.
+        """
+        binding = resolve_device_binding(reading.provider_code, reading.device_no)
+        if not binding.is_known:
+            cls._log_device_not_found(reading)
+            return None
+        if not binding.device_active:
+            logger.info("设备 %s 已停用，跳过数据。", binding.device_id)
+            return None
+        if not binding.provider_active:
+            logger.info("设备厂商 %s 已停用，跳过数据。", (reading.provider_code or "").strip().upper())
+            return None
+        if not binding.patient_id:
+            logger.info("设备 %s 未绑定患者，跳过数据。", binding.device_id)
             return None
-        base_filter = {"provider_id": provider_id}
-        device = cls._query_device(
-            device_no,
-            for_update=for_update,
-            **base_filter,
-        )
-        if device:
-            return device
 
-        return None
+        device = Device.objects.select_for_update().filter(pk=binding.device_id).first()
+        if device is None:
+            cls._log_device_not_found(reading)
+            return None
+        if not device.is_active:
+            logger.info("设备 %s 已停用，跳过数据。", device.pk)
+            return None
+        if not device.current_patient_id:
+            logger.info("设备 %s 未绑定患者，跳过数据。", device.pk)
+            return None
+        return device
 
     @staticmethod
-    def _query_device(
-        device_no: str,
-        *,
-        for_update: bool = False,
-        **filters,
-    ) -> Device | None:
-        devices = Device.objects.all()
-        if for_update:
-            devices = devices.select_for_update()
-        else:
-            devices = devices.select_related("provider", "current_patient")
-        return devices.filter(imei=device_no, **filters).first() or devices.filter(
-            sn=device_no,
-            **filters,
-        ).first()
+    def _log_device_not_found(reading: DeviceMetricReading) -> None:
+        logger.warning(
+            {
+                "event": "device_metric_device_not_found",
+                "provider": reading.provider_code,
+                **_device_log_fields(reading.device_no),
+            }
+        )
 
     @staticmethod
     def _is_exact_retry(device: Device, reading: DeviceMetricReading) -> bool:
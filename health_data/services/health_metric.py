@@ -374,22 +374,7 @@ class HealthMetricService:
                 .first()
             )
 
-            if not metric:
-                result[m_type] = None
-                continue
-
-            result[m_type] = {
-                "name": MetricType(m_type).label,
-                "value_main": metric.value_main,
-                "value_sub": metric.value_sub,
-                "value_display": cls._format_display_value(metric),
-                "measured_at": metric.measured_at,
-                "source": metric.source,
-                "measurement_context": metric.measurement_context,
-                "measurement_context_display": metric.get_measurement_context_display()
-                if metric.measurement_context
-                else "",
-            }
+            result[m_type] = cls._build_last_metric_payload(metric) if metric else None
 
         return result
 
@@ -423,25 +408,83 @@ class HealthMetricService:
                 .order_by("-measured_at")
                 .first()
             )
-            if not metric:
-                result[m_type] = None
-                continue
+            result[m_type] = cls._build_last_metric_payload(metric) if metric else None
 
-            result[m_type] = {
-                "name": MetricType(m_type).label,
-                "value_main": metric.value_main,
-                "value_sub": metric.value_sub,
-                "value_display": cls._format_display_value(metric),
-                "measured_at": metric.measured_at,
-                "source": metric.source,
-                "measurement_context": metric.measurement_context,
-                "measurement_context_display": metric.get_measurement_context_display()
-                if metric.measurement_context
-                else "",
-            }
+        return result
+
+    @classmethod
+    def query_last_metrics_for_range(
+        cls,
+        patient_id: int,
+        start_date: date,
+        end_date: date,
+        metric_types: list[str],
+    ) -> dict:
+        """
+        【功能说明】
+        - 一次查询返回日期区间内每天、每种指标的最后一条记录，替代逐日逐类型调用
+          query_last_metric_for_date。
+        - 日期按本地时区划分；只加载构建展示值所需的字段。
 
+        【使用方法】
+        - query_last_metrics_for_range(patient.id, start, end, [MetricType.BODY_TEMPERATURE])
+
+        【参数说明】
+        - patient_id: int，患者 ID（不校验存在性）。
+        - start_date / end_date: date，闭区间。
+        - metric_types: 需要查询的指标类型列表，为空时不查询。
+
+        【返回值说明】
+        - {date: {metric_type: dict}}，仅包含有记录的日期与类型；
+          dict 结构同 query_last_metric_for_date 的单项返回。
+        """
+        if not metric_types or start_date > end_date:
+            return {}
+        start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+        end_dt = timezone.make_aware(datetime.combine(end_date, datetime.max.time()))
+
+        metrics = (
+            HealthMetric.objects.filter(
+                patient_id=patient_id,
+                metric_type__in=metric_types,
+                measured_at__range=(start_dt, end_dt),
+            )
+            .only(
+                "metric_type",
+                "measured_at",
+                "value_main",
+                "value_sub",
+                "source",
+                "measurement_context",
+            )
+            .order_by("measured_at", "id")
+        )
+        # 升序遍历，同一天同类型后出现的记录覆盖前者。
+        latest: dict = {}
+        for metric in metrics.iterator():
+            day = timezone.localtime(metric.measured_at).date()
+            latest[(day, metric.metric_type)] = metric
+
+        result: dict = {}
+        for (day, metric_type), metric in latest.items():
+            result.setdefault(day, {})[metric_type] = cls._build_last_metric_payload(metric)
         return result
 
+    @classmethod
+    def _build_last_metric_payload(cls, metric: HealthMetric) -> dict:
+        return {
+            "name": MetricType(metric.metric_type).label,
+            "value_main": metric.value_main,
+            "value_sub": metric.value_sub,
+            "value_display": cls._format_display_value(metric),
+            "measured_at": metric.measured_at,
+            "source": metric.source,
+            "measurement_context": metric.measurement_context,
+            "measurement_context_display": metric.get_measurement_context_display()
+            if metric.measurement_context
+            else "",
+        }
+
     @classmethod
     def list_monitoring_metric_types_for_patient(
         cls,
@@ -0,0 +1,490 @@
+"""患者月度管理统计：快照构建与“快照 + 实时”合并读取。
+
+管理统计页（医生端 ManagementStatsView）按服务包周期展示指标上传、问卷提交、
+咨询会话、诊疗事件与依从率，服务包周期往往跨越一年以上。本模块：
+
+- 夜间任务把已结束自然月的统计写入 `PatientMonthlyStat`（每名患者每月一行）；
+- 读取时完整落在区间内且已有快照的月份直接读快照，其余日期（服务包首尾的
+  不完整月份、当前月、尚无快照的月份）按连续区间实时聚合，再合并为同一结构；
+- 已结束月份的源数据被保存/删除时（见 health_data.signals）删除对应快照，
+  该月退回实时计算，由下一次夜间任务重建；queryset.update() 不触发信号。
+
+依从率只按任务日期拆分求和，月初 MONTHLY_STATS_RECHECK_DAYS 天内会整体重算上月，
+覆盖复查/问卷任务的逾期完成窗口。
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from health_data.models import (
+    ClinicalEvent,
+    HealthMetric,
+    PatientMetricMonthlyStat,
+    PatientMonthlyStat,
+    QuestionnaireSubmission,
+)
+
+logger = logging.getLogger(__name__)
+
+# 月初前几天重算上月快照：复查/问卷任务最长可逾期 6 天完成。
+MONTHLY_STATS_RECHECK_DAYS = 7
+# 夜间任务补齐缺失快照的回溯月数（含上月）。
+MONTHLY_STATS_LOOKBACK_MONTHS = 12
+MONTHLY_STATS_BATCH_SIZE = 500
+
+
+@dataclass
+class PatientStatsPeriod:
+    """
+    单个患者在一段时间内的统计结果，可由多个区间合并。
+
+    - 按月拆分（用于趋势图）：metric_uploads、questionnaire_submissions、chat_sessions，
+      键为 "YYYY-MM"；
+    - 区间合计（用于概览与饼图）：其余字段。
+    """
+
+    metric_uploads: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    questionnaire_submissions: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    chat_sessions: Dict[str, int] = field(default_factory=dict)
+    chat_time_slots: Dict[str, int] = field(default_factory=dict)
+    clinical_events: Dict[int, int] = field(default_factory=dict)
+    alerts: Dict[str, int] = field(default_factory=dict)
+    medication_tasks: Tuple[int, int] = (0, 0)
+    monitoring_tasks: Tuple[int, int] = (0, 0)
+
+    def merge(self, other: "PatientStatsPeriod") -> None:
+        for month, counts in other.metric_uploads.items():
+            _add_counts(self.metric_uploads.setdefault(month, {}), counts)
+        for month, counts in other.questionnaire_submissions.items():
+            _add_counts(self.questionnaire_submissions.setdefault(month, {}), counts)
+        _add_counts(self.chat_sessions, other.chat_sessions)
+        _add_counts(self.chat_time_slots, other.chat_time_slots)
+        _add_counts(self.clinical_events, other.clinical_events)
+        _add_counts(self.alerts, other.alerts)
+        self.medication_tasks = _add_pair(self.medication_tasks, other.medication_tasks)
+        self.monitoring_tasks = _add_pair(self.monitoring_tasks, other.monitoring_tasks)
+
+    def count_metric_uploads(self, metric_types: Iterable[str]) -> int:
+        metric_types = set(metric_types)
+        return sum(
+            count
+            for counts in self.metric_uploads.values()
+            for metric_type, count in counts.items()
+            if metric_type in metric_types
+        )
+
+    def metric_uploads_by_month(self, metric_type: str) -> Dict[str, int]:
+        return {
+            month: counts[metric_type]
+            for month, counts in self.metric_uploads.items()
+            if metric_type in counts
+        }
+
+    @property
+    def questionnaire_submission_total(self) -> int:
+        return sum(sum(counts.values()) for counts in self.questionnaire_submissions.values())
+
+    @property
+    def chat_session_total(self) -> int:
+        return sum(self.chat_sessions.values())
+
+
+def _add_counts(target: dict, source: dict) -> None:
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + count
+
+
+def _add_pair(left: Tuple[int, int], right: Tuple[int, int]) -> Tuple[int, int]:
+    return left[0] + right[0], left[1] + right[1]
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month_start(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _month_label(value: date | datetime) -> str:
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _datetime_range(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    start_dt = datetime.combine(start_date, datetime.min.time())
+    end_dt = datetime.combine(end_date, datetime.max.time())
+    if timezone.is_aware(timezone.now()):
+        start_dt = timezone.make_aware(start_dt)
+        end_dt = timezone.make_aware(end_dt)
+    return start_dt, end_dt
+
+
+def collect_patient_stats(
+    patient_ids: Iterable[int],
+    start_date: date,
+    end_date: date,
+    *,
+    refresh_tasks: bool = False,
+) -> Dict[int, PatientStatsPeriod]:
+    """
+    【功能说明】
+    - 实时聚合多名患者在 [start_date, end_date] 内的统计，每类数据一次分组查询。
+    - 统计口径与管理统计页原有实时查询一致（咨询仅统计患者-工作室会话）。
+
+    【参数说明】
+    - patient_ids: Iterable[int]，患者 ID 集合。
+    - start_date / end_date: date，统计区间（含起止）。
+    - refresh_tasks: bool，统计依从率前是否刷新任务状态。
+
+    【返回值说明】
+    - {patient_id: PatientStatsPeriod}，无数据的患者同样返回空结果。
+    """
+    from chat.models import ConversationSession, ConversationType
+    from chat.services.chat import annotate_session_time_slot
+    from core.models.choices import PlanItemCategory
+    from core.service.tasks import (
+        MONITORING_ADHERENCE_ALL,
+        get_adherence_metrics_for_patients,
+    )
+    from patient_alerts.models import PatientAlert
+
+    patient_ids = list(dict.fromkeys(int(patient_id) for patient_id in patient_ids))
+    result = {patient_id: PatientStatsPeriod() for patient_id in patient_ids}
+    if not patient_ids or start_date > end_date:
+        return result
+
+    tz = timezone.get_current_timezone()
+    start_dt, end_dt = _datetime_range(start_date, end_date)
+
+    metric_rows = (
+        HealthMetric.objects.filter(
+            patient_id__in=patient_ids,
+            measured_at__gte=start_dt,
+            measured_at__lte=end_dt,
+        )
+        .annotate(month=TruncMonth("measured_at", tzinfo=tz))
+        .values("patient_id", "metric_type", "month")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in metric_rows:
+        counts = result[row["patient_id"]].metric_uploads.setdefault(_month_label(row["month"]), {})
+        counts[row["metric_type"]] = counts.get(row["metric_type"], 0) + row["count"]
+
+    submission_rows = (
+        QuestionnaireSubmission.objects.filter(
+            patient_id__in=patient_ids,
+            created_at__gte=start_dt,
+            created_at__lte=end_dt,
+        )
+        .annotate(month=TruncMonth("created_at", tzinfo=tz))
+        .values("patient_id", "questionnaire_id", "month")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in submission_rows:
+        counts = result[row["patient_id"]].questionnaire_submissions.setdefault(
+            _month_label(row["month"]), {}
+        )
+        counts[row["questionnaire_id"]] = counts.get(row["questionnaire_id"], 0) + row["count"]
+
+    sessions = ConversationSession.objects.filter(
+        patient_id__in=patient_ids,
+        conversation_type=ConversationType.PATIENT_STUDIO,
+        start_at__gte=start_dt,
+        start_at__lte=end_dt,
+    )
+    session_rows = (
+        annotate_session_time_slot(sessions, tz)
+        .annotate(month=TruncMonth("start_at", tzinfo=tz))
+        .values("patient_id", "month", "slot")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in session_rows:
+        stats = result[row["patient_id"]]
+        month = _month_label(row["month"])
+        stats.chat_sessions[month] = stats.chat_sessions.get(month, 0) + row["count"]
+        stats.chat_time_slots[row["slot"]] = stats.chat_time_slots.get(row["slot"], 0) + row["count"]
+
+    event_rows = (
+        ClinicalEvent.objects.filter(
+            patient_id__in=patient_ids,
+            event_date__range=(start_date, end_date),
+        )
+        .values("patient_id", "event_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in event_rows:
+        result[row["patient_id"]].clinical_events[row["event_type"]] = row["count"]
+
+    alert_rows = (
+        PatientAlert.objects.filter(
+            patient_id__in=patient_ids,
+            event_time__gte=start_dt,
+            event_time__lte=end_dt,
+        )
+        .values("patient_id", "event_type")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in alert_rows:
+        result[row["patient_id"]].alerts[row["event_type"]] = row["count"]
+
+    adherence = get_adherence_metrics_for_patients(
+        patient_ids,
+        [PlanItemCategory.MEDICATION, MONITORING_ADHERENCE_ALL],
+        start_date=start_date,
+        end_date=end_date,
+        refresh=refresh_tasks,
+    )
+    for patient_id, (medication, monitoring) in adherence.items():
+        result[patient_id].medication_tasks = (medication["total"], medication["completed"])
+        result[patient_id].monitoring_tasks = (monitoring["total"], monitoring["completed"])
+
+    return result
+
+
+def _snapshot_to_period(row: PatientMonthlyStat) -> PatientStatsPeriod:
+    month = _month_label(row.month)
+    return PatientStatsPeriod(
+        metric_uploads={month: dict(row.metric_upload_counts)} if row.metric_upload_counts else {},
+        questionnaire_submissions=(
+            {month: {int(key): count for key, count in row.questionnaire_counts.items()}}
+            if row.questionnaire_counts
+            else {}
+        ),
+        chat_sessions={month: row.chat_session_count} if row.chat_session_count else {},
+        chat_time_slots=dict(row.chat_time_slots),
+        clinical_events={int(key): count for key, count in row.clinical_event_counts.items()},
+        alerts=dict(row.alert_counts),
+        medication_tasks=(row.medication_task_total, row.medication_task_completed),
+        monitoring_tasks=(row.monitoring_task_total, row.monitoring_task_completed),
+    )
+
+
+def _period_to_snapshot(patient_id: int, month: date, stats: PatientStatsPeriod) -> PatientMonthlyStat:
+    label = _month_label(month)
+    return PatientMonthlyStat(
+        patient_id=patient_id,
+        month=month,
+        metric_upload_counts=stats.metric_uploads.get(label, {}),
+        questionnaire_counts={
+            str(key): count
+            for key, count in stats.questionnaire_submissions.get(label, {}).items()
+        },
+        clinical_event_counts={str(key): count for key, count in stats.clinical_events.items()},
+        alert_counts=stats.alerts,
+        chat_session_count=stats.chat_sessions.get(label, 0),
+        chat_time_slots=stats.chat_time_slots,
+        medication_task_total=stats.medication_tasks[0],
+        medication_task_completed=stats.medication_tasks[1],
+        monitoring_task_total=stats.monitoring_tasks[0],
+        monitoring_task_completed=stats.monitoring_tasks[1],
+    )
+
+
+def _collect_metric_value_snapshots(
+    patient_ids: List[int], month: date, month_end: date
+) -> List[PatientMetricMonthlyStat]:
+    """按患者、指标类型汇总当月主数值（忽略无主数值的记录）。"""
+    start_dt, end_dt = _datetime_range(month, month_end)
+    rows = (
+        HealthMetric.objects.filter(
+            patient_id__in=patient_ids,
+            measured_at__gte=start_dt,
+            measured_at__lte=end_dt,
+            value_main__isnull=False,
+        )
+        .values("patient_id", "metric_type")
+        .annotate(
+            reading_count=Count("id"),
+            value_avg=Avg("value_main"),
+            value_min=Min("value_main"),
+            value_max=Max("value_main"),
+        )
+        .order_by()
+    )
+    return [
+        PatientMetricMonthlyStat(
+            patient_id=row["patient_id"],
+            month=month,
+            metric_type=row["metric_type"],
+            reading_count=row["reading_count"],
+            value_avg=round(row["value_avg"], 2),
+            value_min=row["value_min"],
+            value_max=row["value_max"],
+        )
+        for row in rows
+    ]
+
+
+def build_patient_stats(patient, start_date: date, end_date: date) -> PatientStatsPeriod:
+    """
+    【功能说明】
+    - 返回患者在 [start_date, end_date] 内的统计：已结束且完整落在区间内的月份读快照，
+      其余日期按连续区间实时聚合后合并。
+
+    【参数说明】
+    - patient: PatientProfile 实例。
+    - start_date / end_date: date，统计区间（含起止）。
+    """
+    result = PatientStatsPeriod()
+    if start_date > end_date:
+        return result
+
+    current_month = month_start(timezone.localdate())
+    candidate_months = []
+    cursor = month_start(start_date)
+    while cursor <= end_date:
+        following = next_month_start(cursor)
+        if cursor >= start_date and following - timedelta(days=1) <= end_date and following <= current_month:
+            candidate_months.append(cursor)
+        cursor = following
+    snapshots = {
+        row.month: row
+        for row in PatientMonthlyStat.objects.filter(patient=patient, month__in=candidate_months)
+    }
+
+    live_segments: List[Tuple[date, date]] = []
+    segment_start: Optional[date] = None
+    cursor = start_date
+    while cursor <= end_date:
+        piece_end = min(next_month_start(cursor) - timedelta(days=1), end_date)
+        snapshot = snapshots.get(cursor) if cursor.day == 1 else None
+        if snapshot is not None:
+            if segment_start is not None:
+                live_segments.append((segment_start, cursor - timedelta(days=1)))
+                segment_start = None
+            result.merge(_snapshot_to_period(snapshot))
+        elif segment_start is None:
+            segment_start = cursor
+        cursor = piece_end + timedelta(days=1)
+    if segment_start is not None:
+        live_segments.append((segment_start, end_date))
+
+    for index, (segment_start, segment_end) in enumerate(live_segments):
+        live = collect_patient_stats(
+            [patient.id],
+            segment_start,
+            segment_end,
+            refresh_tasks=index == 0,
+        )[patient.id]
+        result.merge(live)
+    return result
+
+
+def refresh_patient_monthly_stats(
+    month: date,
+    *,
+    patient_ids: Optional[Iterable[int]] = None,
+    rebuild: bool = False,
+    batch_size: int = MONTHLY_STATS_BATCH_SIZE,
+) -> int:
+    """
+    【功能说明】
+    - 为指定的已结束自然月写入患者统计快照，按患者分批，每批每类数据一次分组查询。
+    - 默认只补齐缺失的快照（增量）；rebuild=True 时重算已有快照。
+    - 同一事务内写入按指标类型的数值汇总 `PatientMetricMonthlyStat`。
+
+    【参数说明】
+    - month: date，目标月份内任意一天。
+    - patient_ids: Iterable[int] | None，限定患者；默认该月月底前已建档的全部患者。
+    - rebuild: bool，是否重算已有快照。
+    - batch_size: int，每批患者数量。
+
+    【返回值说明】
+    - int：本次写入的快照行数。
+
+    【异常说明】
+    - month 不早于当前月：抛出 ValueError（未结束月份不生成快照）。
+    """
+    from users.models import PatientProfile
+
+    month = month_start(month)
+    month_end = next_month_start(month) - timedelta(days=1)
+    if month >= month_start(timezone.localdate()):
+        raise ValueError("仅支持已结束月份")
+
+    _, month_end_dt = _datetime_range(month, month_end)
+    patients = PatientProfile.objects.filter(created_at__lte=month_end_dt)
+    if patient_ids is not None:
+        patients = patients.filter(id__in=list(patient_ids))
+    if not rebuild:
+        patients = patients.exclude(monthly_stats__month=month)
+    candidate_ids = list(patients.order_by("id").values_list("id", flat=True))
+
+    written = 0
+    for offset in range(0, len(candidate_ids), batch_size):
+        batch_ids = candidate_ids[offset : offset + batch_size]
+        stats_by_patient = collect_patient_stats(batch_ids, month, month_end)
+        metric_snapshots = _collect_metric_value_snapshots(batch_ids, month, month_end)
+        with transaction.atomic():
+            PatientMonthlyStat.objects.filter(patient_id__in=batch_ids, month=month).delete()
+            PatientMetricMonthlyStat.objects.filter(
+                patient_id__in=batch_ids, month=month
+            ).delete()
+            PatientMetricMonthlyStat.objects.bulk_create(metric_snapshots)
+            PatientMonthlyStat.objects.bulk_create(
+                [
+                    _period_to_snapshot(patient_id, month, stats)
+                    for patient_id, stats in stats_by_patient.items()
+                ]
+            )
+        written += len(batch_ids)
+    logger.info(
+        "patient monthly stats refreshed",
+        extra={"month": month.isoformat(), "rows": written, "rebuild": rebuild},
+    )
+    return written
+
+
+def resolve_months_to_refresh(today: date, since: Optional[date] = None) -> List[Tuple[date, bool]]:
+    """
+    【功能说明】
+    - 返回夜间任务需要处理的 (月份, 是否重算) 列表：
+      since（默认回溯 MONTHLY_STATS_LOOKBACK_MONTHS 个月）至上月补齐缺失快照；
+      月初 MONTHLY_STATS_RECHECK_DAYS 天内重算上月。
+    """
+    previous_month = month_start(month_start(today) - timedelta(days=1))
+    if since is None:
+        since = previous_month
+        for _ in range(MONTHLY_STATS_LOOKBACK_MONTHS - 1):
+            since = month_start(since - timedelta(days=1))
+    cursor = month_start(since)
+    months = []
+    while cursor <= previous_month:
+        months.append((cursor, cursor == previous_month and today.day <= MONTHLY_STATS_RECHECK_DAYS))
+        cursor = next_month_start(cursor)
+    return months
+
+
+def invalidate_patient_monthly_stat(patient_id: Optional[int], moment: date | datetime | None) -> None:
+    """
+    【功能说明】
+    - 源数据落在已结束月份时删除对应快照，读取时该月退回实时计算，
+      由下一次夜间任务补回（超出回溯月数时需手动指定 --since）。
+    """
+    if not patient_id or moment is None:
+        return
+    if isinstance(moment, datetime):
+        moment = timezone.localtime(moment).date() if timezone.is_aware(moment) else moment.date()
+    month = month_start(moment)
+    if month >= month_start(timezone.localdate()):
+        return
+    PatientMonthlyStat.objects.filter(patient_id=patient_id, month=month).delete()
+    PatientMetricMonthlyStat.objects.filter(patient_id=patient_id, month=month).delete()
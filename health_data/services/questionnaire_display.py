@@ -13,6 +13,7 @@ from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
 from core.models import Questionnaire, choices
+from core.service.catalog import CatalogService
 from health_data.models import QuestionnaireSubmission
 from health_data.services.questionnaire_scoring import is_eq5d5l_code, is_eqvas_code
 from patient_alerts.services.todo_list import TodoListService
@@ -183,7 +184,7 @@ class QuestionnaireDisplayService:
         date_list: list[date],
     ) -> list[dict[str, Any]]:
         """Build one daily score chart for every active questionnaire."""
-        questionnaires = list(cls._active_questionnaires(with_questions=True))
+        questionnaires = CatalogService.get_active_questionnaires_with_questions()
         active_ids = [questionnaire.id for questionnaire in questionnaires]
         latest_by_questionnaire_day: dict[tuple[int, date], Decimal | None] = {}
         submissions = QuestionnaireSubmission.objects.filter(
@@ -238,17 +239,14 @@ class QuestionnaireDisplayService:
             )
         return charts
 
-    @classmethod
-    def build_monthly_count_charts(
-        cls,
+    @staticmethod
+    def _count_submissions_by_month(
         *,
         patient,
         start_date: date | None,
         end_date: date | None,
-        month_labels: list[str],
-    ) -> list[dict[str, Any]]:
-        """Build monthly submission-count charts for every active questionnaire."""
-        questionnaires = list(cls._active_questionnaires())
+        questionnaires,
+    ) -> dict[tuple[int, str], int]:
         counts: dict[tuple[int, str], int] = {}
         if start_date and end_date and questionnaires:
             tz = timezone.get_current_timezone()
@@ -273,6 +271,32 @@ class QuestionnaireDisplayService:
                 month_value = timezone.localtime(row["month"]).strftime("%Y-%m")
                 counts[(row["questionnaire_id"], month_value)] = row["count"]
 
+        return counts
+
+    @classmethod
+    def build_monthly_count_charts(
+        cls,
+        *,
+        patient,
+        start_date: date | None,
+        end_date: date | None,
+        month_labels: list[str],
+        counts: dict[tuple[int, str], int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Build monthly submission-count charts for every active questionnaire.
+
+        ``counts`` ({(questionnaire_id, "YYYY-MM"): count}) may be supplied by the
+        caller (e.g. from monthly stats snapshots) to skip the live query.
+        """
+        questionnaires = CatalogService.get_questionnaires(active_only=True)
+        if counts is None:
+            counts = cls._count_submissions_by_month(
+                patient=patient,
+                start_date=start_date,
+                end_date=end_date,
+                questionnaires=questionnaires,
+            )
+
         charts = []
         for questionnaire in questionnaires:
             data = [counts.get((questionnaire.id, month), 0) for month in month_labels]
@@ -473,10 +497,13 @@ class QuestionnaireDisplayService:
         actual_scores = [
             float(score) for score in latest_by_day.values() if score is not None
         ]
-        questionnaire_with_options = (
-            cls._active_questionnaires(with_questions=True)
-            .filter(pk=questionnaire.pk)
-            .first()
+        questionnaire_with_options = next(
+            (
+                item
+                for item in CatalogService.get_active_questionnaires_with_questions()
+                if item.pk == questionnaire.pk
+            ),
+            None,
         )
         bounds_source = questionnaire_with_options or questionnaire
         y_min, y_max = cls._score_bounds(bounds_source, actual_scores)
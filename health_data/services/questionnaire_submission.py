@@ -3,7 +3,7 @@
 import logging
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Mapping
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
@@ -18,6 +18,7 @@ from core.models import (
 )
 from core.models.choices import QuestionType
 from core.service import tasks as task_service
+from core.service.catalog import CatalogService, QuestionnaireGraph
 from health_data.models import QuestionnaireAnswer, QuestionnaireSubmission
 from health_data.services.health_metric import HealthMetricService
 from health_data.services.questionnaire_scoring import (
@@ -95,22 +96,22 @@ class QuestionnaireSubmissionService:
         ``Q_EQ5D5L`` 使用中国大陆价值集计分，``Q_EQVAS`` 直接使用
         患者填写的 0 至 100 整数。
         所有业务校验均在创建提交记录前完成。
+
+        题目、选项与计分配置取自按目录版本缓存的问卷图，校验、算分及分级
+        全部在内存中进行；数据库写入仅为提交记录一条、答案一次批量插入。
         """
         if not isinstance(answers_data, list):
             raise ValidationError("答案列表格式错误。")
 
-        questionnaire = Questionnaire.objects.get(id=questionnaire_id)
-        questions = list(
-            QuestionnaireQuestion.objects.filter(questionnaire=questionnaire)
-            .only("id", "questionnaire_id", "q_type", "is_required", "seq")
-            .order_by("seq", "id")
-        )
+        graph = CatalogService.get_questionnaire_graph(questionnaire_id)
+        questionnaire = graph.questionnaire
+        questions = list(graph.questions)
         if not questions:
             raise ValidationError("当前问卷未配置题目。")
         if not answers_data and not is_eqvas_code(questionnaire.code):
             raise ValidationError("答案列表不能为空。")
 
-        questions_map = {question.id: question for question in questions}
+        questions_map = graph.questions_by_id
         option_ids: list[int] = []
         text_answers_by_question: dict[int, str] = {}
         for item in answers_data:
@@ -162,20 +163,20 @@ class QuestionnaireSubmissionService:
         if len(option_ids) != len(set(option_ids)):
             raise ValidationError("同一选项不能重复提交。")
 
-        options_qs = (
-            QuestionnaireOption.objects.select_related("question")
-            .filter(id__in=option_ids)
-            .order_by("question__seq", "question_id", "seq", "id")
-        )
-        options_map = {opt.id: opt for opt in options_qs}
-        if len(options_map) != len(option_ids):
-            raise ValidationError("存在无效的选项，请检查填写内容。")
+        # 问卷图只含本问卷的选项：不在图中的选项要么不存在，要么属于其它问卷。
+        foreign_option_ids = [
+            opt_id for opt_id in option_ids if opt_id not in graph.options_by_id
+        ]
+        if foreign_option_ids:
+            if QuestionnaireOption.objects.filter(id__in=foreign_option_ids).count() != len(
+                foreign_option_ids
+            ):
+                raise ValidationError("存在无效的选项，请检查填写内容。")
+            raise ValidationError("答案中包含不属于该问卷的选项。")
 
         answers_by_question: dict[int, list[QuestionnaireOption]] = {}
         for opt_id in option_ids:
-            option = options_map[opt_id]
-            if option.question.questionnaire_id != questionnaire.id:
-                raise ValidationError("答案中包含不属于该问卷的选项。")
+            option = graph.options_by_id[opt_id]
             question = questions_map[option.question_id]
             if question.q_type == QuestionType.TEXT:
                 raise ValidationError("问答/填空题不能提交选项答案。")
@@ -213,6 +214,7 @@ class QuestionnaireSubmissionService:
             total_score = cls._calculate_eq5d5l_score(
                 questions=questions,
                 answers_by_question=answers_by_question,
+                option_values_by_question=graph.option_values_by_question,
             )
         elif is_eqvas_code(questionnaire.code):
             total_score = cls._calculate_eqvas_score(
@@ -235,6 +237,7 @@ class QuestionnaireSubmissionService:
             patient_id=patient_id,
             questionnaire=questionnaire,
             task_id=task_id,
+            total_score=total_score,
         )
 
         answers_to_create = []
@@ -258,8 +261,6 @@ class QuestionnaireSubmissionService:
                 )
 
         QuestionnaireAnswer.objects.bulk_create(answers_to_create)
-        submission.total_score = total_score
-        submission.save(update_fields=["total_score"])
         _, resolved_task_id = task_service.complete_daily_questionnaire_tasks(
             patient_id=patient_id,
             occurred_at=submission.created_at,
@@ -278,13 +279,36 @@ class QuestionnaireSubmissionService:
         )
 
         try:
-            QuestionnaireAlertService.process_submission(submission)
+            grade_result = cls._build_grade_result(
+                graph=graph,
+                answers_by_question=answers_by_question,
+                text_answers_by_question=text_answers_by_question,
+                total_score=total_score,
+            )
+        except ValidationError:
+            # 不支持分级或分数不在分级范围内：不生成预警。
+            grade_result = None
         except Exception:
+            # 分级计算异常不应回滚已保存的问卷提交与指标。
             logger.exception(
-                "问卷 %s 提交成功，但同步报警失败。submission_id=%s",
-                questionnaire.name,
+                "问卷 %s 提交成功，但分级计算失败。submission_id=%s",
+                questionnaire.code,
                 submission.id,
             )
+            grade_result = None
+
+        if grade_result is not None:
+            try:
+                QuestionnaireAlertService.process_submission(
+                    submission,
+                    grade_result=grade_result,
+                )
+            except Exception:
+                logger.exception(
+                    "问卷 %s 提交成功，但同步报警失败。submission_id=%s",
+                    questionnaire.name,
+                    submission.id,
+                )
 
         return submission
 
@@ -294,8 +318,25 @@ class QuestionnaireSubmissionService:
         *,
         questions: list[QuestionnaireQuestion],
         answers_by_question: dict[int, list[QuestionnaireOption]],
+        option_values_by_question: Mapping[int, tuple[str, ...]],
     ) -> Decimal:
         """校验固定五维配置，并计算 EQ-5D-5L 中国大陆健康效用指数。"""
+        levels = cls._resolve_eq5d5l_levels(
+            questions=questions,
+            answers_by_question=answers_by_question,
+            option_values_by_question=option_values_by_question,
+        )
+        return Eq5d5lChinaCalculator.calculate(levels)
+
+    @classmethod
+    def _resolve_eq5d5l_levels(
+        cls,
+        *,
+        questions: list[QuestionnaireQuestion],
+        answers_by_question: dict[int, list[QuestionnaireOption]],
+        option_values_by_question: Mapping[int, tuple[str, ...]],
+    ) -> list[int]:
+        """校验五维题目与选项配置，返回按题目顺序排列的五个等级。"""
         if len(questions) != cls.EQ5D5L_QUESTION_COUNT:
             raise ValidationError("EQ-5D-5L 问卷必须恰好配置五道题。")
 
@@ -305,15 +346,9 @@ class QuestionnaireSubmissionService:
         ):
             raise ValidationError("EQ-5D-5L 五个健康维度必须均为单选题。")
 
-        configured_values_by_question: dict[int, list[str]] = {}
-        for question_id, value in QuestionnaireOption.objects.filter(
-            question_id__in=[question.id for question in questions]
-        ).values_list("question_id", "value"):
-            configured_values_by_question.setdefault(question_id, []).append(value)
-
         expected_values = {"1", "2", "3", "4", "5"}
         for question in questions:
-            configured_values = configured_values_by_question.get(question.id, [])
+            configured_values = option_values_by_question.get(question.id, ())
             if (
                 len(configured_values) != len(expected_values)
                 or set(configured_values) != expected_values
@@ -334,7 +369,7 @@ class QuestionnaireSubmissionService:
                 )
             levels.append(int(option_value))
 
-        return Eq5d5lChinaCalculator.calculate(levels)
+        return levels
 
     @classmethod
     def _calculate_eqvas_score(
@@ -936,6 +971,43 @@ class QuestionnaireSubmissionService:
             "questions": question_items,
         }
 
+    @classmethod
+    def _build_grade_result(
+        cls,
+        *,
+        graph: QuestionnaireGraph,
+        answers_by_question: dict[int, list[QuestionnaireOption]],
+        text_answers_by_question: dict[int, str],
+        total_score: Decimal,
+    ) -> QuestionnaireGradeResult:
+        """提交时在内存中分级，规则与 get_submission_grade_result 一致，不再回查答案。"""
+        questionnaire = graph.questionnaire
+        if is_eq5d5l_code(questionnaire.code):
+            levels = cls._resolve_eq5d5l_levels(
+                questions=list(graph.questions),
+                answers_by_question=answers_by_question,
+                option_values_by_question=graph.option_values_by_question,
+            )
+            return cls._build_eq5d5l_grade_result(tuple(levels), total_score)
+        if is_eqvas_code(questionnaire.code):
+            return cls._build_eqvas_grade_result(
+                text_answers_by_question.get(graph.questions[0].id)
+            )
+
+        return QuestionnaireGradeResult(
+            grade_level=cls._resolve_legacy_grade(
+                questionnaire_code=questionnaire.code,
+                total_score=total_score,
+                selected_options=[
+                    option
+                    for selected_options in answers_by_question.values()
+                    for option in selected_options
+                ],
+            ),
+            rule_version="LEGACY_FIXED_CODE_V1",
+            score_label="总分",
+        )
+
     @classmethod
     def get_submission_grade_result(
         cls,
@@ -975,6 +1047,14 @@ class QuestionnaireSubmissionService:
         submission: QuestionnaireSubmission,
     ) -> QuestionnaireGradeResult:
         levels = cls._get_eq5d5l_submission_levels(submission)
+        return cls._build_eq5d5l_grade_result(levels, submission.total_score)
+
+    @classmethod
+    def _build_eq5d5l_grade_result(
+        cls,
+        levels: tuple[int, ...],
+        utility_index: Decimal | None,
+    ) -> QuestionnaireGradeResult:
         grade_level = Eq5d5lChinaCalculator.grade(levels)
         max_dimension_level = max(levels)
         max_dimensions = [
@@ -985,7 +1065,6 @@ class QuestionnaireSubmissionService:
             )
             if level == max_dimension_level
         ]
-        utility_index = submission.total_score
         if utility_index is None:
             utility_index = Eq5d5lChinaCalculator.calculate(levels)
 
@@ -1007,11 +1086,7 @@ class QuestionnaireSubmissionService:
         submission: QuestionnaireSubmission,
     ) -> QuestionnaireGradeResult:
         questions = list(
-            QuestionnaireQuestion.objects.filter(
-                questionnaire_id=submission.questionnaire_id,
-            )
-            .only("id", "q_type", "seq")
-            .order_by("seq", "id")
+            CatalogService.get_questionnaire_graph(submission.questionnaire_id).questions
         )
         if len(questions) != cls.EQVAS_QUESTION_COUNT:
             raise ValidationError("EQ-VAS 问卷必须恰好配置一道题。")
@@ -1031,6 +1106,10 @@ class QuestionnaireSubmissionService:
             raise ValidationError("EQ-VAS 问卷答案结构错误。")
 
         value_text = answers[0].value_text if answers else None
+        return cls._build_eqvas_grade_result(value_text)
+
+    @staticmethod
+    def _build_eqvas_grade_result(value_text: str | None) -> QuestionnaireGradeResult:
         grade_level = EqVasCalculator.grade(value_text)
         details: dict[str, Any] = {}
         if grade_level is not None:
@@ -1049,11 +1128,7 @@ class QuestionnaireSubmissionService:
         submission: QuestionnaireSubmission,
     ) -> tuple[int, ...]:
         questions = list(
-            QuestionnaireQuestion.objects.filter(
-                questionnaire_id=submission.questionnaire_id,
-            )
-            .only("id", "q_type", "seq")
-            .order_by("seq", "id")
+            CatalogService.get_questionnaire_graph(submission.questionnaire_id).questions
         )
         if len(questions) != cls.EQ5D5L_QUESTION_COUNT:
             raise ValidationError("EQ-5D-5L 问卷必须恰好配置五道题。")
@@ -1093,14 +1168,35 @@ class QuestionnaireSubmissionService:
     ) -> int:
         questionnaire_code = submission.questionnaire.code
         total_score = submission.total_score
-        if total_score is None:
+        selected_options: list[QuestionnaireOption] = []
+        if total_score is None or questionnaire_code in (
+            QuestionnaireCode.Q_COUGH,
+            QuestionnaireCode.Q_PAIN,
+        ):
             answers = list(
                 QuestionnaireAnswer.objects.filter(
                     submission=submission
                 ).select_related("option")
             )
-            total_score = cls._sum_answer_score(answers)
+            if total_score is None:
+                total_score = cls._sum_answer_score(answers)
+            selected_options = [answer.option for answer in answers if answer.option]
+
+        return cls._resolve_legacy_grade(
+            questionnaire_code=questionnaire_code,
+            total_score=total_score,
+            selected_options=selected_options,
+        )
 
+    @classmethod
+    def _resolve_legacy_grade(
+        cls,
+        *,
+        questionnaire_code: str,
+        total_score: Decimal,
+        selected_options: list[QuestionnaireOption],
+    ) -> int:
+        """按固定规则对普通问卷分级；selected_options 为本次提交选中的全部选项。"""
         if questionnaire_code in (
             QuestionnaireCode.Q_PHYSICAL,
             QuestionnaireCode.Q_BREATH,
@@ -1117,15 +1213,11 @@ class QuestionnaireSubmissionService:
                 raise ValidationError("问卷分数不在有效范围内。")
         elif questionnaire_code == QuestionnaireCode.Q_COUGH:
             bleeding_score = Decimal("0.00")
-            bleeding_answers = QuestionnaireAnswer.objects.filter(
-                submission=submission,
-                question_id=cls.COUGH_BLOOD_QUESTION_ID,
-            ).select_related("option")
-            for answer in bleeding_answers:
-                if not answer.option:
+            for option in selected_options:
+                if option.question_id != cls.COUGH_BLOOD_QUESTION_ID:
                     continue
-                if answer.option.score > bleeding_score:
-                    bleeding_score = answer.option.score
+                if option.score > bleeding_score:
+                    bleeding_score = option.score
 
             if bleeding_score >= Decimal("9") or total_score >= Decimal("9"):
                 grade_level = 4
@@ -1149,15 +1241,10 @@ class QuestionnaireSubmissionService:
             else:
                 raise ValidationError("问卷分数不在有效范围内。")
         elif questionnaire_code == QuestionnaireCode.Q_PAIN:
-            pain_answers = QuestionnaireAnswer.objects.filter(
-                submission=submission
-            ).select_related("option")
             pain_sites_with_max = set()
-            for answer in pain_answers:
-                if not answer.option:
-                    continue
-                if answer.option.score == Decimal("9"):
-                    pain_sites_with_max.add(answer.question_id)
+            for option in selected_options:
+                if option.score == Decimal("9"):
+                    pain_sites_with_max.add(option.question_id)
 
             max_score_sites = len(pain_sites_with_max)
 
@@ -0,0 +1,155 @@
+"""报告图片衍生版本（缩略图 / 中图 / WebP）生成服务。
+
+手机拍摄的报告原图动辄数 MB，医生端图片档案、患者端报告列表的宫格只需要几百像素宽的小图。
+上传时由 ReportUploadService.create_upload 在写库事务外同步生成衍生版本并写入 ReportImage.renditions，
+历史图片由 Celery 任务 backfill_report_image_renditions 分批补齐。
+"""
+
+from __future__ import annotations
+
+import logging
+import posixpath
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from health_data.models import REPORT_IMAGE_RENDITION_WIDTHS, ReportImage
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = "renditions"
+# (Pillow 格式, 扩展名, 键名后缀, 保存参数)
+_RENDITION_FORMATS = (
+    ("JPEG", "jpg", "", {"quality": 80, "optimize": True, "progressive": True}),
+    # method=2 的 WebP 编码耗时约为默认值的一半，体积差异很小。
+    ("WEBP", "webp", "_webp", {"quality": 75, "method": 2}),
+)
+# 无法生成衍生版本（远程地址、文件缺失或不是图片）时写入的标记，补齐任务据此跳过。
+RENDITIONS_UNAVAILABLE = {"unavailable": True}
+
+
+def _storage_path_for(image_url: str) -> Optional[str]:
+    """把 default_storage.url() 生成的本地媒体地址还原为存储路径；外部地址返回 None。"""
+    media_url = str(getattr(settings, "MEDIA_URL", "/media/") or "/media/")
+    parsed = urlparse(str(image_url or "").strip())
+    if parsed.scheme or parsed.netloc:
+        return None
+    path = parsed.path
+    if not path.startswith(media_url):
+        return None
+    return unquote(path[len(media_url):].lstrip("/")) or None
+
+
+def _load_source(storage_path: str) -> Image.Image:
+    with default_storage.open(storage_path, "rb") as source_file:
+        image = Image.open(source_file)
+        # JPEG 可在解码阶段按 1/2、1/4、1/8 缩小，大幅减少手机原图的解码时间与内存。
+        largest = max(REPORT_IMAGE_RENDITION_WIDTHS.values())
+        image.draft("RGB", (largest, largest))
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def _resize_to_width(image: Image.Image, width: int) -> Image.Image:
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+def generate_renditions(image_url: str) -> Dict[str, str]:
+    """
+    【功能说明】
+    - 读取本地存储中的原图，按 REPORT_IMAGE_RENDITION_WIDTHS 生成 JPEG 与 WebP 衍生版本并保存。
+
+    【参数说明】
+    - image_url: str，ReportImage.image_url（default_storage.url() 的返回值）。
+
+    【返回值说明】
+    - dict：版本名 → 访问地址，如 {"thumb": ..., "thumb_webp": ..., "medium": ..., "medium_webp": ...}；
+      外部地址返回空 dict。读取或解码失败时抛出 OSError / PIL.UnidentifiedImageError。
+    """
+    storage_path = _storage_path_for(image_url)
+    if not storage_path:
+        return {}
+    source = _load_source(storage_path)
+    stem = posixpath.splitext(storage_path)[0]
+    renditions: Dict[str, str] = {}
+    resized = source
+    # 从大到小逐级缩放：小图由上一级结果缩得，避免每次都从原图重采样。
+    for name, width in sorted(REPORT_IMAGE_RENDITION_WIDTHS.items(), key=lambda item: -item[1]):
+        resized = _resize_to_width(resized, width)
+        for image_format, extension, suffix, save_options in _RENDITION_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **save_options)
+            saved_path = default_storage.save(
+                f"{RENDITION_DIR}/{stem}_{name}.{extension}",
+                ContentFile(buffer.getvalue()),
+            )
+            renditions[f"{name}{suffix}"] = default_storage.url(saved_path)
+    return renditions
+
+
+def build_renditions_safely(image_url: str) -> Dict[str, str]:
+    """上传链路使用：生成失败只记录日志并返回空 dict，由补齐任务稍后重试。"""
+    try:
+        return generate_renditions(image_url)
+    except Exception:  # noqa: BLE001 - 衍生图失败不能阻断报告上传
+        logger.warning("report image rendition failed image_url=%s", image_url, exc_info=True)
+        return {}
+
+
+def discard_renditions(renditions: Dict[str, str]) -> None:
+    """删除未能入库的衍生版本文件（上传事务回滚时调用）；删除失败只记录日志。"""
+    for url in (renditions or {}).values():
+        storage_path = _storage_path_for(url) if isinstance(url, str) else None
+        if not storage_path:
+            continue
+        try:
+            default_storage.delete(storage_path)
+        except Exception:  # noqa: BLE001 - 清理失败不影响上传错误的返回
+            logger.warning("report image rendition cleanup failed path=%s", storage_path, exc_info=True)
+
+
+def backfill_report_image_renditions(after_id: int = 0, batch_size: int = 50) -> Tuple[int, Optional[int]]:
+    """
+    【功能说明】
+    - 按 id 顺序为尚未生成衍生版本的历史图片补齐 renditions，一次处理一批。
+    - 无法生成的图片写入 RENDITIONS_UNAVAILABLE，避免反复重试。
+
+    【参数说明】
+    - after_id: int，从该 id 之后开始扫描。
+    - batch_size: int，本批扫描的图片数量。
+
+    【返回值说明】
+    - (生成数量, 下一批起始 id)；已扫描到末尾时下一批起始 id 为 None。
+    """
+    rows = list(
+        ReportImage.objects.filter(id__gt=after_id)
+        .order_by("id")
+        .values_list("id", "image_url", "renditions")[:batch_size]
+    )
+    generated = 0
+    for image_id, image_url, renditions in rows:
+        if renditions:
+            continue
+        try:
+            result = generate_renditions(image_url) or RENDITIONS_UNAVAILABLE
+        except Exception:  # noqa: BLE001 - 单张失败不影响整批
+            logger.warning("report image rendition backfill failed image_id=%s", image_id, exc_info=True)
+            result = RENDITIONS_UNAVAILABLE
+        ReportImage.objects.filter(id=image_id).update(renditions=result)
+        generated += int(result is not RENDITIONS_UNAVAILABLE)
+    next_after_id = rows[-1][0] if len(rows) == batch_size else None
+    return generated, next_after_id
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime, timedelta
 import logging
 from typing import Iterable, List, Dict, Optional
 
@@ -12,18 +12,17 @@ from django.db import transaction
 from django.db.models import Q, Max
 from django.utils import timezone
 
-from core.models import CheckupLibrary
+from core.service.catalog import CatalogService
 from health_data.models import (
     AIParseStatus,
     ClinicalEvent,
-    HealthMetric,
-    MetricSource,
-    MetricType,
     ReportImage,
     ReportUpload,
     UploadSource,
     UploaderRole,
 )
+from health_data.services.archive_jobs import enqueue_archive_job, new_archive_job_id
+from health_data.services.report_renditions import build_renditions_safely, discard_renditions
 from users import choices as user_choices
 from users.models import CustomUser, DoctorProfile, PatientProfile
 
@@ -102,20 +101,6 @@ def _submit_ai_parse_tasks(image_ids: list[int]) -> None:
             )
 
 
-def _sync_ai_results_after_archive(image_ids: list[int]) -> None:
-    if not image_ids:
-        return
-
-    from health_data.services.checkup_results import sync_lab_results_from_ai_json
-
-    images = ReportImage.objects.select_related("upload", "checkup_item").filter(id__in=image_ids)
-    for image in images:
-        try:
-            sync_lab_results_from_ai_json(image)
-        except Exception:
-            logger.exception("report_image sync after archive failed image_id=%s", image.id)
-
-
 class ReportUploadService:
     """报告上传服务，负责上传批次与图片明细的创建/删除。"""
 
@@ -131,6 +116,9 @@ class ReportUploadService:
         """
         【功能说明】
         - 创建上传批次并写入图片明细。
+        - 全部图片校验通过后，在事务外为本地存储的图片生成缩略图/中图/WebP 衍生版本
+          （ReportImage.renditions）；生成失败不影响上传，由 backfill_report_image_renditions 任务补齐；
+          写库失败时删除已生成的衍生文件。
 
         【使用方法】
         - ReportUploadService.create_upload(patient, images, uploader=user)
@@ -184,44 +172,53 @@ class ReportUploadService:
 
         resolved_role = _resolve_uploader_role(uploader, uploader_role)
 
-        with transaction.atomic():
-            upload = ReportUpload.objects.create(
-                patient=patient,
-                upload_source=upload_source,
-                uploader=uploader,
-                uploader_role=resolved_role,
-                related_task=related_task,
+        prepared: List[Dict[str, object]] = []
+        for payload in normalized_images:
+            record_type = _coerce_record_type(payload.get("record_type"))
+            report_date = _ensure_report_date(payload.get("report_date"))
+            checkup_item = payload.get("checkup_item") or payload.get("checkup_item_id")
+
+            if record_type == ReportImage.RecordType.CHECKUP and not checkup_item:
+                if upload_source != UploadSource.CHECKUP_PLAN:
+                    raise ValidationError("复查图片必须指定复查项目。")
+            if record_type != ReportImage.RecordType.CHECKUP and checkup_item:
+                raise ValidationError("非复查类型不允许指定复查项目。")
+
+            if isinstance(checkup_item, int):
+                checkup_item = CatalogService.get_checkup_library(checkup_item)
+                if checkup_item is None:
+                    raise ValidationError("复查项目不存在。")
+
+            prepared.append(
+                {
+                    "image_url": payload["image_url"],
+                    "record_type": record_type,
+                    "checkup_item": checkup_item,
+                    "report_date": report_date,
+                }
             )
 
-            image_instances: List[ReportImage] = []
-            for payload in normalized_images:
-                record_type = _coerce_record_type(payload.get("record_type"))
-                report_date = _ensure_report_date(payload.get("report_date"))
-                checkup_item = payload.get("checkup_item") or payload.get("checkup_item_id")
+        # 衍生图解码/编码耗时较长，在全部校验通过后、事务外生成，避免长事务持有连接与行锁。
+        for item in prepared:
+            item["renditions"] = build_renditions_safely(item["image_url"])
 
-                if record_type == ReportImage.RecordType.CHECKUP and not checkup_item:
-                    if upload_source != UploadSource.CHECKUP_PLAN:
-                        raise ValidationError("复查图片必须指定复查项目。")
-                if record_type != ReportImage.RecordType.CHECKUP and checkup_item:
-                    raise ValidationError("非复查类型不允许指定复查项目。")
-
-                if isinstance(checkup_item, int):
-                    checkup_item = CheckupLibrary.objects.filter(id=checkup_item).first()
-                    if checkup_item is None:
-                        raise ValidationError("复查项目不存在。")
-
-                image_instances.append(
-                    ReportImage(
-                        upload=upload,
-                        image_url=payload["image_url"],
-                        record_type=record_type,
-                        checkup_item=checkup_item,
-                        report_date=report_date,
-                    )
+        try:
+            with transaction.atomic():
+                upload = ReportUpload.objects.create(
+                    patient=patient,
+                    upload_source=upload_source,
+                    uploader=uploader,
+                    uploader_role=resolved_role,
+                    related_task=related_task,
                 )
-
-            ReportImage.objects.bulk_create(image_instances)
-            return upload
+                ReportImage.objects.bulk_create(
+                    [ReportImage(upload=upload, **item) for item in prepared]
+                )
+        except Exception:
+            for item in prepared:
+                discard_renditions(item["renditions"])
+            raise
+        return upload
 
     @staticmethod
     def list_uploads(
@@ -382,17 +379,22 @@ class ReportUploadService:
 
         images_qs = (
             base_qs.filter(report_date__in=date_list)
-            .values("report_date", "image_url")
+            .values("report_date", "image_url", "renditions")
             .order_by("-report_date", "-id")
         )
         images_by_date = {d: [] for d in date_list}
+        thumbnails_by_date = {d: [] for d in date_list}
         for row in images_qs:
             images_by_date.setdefault(row["report_date"], []).append(row["image_url"])
+            thumbnails_by_date.setdefault(row["report_date"], []).append(
+                ReportImage.thumbnail_url_for(row["image_url"], row["renditions"])
+            )
 
         grouped = [
             {
                 "report_date": d.strftime("%Y-%m-%d"),
                 "image_urls": images_by_date.get(d, []),
+                "thumbnail_urls": thumbnails_by_date.get(d, []),
             }
             for d in date_list
         ]
@@ -578,10 +580,16 @@ class ReportArchiveService:
         archiver: DoctorProfile,
         updates: Iterable[Dict[str, object]],
         archiver_name: Optional[str] = None,
+        job_id: Optional[str] = None,
     ) -> int:
         """
         【功能说明】
         - 批量归档图片，自动绑定或创建诊疗记录。
+        - 请求内只提交归档状态；复查指标/任务联动与 AI 结构化结果同步在事务提交后
+          由后台任务执行，进度可通过 get_archive_job_status(job_id) 查询。
+
+        【参数说明】
+        - job_id: 可选，后台任务 ID；调用方需要轮询进度时预先生成并传入。
         """
         updates = list(updates)
         if not updates:
@@ -610,12 +618,12 @@ class ReportArchiveService:
                 for item in updates
                 if item.get("checkup_item_id")
             }
-            checkup_items = CheckupLibrary.objects.in_bulk(checkup_item_ids)
+            checkup_items = CatalogService.get_checkup_libraries_by_ids(checkup_item_ids)
 
             now = timezone.now()
             images_to_update: List[ReportImage] = []
             event_cache: Dict[tuple, ClinicalEvent] = {}
-            checkup_groups: Dict[tuple[int, date, int], List[ReportImage]] = {}
+            checkup_image_ids: list[int] = []
             ai_image_ids_to_enqueue: list[int] = []
             ai_synced_image_ids: list[int] = []
 
@@ -679,50 +687,9 @@ class ReportArchiveService:
                 images_to_update.append(image)
 
                 if record_type == ReportImage.RecordType.CHECKUP and checkup_item:
-                    group_key = (patient.id, report_date, checkup_item.id)
-                    checkup_groups.setdefault(group_key, []).append(image)
-
-            if checkup_groups:
-                from core.models import DailyTask
-                from core.models.choices import PlanItemCategory, TaskStatus
-
-                for (patient_id, report_date, checkup_item_id), images in checkup_groups.items():
-                    measured_at = datetime.combine(report_date, time.min)
-                    if timezone.is_aware(now) and timezone.is_naive(measured_at):
-                        measured_at = timezone.make_aware(
-                            measured_at, timezone.get_current_timezone()
-                        )
-
-                    metric = HealthMetric.objects.create(
-                        patient_id=patient_id,
-                        metric_type=MetricType.CHECKUP,
-                        source=MetricSource.MANUAL,
-                        measured_at=measured_at,
-                    )
-
-                    for image in images:
-                        image.health_metric = metric
-
-                    window_start = report_date - timedelta(days=6)
-                    task_qs = DailyTask.objects.filter(
-                        patient_id=patient_id,
-                        task_type=PlanItemCategory.CHECKUP,
-                        task_date__range=(window_start, report_date),
-                        status__in=[TaskStatus.PENDING, TaskStatus.NOT_STARTED],
-                    ).filter(
-                        Q(plan_item__template_id=checkup_item_id)
-                        | Q(interaction_payload__checkup_id=checkup_item_id)
-                    )
-                    task = task_qs.order_by("-task_date", "-id").first()
-                    if task:
-                        payload = task.interaction_payload or {}
-                        payload["health_metric_id"] = metric.id
-                        task.status = TaskStatus.COMPLETED
-                        task.completed_at = now
-                        task.interaction_payload = payload
-                        task.save(update_fields=["status", "completed_at", "interaction_payload"])
-                        metric.task_id = task.id
-                        metric.save(update_fields=["task_id"])
+                    # 重新归档的复查图片按新的日期/项目重新生成指标。
+                    image.health_metric = None
+                    checkup_image_ids.append(image.id)
 
             ReportImage.objects.bulk_update(
                 images_to_update,
@@ -744,10 +711,14 @@ class ReportArchiveService:
                 transaction.on_commit(
                     lambda image_ids=sorted(set(ai_image_ids_to_enqueue)): _submit_ai_parse_tasks(image_ids)
                 )
-            if ai_synced_image_ids:
-                transaction.on_commit(
-                    lambda image_ids=sorted(set(ai_synced_image_ids)): _sync_ai_results_after_archive(image_ids)
-                )
+            patient_ids = {image.upload.patient_id for image in image_map.values()}
+            enqueue_archive_job(
+                job_id or new_archive_job_id(),
+                checkup_image_ids=checkup_image_ids,
+                sync_image_ids=ai_synced_image_ids,
+                patient_id=patient_ids.pop() if len(patient_ids) == 1 else None,
+                doctor_id=getattr(archiver, "id", None),
+            )
 
             return len(images_to_update)
 
@@ -762,10 +733,12 @@ class ReportArchiveService:
         department_name: str = "",
         interpretation: str = "",
         uploader: Optional[CustomUser] = None,
+        job_id: Optional[str] = None,
     ) -> ClinicalEvent:
         """
         【功能说明】
         - 医生端新增诊疗记录：创建诊疗记录 + 上传批次 + 图片归档。
+        - 复查指标/任务联动同 archive_images，在事务提交后由后台任务执行。
         """
         normalized_images = _normalize_images(images)
         if not normalized_images:
@@ -826,7 +799,7 @@ class ReportArchiveService:
                     raise ValidationError("非复查类型不允许选择复查项目。")
 
                 if isinstance(checkup_item, int):
-                    checkup_item = CheckupLibrary.objects.filter(id=checkup_item).first()
+                    checkup_item = CatalogService.get_checkup_library(checkup_item)
                     if checkup_item is None:
                         raise ValidationError("复查项目不存在。")
 
@@ -845,60 +818,15 @@ class ReportArchiveService:
 
             ReportImage.objects.bulk_create(image_instances)
             if event_type == ReportImage.RecordType.CHECKUP:
-                from core.models import DailyTask
-                from core.models.choices import PlanItemCategory, TaskStatus
-
-                created_images = list(
-                    ReportImage.objects.filter(
+                enqueue_archive_job(
+                    job_id or new_archive_job_id(),
+                    checkup_image_ids=ReportImage.objects.filter(
                         upload=upload,
-                        record_type=event_type,
-                        report_date=event_date,
-                    )
+                        checkup_item__isnull=False,
+                    ).values_list("id", flat=True),
+                    patient_id=patient.id,
+                    doctor_id=getattr(created_by_doctor, "id", None),
                 )
-                images_by_checkup: Dict[int, List[ReportImage]] = {}
-                for image in created_images:
-                    if not image.checkup_item_id:
-                        continue
-                    images_by_checkup.setdefault(image.checkup_item_id, []).append(image)
-
-                for checkup_item_id, grouped_images in images_by_checkup.items():
-                    measured_at = datetime.combine(event_date, time.min)
-                    if timezone.is_aware(now) and timezone.is_naive(measured_at):
-                        measured_at = timezone.make_aware(
-                            measured_at, timezone.get_current_timezone()
-                        )
-
-                    metric = HealthMetric.objects.create(
-                        patient=patient,
-                        metric_type=MetricType.CHECKUP,
-                        source=MetricSource.MANUAL,
-                        measured_at=measured_at,
-                    )
-
-                    ReportImage.objects.filter(
-                        id__in=[img.id for img in grouped_images]
-                    ).update(health_metric=metric)
-
-                    window_start = event_date - timedelta(days=6)
-                    task_qs = DailyTask.objects.filter(
-                        patient=patient,
-                        task_type=PlanItemCategory.CHECKUP,
-                        task_date__range=(window_start, event_date),
-                        status__in=[TaskStatus.PENDING, TaskStatus.NOT_STARTED],
-                    ).filter(
-                        Q(plan_item__template_id=checkup_item_id)
-                        | Q(interaction_payload__checkup_id=checkup_item_id)
-                    )
-                    task = task_qs.order_by("-task_date", "-id").first()
-                    if task:
-                        payload = task.interaction_payload or {}
-                        payload["health_metric_id"] = metric.id
-                        task.status = TaskStatus.COMPLETED
-                        task.completed_at = now
-                        task.interaction_payload = payload
-                        task.save(update_fields=["status", "completed_at", "interaction_payload"])
-                        metric.task_id = task.id
-                        metric.save(update_fields=["task_id"])
 
             return event
 
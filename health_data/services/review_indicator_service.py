@@ -12,6 +12,7 @@
 from __future__ import annotations
 
 import calendar
+import copy
 import logging
 from datetime import date, timedelta
 
@@ -22,6 +23,7 @@ from core.models import (
     CheckupLibrary,
     StandardFieldValueType,
 )
+from core.service.catalog import get_or_build
 from health_data.models import CheckupResultValue
 from users.models import PatientProfile
 
@@ -41,7 +43,15 @@ def build_followup_review_catalog() -> tuple[list[dict], dict[int, dict], list[i
     - review_catalog：按检查项分组的字段列表，供配置弹窗渲染
     - mapping_meta：mapping_id -> 字段与检查项元信息
     - all_mapping_ids：全部有效 mapping_id
+
+    目录来自进程内快照（core.service.catalog），返回深拷贝，调用方可自由修改。
     """
+    return copy.deepcopy(
+        get_or_build("followup_review_catalog", _build_followup_review_catalog)
+    )
+
+
+def _build_followup_review_catalog() -> tuple[list[dict], dict[int, dict], list[int]]:
     review_mapping_qs = (
         CheckupFieldMapping.objects.filter(
             is_active=True,
@@ -0,0 +1,27 @@
+"""health_data 应用信号：补录历史数据后失效对应月份的统计快照。"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from chat.models import ConversationSession
+from health_data.models import ClinicalEvent, HealthMetric, QuestionnaireSubmission
+from health_data.services.monthly_stats import invalidate_patient_monthly_stat
+from patient_alerts.models import PatientAlert
+
+# 模型 -> 决定统计月份的时间字段
+MONTHLY_STAT_SOURCES = {
+    HealthMetric: "measured_at",
+    QuestionnaireSubmission: "created_at",
+    ClinicalEvent: "event_date",
+    PatientAlert: "event_time",
+    ConversationSession: "start_at",
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_monthly_stat_on_change(sender, instance, **kwargs):
+    field_name = MONTHLY_STAT_SOURCES.get(sender)
+    if field_name is None:
+        return
+    invalidate_patient_monthly_stat(instance.patient_id, getattr(instance, field_name, None))
@@ -1,3 +1,5 @@
+from datetime import date
+
 try:
     from celery import shared_task
 except ImportError:  # pragma: no cover - fallback for environments without celery installed
@@ -9,7 +11,10 @@ except ImportError:  # pragma: no cover - fallback for environments without cele
         return decorator
 
 from health_data.models import CheckupOrphanField, ReportImage
+from health_data.services.archive_jobs import run_archive_job
 from health_data.services.checkup_results import reprocess_orphan_fields, sync_lab_results_from_ai_json
+from health_data.services.monthly_stats import refresh_patient_monthly_stats
+from health_data.services.report_renditions import backfill_report_image_renditions
 
 
 @shared_task(name="health_data.sync_lab_results_from_ai_json")
@@ -27,3 +32,34 @@ def reprocess_orphan_fields_task(
     if orphan_ids:
         queryset = CheckupOrphanField.objects.filter(id__in=list(orphan_ids))
     return reprocess_orphan_fields(queryset=queryset, normalized_names=normalized_names)
+
+
+@shared_task(name="health_data.process_archive_job")
+def process_archive_job_task(
+    job_id: str,
+    checkup_image_ids: list[int],
+    sync_image_ids: list[int],
+) -> dict:
+    return run_archive_job(job_id, checkup_image_ids, sync_image_ids)
+
+
+@shared_task(name="health_data.refresh_patient_monthly_stats")
+def refresh_patient_monthly_stats_task(
+    month: str,
+    patient_ids: list[int] | None = None,
+    rebuild: bool = False,
+) -> int:
+    return refresh_patient_monthly_stats(
+        date.fromisoformat(month),
+        patient_ids=patient_ids,
+        rebuild=rebuild,
+    )
+
+
+@shared_task(name="health_data.backfill_report_image_renditions")
+def backfill_report_image_renditions_task(after_id: int = 0, batch_size: int = 50) -> int:
+    """补齐一批历史图片的衍生版本，未扫描完时以下一批起始 id 重新入队。"""
+    generated, next_after_id = backfill_report_image_renditions(after_id, batch_size)
+    if next_after_id is not None:
+        backfill_report_image_renditions_task.delay(next_after_id, batch_size)
+    return generated
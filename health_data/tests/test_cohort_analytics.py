@@ -0,0 +1,179 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import DailyTask
+from core.models import choices as core_choices
+from health_data.models import HealthMetric, MetricType, PatientMetricMonthlyStat
+from health_data.services.cohort_analytics import (
+    COHORT_SCOPE_DOCTOR,
+    COHORT_SCOPE_SALES,
+    COHORT_SCOPE_STUDIO,
+    build_cohort_analytics,
+)
+from health_data.services.monthly_stats import refresh_patient_monthly_stats
+from patient_alerts.models import AlertEventType, AlertLevel, AlertStatus, PatientAlert
+from users import choices
+from users.models import CustomUser, DoctorProfile, DoctorStudio, PatientProfile, SalesProfile
+
+MONTH = date(2025, 2, 1)
+
+
+def _aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class CohortAnalyticsTests(TestCase):
+    def setUp(self):
+        self.doctor = self._create_doctor("13800000341", "人群医生")
+        self.other_doctor = self._create_doctor("13800000342", "其他医生")
+        self.studio = DoctorStudio.objects.create(
+            name="人群工作室", code="STU034", owner_doctor=self.doctor
+        )
+        DoctorProfile.objects.filter(pk=self.doctor.pk).update(studio=self.studio)
+        sales_user = CustomUser.objects.create_user(
+            user_type=choices.UserType.SALES, phone="13800000343", wx_nickname="销售"
+        )
+        self.sales = SalesProfile.objects.create(user=sales_user, name="人群销售")
+
+        # (用药完成数, 用药任务数, 血氧均值)
+        fixtures = [(1, 4, "96"), (2, 4, "97"), (3, 4, "92"), (4, 4, "85")]
+        self.patients = []
+        for index, (completed, total, spo2) in enumerate(fixtures):
+            patient = PatientProfile.objects.create(
+                phone=f"1390000034{index}",
+                name=f"人群患者{index}",
+                doctor=self.doctor,
+                sales=self.sales if index < 2 else None,
+            )
+            self.patients.append(patient)
+            for day in range(total):
+                DailyTask.objects.create(
+                    patient=patient,
+                    task_date=date(2025, 2, day + 1),
+                    task_type=core_choices.PlanItemCategory.MEDICATION,
+                    title="用药",
+                    status=(
+                        core_choices.TaskStatus.COMPLETED
+                        if day < completed
+                        else core_choices.TaskStatus.PENDING
+                    ),
+                )
+            HealthMetric.objects.create(
+                patient=patient,
+                metric_type=MetricType.BLOOD_OXYGEN,
+                value_main=Decimal(spo2),
+                measured_at=_aware(2025, 2, 10, 8, 0),
+            )
+        outsider = PatientProfile.objects.create(
+            phone="13900000349", name="其他患者", doctor=self.other_doctor
+        )
+        HealthMetric.objects.create(
+            patient=outsider,
+            metric_type=MetricType.BLOOD_OXYGEN,
+            value_main=Decimal("80"),
+            measured_at=_aware(2025, 2, 10, 8, 0),
+        )
+
+        for patient, level in (
+            (self.patients[0], AlertLevel.MILD),
+            (self.patients[0], AlertLevel.SEVERE),
+            (self.patients[1], AlertLevel.MILD),
+            (outsider, AlertLevel.MILD),
+        ):
+            PatientAlert.objects.create(
+                patient=patient,
+                event_type=AlertEventType.DATA,
+                event_level=level,
+                event_title="血氧偏低",
+                event_time=_aware(2025, 2, 12, 10, 0),
+                status=AlertStatus.PENDING,
+            )
+        PatientProfile.objects.update(created_at=_aware(2025, 1, 1, 8, 0))
+        refresh_patient_monthly_stats(MONTH)
+
+    def _create_doctor(self, phone, name):
+        user = CustomUser.objects.create_user(
+            user_type=choices.UserType.DOCTOR, phone=phone, wx_nickname=name
+        )
+        return DoctorProfile.objects.create(user=user, name=name, hospital="测试医院")
+
+    def test_doctor_panel_aggregates_adherence_alerts_and_metrics(self):
+        result = build_cohort_analytics(COHORT_SCOPE_DOCTOR, self.doctor.id, date(2025, 2, 15))
+
+        self.assertEqual(result["patient_count"], 4)
+        self.assertEqual(result["snapshot_patient_count"], 4)
+
+        medication = result["adherence"]["medication"]
+        self.assertEqual(medication["histogram"], {25: 1, 50: 1, 75: 1, 100: 1})
+        self.assertEqual(medication["percentiles"][50], 50)
+        self.assertEqual(medication["percentiles"][90], 100)
+        self.assertEqual(medication["mean_percent"], 62.5)
+        self.assertEqual(result["adherence"]["monitoring"]["patient_count"], 0)
+        self.assertIsNone(result["adherence"]["monitoring"]["percentiles"][50])
+
+        self.assertEqual(result["alerts"]["alert_count"], 3)
+        self.assertEqual(result["alerts"]["patient_count"], 2)
+        self.assertEqual(
+            result["alerts"]["by_type_level"],
+            [
+                {
+                    "event_type": AlertEventType.DATA,
+                    "event_level": AlertLevel.MILD,
+                    "alert_count": 2,
+                    "patient_count": 2,
+                },
+                {
+                    "event_type": AlertEventType.DATA,
+                    "event_level": AlertLevel.SEVERE,
+                    "alert_count": 1,
+                    "patient_count": 1,
+                },
+            ],
+        )
+
+        spo2 = result["metric_histograms"][MetricType.BLOOD_OXYGEN]
+        self.assertEqual(spo2["patient_count"], 4)
+        counts = dict(zip(spo2["labels"], spo2["counts"]))
+        self.assertEqual(counts["<88"], 1)
+        self.assertEqual(counts["92-93"], 1)
+        self.assertEqual(counts["96-97"], 1)
+        self.assertEqual(counts["97-98"], 1)
+
+    def test_studio_and_sales_scopes_filter_patients(self):
+        studio = build_cohort_analytics(COHORT_SCOPE_STUDIO, self.studio.id, MONTH)
+        sales = build_cohort_analytics(
+            COHORT_SCOPE_SALES,
+            self.sales.id,
+            MONTH,
+            metric_types=[MetricType.BLOOD_OXYGEN],
+        )
+
+        self.assertEqual(studio["patient_count"], 4)
+        self.assertEqual(sales["patient_count"], 2)
+        self.assertEqual(sales["adherence"]["medication"]["histogram"], {25: 1, 50: 1})
+        self.assertEqual(sales["alerts"]["alert_count"], 3)
+        self.assertEqual(list(sales["metric_histograms"]), [MetricType.BLOOD_OXYGEN])
+
+    def test_metric_snapshots_follow_monthly_invalidation(self):
+        self.assertEqual(PatientMetricMonthlyStat.objects.filter(month=MONTH).count(), 5)
+
+        HealthMetric.objects.create(
+            patient=self.patients[0],
+            metric_type=MetricType.BLOOD_OXYGEN,
+            value_main=Decimal("98"),
+            measured_at=_aware(2025, 2, 20, 8, 0),
+        )
+        self.assertFalse(
+            PatientMetricMonthlyStat.objects.filter(patient=self.patients[0], month=MONTH).exists()
+        )
+
+        refresh_patient_monthly_stats(MONTH)
+        row = PatientMetricMonthlyStat.objects.get(patient=self.patients[0], month=MONTH)
+        self.assertEqual((row.reading_count, row.value_avg), (2, Decimal("97.00")))
+
+    def test_unknown_scope_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_cohort_analytics("hospital", 1, MONTH)
@@ -0,0 +1,124 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Questionnaire
+from health_data.models import HealthMetric, MetricType, QuestionnaireSubmission
+from health_data.services.data_export import (
+    get_export_dataset,
+    iter_export_batches,
+    pseudonymize_patient_id,
+    stream_csv,
+)
+from users.models import PatientProfile
+
+
+def _aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class HealthDataExportTests(TestCase):
+    def setUp(self):
+        self.patient = PatientProfile.objects.create(phone="13800000351", name="导出患者")
+        self.other = PatientProfile.objects.create(phone="13800000352", name="其他患者")
+        for day in range(1, 6):
+            HealthMetric.objects.create(
+                patient=self.patient,
+                metric_type=MetricType.BLOOD_OXYGEN,
+                value_main=Decimal("95") + day,
+                measured_at=_aware(2025, 3, day, 8, 0),
+            )
+        HealthMetric.objects.create(
+            patient=self.patient,
+            metric_type=MetricType.HEART_RATE,
+            value_main=Decimal("72"),
+            measured_at=_aware(2025, 3, 2, 8, 0),
+        )
+        HealthMetric.objects.create(
+            patient=self.other,
+            metric_type=MetricType.BLOOD_OXYGEN,
+            value_main=Decimal("90"),
+            measured_at=_aware(2025, 3, 2, 8, 0),
+        )
+
+    def test_keyset_batches_cover_filtered_rows_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            batches = list(
+                iter_export_batches(
+                    "health_metrics",
+                    patient_ids=[self.patient.id],
+                    start_date=date(2025, 3, 2),
+                    end_date=date(2025, 3, 5),
+                    metric_types=[MetricType.BLOOD_OXYGEN],
+                    chunk_size=2,
+                )
+            )
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2])
+        ids = [row[0] for batch in batches for row in batch]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 4)
+        # 两个满页 + 一次确认末页为空的查询。
+        self.assertEqual(len(queries), 3)
+        self.assertIn(f"> {ids[1]}", queries[1]["sql"])
+
+    def test_csv_stream_and_pseudonymization(self):
+        content = "".join(stream_csv("health_metrics", pseudonymize=True, pseudonym_salt="s1"))
+        rows = list(csv.reader(io.StringIO(content)))
+
+        self.assertEqual(rows[0][:2], ["id", "patient_pseudonym"])
+        self.assertEqual(len(rows), 8)
+        pseudonyms = {row[1] for row in rows[1:]}
+        self.assertEqual(
+            pseudonyms,
+            {pseudonymize_patient_id(self.patient.id, "s1"), pseudonymize_patient_id(self.other.id, "s1")},
+        )
+        self.assertNotIn(str(self.patient.id), pseudonyms)
+        self.assertNotEqual(
+            pseudonymize_patient_id(self.patient.id, "s1"),
+            pseudonymize_patient_id(self.patient.id, "s2"),
+        )
+
+    def test_free_text_columns_dropped_when_pseudonymized(self):
+        questionnaire = Questionnaire.objects.create(code="Q_EXPORT", name="导出问卷")
+        QuestionnaireSubmission.objects.create(patient=self.patient, questionnaire=questionnaire)
+
+        header = next(csv.reader(io.StringIO(next(stream_csv("questionnaire_answers", pseudonymize=True)))))
+        self.assertNotIn("value_text", header)
+        self.assertIn("value_text", [column.name for column in get_export_dataset("questionnaire_answers").columns])
+
+        submissions = list(csv.reader(io.StringIO("".join(stream_csv("questionnaire_submissions")))))
+        self.assertEqual(submissions[1][1:3], [str(self.patient.id), "Q_EXPORT"])
+
+    def test_metric_type_filter_rejected_for_other_datasets(self):
+        with self.assertRaises(ValueError):
+            list(iter_export_batches("daily_tasks", metric_types=[MetricType.BLOOD_OXYGEN]))
+
+    def test_command_writes_csv_to_stdout(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "export_health_data",
+            "health_metrics",
+            "--patient-ids",
+            str(self.other.id),
+            "--chunk-size",
+            "1",
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        rows = list(csv.reader(io.StringIO(stdout.getvalue())))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2:5], [MetricType.BLOOD_OXYGEN, "device", "90.00"])
+        self.assertIn("Exported 1 health_metrics row(s).", stderr.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("export_health_data", "health_metrics", "--format", "parquet")
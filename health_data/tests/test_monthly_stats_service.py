@@ -0,0 +1,141 @@
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import DailyTask, Questionnaire
+from core.models import choices as core_choices
+from health_data.models import (
+    ClinicalEvent,
+    HealthMetric,
+    MetricType,
+    PatientMonthlyStat,
+    QuestionnaireSubmission,
+)
+from health_data.services import monthly_stats
+from health_data.services.monthly_stats import (
+    build_patient_stats,
+    collect_patient_stats,
+    refresh_patient_monthly_stats,
+    resolve_months_to_refresh,
+)
+from patient_alerts.models import AlertEventType, AlertLevel, AlertStatus, PatientAlert
+from users.models import PatientProfile
+
+
+def _aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class PatientMonthlyStatsServiceTests(TestCase):
+    def setUp(self):
+        self.patient = PatientProfile.objects.create(phone="13800000033", name="月度统计患者")
+        PatientProfile.objects.filter(pk=self.patient.pk).update(created_at=_aware(2024, 12, 1, 8, 0))
+        questionnaire = Questionnaire.objects.create(code="Q_MONTHLY_STATS", name="月度问卷")
+
+        for measured_at in (
+            _aware(2025, 1, 10, 8, 0),
+            _aware(2025, 1, 20, 8, 0),
+            _aware(2025, 2, 3, 8, 0),
+            _aware(2025, 3, 5, 8, 0),
+        ):
+            HealthMetric.objects.create(
+                patient=self.patient,
+                metric_type=MetricType.BLOOD_PRESSURE,
+                measured_at=measured_at,
+            )
+        HealthMetric.objects.create(
+            patient=self.patient,
+            metric_type=MetricType.USE_MEDICATED,
+            measured_at=_aware(2025, 2, 14, 9, 0),
+        )
+        submission = QuestionnaireSubmission.objects.create(
+            patient=self.patient,
+            questionnaire=questionnaire,
+        )
+        QuestionnaireSubmission.objects.filter(pk=submission.pk).update(
+            created_at=_aware(2025, 2, 10, 9, 0)
+        )
+        ClinicalEvent.objects.create(patient=self.patient, event_date=date(2025, 2, 11), event_type=3)
+        PatientAlert.objects.create(
+            patient=self.patient,
+            event_type=AlertEventType.DATA,
+            event_level=AlertLevel.MILD,
+            event_title="血压异常",
+            event_time=_aware(2025, 2, 12, 10, 0),
+            status=AlertStatus.PENDING,
+        )
+        for offset, status in enumerate(
+            (core_choices.TaskStatus.COMPLETED, core_choices.TaskStatus.PENDING)
+        ):
+            DailyTask.objects.create(
+                patient=self.patient,
+                task_date=date(2025, 2, 1) + timedelta(days=offset),
+                task_type=core_choices.PlanItemCategory.MEDICATION,
+                title="用药",
+                status=status,
+            )
+        # 建数过程中触发的快照失效在此之后无关，清空重来。
+        PatientMonthlyStat.objects.all().delete()
+
+    def test_refresh_writes_only_missing_snapshots(self):
+        self.assertEqual(refresh_patient_monthly_stats(date(2025, 2, 1)), 1)
+        self.assertEqual(refresh_patient_monthly_stats(date(2025, 2, 1)), 0)
+        self.assertEqual(refresh_patient_monthly_stats(date(2025, 2, 1), rebuild=True), 1)
+
+        row = PatientMonthlyStat.objects.get(patient=self.patient, month=date(2025, 2, 1))
+        self.assertEqual(
+            row.metric_upload_counts,
+            {MetricType.BLOOD_PRESSURE: 1, MetricType.USE_MEDICATED: 1},
+        )
+        self.assertEqual(sum(row.questionnaire_counts.values()), 1)
+        self.assertEqual(row.clinical_event_counts, {"3": 1})
+        self.assertEqual(row.alert_counts, {AlertEventType.DATA: 1})
+        self.assertEqual((row.medication_task_total, row.medication_task_completed), (2, 1))
+
+    def test_refresh_rejects_open_month(self):
+        with self.assertRaises(ValueError):
+            refresh_patient_monthly_stats(timezone.localdate())
+
+    def test_snapshot_and_live_segments_match_full_live_aggregation(self):
+        start_date, end_date = date(2025, 1, 15), date(2025, 3, 20)
+        expected = collect_patient_stats([self.patient.id], start_date, end_date)[self.patient.id]
+
+        refresh_patient_monthly_stats(date(2025, 2, 1))
+        with patch.object(
+            monthly_stats,
+            "collect_patient_stats",
+            wraps=monthly_stats.collect_patient_stats,
+        ) as live:
+            merged = build_patient_stats(self.patient, start_date, end_date)
+
+        self.assertEqual(merged, expected)
+        # 二月读快照，只实时计算一月下半月与三月上旬。
+        self.assertEqual(
+            [call.args[1:3] for call in live.call_args_list],
+            [(date(2025, 1, 15), date(2025, 1, 31)), (date(2025, 3, 1), date(2025, 3, 20))],
+        )
+
+    def test_backdated_metric_invalidates_closed_month_snapshot(self):
+        refresh_patient_monthly_stats(date(2025, 2, 1))
+
+        HealthMetric.objects.create(
+            patient=self.patient,
+            metric_type=MetricType.BLOOD_PRESSURE,
+            measured_at=_aware(2025, 2, 20, 8, 0),
+        )
+
+        self.assertFalse(
+            PatientMonthlyStat.objects.filter(patient=self.patient, month=date(2025, 2, 1)).exists()
+        )
+        stats = build_patient_stats(self.patient, date(2025, 2, 1), date(2025, 2, 28))
+        self.assertEqual(stats.metric_uploads["2025-02"][MetricType.BLOOD_PRESSURE], 2)
+
+    def test_resolve_months_rechecks_previous_month_early_in_month(self):
+        months = resolve_months_to_refresh(date(2025, 4, 3), since=date(2025, 2, 1))
+        self.assertEqual(months, [(date(2025, 2, 1), False), (date(2025, 3, 1), True)])
+
+        months = resolve_months_to_refresh(date(2025, 4, 20))
+        self.assertEqual(len(months), monthly_stats.MONTHLY_STATS_LOOKBACK_MONTHS)
+        self.assertEqual(months[-1], (date(2025, 3, 1), False))
@@ -1,8 +1,11 @@
 from datetime import date, datetime
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from core.models import (
@@ -14,6 +17,7 @@ from core.models import (
     choices,
 )
 from core.models.choices import QuestionType
+from core.service.catalog import bump_catalog_version, clear_local_catalog_cache
 from health_data.models import (
     HealthMetric,
     MetricSource,
@@ -182,6 +186,29 @@ class QuestionnaireSubmissionServiceTest(TestCase):
         self.assertEqual(metric.value_main, Decimal("5"))
         self.assertEqual(metric.source, MetricSource.MANUAL)
 
+    def test_grading_failure_keeps_submission_and_metric(self):
+        """分级计算抛出非预期异常时只记录日志，提交与总分指标照常保存。"""
+        answers_data = [
+            {"option_id": self.q1_opt2.id},
+            {"option_id": self.q2_opt1.id},
+        ]
+
+        with patch.object(
+            QuestionnaireSubmissionService,
+            "_build_grade_result",
+            side_effect=RuntimeError("grading bug"),
+        ), self.assertLogs("health_data.services.questionnaire_submission", level="ERROR"):
+            submission = QuestionnaireSubmissionService.submit_questionnaire(
+                patient_id=self.patient.id,
+                questionnaire_id=self.questionnaire.id,
+                answers_data=answers_data,
+            )
+
+        self.assertTrue(QuestionnaireSubmission.objects.filter(pk=submission.pk).exists())
+        self.assertTrue(
+            HealthMetric.objects.filter(questionnaire_submission=submission).exists()
+        )
+
     def test_submit_ordinary_text_answer_saves_text_without_adding_score(self):
         text_question = QuestionnaireQuestion.objects.create(
             questionnaire=self.questionnaire,
@@ -266,6 +293,77 @@ class QuestionnaireSubmissionServiceTest(TestCase):
 
         self.assertEqual(QuestionnaireSubmission.objects.count(), 0)
 
+    def test_submit_reads_questionnaire_graph_from_catalog_cache(self):
+        # 模拟题目配置已提交：之后的提交不再查询问卷、题目与选项。
+        bump_catalog_version()
+        self.addCleanup(clear_local_catalog_cache)
+        answers_data = [
+            {"option_id": self.q1_opt1.id},
+            {"option_id": self.q2_opt2.id},
+        ]
+        QuestionnaireSubmissionService.submit_questionnaire(
+            patient_id=self.patient.id,
+            questionnaire_id=self.questionnaire.id,
+            answers_data=answers_data,
+        )
+
+        other_patient = PatientProfile.objects.create(phone="13800000029", name="测试患者2")
+        with CaptureQueriesContext(connection) as ctx:
+            submission = QuestionnaireSubmissionService.submit_questionnaire(
+                patient_id=other_patient.id,
+                questionnaire_id=self.questionnaire.id,
+                answers_data=answers_data,
+            )
+
+        catalog_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if "core_questionnaire" in query["sql"]
+        ]
+        submission_writes = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if "health_questionnaire_" in query["sql"]
+            and not query["sql"].lstrip().upper().startswith("SELECT")
+        ]
+        self.assertEqual(catalog_queries, [])
+        # 提交记录一次 INSERT，答案一次批量 INSERT。
+        self.assertEqual(len(submission_writes), 2)
+        self.assertEqual(submission.total_score, Decimal("5"))
+        self.assertEqual(submission.answers.count(), 2)
+
+    def test_option_from_other_questionnaire_is_rejected(self):
+        other = Questionnaire.objects.create(name="其它问卷", code="Q_OTHER")
+        other_question = QuestionnaireQuestion.objects.create(
+            questionnaire=other,
+            text="其它问题",
+            seq=1,
+        )
+        other_option = QuestionnaireOption.objects.create(
+            question=other_question,
+            text="其它选项",
+            score=Decimal("1"),
+        )
+
+        with self.assertRaisesMessage(ValidationError, "不属于该问卷"):
+            QuestionnaireSubmissionService.submit_questionnaire(
+                patient_id=self.patient.id,
+                questionnaire_id=self.questionnaire.id,
+                answers_data=[
+                    {"option_id": self.q1_opt1.id},
+                    {"option_id": other_option.id},
+                ],
+            )
+        with self.assertRaisesMessage(ValidationError, "存在无效的选项"):
+            QuestionnaireSubmissionService.submit_questionnaire(
+                patient_id=self.patient.id,
+                questionnaire_id=self.questionnaire.id,
+                answers_data=[
+                    {"option_id": self.q1_opt1.id},
+                    {"option_id": other_option.id + 1000},
+                ],
+            )
+
     def test_get_submission_dates_returns_unique_dates_desc(self):
         """
         查询提交日期：同一天只保留一次，且最近日期排在最前。
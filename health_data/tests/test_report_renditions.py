@@ -0,0 +1,114 @@
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from health_data.models import ReportImage, ReportUpload
+from health_data.services.report_renditions import (
+    RENDITIONS_UNAVAILABLE,
+    backfill_report_image_renditions,
+)
+from health_data.services.report_service import ReportUploadService
+from users import choices as user_choices
+from users.models import CustomUser, PatientProfile
+
+
+class ReportImageRenditionTests(TestCase):
+    def setUp(self):
+        media_dir = TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_dir.name, MEDIA_URL="/media/")
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        user = CustomUser.objects.create_user(
+            user_type=user_choices.UserType.PATIENT,
+            wx_openid="wx_rendition_patient",
+        )
+        self.patient = PatientProfile.objects.create(user=user, name="患者R", phone="13900000043")
+
+    def _save_photo(self, name="reports/photo.jpg", size=(2000, 1500)):
+        buffer = BytesIO()
+        Image.new("RGB", size, (200, 80, 40)).save(buffer, "JPEG")
+        return default_storage.url(default_storage.save(name, ContentFile(buffer.getvalue())))
+
+    def _rendition_width(self, url):
+        path = url[len("/media/"):]
+        with default_storage.open(path, "rb") as handle:
+            return Image.open(handle).width
+
+    def test_create_upload_generates_thumb_and_medium_renditions(self):
+        image_url = self._save_photo()
+
+        upload = ReportUploadService.create_upload(self.patient, [{"image_url": image_url}])
+
+        image = upload.images.get()
+        self.assertEqual(
+            set(image.renditions), {"thumb", "thumb_webp", "medium", "medium_webp"}
+        )
+        self.assertEqual(self._rendition_width(image.renditions["thumb"]), 480)
+        self.assertEqual(self._rendition_width(image.renditions["medium_webp"]), 1280)
+        self.assertEqual(image.thumbnail_url, image.renditions["thumb"])
+        self.assertIn(f"{image.renditions['medium']} 1280w", image.srcset)
+        self.assertIn(f"{image.renditions['thumb_webp']} 480w", image.webp_srcset)
+
+    def test_create_upload_keeps_original_for_remote_or_broken_images(self):
+        upload = ReportUploadService.create_upload(
+            self.patient,
+            ["https://example.com/a.png", "/media/reports/missing.jpg"],
+        )
+
+        for image in upload.images.all():
+            self.assertEqual(image.renditions, {})
+            self.assertEqual(image.thumbnail_url, image.image_url)
+            self.assertEqual(image.srcset, "")
+
+    def test_invalid_image_fails_before_any_rendition_is_built(self):
+        image_url = self._save_photo()
+
+        with patch("health_data.services.report_service.build_renditions_safely") as build:
+            with self.assertRaises(ValidationError):
+                ReportUploadService.create_upload(
+                    self.patient,
+                    [{"image_url": image_url}, {"image_url": image_url, "checkup_item_id": 1}],
+                )
+
+        build.assert_not_called()
+        self.assertFalse(ReportUpload.objects.filter(patient=self.patient).exists())
+
+    def test_failed_insert_removes_generated_renditions(self):
+        image_url = self._save_photo()
+
+        with patch.object(ReportImage.objects, "bulk_create", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                ReportUploadService.create_upload(self.patient, [{"image_url": image_url}])
+
+        self.assertFalse(ReportUpload.objects.filter(patient=self.patient).exists())
+        _, rendition_files = default_storage.listdir("renditions/reports")
+        self.assertEqual(rendition_files, [])
+
+    def test_backfill_generates_missing_and_marks_unavailable(self):
+        upload = ReportUpload.objects.create(patient=self.patient)
+        local = ReportImage.objects.create(upload=upload, image_url=self._save_photo())
+        remote = ReportImage.objects.create(upload=upload, image_url="https://example.com/b.png")
+        done = ReportImage.objects.create(
+            upload=upload, image_url="https://example.com/c.png", renditions={"thumb": "/media/x.jpg"}
+        )
+
+        generated, next_after_id = backfill_report_image_renditions(after_id=0, batch_size=2)
+        self.assertEqual((generated, next_after_id), (1, remote.id))
+        generated, next_after_id = backfill_report_image_renditions(after_id=next_after_id, batch_size=2)
+        self.assertEqual((generated, next_after_id), (0, None))
+
+        local.refresh_from_db()
+        remote.refresh_from_db()
+        done.refresh_from_db()
+        self.assertIn("thumb", local.renditions)
+        self.assertEqual(remote.renditions, RENDITIONS_UNAVAILABLE)
+        self.assertEqual(remote.thumbnail_url, remote.image_url)
+        self.assertEqual(done.renditions, {"thumb": "/media/x.jpg"})
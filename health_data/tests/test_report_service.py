@@ -1,5 +1,5 @@
 from datetime import date, datetime, timedelta
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from django.core.exceptions import ValidationError
 from django.db import connection
@@ -18,6 +18,7 @@ from health_data.models import (
     UploadSource,
     UploaderRole,
 )
+from health_data.services.archive_jobs import get_archive_job_status, run_archive_job
 from health_data.services.report_service import ReportArchiveService, ReportUploadService
 from users import choices as user_choices
 from users.models import CustomUser, DoctorProfile, PatientProfile
@@ -791,9 +792,9 @@ class ReportServiceTest(TestCase):
         self.assertEqual(image.ai_error_message, "")
         self.assertIsNone(image.ai_parsed_at)
 
-    @patch("health_data.services.report_service._sync_ai_results_after_archive")
+    @patch("health_data.tasks.process_archive_job_task.delay")
     @patch("ai_vision.tasks.extract_report_image_task.delay")
-    def test_archive_images_does_not_reenqueue_successful_ai_parse(self, mock_delay, mock_sync):
+    def test_archive_images_does_not_reenqueue_successful_ai_parse(self, mock_delay, mock_job_delay):
         upload = self._create_upload(images=["https://example.com/a.png"])
         image = upload.images.first()
         image.ai_parse_status = AIParseStatus.SUCCESS
@@ -813,7 +814,7 @@ class ReportServiceTest(TestCase):
 
         self.assertEqual(updated, 1)
         mock_delay.assert_not_called()
-        mock_sync.assert_called_once_with([image.id])
+        mock_job_delay.assert_called_once_with(ANY, [], [image.id])
         image.refresh_from_db()
         self.assertEqual(image.ai_parse_status, AIParseStatus.SUCCESS)
         self.assertEqual(image.ai_structured_json, {"is_medical_report": True, "items": []})
@@ -867,7 +868,8 @@ class ReportServiceTest(TestCase):
         self.assertIn("redis down", image.ai_error_message)
         self.assertIsNotNone(image.ai_parsed_at)
 
-    def test_archive_images_creates_checkup_metric_and_matches_task(self):
+    @patch("health_data.tasks.process_archive_job_task.delay", side_effect=run_archive_job)
+    def test_archive_images_creates_checkup_metric_and_matches_task(self, _mock_delay):
         upload = self._create_upload(images=["https://example.com/a.png"])
         image = upload.images.first()
         report_date = timezone.localdate()
@@ -887,7 +889,8 @@ class ReportServiceTest(TestCase):
                 "checkup_item_id": self.checkup_item.id,
             }
         ]
-        updated = ReportArchiveService.archive_images(self.doctor_profile, updates)
+        with self.captureOnCommitCallbacks(execute=True):
+            updated = ReportArchiveService.archive_images(self.doctor_profile, updates)
         self.assertEqual(updated, 1)
 
         metric = HealthMetric.objects.filter(
@@ -903,6 +906,67 @@ class ReportServiceTest(TestCase):
         self.assertEqual(task.status, TaskStatus.COMPLETED)
         self.assertEqual(task.interaction_payload.get("health_metric_id"), metric.id)
 
+    @patch("health_data.tasks.process_archive_job_task.delay")
+    def test_archive_images_defers_checkup_side_effects_until_job_runs(self, mock_job_delay):
+        upload = self._create_upload(images=["https://example.com/a.png"])
+        image = upload.images.first()
+        updates = [
+            {
+                "image_id": image.id,
+                "record_type": ReportImage.RecordType.CHECKUP,
+                "report_date": date(2025, 2, 1),
+                "checkup_item_id": self.checkup_item.id,
+            }
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReportArchiveService.archive_images(self.doctor_profile, updates, job_id="job-1")
+
+        mock_job_delay.assert_called_once_with("job-1", [image.id], [])
+        self.assertFalse(HealthMetric.objects.filter(patient=self.patient).exists())
+        self.assertEqual(get_archive_job_status("job-1")["status"], "pending")
+
+        # 任务重试时不会重复生成指标。
+        run_archive_job("job-1", [image.id], [])
+        run_archive_job("job-1", [image.id], [])
+        self.assertEqual(
+            HealthMetric.objects.filter(patient=self.patient, metric_type=MetricType.CHECKUP).count(),
+            1,
+        )
+        self.assertEqual(
+            get_archive_job_status("job-1"),
+            {
+                "patient_id": self.patient.id,
+                "doctor_id": self.doctor_profile.id,
+                "status": "success",
+                "total": 1,
+                "done": 1,
+                "failed_image_ids": [],
+            },
+        )
+
+    @patch(
+        "health_data.tasks.process_archive_job_task.delay",
+        side_effect=RuntimeError("redis down"),
+    )
+    def test_archive_job_runs_inline_when_enqueue_fails(self, _mock_delay):
+        upload = self._create_upload(images=["https://example.com/a.png"])
+        image = upload.images.first()
+        updates = [
+            {
+                "image_id": image.id,
+                "record_type": ReportImage.RecordType.CHECKUP,
+                "report_date": date(2025, 2, 1),
+                "checkup_item_id": self.checkup_item.id,
+            }
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReportArchiveService.archive_images(self.doctor_profile, updates)
+
+        image.refresh_from_db()
+        self.assertIsNotNone(image.health_metric_id)
+
     def test_archive_images_sets_archiver_name(self):
         upload = self._create_upload(images=["https://example.com/a.png"])
         image = upload.images.first()
@@ -965,20 +1029,22 @@ class ReportServiceTest(TestCase):
                 ],
             )
 
-    def test_create_record_with_images(self):
-        event = ReportArchiveService.create_record_with_images(
-            patient=self.patient,
-            created_by_doctor=self.doctor_profile,
-            event_type=ReportImage.RecordType.CHECKUP,
-            event_date=date(2025, 3, 1),
-            images=[
-                {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
-                {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
-            ],
-            hospital_name="医院A",
-            department_name="肿瘤科",
-            interpretation="备注",
-        )
+    @patch("health_data.tasks.process_archive_job_task.delay", side_effect=run_archive_job)
+    def test_create_record_with_images(self, _mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = ReportArchiveService.create_record_with_images(
+                patient=self.patient,
+                created_by_doctor=self.doctor_profile,
+                event_type=ReportImage.RecordType.CHECKUP,
+                event_date=date(2025, 3, 1),
+                images=[
+                    {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
+                    {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
+                ],
+                hospital_name="医院A",
+                department_name="肿瘤科",
+                interpretation="备注",
+            )
         self.assertEqual(event.patient, self.patient)
         self.assertEqual(event.hospital_name, "医院A")
         self.assertEqual(event.interpretation, "备注")
@@ -996,7 +1062,8 @@ class ReportServiceTest(TestCase):
         self.assertIsNone(metric.task_id)
         self.assertTrue(images.filter(health_metric=metric).exists())
 
-    def test_create_record_with_images_matches_task(self):
+    @patch("health_data.tasks.process_archive_job_task.delay", side_effect=run_archive_job)
+    def test_create_record_with_images_matches_task(self, _mock_delay):
         report_date = timezone.localdate()
         task = DailyTask.objects.create(
             patient=self.patient,
@@ -1006,16 +1073,17 @@ class ReportServiceTest(TestCase):
             status=TaskStatus.PENDING,
             interaction_payload={"checkup_id": self.checkup_item.id},
         )
-        event = ReportArchiveService.create_record_with_images(
-            patient=self.patient,
-            created_by_doctor=self.doctor_profile,
-            event_type=ReportImage.RecordType.CHECKUP,
-            event_date=report_date,
-            images=[
-                {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
-                {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
-            ],
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            event = ReportArchiveService.create_record_with_images(
+                patient=self.patient,
+                created_by_doctor=self.doctor_profile,
+                event_type=ReportImage.RecordType.CHECKUP,
+                event_date=report_date,
+                images=[
+                    {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
+                    {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
+                ],
+            )
         images = ReportImage.objects.filter(clinical_event=event)
         metric = HealthMetric.objects.filter(
             patient=self.patient, metric_type=MetricType.CHECKUP
@@ -0,0 +1,177 @@
+"""读写分离路由：只读统计 / 列表服务通过 use_replica() 读从库，其余读写一律走主库。
+
+- 只有显式进入 use_replica() 作用域的查询才会读从库，未标注的代码行为不变；
+- 从库未配置、复制延迟超过 DATABASE_REPLICA_MAX_LAG_SECONDS、延迟探测失败、
+  当前处于主库事务中时，作用域内的读取自动回落主库；
+- 读己之写：请求内发生过写入后，后续读取回落主库；ReplicaStickinessMiddleware 再通过
+  Cookie 让该用户接下来 DATABASE_REPLICA_STICKY_SECONDS 秒内的请求都读主库。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_ALIAS = DEFAULT_DB_ALIAS
+REPLICA_ALIAS = "replica"
+
+
+@dataclass
+class RequestDbState:
+    """单个请求的读写状态：pinned 表示请求开始前已被 Cookie 固定到主库。"""
+
+    pinned: bool = False
+    wrote: bool = False
+
+
+_read_alias: ContextVar[Optional[str]] = ContextVar("lcc_db_read_alias", default=None)
+_request_state: ContextVar[Optional[RequestDbState]] = ContextVar("lcc_db_request_state", default=None)
+
+# 进程级复制延迟缓存：探测间隔内复用上次结果，避免每次进入作用域都查询从库状态。
+_lag_lock = threading.Lock()
+_lag_state = {"checked_at": None, "lag": None}
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _query_replica_lag() -> Optional[float]:
+    """
+    【功能说明】
+    - 查询从库复制延迟（秒）。非 MySQL 从库（本地镜像别名）视为无延迟。
+
+    【返回值说明】
+    - float：延迟秒数；None：复制中断或查询失败，视为不可用。
+    """
+    connection = connections[REPLICA_ALIAS]
+    if connection.vendor != "mysql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Exception:
+                # MySQL < 8.0.22 只支持旧语法。
+                cursor.execute("SHOW SLAVE STATUS")
+            row = cursor.fetchone()
+            if row is None:
+                # 未配置复制通道（如直连代理的只读端点），无法判断延迟，按无延迟处理。
+                return 0.0
+            status = dict(zip([column[0] for column in cursor.description], row))
+    except Exception:
+        logger.warning("Replica lag check failed; reads fall back to primary.", exc_info=True)
+        return None
+    lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+def replica_lag_seconds() -> Optional[float]:
+    """返回缓存的复制延迟；超过探测间隔时由一个线程刷新，其余线程沿用旧值。"""
+    interval = settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS
+    now = time.monotonic()
+    checked_at = _lag_state["checked_at"]
+    if checked_at is not None and now - checked_at < interval:
+        return _lag_state["lag"]
+    if not _lag_lock.acquire(blocking=checked_at is None):
+        return _lag_state["lag"]
+    try:
+        if _lag_state["checked_at"] is None or now - _lag_state["checked_at"] >= interval:
+            _lag_state["lag"] = _query_replica_lag()
+            _lag_state["checked_at"] = time.monotonic()
+        return _lag_state["lag"]
+    finally:
+        _lag_lock.release()
+
+
+def reset_replica_lag_cache() -> None:
+    with _lag_lock:
+        _lag_state.update(checked_at=None, lag=None)
+
+
+def _choose_read_alias() -> str:
+    if not replica_configured():
+        return PRIMARY_ALIAS
+    state = _request_state.get()
+    if state is not None and (state.pinned or state.wrote):
+        return PRIMARY_ALIAS
+    if connections[PRIMARY_ALIAS].in_atomic_block:
+        # 事务内的读取需要看到本事务尚未提交的写入。
+        return PRIMARY_ALIAS
+    lag = replica_lag_seconds()
+    if lag is None or lag > settings.DATABASE_REPLICA_MAX_LAG_SECONDS:
+        return PRIMARY_ALIAS
+    return REPLICA_ALIAS
+
+
+@contextmanager
+def use_replica() -> Iterator[str]:
+    """
+    【功能说明】
+    - 将作用域内的 ORM 读取路由到从库；从库不可用或需要读己之写时回落主库。
+    - 写入始终走主库，不受作用域影响。
+
+    【使用方法】
+    - with use_replica(): ...
+    - @use_replica() 装饰只读服务函数 / 视图方法（每次调用重新判断路由）。
+    - QuerySet 是惰性的：需在作用域内求值（模板渲染同理）。
+
+    【返回值说明】
+    - 上下文值为本次选中的数据库别名。
+    """
+    token = _read_alias.set(_choose_read_alias())
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def request_db_scope(pinned: bool = False) -> Iterator[RequestDbState]:
+    """为一次请求建立读写状态，供 ReplicaStickinessMiddleware 使用。"""
+    state = RequestDbState(pinned=pinned)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS 入口：读取按 use_replica() 作用域选库，写入与迁移只走主库。"""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias != REPLICA_ALIAS:
+            return PRIMARY_ALIAS
+        state = _request_state.get()
+        if state is not None and state.wrote:
+            return PRIMARY_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False
+        return None
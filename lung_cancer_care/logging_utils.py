@@ -1,7 +1,15 @@
 import json
 import logging
+import os
+import queue
+import sys
+import threading
+import traceback
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional
+
+from concurrent_log_handler import ConcurrentTimedRotatingFileHandler
+from django.utils.module_loading import import_string
 
 
 class JsonFormatter(logging.Formatter):
@@ -23,3 +31,188 @@ class JsonFormatter(logging.Formatter):
             data["exc_info"] = self.formatException(record.exc_info)
 
         return json.dumps(data, ensure_ascii=False)
+
+
+class BackgroundBatchWriter:
+    """
+    有界队列 + 单个后台线程，按批把条目交给 write_batch 回调。
+
+    - submit() 只做入队，不做任何 I/O；队列已满时丢弃条目并计数，调用方永远不会被写盘阻塞；
+    - 后台线程按进程惰性启动：gunicorn / Celery 在导入配置后 fork 出的子进程会重建自己的
+      队列与线程，不会把条目写进父进程遗留的死队列；
+    - flush() 等待当前队列写完，供关停与测试使用。
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], None],
+        *,
+        name: str,
+        batch_size: int = 500,
+        queue_size: int = 10000,
+    ) -> None:
+        self._write_batch = write_batch
+        self._name = name
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def _ensure_started(self) -> "queue.Queue[Any]":
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._queue
+        with self._lock:
+            if self._pid != pid:
+                self._queue = queue.Queue(maxsize=self._queue_size)
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,), name=self._name, daemon=True
+                )
+                self._thread.start()
+                self._pid = pid
+        return self._queue
+
+    def submit(self, item: Any) -> bool:
+        try:
+            self._ensure_started().put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self, items: "queue.Queue[Any]") -> None:
+        while True:
+            batch = [items.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(items.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is self._STOP for item in batch)
+            try:
+                payload = [item for item in batch if item is not self._STOP]
+                if payload:
+                    self._write_batch(payload)
+            except Exception:  # pragma: no cover - 写入失败不能让线程退出
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                for _ in batch:
+                    items.task_done()
+            if stop:
+                return
+
+    def flush(self) -> None:
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:  # pragma: no cover - 写线程卡死时放弃剩余条目
+            return
+        self._thread.join(timeout)
+        self._pid = None
+
+
+class BatchingQueueHandler(logging.Handler):
+    """
+    日志队列模式：请求线程只把记录放入进程内队列，由后台线程批量写入目标 handler。
+
+    目标 handler 提供 emit_batch(records) 时整批只加一次跨进程文件锁，否则逐条 handle()。
+    以 dictConfig 的 "()" 工厂方式配置，target_class / target_kwargs 描述实际的文件 handler。
+    """
+
+    def __init__(
+        self,
+        target_class: str,
+        target_kwargs: Optional[Dict[str, Any]] = None,
+        batch_size: int = 500,
+        queue_size: int = 10000,
+    ) -> None:
+        super().__init__()
+        self.target: logging.Handler = import_string(target_class)(**dict(target_kwargs or {}))
+        self._writer = BackgroundBatchWriter(
+            self._write_records,
+            name="log-writer",
+            batch_size=batch_size,
+            queue_size=queue_size,
+        )
+        self._reported_dropped = 0
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # 参数可能在写线程格式化前被调用方修改，入队前先合并为最终文本；dict 消息保持原样交给 JsonFormatter。
+        if record.args and not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        self._writer.submit(record)
+
+    def _write_records(self, records: List[logging.LogRecord]) -> None:
+        dropped = self._writer.dropped
+        if dropped != self._reported_dropped:
+            records.append(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": {"event": "log_queue_dropped", "dropped_total": dropped},
+                    }
+                )
+            )
+            self._reported_dropped = dropped
+        emit_batch = getattr(self.target, "emit_batch", None)
+        if emit_batch is not None:
+            emit_batch(records)
+            return
+        for record in records:
+            self.target.handle(record)
+
+    def flush(self) -> None:
+        self._writer.flush()
+        self.target.flush()
+
+    def close(self) -> None:
+        self._writer.stop()
+        self.target.close()
+        super().close()
+
+
+class BatchedConcurrentTimedRotatingFileHandler(ConcurrentTimedRotatingFileHandler):
+    """整批记录只加一次跨进程文件锁、只写一次的 ConcurrentTimedRotatingFileHandler。"""
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        if not records:
+            return
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:  # pragma: no cover - 单条格式化失败不影响整批
+                self.handleError(record)
+        if not lines:
+            return
+        try:
+            self.clh._do_lock()
+            try:
+                self.clh._check_stream()
+                try:
+                    if self.shouldRollover(records[0]):
+                        self.doRollover()
+                except Exception:  # pragma: no cover - 与父类一致，轮转失败仍继续写入
+                    traceback.print_exc(file=sys.stderr)
+                self.clh.do_write(self.terminator.join(lines))
+            finally:
+                self.clh._do_unlock()
+        except Exception:  # pragma: no cover
+            self.handleError(records[-1])
@@ -3,8 +3,14 @@ import time
 import uuid
 import logging
 
+from django.conf import settings
+
+from lung_cancer_care.db_router import request_db_scope
+
 logger = logging.getLogger("lung_cancer_care.request")
 
+PRIMARY_STICKY_COOKIE = "lcc_primary_until"
+
 class RequestLogMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -59,4 +65,35 @@ class RequestLogMiddleware:
         # 9. 打印日志
         logger.info(log_data)
 
-        return response
\ No newline at end of file
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    读己之写：请求内发生 ORM 写入后下发 Cookie，该用户在 DATABASE_REPLICA_STICKY_SECONDS 秒内
+    的请求中 use_replica() 一律回落主库，避免刚提交的数据因复制延迟"消失"。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_db_scope(pinned=self._is_pinned(request)) as state:
+            response = self.get_response(request)
+        sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+        if state.wrote and sticky_seconds > 0:
+            response.set_cookie(
+                PRIMARY_STICKY_COOKIE,
+                str(int(time.time()) + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    @staticmethod
+    def _is_pinned(request):
+        try:
+            return int(request.COOKIES.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
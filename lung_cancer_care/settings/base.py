@@ -8,6 +8,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 from .logging import build_logging_config
+from . import task_queues
 
 load_dotenv()
 
@@ -113,6 +114,7 @@ ADMIN_APP_ORDER = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "lung_cancer_care.middleware.ReplicaStickinessMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -150,21 +152,62 @@ DATABASES = {
         "PASSWORD": os.getenv("MYSQL_PASSWORD"),
         "HOST": os.getenv("MYSQL_HOST"),
         "PORT": os.getenv("MYSQL_PORT"),
+        # 默认每个请求结束即关闭连接。设置 DATABASE_CONN_MAX_AGE 可开启持久连接（按线程复用），
+        # 但 ASGI 设备回调进程的线程池（DEVICE_CALLBACK_EXECUTOR_WORKERS）中每个线程都会长期占用一条连接，
+        # 开启前需确认 MySQL max_connections 足以容纳 进程数 × 线程数 再加网页 worker 数。
+        # 复用前做存活检查，避免拿到已被 MySQL 关闭的连接。
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# 只读从库（可选）：配置 MYSQL_REPLICA_HOST 后启用，未单独配置的账号 / 端口沿用主库。
+MYSQL_REPLICA_HOST = os.getenv("MYSQL_REPLICA_HOST", "")
+if MYSQL_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": MYSQL_REPLICA_HOST,
+        "PORT": os.getenv("MYSQL_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "USER": os.getenv("MYSQL_REPLICA_USER", DATABASES["default"]["USER"]),
+        "PASSWORD": os.getenv("MYSQL_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["lung_cancer_care.db_router.ReplicaRouter"]
+# 复制延迟超过该值时 use_replica() 回落主库。
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5"))
+DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS = float(os.getenv("DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS", "5"))
+# 用户产生写入后，其后续请求固定读主库的秒数（读己之写）。
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "15"))
+
 REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
 REDIS_PORT = os.getenv("REDIS_PORT", "6379")
 REDIS_DB = os.getenv("REDIS_DB", "0")
+# 缓存、Celery 消息队列与任务结果分库：缓存淘汰 / FLUSHDB 不会误删排队中的任务。
+REDIS_BROKER_DB = os.getenv("REDIS_BROKER_DB", "1")
+REDIS_RESULT_DB = os.getenv("REDIS_RESULT_DB", "2")
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
 _redis_auth = f":{REDIS_PASSWORD}@" if REDIS_PASSWORD else ""
 
-CELERY_BROKER_URL = f"redis://{_redis_auth}{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
-CELERY_RESULT_BACKEND = CELERY_BROKER_URL
+CELERY_BROKER_URL = f"redis://{_redis_auth}{REDIS_HOST}:{REDIS_PORT}/{REDIS_BROKER_DB}"
+CELERY_RESULT_BACKEND = f"redis://{_redis_auth}{REDIS_HOST}:{REDIS_PORT}/{REDIS_RESULT_DB}"
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+CELERY_RESULT_EXPIRES = 24 * 60 * 60
+# 队列拓扑见 settings/task_queues.py；各队列由 manage.py run_celery_worker --queue <name> 启动。
+CELERY_TASK_DEFAULT_QUEUE = task_queues.QUEUE_DEFAULT
+CELERY_TASK_DEFAULT_PRIORITY = task_queues.PRIORITY_NORMAL
+CELERY_TASK_ROUTES = task_queues.build_task_routes()
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    # Redis 以子队列模拟优先级：0 最先执行；同一队列内按 priority_steps 分 10 档。
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+# 默认每个进程只预取 1 条；秒级队列在 WORKER_POOLS 中单独放大。
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 
 EMBED_URL = os.getenv("EMBED_URL", "")
 EMBED_TOKEN = os.getenv("EMBED_TOKEN", "")
@@ -185,6 +228,21 @@ CACHES = {
     }
 }
 
+# 患者端访问者上下文（患者、身份、会员、疗程）按会话缓存，见 users.services.viewer_context。
+VIEWER_CONTEXT_CACHE_ENABLED = env_bool("VIEWER_CONTEXT_CACHE_ENABLED", default=True)
+# 版本号失效之外的兜底有效期，覆盖 queryset.update() 等不触发信号的写入。
+VIEWER_CONTEXT_MAX_AGE_SECONDS = int(os.getenv("VIEWER_CONTEXT_MAX_AGE_SECONDS", "600"))
+
+# 定时任务运行台账（core.service.job_ledger）：单次耗时超过同名任务历史成功运行 P95 × 系数时告警。
+JOB_LEDGER_ENABLED = env_bool("JOB_LEDGER_ENABLED", default=True)
+JOB_LEDGER_P95_WINDOW = int(os.getenv("JOB_LEDGER_P95_WINDOW", "30"))
+JOB_LEDGER_P95_MIN_RUNS = int(os.getenv("JOB_LEDGER_P95_MIN_RUNS", "5"))
+JOB_LEDGER_P95_ALERT_FACTOR = float(os.getenv("JOB_LEDGER_P95_ALERT_FACTOR", "1.2"))
+# 台账保留天数：每次运行结束时清理同名任务更早的记录，0 表示不清理。
+JOB_RUN_RETENTION_DAYS = int(os.getenv("JOB_RUN_RETENTION_DAYS", "180"))
+# 企业微信 / 钉钉群机器人地址；为空时仅写 WARNING 日志。
+JOB_LEDGER_ALERT_WEBHOOK_URL = os.getenv("JOB_LEDGER_ALERT_WEBHOOK_URL", "")
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -210,6 +268,8 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# 页面统一加载的 ECharts 构建（相对 STATIC 路径）。
+ECHARTS_BUNDLE = os.getenv("ECHARTS_BUNDLE", "vendor/echarts/5.4.3/echarts.common.min.js")
 
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
@@ -230,7 +290,9 @@ LOGIN_URL = "web_doctor:login"
 LOGIN_REDIRECT_URL = "web_doctor:doctor_dashboard"
 LOGOUT_REDIRECT_URL = "web_doctor:login"
 
-LOGGING = build_logging_config(LOG_DIR, LOG_LEVEL)
+# 日志队列模式：各进程只入队，后台线程批量写文件（LOG_QUEUE_MODE=1 开启）
+LOG_QUEUE_MODE = env_bool("LOG_QUEUE_MODE", False)
+LOGGING = build_logging_config(LOG_DIR, LOG_LEVEL, queue_mode=LOG_QUEUE_MODE)
 
 SMS_CONFIG = {
     "API_URL": os.environ.get("SMS_API_URL", "http://124.172.234.157:8180/service.asmx/SendMessageStr"),
@@ -246,6 +308,21 @@ SMARTWATCH_CONFIG = {
     "API_BASE_URL": "https://apibff.scheartmed.com",
 }
 
+# 设备回调异步视图的阻塞工作（解析 / 日志 / 入库）线程池大小，即设备进程最多占用的数据库连接数；
+# 0 表示在 Django 请求线程内执行。
+DEVICE_CALLBACK_EXECUTOR_WORKERS = int(os.getenv("DEVICE_CALLBACK_EXECUTOR_WORKERS", "8"))
+
+# 设备回调原始报文归档（按 SHA-256 检索，可用 replay_device_payloads 重放）；目录为空表示关闭，
+# 关闭时 IWOWN 报文仍以 Base64 写入日志。
+DEVICE_PAYLOAD_ARCHIVE_DIR = os.getenv("DEVICE_PAYLOAD_ARCHIVE_DIR", str(LOG_DIR / "device_payloads"))
+DEVICE_PAYLOAD_ARCHIVE_SEGMENT_BYTES = int(os.getenv("DEVICE_PAYLOAD_ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+DEVICE_PAYLOAD_ARCHIVE_MAX_BODY_BYTES = 1024 * 1024
+# 段轮转时清理：超过保留天数或总大小上限的最旧段被删除，0 表示不按该项清理。
+DEVICE_PAYLOAD_ARCHIVE_MAX_AGE_DAYS = int(os.getenv("DEVICE_PAYLOAD_ARCHIVE_MAX_AGE_DAYS", "30"))
+DEVICE_PAYLOAD_ARCHIVE_MAX_TOTAL_BYTES = int(
+    os.getenv("DEVICE_PAYLOAD_ARCHIVE_MAX_TOTAL_BYTES", str(2 * 1024 * 1024 * 1024))
+)
+
 # shell_plus
 SHELL_PLUS = "ipython"
 SHELL_PLUS_IMPORTS = []
@@ -1,6 +1,18 @@
+import os
+
 from .base import *  # noqa: F403
 
 DEBUG = True
 
 if not ALLOWED_HOSTS:  # noqa: F405
     ALLOWED_HOSTS = []  # noqa: F405
+
+# 开发 / 测试默认不启用回调线程池：TestCase 的事务只在请求线程内可见。
+DEVICE_CALLBACK_EXECUTOR_WORKERS = int(os.getenv("DEVICE_CALLBACK_EXECUTOR_WORKERS", "0"))
+
+# 开发 / 测试默认不归档原始回调报文，IWOWN 报文照旧以 Base64 写入日志。
+DEVICE_PAYLOAD_ARCHIVE_DIR = os.getenv("DEVICE_PAYLOAD_ARCHIVE_DIR", "")
+
+# 本地验证读写分离：DATABASE_REPLICA_MIRROR=true 时增加一个指向同一数据库的 replica 别名。
+if env_bool("DATABASE_REPLICA_MIRROR", False) and "replica" not in DATABASES:  # noqa: F405
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}  # noqa: F405
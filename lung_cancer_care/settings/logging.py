@@ -2,7 +2,7 @@ from pathlib import Path
 import sys
 
 
-def build_logging_config(log_dir: Path, log_level: str = "INFO"):
+def build_logging_config(log_dir: Path, log_level: str = "INFO", queue_mode: bool = False):
     config = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -65,6 +65,23 @@ def build_logging_config(log_dir: Path, log_level: str = "INFO"):
         },
     }
 
+    if queue_mode:
+        # Request threads only enqueue; one background thread per process writes
+        # batches, taking the cross-process file lock once per batch instead of per line.
+        file_handler = config["handlers"]["file"]
+        config["handlers"]["file"] = {
+            "()": "lung_cancer_care.logging_utils.BatchingQueueHandler",
+            "target_class": "lung_cancer_care.logging_utils.BatchedConcurrentTimedRotatingFileHandler",
+            "target_kwargs": {
+                key: value
+                for key, value in file_handler.items()
+                if key not in {"class", "formatter"}
+            },
+            "batch_size": 500,
+            "queue_size": 10000,
+            "formatter": "json",
+        }
+
     # Avoid noisy console/file logging in tests.
     if "test" in sys.argv:
         config["handlers"]["console"] = {"class": "logging.NullHandler"}
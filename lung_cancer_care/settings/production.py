@@ -38,7 +38,8 @@ _storages.setdefault(
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
 )
+# 哈希文件名 + .gz/.br 预压缩副本；Nginx 对 STATIC_URL 设置一年期 immutable 缓存，见开发指南 3.5。
 _storages["staticfiles"] = {
-    "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage",
+    "BACKEND": "lung_cancer_care.static_storage.PrecompressedManifestStaticFilesStorage",
 }
 STORAGES = _storages
@@ -0,0 +1,52 @@
+"""Celery 队列拓扑：任务路由、优先级与各队列 worker 进程池参数。
+
+- ai：大模型识图，单任务可达 120 秒，预取 1 条，避免一个进程囤积多张图片；
+- notifications：聊天未读提醒等秒级任务，独立进程池，不被 AI 积压拖慢；
+- ingestion：识图结果入库、归档副作用；
+- maintenance：回补、统计重算等后台维护任务，同时消费未显式路由的 default 队列。
+
+每个队列由单独的 worker 进程池消费（manage.py run_celery_worker --queue <name>），
+并发与预取按队列配置。Redis 传输下优先级数字越小越先执行，只在同一队列内生效。
+"""
+
+from typing import Dict, List
+
+QUEUE_AI = "ai"
+QUEUE_NOTIFICATIONS = "notifications"
+QUEUE_INGESTION = "ingestion"
+QUEUE_MAINTENANCE = "maintenance"
+QUEUE_DEFAULT = "default"
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+# 任务名 → (队列, 优先级)
+TASK_QUEUE_MAP = {
+    "ai_vision.extract_report_image": (QUEUE_AI, PRIORITY_NORMAL),
+    "wx.send_chat_unread_notification": (QUEUE_NOTIFICATIONS, PRIORITY_HIGH),
+    "health_data.sync_lab_results_from_ai_json": (QUEUE_INGESTION, PRIORITY_HIGH),
+    "health_data.process_archive_job": (QUEUE_INGESTION, PRIORITY_NORMAL),
+    "health_data.reprocess_orphan_fields": (QUEUE_MAINTENANCE, PRIORITY_NORMAL),
+    "health_data.refresh_patient_monthly_stats": (QUEUE_MAINTENANCE, PRIORITY_NORMAL),
+    "health_data.backfill_report_image_renditions": (QUEUE_MAINTENANCE, PRIORITY_LOW),
+}
+
+# 队列 → worker 进程池参数；extra_queues 为同一进程池额外消费的队列。
+WORKER_POOLS: Dict[str, Dict] = {
+    QUEUE_AI: {"concurrency": 4, "prefetch_multiplier": 1},
+    QUEUE_NOTIFICATIONS: {"concurrency": 4, "prefetch_multiplier": 4},
+    QUEUE_INGESTION: {"concurrency": 2, "prefetch_multiplier": 2},
+    QUEUE_MAINTENANCE: {"concurrency": 1, "prefetch_multiplier": 1, "extra_queues": [QUEUE_DEFAULT]},
+}
+
+
+def build_task_routes() -> Dict[str, Dict]:
+    return {
+        task_name: {"queue": queue, "priority": priority}
+        for task_name, (queue, priority) in TASK_QUEUE_MAP.items()
+    }
+
+
+def worker_queues(queue: str) -> List[str]:
+    return [queue, *WORKER_POOLS[queue].get("extra_queues", [])]
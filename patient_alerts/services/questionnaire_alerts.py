@@ -7,6 +7,7 @@ from typing import Any
 from django.core.exceptions import ValidationError
 
 from health_data.services.questionnaire_scoring import (
+    QuestionnaireGradeResult,
     is_eq5d5l_code,
     is_eqvas_code,
 )
@@ -38,19 +39,24 @@ class QuestionnaireAlertService:
 
     @classmethod
     def process_submission(
-        cls, submission: QuestionnaireSubmission
+        cls,
+        submission: QuestionnaireSubmission,
+        grade_result: QuestionnaireGradeResult | None = None,
     ) -> PatientAlert | None:
         """
         处理问卷提交并生成报警。
 
         【参数说明】
         - submission: QuestionnaireSubmission 问卷提交记录。
+        - grade_result: 提交流程已在内存中算好的分级结果；为空时按提交记录回查。
 
         【返回值说明】
         - PatientAlert | None：未触发报警返回 None。
         """
         if not submission:
             return None
+        if grade_result is not None:
+            return cls._create_alert(submission, grade_result)
 
         try:
             from health_data.services.questionnaire_submission import (
@@ -70,7 +76,14 @@ class QuestionnaireAlertService:
                 submission.id,
             )
             return None
+        return cls._create_alert(submission, grade_result)
 
+    @classmethod
+    def _create_alert(
+        cls,
+        submission: QuestionnaireSubmission,
+        grade_result: QuestionnaireGradeResult,
+    ) -> PatientAlert | None:
         grade_level = grade_result.grade_level
         alert_level = cls.GRADE_TO_LEVEL.get(grade_level)
         if not alert_level:
@@ -396,6 +396,32 @@
     };
   };
 
+  var ARCHIVE_JOB_POLL_INTERVAL_MS = 2000;
+  var ARCHIVE_JOB_MAX_POLLS = 90;
+
+  function pollArchiveJob(statusUrl) {
+    var polls = 0;
+    var timer = window.setInterval(async function () {
+      polls += 1;
+      try {
+        var job = await fetchJson(statusUrl, {
+          headers: { "X-Requested-With": "XMLHttpRequest" },
+        });
+        if (job.status === "success") {
+          window.clearInterval(timer);
+          showToast("归档后台同步完成", "success");
+        } else if (job.status === "failed") {
+          window.clearInterval(timer);
+          showToast("部分图片后台同步失败，请稍后查看识别结果", "error");
+        } else if (polls >= ARCHIVE_JOB_MAX_POLLS) {
+          window.clearInterval(timer);
+        }
+      } catch (error) {
+        window.clearInterval(timer);
+      }
+    }, ARCHIVE_JOB_POLL_INTERVAL_MS);
+  }
+
   window.saveImageArchiveGroup = async function (rootEl, state, url) {
     if (state.isSaving) return;
     state.isSaving = true;
@@ -434,7 +460,7 @@
         return;
       }
 
-      var html = await fetchText(url, {
+      var response = await fetch(url, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -442,8 +468,18 @@
         },
         body: JSON.stringify({ updates: updates }),
       });
+      var html = await response.text();
+      if (!response.ok) {
+        throw new Error(html || "请求失败");
+      }
       replaceContent(getReportsContentTarget(), html);
-      showToast("归档保存成功", "success");
+      var jobStatusUrl = response.headers.get("X-Archive-Job-Status-Url");
+      if (jobStatusUrl) {
+        showToast("归档保存成功，指标与识别结果后台同步中", "success");
+        pollArchiveJob(jobStatusUrl);
+      } else {
+        showToast("归档保存成功", "success");
+      }
     } catch (error) {
       showToast(error.message || "保存失败", "error");
     } finally {
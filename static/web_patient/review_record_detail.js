@@ -185,9 +185,10 @@
 
   function buildCardHtml(group) {
     const urls = Array.isArray(group.image_urls) ? group.image_urls : [];
+    const thumbnailUrls = Array.isArray(group.thumbnail_urls) ? group.thumbnail_urls : [];
     const date = group.report_date || '';
     const thumbs = urls.map((url, idx) => {
-      const t = thumbUrl(url);
+      const t = thumbnailUrls[idx] && thumbnailUrls[idx] !== url ? thumbnailUrls[idx] : thumbUrl(url);
       const safeFull = (url || '').replace(/'/g, '&#39;');
       const safeThumb = (t || '').replace(/'/g, '&#39;');
       return `
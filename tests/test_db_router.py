@@ -0,0 +1,154 @@
+import time
+from unittest.mock import MagicMock, patch
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from lung_cancer_care import db_router
+from lung_cancer_care.db_router import (
+    PRIMARY_ALIAS,
+    REPLICA_ALIAS,
+    ReplicaRouter,
+    request_db_scope,
+    use_replica,
+)
+from lung_cancer_care.middleware import PRIMARY_STICKY_COOKIE, ReplicaStickinessMiddleware
+from users.models import PatientProfile
+
+
+def _replica_available(lag=0.0):
+    """模拟已配置从库且延迟为 lag 秒。"""
+    return patch.multiple(
+        db_router,
+        replica_configured=MagicMock(return_value=True),
+        replica_lag_seconds=MagicMock(return_value=lag),
+    )
+
+
+@override_settings(DATABASE_REPLICA_MAX_LAG_SECONDS=5)
+class UseReplicaRoutingTests(SimpleTestCase):
+    def test_reads_outside_scope_use_primary(self):
+        with _replica_available():
+            self.assertEqual(PatientProfile.objects.all().db, PRIMARY_ALIAS)
+
+    def test_reads_inside_scope_use_replica_and_writes_stay_on_primary(self):
+        with _replica_available(), use_replica() as alias:
+            self.assertEqual(alias, REPLICA_ALIAS)
+            self.assertEqual(PatientProfile.objects.all().db, REPLICA_ALIAS)
+            self.assertEqual(ReplicaRouter().db_for_write(PatientProfile), PRIMARY_ALIAS)
+        self.assertEqual(PatientProfile.objects.all().db, PRIMARY_ALIAS)
+
+    def test_decorator_routes_each_call(self):
+        @use_replica()
+        def read_alias():
+            return PatientProfile.objects.all().db
+
+        with _replica_available():
+            self.assertEqual(read_alias(), REPLICA_ALIAS)
+        with _replica_available(lag=30):
+            self.assertEqual(read_alias(), PRIMARY_ALIAS)
+
+    def test_falls_back_to_primary_without_replica_alias(self):
+        with use_replica() as alias:
+            self.assertEqual(alias, PRIMARY_ALIAS)
+            self.assertEqual(PatientProfile.objects.all().db, PRIMARY_ALIAS)
+
+    def test_falls_back_to_primary_when_lagging_or_unhealthy(self):
+        for lag in (5.5, None):
+            with self.subTest(lag=lag), _replica_available(lag=lag), use_replica():
+                self.assertEqual(PatientProfile.objects.all().db, PRIMARY_ALIAS)
+
+    def test_pinned_request_reads_primary(self):
+        with _replica_available(), request_db_scope(pinned=True), use_replica():
+            self.assertEqual(PatientProfile.objects.all().db, PRIMARY_ALIAS)
+
+    def test_reads_after_write_in_same_request_use_primary(self):
+        router = ReplicaRouter()
+        with _replica_available(), request_db_scope() as state, use_replica():
+            self.assertEqual(PatientProfile.objects.all().db, REPLICA_ALIAS)
+            router.db_for_write(PatientProfile)
+            self.assertTrue(state.wrote)
+            self.assertEqual(PatientProfile.objects.all().db, PRIMARY_ALIAS)
+
+    def test_replica_alias_never_migrates(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate(REPLICA_ALIAS, "users"))
+        self.assertIsNone(router.allow_migrate(PRIMARY_ALIAS, "users"))
+
+
+class UseReplicaTransactionTests(TestCase):
+    def test_atomic_block_reads_primary(self):
+        # 事务内读取留在主库，才能看到本事务尚未提交的写入。
+        with _replica_available(), transaction.atomic(), use_replica() as alias:
+            self.assertEqual(alias, PRIMARY_ALIAS)
+
+
+@override_settings(DATABASE_REPLICA_LAG_CHECK_INTERVAL_SECONDS=60)
+class ReplicaLagCheckTests(SimpleTestCase):
+    def setUp(self):
+        db_router.reset_replica_lag_cache()
+        self.addCleanup(db_router.reset_replica_lag_cache)
+
+    def _mysql_connection(self, status):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = tuple(status.values())
+        cursor.description = [(name,) for name in status]
+        connection = MagicMock(vendor="mysql")
+        connection.cursor.return_value.__enter__.return_value = cursor
+        return connection
+
+    def test_reads_seconds_behind_source_and_caches_result(self):
+        connection = self._mysql_connection({"Replica_IO_Running": "Yes", "Seconds_Behind_Source": 3})
+        with patch.object(db_router, "connections", {REPLICA_ALIAS: connection}):
+            self.assertEqual(db_router.replica_lag_seconds(), 3.0)
+            self.assertEqual(db_router.replica_lag_seconds(), 3.0)
+        self.assertEqual(connection.cursor.call_count, 1)
+
+    def test_stopped_replication_is_unhealthy(self):
+        connection = self._mysql_connection({"Seconds_Behind_Master": None})
+        with patch.object(db_router, "connections", {REPLICA_ALIAS: connection}):
+            self.assertIsNone(db_router.replica_lag_seconds())
+
+    def test_query_error_is_unhealthy(self):
+        connection = MagicMock(vendor="mysql")
+        connection.cursor.side_effect = RuntimeError("gone away")
+        with patch.object(db_router, "connections", {REPLICA_ALIAS: connection}):
+            with self.assertLogs("lung_cancer_care.db_router", level="WARNING"):
+                self.assertIsNone(db_router.replica_lag_seconds())
+
+
+@override_settings(DATABASE_REPLICA_STICKY_SECONDS=15)
+class ReplicaStickinessMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_write_sets_primary_cookie(self):
+        def view(request):
+            ReplicaRouter().db_for_write(PatientProfile)
+            return HttpResponse("ok")
+
+        response = ReplicaStickinessMiddleware(view)(self.factory.post("/"))
+
+        cookie = response.cookies[PRIMARY_STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], 15)
+        self.assertGreater(int(cookie.value), time.time())
+
+    def test_read_only_request_sets_no_cookie(self):
+        response = ReplicaStickinessMiddleware(lambda request: HttpResponse("ok"))(self.factory.get("/"))
+        self.assertNotIn(PRIMARY_STICKY_COOKIE, response.cookies)
+
+    def test_cookie_pins_following_requests_to_primary(self):
+        def view(request):
+            with use_replica() as alias:
+                return HttpResponse(alias)
+
+        middleware = ReplicaStickinessMiddleware(view)
+        pinned = self.factory.get("/")
+        pinned.COOKIES[PRIMARY_STICKY_COOKIE] = str(int(time.time()) + 10)
+        expired = self.factory.get("/")
+        expired.COOKIES[PRIMARY_STICKY_COOKIE] = str(int(time.time()) - 10)
+
+        with _replica_available():
+            self.assertEqual(middleware(pinned).content.decode(), PRIMARY_ALIAS)
+            self.assertEqual(middleware(expired).content.decode(), REPLICA_ALIAS)
@@ -118,7 +118,7 @@ class ProductionGuardTests(unittest.TestCase):
         )
         self.assertEqual(
             settings.STORAGES["staticfiles"]["BACKEND"],
-            "django.contrib.staticfiles.storage.ManifestStaticFilesStorage",
+            "lung_cancer_care.static_storage.PrecompressedManifestStaticFilesStorage",
         )
 
 
@@ -162,6 +162,41 @@ class LoggingConfigTests(unittest.TestCase):
         self.assertEqual(config["handlers"]["console"]["class"], "logging.NullHandler")
         self.assertEqual(config["handlers"]["file"]["class"], "logging.NullHandler")
 
+    def test_build_logging_config_in_queue_mode_writes_batches_from_background_thread(self):
+        import logging
+        import logging.config
+        from tempfile import TemporaryDirectory
+
+        module = _import_settings("lung_cancer_care.settings.logging")
+        with TemporaryDirectory() as tmp_dir, patch.object(sys, "argv", ["manage.py", "runserver"]):
+            config = module.build_logging_config(Path(tmp_dir), "INFO", queue_mode=True)
+            file_config = config["handlers"]["file"]
+            self.assertEqual(file_config["()"], "lung_cancer_care.logging_utils.BatchingQueueHandler")
+            self.assertEqual(file_config["target_kwargs"]["filename"], Path(tmp_dir) / "lung_cancer_care.log")
+
+            logging.config.dictConfig(
+                {
+                    "version": 1,
+                    "disable_existing_loggers": False,
+                    "formatters": config["formatters"],
+                    "handlers": {"file": file_config},
+                    "loggers": {"queue_mode_test": {"handlers": ["file"], "level": "INFO", "propagate": False}},
+                }
+            )
+            queue_logger = logging.getLogger("queue_mode_test")
+            handler = queue_logger.handlers[0]
+            try:
+                for index in range(50):
+                    queue_logger.info({"event": "queued", "index": index})
+                handler.flush()
+                lines = (Path(tmp_dir) / "lung_cancer_care.log").read_text(encoding="utf-8").splitlines()
+            finally:
+                queue_logger.removeHandler(handler)
+                handler.close()
+
+        self.assertEqual(len(lines), 50)
+        self.assertIn('"index": 49', lines[-1])
+
 
 if __name__ == "__main__":
     unittest.main()
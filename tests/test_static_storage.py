@@ -0,0 +1,54 @@
+import gzip
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase
+
+from lung_cancer_care import static_storage
+from lung_cancer_care.static_storage import PrecompressedManifestStaticFilesStorage
+
+
+class PrecompressedManifestStaticFilesStorageTests(SimpleTestCase):
+    def _collect(self, files):
+        source_dir = TemporaryDirectory()
+        target_dir = TemporaryDirectory()
+        self.addCleanup(source_dir.cleanup)
+        self.addCleanup(target_dir.cleanup)
+        source = FileSystemStorage(location=source_dir.name)
+        storage = PrecompressedManifestStaticFilesStorage(location=target_dir.name, base_url="/static/")
+        for name, content in files.items():
+            source.save(name, ContentFile(content))
+            storage.save(name, ContentFile(content))
+        paths = {name: (source, name) for name in files}
+        results = list(storage.post_process(paths))
+        return storage, Path(target_dir.name), results
+
+    def test_post_process_writes_gzip_and_brotli_copies_of_hashed_text_assets(self):
+        script = b"window.app = function () { return 'lung cancer care'; };\n" * 200
+        storage, root, _ = self._collect(
+            {"js/app.js": script, "css/tiny.css": b"a{}", "img/logo.png": b"\x89PNG" + b"\x00" * 4096}
+        )
+
+        hashed_js = storage.stored_name("js/app.js")
+        self.assertNotEqual(hashed_js, "js/app.js")
+        self.assertEqual(gzip.decompress((root / f"{hashed_js}.gz").read_bytes()), script)
+        if static_storage.brotli is not None:
+            brotli_copy = (root / f"{hashed_js}.br").read_bytes()
+            self.assertEqual(static_storage.brotli.decompress(brotli_copy), script)
+        self.assertFalse((root / "js/app.js.gz").exists())
+        self.assertFalse((root / f"{storage.stored_name('css/tiny.css')}.gz").exists())
+        self.assertFalse((root / f"{storage.stored_name('img/logo.png')}.gz").exists())
+
+    def test_gzip_copies_are_byte_identical_across_runs(self):
+        script = b"console.log('stable');\n" * 200
+        first, first_root, _ = self._collect({"js/app.js": script})
+        second, second_root, _ = self._collect({"js/app.js": script})
+
+        name = first.stored_name("js/app.js")
+        self.assertEqual(name, second.stored_name("js/app.js"))
+        self.assertEqual(
+            (first_root / f"{name}.gz").read_bytes(),
+            (second_root / f"{name}.gz").read_bytes(),
+        )
@@ -1,3 +1,4 @@
+import re
 import struct
 from pathlib import Path
 from xml.etree import ElementTree
@@ -187,3 +188,25 @@ class TemplateAssetLoadingTests(SimpleTestCase):
         for path in templates_root.rglob("*.html"):
             content = path.read_text(encoding="utf-8")
             self.assertNotIn("?v={% now 'U' %}", content, msg=str(path))
+
+    def test_pages_load_exactly_one_echarts_variant_through_asset_loader(self):
+        base_dir = Path(settings.BASE_DIR)
+        echarts_file = re.compile(r"echarts[\w.-]*\.js")
+        sources = list((base_dir / "templates").rglob("*.html")) + [
+            path
+            for path in (base_dir / "static").rglob("*.js")
+            if path.relative_to(base_dir / "static").parts[0] not in {"vendor", "src"}
+        ]
+        loader = base_dir / "templates/layouts/partials/third_party_assets.html"
+
+        for path in sources:
+            if path == loader:
+                continue
+            self.assertIsNone(echarts_file.search(path.read_text(encoding="utf-8")), msg=str(path))
+
+        assets = loader.read_text(encoding="utf-8")
+        self.assertEqual(assets.count("echarts: {"), 1)
+        self.assertIn('local: "{% echarts_bundle_url %}"', assets)
+        self.assertEqual(set(echarts_file.findall(assets)), {"echarts.common.min.js"})
+        self.assertIsNone(finders.find("vendor/echarts/5.4.3/echarts.min.js"))
+        self.assertIsNotNone(finders.find(settings.ECHARTS_BUNDLE), msg=settings.ECHARTS_BUNDLE)
@@ -8,12 +8,15 @@ from django import forms
 from django.contrib import admin
 from django.contrib.admin.views.main import ChangeList
 from django.db.models import DateTimeField, IntegerField, OuterRef, Q, Subquery
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.utils.html import format_html
 
 from core.models import choices as core_choices
 from core.service import tasks as task_service
 from health_data.models import MedicalHistory
+from health_data.services.data_export import stream_csv
+from lung_cancer_care.db_router import use_replica
 from market.models import Order
 from users import choices
 from users.models import PatientProfile
@@ -112,10 +115,20 @@ class PatientProfileAdmin(admin.ModelAdmin):
         "studio_display",
         "doctor_display",
         "sales_display",
+        "medication_adherence_display",
+        "monitoring_adherence_display",
+        "other_adherence_display",
     )
     list_display_links = None
     list_per_page = 20
     search_fields = ("name", "phone")
+    actions = (
+        "export_health_metrics_csv",
+        "export_checkup_results_csv",
+        "export_questionnaire_submissions_csv",
+        "export_questionnaire_answers_csv",
+        "export_daily_tasks_csv",
+    )
 
     def get_changelist(self, request, **kwargs):
         return PatientProfileChangeList
@@ -196,6 +209,17 @@ class PatientProfileAdmin(admin.ModelAdmin):
         return qs
 
     def changelist_view(self, request, extra_context=None):
+        if request.method not in ("GET", "HEAD"):
+            # POST 为批量操作，保持主库读写。
+            return self._build_changelist_response(request, extra_context)
+        with use_replica():
+            response = self._build_changelist_response(request, extra_context)
+            # 列表查询在模板渲染时才执行，需在从库作用域内完成渲染。
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
+    def _build_changelist_response(self, request, extra_context=None):
         form = self.get_filter_form(request)
         selected_id = request.GET.get("patient_id")
         extra_context = extra_context or {}
@@ -213,13 +237,13 @@ class PatientProfileAdmin(admin.ModelAdmin):
             selected_patient = None
             selected_history = None
             adherence_display = None
+            cl = context.get("cl")
+            page_patients = list(cl.result_list) if cl else []
             if selected_id:
-                cl = context.get("cl")
-                if cl:
-                    selected_patient = next(
-                        (obj for obj in cl.result_list if str(obj.pk) == str(selected_id)),
-                        None,
-                    )
+                selected_patient = next(
+                    (obj for obj in page_patients if str(obj.pk) == str(selected_id)),
+                    None,
+                )
                 if not selected_patient:
                     selected_patient = self.get_queryset(request).filter(pk=selected_id).first()
                 if selected_patient:
@@ -228,7 +252,17 @@ class PatientProfileAdmin(admin.ModelAdmin):
                         .order_by("-created_at")
                         .first()
                     )
-                    adherence_display = self._build_adherence_display(selected_patient)
+            # 当前页与选中患者的依从率一次分组查询算出，页面耗时不随行数增长。
+            adherence_patients = page_patients + (
+                [selected_patient]
+                if selected_patient and selected_patient not in page_patients
+                else []
+            )
+            displays = self._build_adherence_displays([obj.pk for obj in adherence_patients])
+            for obj in page_patients:
+                obj._adherence_display = displays.get(obj.pk)
+            if selected_patient:
+                adherence_display = displays.get(selected_patient.pk)
             context.update(
                 {
                     "selected_patient": selected_patient,
@@ -313,9 +347,55 @@ class PatientProfileAdmin(admin.ModelAdmin):
     def sales_display(self, obj):
         return self._sales_names(obj)
 
+    @admin.display(description="用药依从率")
+    def medication_adherence_display(self, obj):
+        return self._page_adherence(obj, "medication")
+
+    @admin.display(description="监测依从率")
+    def monitoring_adherence_display(self, obj):
+        return self._page_adherence(obj, "monitoring")
+
+    @admin.display(description="其他依从率")
+    def other_adherence_display(self, obj):
+        return self._page_adherence(obj, "other")
+
     def has_delete_permission(self, request, obj=None):
         return False
 
+    def has_export_permission(self, request):
+        # 导出含诊疗数据，仅超级管理员可用。
+        return request.user.is_superuser
+
+    def _export_csv(self, request, queryset, dataset):
+        patient_ids = list(queryset.order_by().values_list("pk", flat=True))
+        filename = f"{dataset}_{timezone.localtime():%Y%m%d%H%M%S}.csv"
+        response = StreamingHttpResponse(
+            stream_csv(dataset, patient_ids=patient_ids),
+            content_type="text/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @admin.action(description="导出所选患者的体征指标（CSV）", permissions=["export"])
+    def export_health_metrics_csv(self, request, queryset):
+        return self._export_csv(request, queryset, "health_metrics")
+
+    @admin.action(description="导出所选患者的结构化复查结果（CSV）", permissions=["export"])
+    def export_checkup_results_csv(self, request, queryset):
+        return self._export_csv(request, queryset, "checkup_results")
+
+    @admin.action(description="导出所选患者的问卷提交记录（CSV）", permissions=["export"])
+    def export_questionnaire_submissions_csv(self, request, queryset):
+        return self._export_csv(request, queryset, "questionnaire_submissions")
+
+    @admin.action(description="导出所选患者的问卷回答明细（CSV）", permissions=["export"])
+    def export_questionnaire_answers_csv(self, request, queryset):
+        return self._export_csv(request, queryset, "questionnaire_answers")
+
+    @admin.action(description="导出所选患者的每日任务（CSV）", permissions=["export"])
+    def export_daily_tasks_csv(self, request, queryset):
+        return self._export_csv(request, queryset, "daily_tasks")
+
     def _current_disease(self, obj, history):
         if history:
             return history.tumor_diagnosis or history.clinical_diagnosis or "-"
@@ -398,33 +478,45 @@ class PatientProfileAdmin(admin.ModelAdmin):
             matched_ids = [pid for pid, _, _ in records if pid not in end_dates]
         return qs.filter(pk__in=matched_ids)
 
+    def _page_adherence(self, obj, key):
+        # 由 changelist_view 按当前页批量写入，未写入时不单独查询。
+        display = getattr(obj, "_adherence_display", None) or {}
+        return display.get(key, "-")
+
     def _format_rate(self, metrics):
         if not metrics or metrics.get("rate") is None:
             return "-"
         return f"{metrics['rate']:.0%}"
 
-    def _build_adherence_display(self, patient):
-        medication = task_service.get_adherence_metrics(
-            patient_id=patient.id,
-            adherence_type=core_choices.PlanItemCategory.MEDICATION,
-        )
-        monitoring = task_service.get_adherence_metrics(
-            patient_id=patient.id,
-            adherence_type=task_service.MONITORING_ADHERENCE_ALL,
-        )
-        checkup = task_service.get_adherence_metrics(
-            patient_id=patient.id,
-            adherence_type=core_choices.PlanItemCategory.CHECKUP,
+    def _build_adherence_displays(self, patient_ids):
+        """
+        【功能说明】
+        - 批量计算患者的用药/监测/其他（复查+问卷）依从率展示文本。
+        - 四种依从性共用一次 DailyTask 分组查询，结果按天缓存，任务完成时失效。
+
+        【返回值说明】
+        - {patient_id: {"medication": str, "monitoring": str, "other": str}}。
+        """
+        metrics_by_patient = task_service.get_adherence_metrics_for_patients(
+            patient_ids,
+            [
+                core_choices.PlanItemCategory.MEDICATION,
+                task_service.MONITORING_ADHERENCE_ALL,
+                core_choices.PlanItemCategory.CHECKUP,
+                core_choices.PlanItemCategory.QUESTIONNAIRE,
+            ],
+            use_cache=True,
         )
-        questionnaire = task_service.get_adherence_metrics(
-            patient_id=patient.id,
-            adherence_type=core_choices.PlanItemCategory.QUESTIONNAIRE,
-        )
-        other_total = checkup["total"] + questionnaire["total"]
-        other_completed = checkup["completed"] + questionnaire["completed"]
-        other_rate = None if other_total == 0 else other_completed / other_total
-        return {
-            "medication": self._format_rate(medication),
-            "monitoring": self._format_rate(monitoring),
-            "other": "-" if other_rate is None else f"{other_rate:.0%}",
-        }
+        displays = {}
+        for patient_id, (medication, monitoring, checkup, questionnaire) in (
+            metrics_by_patient.items()
+        ):
+            other_total = checkup["total"] + questionnaire["total"]
+            other_completed = checkup["completed"] + questionnaire["completed"]
+            other_rate = None if other_total == 0 else other_completed / other_total
+            displays[patient_id] = {
+                "medication": self._format_rate(medication),
+                "monitoring": self._format_rate(monitoring),
+                "other": "-" if other_rate is None else f"{other_rate:.0%}",
+            }
+        return displays
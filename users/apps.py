@@ -13,3 +13,6 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
     verbose_name = "用户模块"
+
+    def ready(self):
+        import users.signals  # noqa: F401
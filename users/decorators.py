@@ -13,6 +13,7 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 
 from users import choices
+from users.services.viewer_context import viewer_context_for
 from functools import wraps
 from wx.services.oauth import generate_menu_auth_url
 
@@ -145,13 +146,22 @@ def auto_wechat_login(view_func: Callable) -> Callable:
 
 
 def require_membership(view_func: Callable) -> Callable:
+    """
+    【业务说明】会员专属页面访问控制，非会员跳转购买页。
+    【判定口径】优先使用会话缓存的访问者上下文（users.services.viewer_context），否则按订单实时计算。
+    【用法】放在 @check_patient 之后，依赖 request.patient。
+    """
     @wraps(view_func)
     def _wrapped_view(request: HttpRequest, *args, **kwargs):
         patient = getattr(request, "patient", None)
-        is_member = bool(
-            getattr(patient, "is_member", False)
-            and getattr(patient, "membership_expire_date", None)
-        )
+        context = viewer_context_for(request, patient)
+        if context is not None:
+            is_member = context.is_member
+        else:
+            is_member = bool(
+                getattr(patient, "is_member", False)
+                and getattr(patient, "membership_expire_date", None)
+            )
         if not is_member:
             return redirect(generate_menu_auth_url("market:product_buy"))
         return view_func(request, *args, **kwargs)
@@ -163,7 +173,7 @@ def require_plan_access(view_func: Callable) -> Callable:
     """
     【业务说明】管理计划类页面访问控制：会员放行；免费用户存在进行中疗程（trial）同样放行。
     【判定口径】复用 web_patient.services.home_plan_access.resolve_home_plan_access，
-        即 can_view_daily_plan = True（member 或 trial）才放行。
+        即 can_view_daily_plan = True（member 或 trial）才放行；进行中疗程取自会话缓存的访问者上下文。
     【用法】放在 @check_patient 之后，依赖 request.patient。
     """
     @wraps(view_func)
@@ -174,7 +184,11 @@ def require_plan_access(view_func: Callable) -> Callable:
         # 懒加载避免 users -> web_patient 循环引用
         from web_patient.services.home_plan_access import resolve_home_plan_access
 
-        access = resolve_home_plan_access(patient)
+        context = viewer_context_for(request, patient)
+        access = resolve_home_plan_access(
+            patient,
+            has_active_cycle=context.has_active_cycle if context else None,
+        )
         if not access.can_view_daily_plan:
             return redirect(generate_menu_auth_url("market:product_buy"))
         request.home_plan_access = access
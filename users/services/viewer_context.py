@@ -0,0 +1,295 @@
+"""
+【模块说明】患者端“访问者上下文”缓存。
+
+患者端每个请求都要回答同一组问题：当前登录用户代表哪位患者、以什么身份
+（本人 / 家属关系）、会员状态如何、当前是否有进行中的疗程。这些结果变化频率
+远低于页面访问频率，因此按会话缓存在 ``request.session`` 中，并通过两组版本号
+判断是否过期：
+
+- 患者版本号：绑定/解绑、付款、疗程变更、档案认领时递增，使所有查看该患者的会话失效；
+- 用户版本号：用户绑定关系变化时递增，覆盖“尚未绑定患者”的会话。
+
+另外上下文只在构建当天有效（会员到期、疗程起止均按天计算），并受
+``VIEWER_CONTEXT_MAX_AGE_SECONDS`` 兜底，用于覆盖 ``queryset.update()`` 等不触发信号的批量写入。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from users.choices import UserType
+from users.models import PatientProfile, PatientRelation
+
+logger = logging.getLogger(__name__)
+
+VIEWER_CONTEXT_SESSION_KEY = "viewer_context"
+ACTIVE_PATIENT_SESSION_KEY = "active_patient_id"
+RELATION_ROLE_SELF = "self"
+
+_PATIENT_VERSION_KEY = "users:viewer_ctx:version:patient:{patient_id}"
+_USER_VERSION_KEY = "users:viewer_ctx:version:user:{user_id}"
+_REQUEST_CACHE_ATTR = "_viewer_context_cache"
+
+
+@dataclass(frozen=True)
+class ViewerContext:
+    """当前会话所代表的患者及其身份、会员与疗程状态（可 JSON 序列化，直接存入 Session）。"""
+
+    user_id: int
+    patient_id: int | None
+    relation_role: str | None
+    membership_state: str
+    membership_expire_date: str | None
+    active_cycle_id: int | None
+    as_of: str
+    user_version: int
+    patient_version: int
+    built_at: float
+
+    @property
+    def is_self(self) -> bool:
+        return self.relation_role == RELATION_ROLE_SELF
+
+    @property
+    def is_member(self) -> bool:
+        return self.membership_state == "active" and bool(self.membership_expire_date)
+
+    @property
+    def has_active_cycle(self) -> bool:
+        return self.active_cycle_id is not None
+
+
+def _incr_version(key: str) -> None:
+    try:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception:  # pragma: no cover - Redis 故障时依赖上下文最长有效期兜底
+        logger.warning("viewer context version bump failed key=%s", key, exc_info=True)
+
+
+def _bump(key: str) -> None:
+    # 立即递增让当前事务外的读取尽快失效；提交后再递增一次，避免其它请求在提交前用旧数据重建。
+    _incr_version(key)
+    transaction.on_commit(lambda: _incr_version(key))
+
+
+def invalidate_patient_viewer_context(patient_id: int | None) -> None:
+    """
+    【功能说明】
+    - 递增患者版本号，使所有查看该患者的会话在下一次请求时重建上下文。
+
+    【使用方法】
+    - 由 users.signals 在亲情绑定、订单、疗程、患者档案变更后调用；
+    - queryset.update() 不触发信号，批量更新后需手动调用。
+    """
+    if not patient_id:
+        return
+    _bump(_PATIENT_VERSION_KEY.format(patient_id=patient_id))
+
+
+def invalidate_user_viewer_context(user_id: int | None) -> None:
+    """
+    【功能说明】
+    - 递增用户版本号，使该用户的会话上下文失效（例如新绑定了患者或认领了档案）。
+    """
+    if not user_id:
+        return
+    _bump(_USER_VERSION_KEY.format(user_id=user_id))
+
+
+def _read_versions(user_id: int, patient_id: int | None) -> tuple[int, int] | None:
+    user_key = _USER_VERSION_KEY.format(user_id=user_id)
+    keys = [user_key]
+    patient_key = None
+    if patient_id:
+        patient_key = _PATIENT_VERSION_KEY.format(patient_id=patient_id)
+        keys.append(patient_key)
+    try:
+        versions = cache.get_many(keys)
+    except Exception:  # pragma: no cover - Redis 故障时不使用会话缓存
+        logger.warning("viewer context version read failed user_id=%s", user_id, exc_info=True)
+        return None
+    user_version = int(versions.get(user_key) or 0)
+    patient_version = int(versions.get(patient_key) or 0) if patient_key else 0
+    return user_version, patient_version
+
+
+def _resolve_patient_and_role(request) -> tuple[PatientProfile | None, str | None]:
+    user = request.user
+    # 1. 本人档案（PatientProfile.user 为 OneToOneField）
+    if hasattr(user, "patient_profile"):
+        return user.patient_profile, RELATION_ROLE_SELF
+
+    # 2. 家属：一次查询取出全部有效关系，优先 Session 中选中的患者，否则取最近绑定的一个
+    relations = list(
+        PatientRelation.objects.select_related("patient")
+        .filter(user=user, is_active=True)
+        .order_by("-created_at")
+    )
+    if not relations:
+        return None, None
+    session = getattr(request, "session", {})
+    session_patient_id = session.get(ACTIVE_PATIENT_SESSION_KEY)
+    relation = next(
+        (item for item in relations if item.patient_id == session_patient_id),
+        relations[0],
+    )
+    if session_patient_id != relation.patient_id:
+        # 自动帮用户种下 Session，方便后续使用
+        session[ACTIVE_PATIENT_SESSION_KEY] = relation.patient_id
+    return relation.patient, str(relation.relation_type)
+
+
+def _find_active_cycle_id(patient_id: int, as_of: date) -> int | None:
+    from core.models import TreatmentCycle
+    from core.models import choices as core_choices
+
+    return (
+        TreatmentCycle.objects.filter(
+            patient_id=patient_id,
+            status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
+            start_date__lte=as_of,
+        )
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=as_of))
+        .order_by("-start_date", "-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def _build_context(request, versions: tuple[int, int] | None) -> tuple[ViewerContext, PatientProfile | None]:
+    user = request.user
+    today = timezone.localdate()
+    patient, role = _resolve_patient_and_role(request)
+    if versions is not None and patient is not None:
+        # 解析出的患者可能与上次不同，补读其版本号。
+        versions = _read_versions(user.id, patient.id)
+    user_version, patient_version = versions or (0, 0)
+
+    membership_state, expire_date, active_cycle_id = "none", None, None
+    if patient is not None:
+        membership_state = patient.service_status
+        expire_date = patient.membership_expire_date
+        active_cycle_id = _find_active_cycle_id(patient.id, today)
+
+    context = ViewerContext(
+        user_id=user.id,
+        patient_id=patient.id if patient else None,
+        relation_role=role,
+        membership_state=membership_state,
+        membership_expire_date=expire_date.isoformat() if expire_date else None,
+        active_cycle_id=active_cycle_id,
+        as_of=today.isoformat(),
+        user_version=user_version,
+        patient_version=patient_version,
+        built_at=time.time(),
+    )
+    if versions is not None:
+        request.session[VIEWER_CONTEXT_SESSION_KEY] = asdict(context)
+    return context, patient
+
+
+def _load_cached_context(request) -> ViewerContext | None:
+    raw = request.session.get(VIEWER_CONTEXT_SESSION_KEY)
+    if not isinstance(raw, dict):
+        return None
+    try:
+        context = ViewerContext(**raw)
+    except TypeError:
+        return None
+    if context.user_id != request.user.id:
+        return None
+    if context.as_of != timezone.localdate().isoformat():
+        return None
+    max_age = getattr(settings, "VIEWER_CONTEXT_MAX_AGE_SECONDS", 600)
+    if time.time() - context.built_at > max_age:
+        return None
+    if not context.is_self:
+        session_patient_id = request.session.get(ACTIVE_PATIENT_SESSION_KEY)
+        if session_patient_id and session_patient_id != context.patient_id:
+            return None
+    return context
+
+
+def _resolve(request) -> tuple[ViewerContext | None, PatientProfile | None]:
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated or user.user_type != UserType.PATIENT:
+        return None, None
+    if not hasattr(request, "session") or not getattr(settings, "VIEWER_CONTEXT_CACHE_ENABLED", True):
+        return _build_context(request, None)
+
+    context = _load_cached_context(request)
+    versions = _read_versions(user.id, context.patient_id if context else None)
+    if context is not None and versions == (context.user_version, context.patient_version):
+        if context.patient_id is None:
+            return context, None
+        patient = PatientProfile.objects.filter(pk=context.patient_id).first()
+        if patient is not None:
+            # 预置会员缓存，is_member / membership_expire_date 不再查订单。
+            expire_date = (
+                date.fromisoformat(context.membership_expire_date)
+                if context.membership_expire_date
+                else None
+            )
+            patient._membership_cache = (context.membership_state, expire_date)
+            return context, patient
+    return _build_context(request, versions)
+
+
+def resolve_viewer(request) -> tuple[ViewerContext | None, PatientProfile | None]:
+    """
+    【功能说明】
+    - 解析当前请求对应的访问者上下文与患者档案，同一请求内只解析一次。
+    - 会话缓存命中时仅需一次按主键读取患者档案，跳过亲情关系、订单、疗程查询。
+
+    【使用方法】
+    - context, patient = resolve_viewer(request)
+
+    【返回值说明】
+    - (ViewerContext | None, PatientProfile | None)；非患者端用户返回 (None, None)。
+    """
+    cached = getattr(request, _REQUEST_CACHE_ATTR, None)
+    if cached is None:
+        cached = _resolve(request)
+        setattr(request, _REQUEST_CACHE_ATTR, cached)
+    return cached
+
+
+def get_viewer_context(request) -> ViewerContext | None:
+    """
+    【功能说明】
+    - 返回当前请求的访问者上下文；未经过 PatientContextMiddleware 的请求返回 None。
+
+    【使用方法】
+    - 权限装饰器中：context = get_viewer_context(request)
+    """
+    if not hasattr(request, _REQUEST_CACHE_ATTR) and not hasattr(request, "session"):
+        return None
+    context, _ = resolve_viewer(request)
+    return context
+
+
+def viewer_context_for(request, patient) -> ViewerContext | None:
+    """
+    【功能说明】
+    - 返回与给定患者一致的访问者上下文；患者不一致（如视图自行替换了 patient）时返回 None，调用方回落实时计算。
+
+    【使用方法】
+    - context = viewer_context_for(request, request.patient)
+    - resolve_home_plan_access(patient, has_active_cycle=context.has_active_cycle if context else None)
+    """
+    if patient is None:
+        return None
+    context = get_viewer_context(request)
+    if context is None or context.patient_id != getattr(patient, "pk", None):
+        return None
+    return context
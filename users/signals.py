@@ -0,0 +1,38 @@
+"""users 应用信号：绑定关系、付款、疗程、患者档案变更后使患者端访问者上下文缓存失效。"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import PatientProfile, PatientRelation
+from users.services.viewer_context import (
+    invalidate_patient_viewer_context,
+    invalidate_user_viewer_context,
+)
+
+
+@receiver(post_save, sender=PatientRelation)
+@receiver(post_delete, sender=PatientRelation)
+def invalidate_viewer_context_on_relation_change(sender, instance, **kwargs):
+    # 绑定/解绑同时影响“该用户能看哪些患者”和“哪些会话在看该患者”。
+    invalidate_user_viewer_context(instance.user_id)
+    invalidate_patient_viewer_context(instance.patient_id)
+
+
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_delete, sender=PatientProfile)
+def invalidate_viewer_context_on_profile_change(sender, instance, **kwargs):
+    # 档案认领会改变 user 归属；会员到期日等字段也随档案保存。
+    invalidate_user_viewer_context(instance.user_id)
+    invalidate_patient_viewer_context(instance.pk)
+
+
+@receiver(post_save, sender="market.Order")
+@receiver(post_delete, sender="market.Order")
+def invalidate_viewer_context_on_order_change(sender, instance, **kwargs):
+    invalidate_patient_viewer_context(instance.patient_id)
+
+
+@receiver(post_save, sender="core.TreatmentCycle")
+@receiver(post_delete, sender="core.TreatmentCycle")
+def invalidate_viewer_context_on_cycle_change(sender, instance, **kwargs):
+    invalidate_patient_viewer_context(instance.patient_id)
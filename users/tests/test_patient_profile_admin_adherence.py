@@ -0,0 +1,87 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import DailyTask, choices as core_choices
+from core.service import tasks as task_service
+from users.models import CustomUser, PatientProfile
+
+
+class PatientProfileAdminAdherenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.superuser = CustomUser.objects.create_superuser(
+            username="adherence_admin",
+            password="admin-pass-123",
+            phone="13900000032",
+        )
+        self.client.force_login(self.superuser)
+        self.url = reverse("admin:users_patientprofile_changelist")
+        # 依从率默认统计截至昨天。
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self.patients = []
+        for index in range(3):
+            patient = PatientProfile.objects.create(
+                phone=f"1380000003{index}",
+                name=f"依从患者{index}",
+            )
+            self.patients.append(patient)
+            for status in (core_choices.TaskStatus.COMPLETED, core_choices.TaskStatus.PENDING):
+                DailyTask.objects.create(
+                    patient=patient,
+                    task_date=yesterday,
+                    task_type=core_choices.PlanItemCategory.MEDICATION,
+                    title="用药",
+                    status=status,
+                )
+
+    def test_changelist_computes_page_adherence_in_one_batch(self):
+        with patch.object(
+            task_service,
+            "get_adherence_metrics_for_patients",
+            wraps=task_service.get_adherence_metrics_for_patients,
+        ) as batch:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual(
+            set(batch.call_args.args[0]),
+            {patient.id for patient in self.patients},
+        )
+        self.assertContains(response, "用药依从率")
+        self.assertContains(response, "50%")
+
+    def test_selected_patient_reuses_page_batch(self):
+        selected = self.patients[0]
+        with patch.object(
+            task_service,
+            "get_adherence_metrics_for_patients",
+            wraps=task_service.get_adherence_metrics_for_patients,
+        ) as batch:
+            response = self.client.get(self.url, {"patient_id": selected.id})
+
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual(
+            response.context["adherence_display"],
+            {"medication": "50%", "monitoring": "-", "other": "-"},
+        )
+
+    def test_export_action_streams_selected_patients_csv(self):
+        response = self.client.post(
+            self.url,
+            {
+                "action": "export_daily_tasks_csv",
+                "_selected_action": [self.patients[0].pk],
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,patient_id,"))
+        self.assertEqual(len(lines), 3)
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from core.models import TreatmentCycle
+from core.models import choices as core_choices
+from market.models import Order, Product
+from users import choices
+from users.decorators import require_membership, require_plan_access
+from users.models import CustomUser, PatientProfile, PatientRelation
+from users.services.viewer_context import VIEWER_CONTEXT_SESSION_KEY, resolve_viewer
+
+
+class ViewerContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.session = SessionStore()
+        self.owner = CustomUser.objects.create_user(
+            username="viewer_ctx_owner",
+            password="password",
+            user_type=choices.UserType.PATIENT,
+            wx_openid="openid_viewer_ctx_owner",
+        )
+        self.patient = PatientProfile.objects.create(user=self.owner, name="本人患者", phone="13800000061")
+        self.other_patient = PatientProfile.objects.create(name="另一位患者", phone="13800000062")
+        self.family = CustomUser.objects.create_user(
+            username="viewer_ctx_family",
+            password="password",
+            user_type=choices.UserType.PATIENT,
+            wx_openid="openid_viewer_ctx_family",
+        )
+        self.relation = PatientRelation.objects.create(
+            patient=self.patient,
+            user=self.family,
+            relation_type=choices.RelationType.CHILD,
+            is_active=True,
+        )
+
+    def _request(self, user):
+        request = self.factory.get("/p/home/")
+        request.user = CustomUser.objects.get(pk=user.pk)
+        request.session = self.session
+        return request
+
+    def _pay(self, patient):
+        product = Product.objects.create(name="VIP", price=Decimal("99.00"), duration_days=30, is_active=True)
+        Order.objects.create(
+            patient=patient,
+            product=product,
+            amount=product.price,
+            status=Order.Status.PAID,
+            paid_at=timezone.now(),
+        )
+
+    def test_family_context_is_cached_per_session(self):
+        context, patient = resolve_viewer(self._request(self.family))
+        self.assertEqual(patient, self.patient)
+        self.assertEqual(context.relation_role, str(choices.RelationType.CHILD))
+        self.assertIn(VIEWER_CONTEXT_SESSION_KEY, self.session)
+
+        request = self._request(self.family)
+        # 命中会话缓存：只按主键读取患者档案，会员状态不再查订单。
+        with self.assertNumQueries(1):
+            cached_context, cached_patient = resolve_viewer(request)
+            self.assertFalse(cached_patient.is_member)
+        self.assertEqual(cached_context, context)
+        self.assertEqual(cached_patient, self.patient)
+
+    def test_self_context_resolves_own_profile(self):
+        context, patient = resolve_viewer(self._request(self.owner))
+        self.assertTrue(context.is_self)
+        self.assertEqual(patient, self.patient)
+
+    def test_payment_invalidates_membership(self):
+        resolve_viewer(self._request(self.owner))
+        self._pay(self.patient)
+
+        context, patient = resolve_viewer(self._request(self.owner))
+
+        self.assertTrue(context.is_member)
+        self.assertTrue(patient.is_member)
+
+    def test_cycle_change_invalidates_active_cycle(self):
+        self.assertFalse(resolve_viewer(self._request(self.owner))[0].has_active_cycle)
+        cycle = TreatmentCycle.objects.create(
+            patient=self.patient,
+            name="疗程",
+            start_date=timezone.localdate(),
+            end_date=timezone.localdate() + timedelta(days=20),
+            status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+
+        context, _ = resolve_viewer(self._request(self.owner))
+
+        self.assertEqual(context.active_cycle_id, cycle.id)
+
+    def test_unbind_invalidates_family_context(self):
+        resolve_viewer(self._request(self.family))
+        self.relation.is_active = False
+        self.relation.save(update_fields=["is_active", "updated_at"])
+
+        context, patient = resolve_viewer(self._request(self.family))
+
+        self.assertIsNone(patient)
+        self.assertIsNone(context.patient_id)
+
+    def test_bind_invalidates_unbound_context(self):
+        stranger = CustomUser.objects.create_user(
+            username="viewer_ctx_stranger",
+            password="password",
+            user_type=choices.UserType.PATIENT,
+            wx_openid="openid_viewer_ctx_stranger",
+        )
+        self.assertIsNone(resolve_viewer(self._request(stranger))[1])
+        PatientRelation.objects.create(
+            patient=self.other_patient,
+            user=stranger,
+            relation_type=choices.RelationType.SPOUSE,
+            is_active=True,
+        )
+
+        self.assertEqual(resolve_viewer(self._request(stranger))[1], self.other_patient)
+
+    def test_switching_active_patient_rebuilds_context(self):
+        PatientRelation.objects.create(
+            patient=self.other_patient,
+            user=self.family,
+            relation_type=choices.RelationType.OTHER,
+            is_active=True,
+        )
+        self.session["active_patient_id"] = self.patient.id
+        self.assertEqual(resolve_viewer(self._request(self.family))[1], self.patient)
+
+        self.session["active_patient_id"] = self.other_patient.id
+
+        self.assertEqual(resolve_viewer(self._request(self.family))[1], self.other_patient)
+
+    def test_context_from_previous_day_is_rebuilt(self):
+        resolve_viewer(self._request(self.owner))
+        stale = dict(self.session[VIEWER_CONTEXT_SESSION_KEY])
+        stale["as_of"] = (timezone.localdate() - timedelta(days=1)).isoformat()
+        stale["membership_state"] = "active"
+        stale["membership_expire_date"] = timezone.localdate().isoformat()
+        self.session[VIEWER_CONTEXT_SESSION_KEY] = stale
+
+        context, _ = resolve_viewer(self._request(self.owner))
+
+        self.assertEqual(context.as_of, timezone.localdate().isoformat())
+        self.assertFalse(context.is_member)
+
+    def test_decorators_use_cached_context(self):
+        TreatmentCycle.objects.create(
+            patient=self.patient,
+            name="试用疗程",
+            start_date=timezone.localdate(),
+            end_date=timezone.localdate() + timedelta(days=20),
+            status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+        view = lambda request: HttpResponse("ok")  # noqa: E731
+        resolve_viewer(self._request(self.owner))
+        request = self._request(self.owner)
+        request.patient = resolve_viewer(request)[1]
+
+        with self.assertNumQueries(0), patch("users.decorators.generate_menu_auth_url", return_value="/buy/"):
+            plan_response = require_plan_access(view)(request)
+            membership_response = require_membership(view)(request)
+
+        self.assertEqual(plan_response.status_code, 200)
+        self.assertEqual(membership_response.status_code, 302)
@@ -1,6 +1,7 @@
 
 import json
 from datetime import date
+from unittest.mock import patch
 
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
@@ -9,7 +10,7 @@ from core.models import CheckupLibrary
 from health_data.models import ReportUpload, ReportImage, UploadSource
 from users.models import DoctorProfile, PatientProfile
 from users import choices
-from web_doctor.views.reports_history_data import batch_archive_images
+from web_doctor.views.reports_history_data import archive_job_status, batch_archive_images
 
 User = get_user_model()
 
@@ -78,3 +79,69 @@ class ImageArchiveTests(TestCase):
         self.assertIsNotNone(img2.checkup_item)
         self.assertEqual(img2.checkup_item.name, "CT")
         self.assertIsNotNone(img2.clinical_event)
+
+    @patch("health_data.tasks.process_archive_job_task.delay")
+    def test_batch_archive_returns_job_status_url(self, mock_job_delay):
+        self.patient.doctor = self.doctor_profile
+        self.patient.save(update_fields=["doctor"])
+        upload = ReportUpload.objects.create(patient=self.patient, upload_source=UploadSource.PERSONAL_CENTER)
+        image = ReportImage.objects.create(upload=upload, image_url="http://test.com/1.jpg")
+        payload = {
+            "updates": [
+                {"image_id": image.id, "category": "复查-CT", "report_date": "2023-01-02"}
+            ]
+        }
+        request = self.factory.post(
+            f'/doctor/workspace/patient/{self.patient.id}/reports/archive/',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        request.user = self.user
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = batch_archive_images(request, self.patient.id)
+
+        self.assertEqual(response.status_code, 200)
+        status_url = response["X-Archive-Job-Status-Url"]
+        job_id = status_url.rstrip("/").rsplit("/", 1)[-1]
+        mock_job_delay.assert_called_once_with(job_id, [image.id], [])
+
+        status_request = self.factory.get(status_url)
+        status_request.user = self.user
+        status_response = archive_job_status(status_request, self.patient.id, job_id)
+        self.assertEqual(status_response.status_code, 200)
+        self.assertEqual(json.loads(status_response.content)["status"], "pending")
+
+        missing_response = archive_job_status(status_request, self.patient.id, "missing")
+        self.assertEqual(missing_response.status_code, 404)
+
+    @patch("health_data.tasks.process_archive_job_task.delay")
+    def test_archive_job_status_hidden_from_other_patients_and_doctors(self, _mock_job_delay):
+        self.patient.doctor = self.doctor_profile
+        self.patient.save(update_fields=["doctor"])
+        other_patient = PatientProfile.objects.create(name="Other Patient", phone="13800000002", doctor=self.doctor_profile)
+        upload = ReportUpload.objects.create(patient=self.patient, upload_source=UploadSource.PERSONAL_CENTER)
+        image = ReportImage.objects.create(upload=upload, image_url="http://test.com/1.jpg")
+        request = self.factory.post(
+            f'/doctor/workspace/patient/{self.patient.id}/reports/archive/',
+            data=json.dumps({"updates": [{"image_id": image.id, "category": "复查-CT", "report_date": "2023-01-02"}]}),
+            content_type='application/json'
+        )
+        request.user = self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            response = batch_archive_images(request, self.patient.id)
+        job_id = response["X-Archive-Job-Status-Url"].rstrip("/").rsplit("/", 1)[-1]
+
+        status_request = self.factory.get("/")
+        status_request.user = self.user
+        self.assertEqual(archive_job_status(status_request, other_patient.id, job_id).status_code, 404)
+
+        other_user = User.objects.create_user(
+            username='doctor2',
+            password='password',
+            user_type=choices.UserType.DOCTOR,
+            phone="13800000001"
+        )
+        DoctorProfile.objects.create(user=other_user, name='Other Doctor')
+        status_request.user = other_user
+        self.assertEqual(archive_job_status(status_request, self.patient.id, job_id).status_code, 404)
@@ -17,8 +17,6 @@ def _empty_page():
     return SimpleNamespace(object_list=[])
 
 
-@patch("web_doctor.views.indicators.cache.get", return_value=None)
-@patch("web_doctor.views.indicators.cache.set", return_value=None)
 @patch("web_doctor.views.indicators.get_adherence_metrics_batch", return_value=[])
 @patch("web_doctor.views.indicators.QuestionnaireSubmissionService.list_daily_questionnaire_scores", return_value=[])
 @patch("web_doctor.views.indicators.QuestionnaireSubmissionService.list_daily_cough_hemoptysis_flags", return_value=[])
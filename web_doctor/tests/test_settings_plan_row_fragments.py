@@ -0,0 +1,130 @@
+import json
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Medication, PlanItem, TreatmentCycle, choices
+from core.service.plan_item import PlanItemService
+from users.choices import UserType
+from users.models import CustomUser, DoctorProfile, PatientProfile
+
+
+class SettingsPlanRowFragmentTests(TestCase):
+    def setUp(self):
+        self.doctor_user = CustomUser.objects.create_user(
+            username="doctor_plan_row",
+            password="password123",
+            user_type=UserType.DOCTOR,
+            phone="13900006670",
+        )
+        doctor_profile = DoctorProfile.objects.create(user=self.doctor_user, name="王医生")
+        patient_user = CustomUser.objects.create_user(
+            username="patient_plan_row",
+            password="password123",
+            user_type=UserType.PATIENT,
+            phone="13800006670",
+            wx_openid="openid_plan_row",
+        )
+        self.patient = PatientProfile.objects.create(
+            user=patient_user,
+            doctor=doctor_profile,
+            name="患者D",
+            phone="13800006670",
+            is_active=True,
+        )
+        today = date.today()
+        self.cycle = TreatmentCycle.objects.create(
+            patient=self.patient,
+            name="进行中疗程",
+            start_date=today,
+            end_date=today + timedelta(days=20),
+            cycle_days=21,
+            status=choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+        self.medication = Medication.objects.create(
+            name="测试药物",
+            name_abbr="CSYW",
+            default_dosage="10mg",
+            default_frequency="qd",
+            is_active=True,
+        )
+        self.plan = PlanItem.objects.create(
+            cycle=self.cycle,
+            category=choices.PlanItemCategory.MEDICATION,
+            template_id=self.medication.id,
+            item_name=self.medication.name,
+            schedule_days=[1, 2],
+            status=choices.PlanItemStatus.ACTIVE,
+        )
+        self.client.login(username="doctor_plan_row", password="password123")
+
+    def _toggle_url(self, day):
+        return reverse(
+            "web_doctor:patient_plan_item_toggle_day",
+            args=[self.patient.id, self.plan.id, day],
+        )
+
+    def test_toggle_day_returns_only_changed_row(self):
+        response = self.client.post(self._toggle_url(3))
+
+        self.assertEqual(response.status_code, 200)
+        html = response.content.decode("utf-8")
+        self.assertTrue(html.strip().startswith("<tr"))
+        self.assertEqual(html.count("<tr"), 1)
+        self.assertIn("测试药物", html)
+        self.assertIn(self._toggle_url(3), html)
+        self.assertIn('hx-target="closest tr"', html)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.schedule_days, [1, 2, 3])
+
+    def test_toggle_day_rejects_past_day_with_plan_error(self):
+        self.cycle.start_date = date.today() - timedelta(days=5)
+        self.cycle.save(update_fields=["start_date"])
+
+        response = self.client.post(self._toggle_url(1))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.has_header("HX-Trigger"))
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.schedule_days, [1, 2])
+
+    def test_toggle_day_plan_error_header_is_valid_json(self):
+        messages = ['第 "1" 天已过期', "second line"]
+        with patch.object(
+            PlanItemService,
+            "toggle_schedule_day",
+            side_effect=ValidationError(messages),
+        ):
+            response = self.client.post(self._toggle_url(3))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            json.loads(response["HX-Trigger"]),
+            {"plan-error": {"message": "\n".join(messages)}},
+        )
+
+    def test_plan_table_is_served_from_cache_until_plan_changes(self):
+        url = reverse("web_doctor:patient_settings_plan_table", args=[self.patient.id])
+        url += f"?cycle_id={self.cycle.id}"
+
+        with patch.object(
+            PlanItemService, "get_cycle_plan_view", wraps=PlanItemService.get_cycle_plan_view
+        ) as plan_view:
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(plan_view.call_count, 1)
+
+            self.client.post(self._toggle_url(5))
+            calls_after_toggle = plan_view.call_count
+            html = self.client.get(url).content.decode("utf-8")
+
+        self.assertEqual(calls_after_toggle, 2)
+        self.assertEqual(plan_view.call_count, 2)
+        self.assertIn(self._toggle_url(5), html)
+        self.assertIn(
+            "checked",
+            html.split(self._toggle_url(5))[0].rsplit("<input", 1)[1],
+        )
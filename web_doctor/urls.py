@@ -198,6 +198,11 @@ urlpatterns = [
         views.batch_archive_images,
         name="batch_archive_images",
     ),
+    path(
+        "doctor/workspace/patient/<int:patient_id>/reports/archive-jobs/<str:job_id>/",
+        views.archive_job_status,
+        name="archive_job_status",
+    ),
     path(
         "doctor/workspace/patient/<int:patient_id>/reports/image/<int:image_id>/ignore-ai-warning/",
         views.ignore_ai_sync_warning,
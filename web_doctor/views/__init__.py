@@ -32,6 +32,7 @@ from .reports_history_data import (
     patient_report_detail,
     patient_report_create_modal,
     batch_archive_images,
+    archive_job_status,
     ignore_ai_sync_warning,
     create_consultation_record,
     delete_consultation_record,
@@ -106,6 +107,7 @@ __all__ = [
     "patient_report_detail",
     "patient_report_create_modal",
     "batch_archive_images",
+    "archive_job_status",
     "ignore_ai_sync_warning",
     "create_consultation_record",
     "delete_consultation_record",
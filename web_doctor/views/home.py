@@ -30,7 +30,8 @@ from core.service.treatment_cycle import (
     get_treatment_cycles,
 )
 from core.service.tasks import MONITORING_ADHERENCE_ALL, get_adherence_metrics
-from core.models import TreatmentCycle, choices, CheckupLibrary
+from core.models import TreatmentCycle, choices
+from core.service.catalog import CatalogService
 from core.service.plan_item import PlanItemService
 from core.service.checkup import get_active_checkup_library
 from django.utils import timezone
@@ -677,7 +678,7 @@ def create_checkup_record(request: HttpRequest, patient_id: int) -> JsonResponse
     upload_dir = f"examination_reports/{patient.id}/{event_date}"
     
     # 预加载复查项目库，减少数据库查询
-    checkup_libs = {lib.name: lib for lib in CheckupLibrary.objects.all()}
+    checkup_libs = CatalogService.get_checkup_library_map_by_name()
     
     try:
         for file in files:
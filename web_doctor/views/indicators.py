@@ -4,7 +4,6 @@ from datetime import date, timedelta, datetime
 from decimal import Decimal, ROUND_CEILING, InvalidOperation
 from django.db.models import Count, Q
 from django.utils import timezone
-from django.core.cache import cache
 from core.models import (
     DailyTask,
     TreatmentCycle,
@@ -27,6 +26,7 @@ from health_data.services.review_indicator_service import (
     query_followup_review_series as _query_followup_review_series,
 )
 from users.models import PatientProfile
+from lung_cancer_care.db_router import use_replica
 
 logger = logging.getLogger(__name__)
 
@@ -412,6 +412,7 @@ def _build_followup_review_indicator(
     }
 
 
+@use_replica()
 def build_indicators_context(
     patient: PatientProfile,
     cycle_id: str | None = None,
@@ -891,24 +892,19 @@ def build_indicators_context(
     # 构造查询列表
     types_to_query = [med_type] + list(chart_metric_map.values())
     
-    # 尝试从缓存获取
-    cache_key = f"adherence_metrics_{patient.id}_{start_date}_{end_date}"
-    adherence_results = cache.get(cache_key)
-    
-    if not adherence_results:
-        try:
-            adherence_results = get_adherence_metrics_batch(
-                patient=patient,
-                adherence_types=types_to_query,
-                start_date=start_date,
-                end_date=end_date
-            )
-            # 缓存 5 分钟
-            cache.set(cache_key, adherence_results, 300)
-        except Exception as e:
-            logger.error(f"Failed to fetch adherence metrics for patient {patient.id}: {e}")
-            # 发生错误时保留“不可计算”语义，页面依从性显示为 "-"
-            adherence_results = []
+    # 按患者、按天缓存分组统计结果，任务完成时由服务层失效
+    try:
+        adherence_results = get_adherence_metrics_batch(
+            patient=patient,
+            adherence_types=types_to_query,
+            start_date=start_date,
+            end_date=end_date,
+            use_cache=True,
+        )
+    except Exception as e:
+        logger.error(f"Failed to fetch adherence metrics for patient {patient.id}: {e}")
+        # 发生错误时保留“不可计算”语义，页面依从性显示为 "-"
+        adherence_results = []
         
     # 将结果转换为字典以便查找
     adherence_map = {res['type']: res for res in adherence_results}
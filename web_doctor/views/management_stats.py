@@ -6,7 +6,11 @@ from django.utils import timezone
 import datetime
 
 from market.service.order import get_paid_orders_for_patient
-from core.service.tasks import get_adherence_metrics, MONITORING_ADHERENCE_ALL
+from core.service.tasks import (
+    get_adherence_metrics_batch,
+    MONITORING_ADHERENCE_ALL,
+    MONITORING_ADHERENCE_TYPES,
+)
 from health_data.services.health_metric import HealthMetricService
 from health_data.services.questionnaire_display import QuestionnaireDisplayService
 from core.models.choices import PlanItemCategory
@@ -18,9 +22,15 @@ from health_data.models import (
 )
 from django.contrib.auth.decorators import login_required
 from users.decorators import check_doctor_or_assistant
-from chat.services.chat import ChatService
+from lung_cancer_care.db_router import use_replica
+from chat.services.chat import CHAT_TIME_SLOTS, ChatService
+from health_data.services.monthly_stats import PatientStatsPeriod, build_patient_stats
+
+logger = logging.getLogger(__name__)
+
 
 class ManagementStatsView:
+    @use_replica()
     def get_context_data(self, patient: Any, selected_package_id: Optional[int] = None) -> Dict[str, Any]:
         """
         获取管理统计页面的上下文数据
@@ -58,17 +68,25 @@ class ManagementStatsView:
             start_date = active_package["start_date"]
             end_date = active_package["end_date"]
 
+        # 已结束月份读月度快照，其余日期实时聚合；失败时各模块退回原有实时查询
+        period_stats = None
+        if patient and start_date and end_date:
+            try:
+                period_stats = build_patient_stats(patient, start_date, end_date)
+            except Exception:
+                logger.exception("management stats snapshot read failed patient_id=%s", patient.id)
+
         # 生成图表数据
-        charts = self._generate_charts_data(patient, start_date, end_date)
+        charts = self._generate_charts_data(patient, start_date, end_date, stats=period_stats)
         questionnaire_count_charts = self._generate_questionnaire_count_charts(
-            patient, start_date, end_date
+            patient, start_date, end_date, stats=period_stats
         )
 
         # 生成复查指标统计
         followup_review_charts = self._generate_followup_review_charts(patient, start_date, end_date)
         
         # 生成咨询数据统计
-        query_stats = self._generate_query_stats(patient, start_date, end_date)
+        query_stats = self._generate_query_stats(patient, start_date, end_date, stats=period_stats)
 
         # 管理数据概览
         stats_overview = self._build_stats_overview(
@@ -76,6 +94,7 @@ class ManagementStatsView:
             start_date,
             end_date,
             query_stats=query_stats,
+            stats=period_stats,
         )
 
         return {
@@ -118,6 +137,7 @@ class ManagementStatsView:
         end_date: date | None,
         *,
         query_stats: Dict[str, Any] | None = None,
+        stats: PatientStatsPeriod | None = None,
     ) -> Dict[str, Any]:
         stats_overview = {
             "medication_adjustment": 0,
@@ -134,9 +154,16 @@ class ManagementStatsView:
         if not patient or not start_date or not end_date:
             return stats_overview
 
-        med_metrics = get_adherence_metrics(
-            patient_id=patient.id,
-            adherence_type=PlanItemCategory.MEDICATION,
+        if stats is not None:
+            return self._build_stats_overview_from_period(
+                stats_overview,
+                stats,
+                query_stats=query_stats,
+            )
+
+        med_metrics, mon_metrics = get_adherence_metrics_batch(
+            patient=patient,
+            adherence_types=[PlanItemCategory.MEDICATION, MONITORING_ADHERENCE_ALL],
             start_date=start_date,
             end_date=end_date,
         )
@@ -151,12 +178,6 @@ class ManagementStatsView:
             stats_overview["medication_taken"],
         )
 
-        mon_metrics = get_adherence_metrics(
-            patient_id=patient.id,
-            adherence_type=MONITORING_ADHERENCE_ALL,
-            start_date=start_date,
-            end_date=end_date,
-        )
         stats_overview["indicators_monitoring"] = mon_metrics.get("total", 0)
         stats_overview["monitoring_compliance"] = self._format_rate(
             mon_metrics.get("rate")
@@ -196,6 +217,37 @@ class ManagementStatsView:
 
         return stats_overview
 
+    def _build_stats_overview_from_period(
+        self,
+        stats_overview: Dict[str, Any],
+        stats: PatientStatsPeriod,
+        *,
+        query_stats: Dict[str, Any] | None = None,
+    ) -> Dict[str, Any]:
+        """按合并后的月度统计填充概览，口径同实时查询分支。"""
+        med_total, med_completed = stats.medication_tasks
+        mon_total, mon_completed = stats.monitoring_tasks
+        stats_overview["medication_taken"] = stats.count_metric_uploads([MetricType.USE_MEDICATED])
+        stats_overview["medication_compliance"] = self._format_medication_compliance(
+            med_completed / med_total if med_total else None,
+            stats_overview["medication_taken"],
+        )
+        stats_overview["indicators_monitoring"] = mon_total
+        stats_overview["monitoring_compliance"] = self._format_rate(
+            mon_completed / mon_total if mon_total else None
+        )
+        stats_overview["indicators_recorded"] = stats.count_metric_uploads(
+            MONITORING_ADHERENCE_TYPES
+        )
+        if query_stats is not None:
+            stats_overview["online_consultation"] = query_stats.get("total_count", 0)
+        else:
+            stats_overview["online_consultation"] = stats.chat_session_total
+        stats_overview["follow_up"] = stats.questionnaire_submission_total
+        stats_overview["hospitalization"] = stats.clinical_events.get(2, 0)
+        stats_overview["checkup"] = stats.clinical_events.get(3, 0)
+        return stats_overview
+
     @staticmethod
     def _build_month_labels(start_date: date | None, end_date: date | None) -> list[str]:
         if not start_date or not end_date:
@@ -212,7 +264,13 @@ class ManagementStatsView:
                 curr = date(curr.year, curr.month + 1, 1)
         return months
     
-    def _generate_charts_data(self, patient: Any, start_date: date | None, end_date: date | None) -> Dict[str, Any]:
+    def _generate_charts_data(
+        self,
+        patient: Any,
+        start_date: date | None,
+        end_date: date | None,
+        stats: PatientStatsPeriod | None = None,
+    ) -> Dict[str, Any]:
         """
         生成管理数据统计图表数据
         """
@@ -247,7 +305,15 @@ class ManagementStatsView:
         # 获取数据
         combined_data = {}
 
-        if start_date and end_date and all_types_to_query:
+        if stats is not None:
+            combined_data = {
+                type_code: [
+                    {"month": month, "count": count}
+                    for month, count in stats.metric_uploads_by_month(type_code).items()
+                ]
+                for type_code in all_types_to_query
+            }
+        elif start_date and end_date and all_types_to_query:
             try:
                 # 统一调用接口获取所有类型（指标+问卷）的数据
                 combined_data = HealthMetricService.count_metric_uploads_by_month(
@@ -296,13 +362,22 @@ class ManagementStatsView:
         patient: Any,
         start_date: date | None,
         end_date: date | None,
+        stats: PatientStatsPeriod | None = None,
     ) -> list[Dict[str, Any]]:
         """Return database-driven monthly counts for all enabled questionnaires."""
+        counts = None
+        if stats is not None:
+            counts = {
+                (questionnaire_id, month): count
+                for month, by_questionnaire in stats.questionnaire_submissions.items()
+                for questionnaire_id, count in by_questionnaire.items()
+            }
         return QuestionnaireDisplayService.build_monthly_count_charts(
             patient=patient,
             start_date=start_date,
             end_date=end_date,
             month_labels=self._build_month_labels(start_date, end_date),
+            counts=counts,
         )
 
     def _generate_followup_review_charts(self, patient: Any, start_date: date | None, end_date: date | None) -> list[Dict[str, Any]]:
@@ -410,7 +485,13 @@ class ManagementStatsView:
 
         return charts
 
-    def _generate_query_stats(self, patient: Any, start_date: date | None, end_date: date | None) -> Dict[str, Any]:
+    def _generate_query_stats(
+        self,
+        patient: Any,
+        start_date: date | None,
+        end_date: date | None,
+        stats: PatientStatsPeriod | None = None,
+    ) -> Dict[str, Any]:
         """
         生成咨询数据统计
         """
@@ -434,17 +515,29 @@ class ManagementStatsView:
         if not patient or not start_date or not end_date:
             return empty_result
 
-        try:
-            chat_service = ChatService()
-            stats = chat_service.get_patient_chat_session_stats(
-                patient=patient,
-                start_date=start_date,
-                end_date=end_date
-            )
-            # logging.info(f"数据: {stats}")
-        except Exception as e:
-            # 如果服务调用失败，返回空数据
-            return empty_result
+        if stats is not None:
+            stats = {
+                "total": stats.chat_session_total,
+                "monthly": [
+                    {"month": month, "count": count}
+                    for month, count in sorted(stats.chat_sessions.items())
+                ],
+                "time_slots": {
+                    slot: stats.chat_time_slots.get(slot, 0) for slot in CHAT_TIME_SLOTS
+                },
+            }
+        else:
+            try:
+                chat_service = ChatService()
+                stats = chat_service.get_patient_chat_session_stats(
+                    patient=patient,
+                    start_date=start_date,
+                    end_date=end_date
+                )
+                # logging.info(f"数据: {stats}")
+            except Exception as e:
+                # 如果服务调用失败，返回空数据
+                return empty_result
 
         # 1. 处理折线图数据 (按月统计)
         months = []
@@ -818,18 +818,23 @@ def _load_review_image_groups_batch(
         if date_list:
             images_qs = (
                 base_qs.filter(report_date__in=date_list)
-                .values("report_date", "image_url")
+                .values("report_date", "image_url", "renditions")
                 .order_by("-report_date", "-id")
             )
             images_by_date = {report_date: [] for report_date in date_list}
+            thumbnails_by_date = {report_date: [] for report_date in date_list}
             for row in images_qs:
                 images_by_date.setdefault(row["report_date"], []).append(row["image_url"])
+                thumbnails_by_date.setdefault(row["report_date"], []).append(
+                    ReportImage.thumbnail_url_for(row["image_url"], row["renditions"])
+                )
 
             for report_date in date_list:
                 groups.append(
                     {
                         "report_date": report_date.strftime("%Y-%m-%d"),
                         "image_urls": images_by_date.get(report_date, []),
+                        "thumbnail_urls": thumbnails_by_date.get(report_date, []),
                     }
                 )
 
@@ -2,12 +2,12 @@ import json
 import os
 import uuid
 import logging
-import time
 from typing import Dict, Any
 from datetime import datetime
 
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
@@ -20,6 +20,8 @@ from django.utils import timezone
 
 from users.decorators import check_doctor_or_assistant
 from users.models import PatientProfile
+from lung_cancer_care.db_router import use_replica
+from health_data.services.archive_jobs import get_archive_job_status, new_archive_job_id
 from health_data.services.report_service import ReportArchiveService
 from health_data.services.checkup_results import (
     build_report_image_metrics_payload,
@@ -29,7 +31,7 @@ from health_data.services.checkup_results import (
 from health_data.models import ReportImage, ClinicalEvent, ReportUpload
 from health_data.models.report_upload import UploadSource
 from core.service.checkup import get_active_checkup_library 
-from core.models import CheckupLibrary
+from core.service.catalog import CatalogService
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +40,6 @@ REPORTS_CONTENT_TEMPLATE = "web_doctor/partials/reports_history/_content.html"
 REPORTS_DETAIL_TEMPLATE = "web_doctor/partials/reports_history/_record_detail.html"
 REPORTS_ROW_SUMMARY_TEMPLATE = "web_doctor/partials/reports_history/_record_row_summary.html"
 REPORTS_CREATE_MODAL_TEMPLATE = "web_doctor/partials/reports_history/create_modal.html"
-CHECKUP_SUBCATEGORIES_CACHE_TTL_SECONDS = 300
 
 # 预设图片分类
 REPORT_IMAGE_CATEGORIES = [
@@ -57,29 +58,18 @@ RECHECK_SUB_CATEGORIES = [
     "心电图", "凝血功能", "甲状腺功能", "肿瘤评估", "肿瘤标志物", "其他"
 ]
 
-_checkup_subcategories_cache: dict[str, Any] = {
-    "expires_at": 0.0,
-    "value": RECHECK_SUB_CATEGORIES,
-}
-
 def get_report_image_categories():
     """获取所有可用的图片分类"""
     return REPORT_IMAGE_CATEGORIES
 
 
 def _get_checkup_subcategories() -> list[str]:
-    now = time.time()
-    if _checkup_subcategories_cache["expires_at"] > now:
-        return list(_checkup_subcategories_cache["value"])
-
     try:
         checkup_lib = get_active_checkup_library()
         categories = [item["name"] for item in checkup_lib]
     except Exception:
         categories = RECHECK_SUB_CATEGORIES
 
-    _checkup_subcategories_cache["value"] = categories
-    _checkup_subcategories_cache["expires_at"] = now + CHECKUP_SUBCATEGORIES_CACHE_TTL_SECONDS
     return list(categories)
 
 
@@ -128,7 +118,9 @@ def _build_report_image_dict(
         "id": img.id,
         "name": f"图片-{img.id}",
         "url": img.image_url,
-        "thumbnail_url": img.image_url,
+        "thumbnail_url": img.thumbnail_url,
+        "srcset": img.srcset,
+        "webp_srcset": img.webp_srcset,
         "category": category_str,
         "record_type": record_type_display,
         "sub_category": sub_category,
@@ -328,13 +320,13 @@ def _get_archives_data(patient: PatientProfile, page: int = 1, page_size: int =
     if candidate_checkup_ids:
         checkup_id_to_name = {
             item.id: item.name
-            for item in CheckupLibrary.objects.filter(id__in=candidate_checkup_ids).only("id", "name")
+            for item in CatalogService.get_checkup_libraries_by_ids(candidate_checkup_ids).values()
         }
 
     checkup_name_exists: set[str] = set()
     if candidate_checkup_names:
-        checkup_name_exists = set(
-            CheckupLibrary.objects.filter(name__in=candidate_checkup_names).values_list("name", flat=True)
+        checkup_name_exists = candidate_checkup_names & set(
+            CatalogService.get_checkup_library_map_by_name()
         )
 
     upload_checkup_sub_name: dict[int, str] = {}
@@ -548,6 +540,7 @@ def _build_reports_section_context(
     return context
 
 
+@use_replica()
 def handle_reports_history_section(request: HttpRequest, context: dict) -> str:
     """
     处理检查报告历史记录板块
@@ -674,7 +667,9 @@ def batch_archive_images(request: HttpRequest, patient_id: int) -> HttpResponse:
         return _render_images_tab_response(request, patient_id, "无未归档图片需要归档", toast_type="info")
         
     service_updates = []
-    checkup_libs = {lib.name: lib.id for lib in CheckupLibrary.objects.all()}
+    checkup_libs = {
+        name: lib.id for name, lib in CatalogService.get_checkup_library_map_by_name().items()
+    }
     
     for idx, update in enumerate(updates):
         img_id = update.get("image_id")
@@ -740,13 +735,54 @@ def batch_archive_images(request: HttpRequest, patient_id: int) -> HttpResponse:
     else:
         return HttpResponse("非医生/助理账号无法归档", status=403)
          
+    job_id = new_archive_job_id()
     try:
-        ReportArchiveService.archive_images(archiver, service_updates, archiver_name=archiver_name)
+        ReportArchiveService.archive_images(
+            archiver,
+            service_updates,
+            archiver_name=archiver_name,
+            job_id=job_id,
+        )
     except Exception as e:
         logger.exception("归档失败")
         return HttpResponse(f"归档失败: {str(e)}", status=400)
 
-    return _render_images_tab_response(request, patient_id, "归档保存成功", toast_type="success")
+    response = _render_images_tab_response(request, patient_id, "归档保存成功", toast_type="success")
+    if get_archive_job_status(job_id) is not None:
+        response["X-Archive-Job-Status-Url"] = reverse(
+            "web_doctor:archive_job_status",
+            args=[patient_id, job_id],
+        )
+    return response
+
+
+@login_required
+@check_doctor_or_assistant
+def archive_job_status(request: HttpRequest, patient_id: int, job_id: str) -> JsonResponse:
+    """
+    查询归档后台任务进度（复查指标联动、AI 结构化结果同步）。
+    任务须属于 URL 中的患者、由当前账号可代表的医生发起，且当前账号可访问该患者，否则按不存在处理。
+    """
+    state = get_archive_job_status(job_id)
+    if state is None or not _can_view_archive_job(request.user, patient_id, state):
+        return JsonResponse({"status": "error", "message": "任务不存在或已过期"}, status=404)
+    return JsonResponse({"job_id": job_id, **state})
+
+
+def _can_view_archive_job(user, patient_id: int, state: Dict[str, Any]) -> bool:
+    if state.get("patient_id") != patient_id:
+        return False
+    doctor_profile = getattr(user, "doctor_profile", None)
+    assistant_profile = getattr(user, "assistant_profile", None)
+    if doctor_profile:
+        doctor_ids = {doctor_profile.id}
+    elif assistant_profile:
+        doctor_ids = set(assistant_profile.doctors.values_list("id", flat=True))
+    else:
+        return False
+    if state.get("doctor_id") not in doctor_ids:
+        return False
+    return PatientProfile.objects.filter(pk=patient_id, doctor_id__in=doctor_ids).exists()
 
 
 @login_required
@@ -826,7 +862,9 @@ def patient_report_update(request: HttpRequest, patient_id: int, report_id: int)
     }
     record_type = type_map.get(record_type_str) if record_type_str else event.event_type
 
-    checkup_name_to_id = {lib.name: lib.id for lib in CheckupLibrary.objects.all()}
+    checkup_name_to_id = {
+        name: lib.id for name, lib in CatalogService.get_checkup_library_map_by_name().items()
+    }
     service_updates = []
     for update in image_updates:
         img_id = update.get("image_id")
@@ -933,7 +971,7 @@ def create_consultation_record(request: HttpRequest, patient_id: int) -> JsonRes
     image_payloads = []
     upload_dir = f"examination_reports/{patient.id}/{event_date}"
     
-    checkup_libs = {lib.name: lib for lib in CheckupLibrary.objects.all()}
+    checkup_libs = CatalogService.get_checkup_library_map_by_name()
     
     try:
         for file in files:
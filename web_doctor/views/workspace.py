@@ -750,6 +750,41 @@ def patient_indicator_preferences_update(request: HttpRequest, patient_id: int)
     return render(request, "web_doctor/partials/indicators/followup_review_monitoring.html", context)
 
 
+# 计划表单行模板：category -> (模板, 行上下文变量名, plan_view 列表键)
+_PLAN_ROW_TEMPLATES = {
+    core_choices.PlanItemCategory.MEDICATION: (
+        "web_doctor/partials/settings/plan_table_medication_row.html", "med", "medications",
+    ),
+    core_choices.PlanItemCategory.CHECKUP: (
+        "web_doctor/partials/settings/plan_table_checkup_row.html", "check", "checkups",
+    ),
+    core_choices.PlanItemCategory.QUESTIONNAIRE: (
+        "web_doctor/partials/settings/plan_table_questionnaire_row.html", "questionnaire", "questionnaires",
+    ),
+    core_choices.PlanItemCategory.MONITORING: (
+        "web_doctor/partials/settings/plan_table_monitoring_row.html", "monitoring", "monitorings",
+    ),
+}
+
+
+def _build_plan_row(category: int, item: dict) -> dict:
+    """将 PlanItemService 计划视图中的单个库条目转换为计划表行数据。"""
+    row = {
+        "lib_id": item["library_id"],
+        "name": item["name"],
+        "is_active": bool(item.get("is_active")),
+        "schedule": list(item.get("schedule_days") or []),
+        "plan_item_id": item.get("plan_item_id"),
+    }
+    if category == core_choices.PlanItemCategory.MEDICATION:
+        row["type"] = item.get("type", "")
+        row["default_dosage"] = item.get("current_dosage") or item.get("default_dosage") or ""
+        row["default_frequency"] = item.get("current_usage") or item.get("default_frequency") or ""
+    elif category == core_choices.PlanItemCategory.CHECKUP:
+        row["category"] = item.get("related_report_type") or ""
+    return row
+
+
 def _build_settings_context(
     patient: PatientProfile,
     tc_page: str | None = None,
@@ -836,67 +871,34 @@ def _build_settings_context(
         header_days = header_meta.get("header_days") or []
         header_week_ranges = header_meta.get("header_week_ranges") or []
 
-        # cycle_plan = PlanItemService.get_cycle_plan_view(selected_cycle.id)
         cycle_plan = {}
         if hasattr(selected_cycle, 'id') and selected_cycle.id:
             try:
-                cycle_plan = PlanItemService.get_cycle_plan_view(selected_cycle.id)
+                cycle_plan = PlanItemService.get_cached_cycle_plan_view(selected_cycle)
             except Exception as e:
                 # 捕获异常，避免单个疗程计划查询失败导致整个页面报错
                 logger.error(f"获取疗程 {selected_cycle.id} 计划视图失败：{e}")
                 cycle_plan = {}
 
         # 用药计划：仅展示当前疗程已选中的药品
-        for med in cycle_plan.get("medications", []):
-            if not med.get("is_active"):
-                continue
-            medications.append(
-                {
-                    "lib_id": med["library_id"],
-                    "name": med["name"],
-                    "type": med.get("type", ""),
-                    "default_dosage": med.get("current_dosage") or med.get("default_dosage") or "",
-                    "default_frequency": med.get("current_usage") or med.get("default_frequency") or "",
-                    "schedule": list(med.get("schedule_days") or []),
-                    "plan_item_id": med.get("plan_item_id"),
-                }
-            )
-        
-        # 复查计划：展示所有启用中的复查项目，与当前疗程下的计划状态融合
-        for chk in cycle_plan.get("checkups", []):
-            checkups.append(
-                {
-                    "lib_id": chk["library_id"],
-                    "name": chk["name"],
-                    "category": chk.get("related_report_type") or "",
-                    "is_active": bool(chk.get("is_active")),
-                    "schedule": list(chk.get("schedule_days") or []),
-                    "plan_item_id": chk.get("plan_item_id"),
-                }
-            )
-
-        # 问卷计划：同样从 PlanItem 视图中获取
-        for q in cycle_plan.get("questionnaires", []):
-            item = {
-                "lib_id": q["library_id"],
-                "name": q["name"],
-                "is_active": bool(q.get("is_active")),
-                "schedule": list(q.get("schedule_days") or []),
-                "plan_item_id": q.get("plan_item_id"),
-            }
-            questionnaires.append(item)
-
-        # 一般监测计划：与复查/问卷类似，从 PlanItem 视图中获取（以 MonitoringTemplate 为库）
-        for m in cycle_plan.get("monitorings", []):
-            monitorings.append(
-                {
-                    "lib_id": m["library_id"],
-                    "name": m["name"],
-                    "is_active": bool(m.get("is_active")),
-                    "schedule": list(m.get("schedule_days") or []),
-                    "plan_item_id": m.get("plan_item_id"),
-                }
-            )
+        medications = [
+            _build_plan_row(core_choices.PlanItemCategory.MEDICATION, med)
+            for med in cycle_plan.get("medications", [])
+            if med.get("is_active")
+        ]
+        # 复查 / 问卷 / 一般监测计划：展示所有启用中的库条目，与当前疗程下的计划状态融合
+        checkups = [
+            _build_plan_row(core_choices.PlanItemCategory.CHECKUP, chk)
+            for chk in cycle_plan.get("checkups", [])
+        ]
+        questionnaires = [
+            _build_plan_row(core_choices.PlanItemCategory.QUESTIONNAIRE, q)
+            for q in cycle_plan.get("questionnaires", [])
+        ]
+        monitorings = [
+            _build_plan_row(core_choices.PlanItemCategory.MONITORING, m)
+            for m in cycle_plan.get("monitorings", [])
+        ]
 
         # 选出当前“活动”的问卷计划，用于渲染问卷内容：
         # 优先选 is_active 且已存在 PlanItem 的条目；否则选任意有 PlanItem 的条目；
@@ -1484,24 +1486,14 @@ def patient_cycle_plan_toggle(request: HttpRequest, patient_id: int, cycle_id: i
     # 打开或修正状态时，仅返回该药品对应的单行 HTML，替换当前行，减少滚动跳动。
     medications: list[dict] = []
     if not errors:
-        cycle_plan = PlanItemService.get_cycle_plan_view(cycle.id)
+        cycle_plan = PlanItemService.get_cached_cycle_plan_view(cycle)
         for med in cycle_plan.get("medications", []):
             if med.get("library_id") != library_id:
                 continue
             if not med.get("is_active"):
                 # 已处于未启用状态，则无行可展示
                 return HttpResponse("")
-            medications.append(
-                {
-                    "lib_id": med["library_id"],
-                    "name": med["name"],
-                    "type": med.get("type", ""),
-                    "default_dosage": med.get("current_dosage") or med.get("default_dosage") or "",
-                    "default_frequency": med.get("current_usage") or med.get("default_frequency") or "",
-                    "schedule": list(med.get("schedule_days") or []),
-                    "plan_item_id": med.get("plan_item_id"),
-                }
-            )
+            medications.append(_build_plan_row(core_choices.PlanItemCategory.MEDICATION, med))
             break
 
     if errors or not medications:
@@ -1818,6 +1810,7 @@ def patient_plan_item_toggle_day(
     """
     切换某个计划条目在指定 DayIndex 下的勾选状态。
     - 不依赖前端传入的 checked 状态，而是根据当前 schedule_days 自动取反，保证幂等。
+    - 成功时仅返回该条目所在的单行 HTML；失败返回 400 并触发 plan-error 事件。
     """
     patients_qs = _get_workspace_patients(request.user, query=None)
     patient = patients_qs.filter(pk=patient_id).first()
@@ -1838,26 +1831,31 @@ def patient_plan_item_toggle_day(
     try:
         PlanItemService.toggle_schedule_day(plan_item_id, day, not currently_checked, request.user)
     except ValidationError as exc:
-        errors = [str(exc)]
-    else:
-        errors = []
+        # 前端勾选控件收到错误响应后会自动回滚勾选状态
+        message = "\n".join(exc.messages)
+        response = HttpResponse(message, status=400)
+        # 非 ASCII 字符须转义：Django 会把非 latin-1 的响应头编码成 MIME 形式，htmx 无法解析
+        response["HX-Trigger"] = json.dumps({"plan-error": {"message": message}}, ensure_ascii=True)
+        return response
 
-    context: dict = {
+    # 仅重新渲染被修改的这一行（hx-target="closest tr"），无需重建整个设置页
+    cycle = plan.cycle
+    template_name, row_key, plan_view_key = _PLAN_ROW_TEMPLATES[plan.category]
+    cycle_plan = PlanItemService.get_cached_cycle_plan_view(cycle)
+    target_row: dict | None = None
+    for item in cycle_plan.get(plan_view_key, []):
+        if item.get("plan_item_id") == plan.id:
+            target_row = _build_plan_row(plan.category, item)
+            break
+    if target_row is None:
+        return HttpResponse("", status=204)
+
+    delta_days = (date.today() - cycle.start_date).days + 1
+    row_ctx = {
         "patient": patient,
-        "active_tab": "settings",
-        "cycle_form_errors": errors,
-        "cycle_form_initial": _empty_cycle_form_initial(),
+        "cycle": cycle,
+        row_key: target_row,
+        "current_day": max(delta_days, 1),
+        "is_cycle_editable": _resolve_cycle_runtime_state(cycle) in ("in_progress", "not_started"),
     }
-    context.update(
-        _build_settings_context(
-            patient,
-            tc_page=request.GET.get("tc_page"),
-            selected_cycle_id=plan.cycle_id,
-        )
-    )
-
-    return render(
-        request,
-        "web_doctor/partials/settings/main.html",
-        context,
-    )
+    return render(request, template_name, row_ctx)
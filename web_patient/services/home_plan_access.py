@@ -40,15 +40,28 @@ class HomePlanAccess:
         )
 
 
+def _has_active_cycle(patient, as_of_date: date | None) -> bool:
+    target_date = as_of_date or timezone.localdate()
+    return TreatmentCycle.objects.filter(
+        patient=patient,
+        status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
+        start_date__lte=target_date,
+    ).filter(Q(end_date__isnull=True) | Q(end_date__gte=target_date)).exists()
+
+
 def resolve_home_plan_access(
     patient,
     as_of_date: date | None = None,
+    *,
+    has_active_cycle: bool | None = None,
 ) -> HomePlanAccess:
     """Resolve patient-home daily-plan capabilities.
 
     Args:
         patient: The patient profile whose membership and treatment cycle are checked.
         as_of_date: The date used to evaluate an active cycle; defaults to local today.
+        has_active_cycle: Precomputed active-cycle flag (e.g. from the session viewer
+            context); skips the treatment-cycle query when provided.
 
     Returns:
         A ``HomePlanAccess`` describing member, trial, or locked capabilities.
@@ -66,12 +79,8 @@ def resolve_home_plan_access(
             can_view_history=True,
         )
 
-    target_date = as_of_date or timezone.localdate()
-    has_active_cycle = TreatmentCycle.objects.filter(
-        patient=patient,
-        status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
-        start_date__lte=target_date,
-    ).filter(Q(end_date__isnull=True) | Q(end_date__gte=target_date)).exists()
+    if has_active_cycle is None:
+        has_active_cycle = _has_active_cycle(patient, as_of_date)
     if has_active_cycle:
         return HomePlanAccess(
             mode="trial",
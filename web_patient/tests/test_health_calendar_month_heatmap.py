@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import DailyTask, TreatmentCycle
+from core.models import choices as core_choices
+from health_data.models import HealthMetric, MetricType
+from market.models import Order, Product
+from users import choices as user_choices
+from users.models import CustomUser, PatientProfile
+
+
+class HealthCalendarMonthHeatmapTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="calendar_heatmap_user",
+            password="password",
+            user_type=user_choices.UserType.PATIENT,
+            wx_openid="openid_calendar_heatmap_user",
+        )
+        self.patient = PatientProfile.objects.create(
+            user=self.user,
+            name="热力图患者",
+            phone="13800000031",
+        )
+        product = Product.objects.create(
+            name="VIP 服务包", price=Decimal("199.00"), duration_days=30, is_active=True
+        )
+        Order.objects.create(
+            patient=self.patient,
+            product=product,
+            amount=Decimal("199.00"),
+            status=Order.Status.PAID,
+            paid_at=timezone.now(),
+        )
+        self.client.force_login(self.user)
+        self.url = reverse("web_patient:health_calendar_month")
+
+        # 固定在上个月取三天，避免受“今天之后不统计”的截断影响。
+        self.month_start = (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+        self.day1 = self.month_start
+        self.day2 = self.month_start + timedelta(days=1)
+        self.day3 = self.month_start + timedelta(days=2)
+        TreatmentCycle.objects.create(
+            patient=self.patient,
+            name="热力图疗程",
+            start_date=self.day1,
+            end_date=self.day3,
+            status=core_choices.TreatmentCycleStatus.IN_PROGRESS,
+        )
+        for day, medication_status in (
+            (self.day1, core_choices.TaskStatus.COMPLETED),
+            (self.day2, core_choices.TaskStatus.TERMINATED),
+            (self.day3, core_choices.TaskStatus.TERMINATED),
+        ):
+            DailyTask.objects.create(
+                patient=self.patient,
+                task_date=day,
+                task_type=core_choices.PlanItemCategory.MEDICATION,
+                title="用药提醒",
+                status=medication_status,
+            )
+            DailyTask.objects.create(
+                patient=self.patient,
+                task_date=day,
+                task_type=core_choices.PlanItemCategory.MONITORING,
+                title="体温",
+                status=core_choices.TaskStatus.TERMINATED,
+            )
+        # 第一天、第二天已录入体温：已有记录即视为完成，与单日视图一致。
+        for day in (self.day1, self.day2):
+            HealthMetric.objects.create(
+                patient=self.patient,
+                metric_type=MetricType.BODY_TEMPERATURE,
+                value_main=Decimal("36.6"),
+                measured_at=timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=9),
+                source="manual",
+            )
+
+    def test_month_heatmap_levels(self):
+        response = self.client.get(self.url, {"month": self.month_start.strftime("%Y-%m")})
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["month"], self.month_start.strftime("%Y-%m"))
+        self.assertEqual(
+            payload["days"],
+            {
+                self.day1.isoformat(): {"level": "completed", "completed": 2, "total": 2},
+                self.day2.isoformat(): {"level": "partial", "completed": 1, "total": 2},
+                self.day3.isoformat(): {"level": "pending", "completed": 0, "total": 2},
+            },
+        )
+
+    def test_month_heatmap_matches_single_day_view(self):
+        response = self.client.get(
+            reverse("web_patient:health_calendar"),
+            {"date": self.day2.isoformat(), "ajax": 1},
+        )
+        plans = response.context["daily_plans"]
+        self.assertEqual(
+            sorted(plan["status"] for plan in plans),
+            ["completed", "pending"],
+        )
+
+    def test_future_month_returns_no_days(self):
+        next_month = (timezone.localdate().replace(day=28) + timedelta(days=5)).strftime("%Y-%m")
+        response = self.client.get(self.url, {"month": next_month})
+        self.assertEqual(response.json()["days"], {})
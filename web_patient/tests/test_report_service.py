@@ -1,4 +1,5 @@
 from datetime import date, datetime, timedelta
+from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
@@ -15,6 +16,7 @@ from health_data.models import (
     UploadSource,
     UploaderRole,
 )
+from health_data.services.archive_jobs import run_archive_job
 from health_data.services.report_service import (
     ReportArchiveService,
     ReportUploadService,
@@ -509,7 +511,8 @@ class ReportServiceTest(TestCase):
         event = ClinicalEvent.objects.get(id=images[0].clinical_event_id)
         self.assertEqual(event.archiver_name, self.doctor_profile.name)
 
-    def test_archive_images_creates_checkup_metric_and_matches_task(self):
+    @patch("health_data.tasks.process_archive_job_task.delay", side_effect=run_archive_job)
+    def test_archive_images_creates_checkup_metric_and_matches_task(self, _mock_delay):
         upload = self._create_upload(images=["https://example.com/a.png"])
         image = upload.images.first()
         report_date = timezone.localdate()
@@ -529,7 +532,8 @@ class ReportServiceTest(TestCase):
                 "checkup_item_id": self.checkup_item.id,
             }
         ]
-        updated = ReportArchiveService.archive_images(self.doctor_profile, updates)
+        with self.captureOnCommitCallbacks(execute=True):
+            updated = ReportArchiveService.archive_images(self.doctor_profile, updates)
         self.assertEqual(updated, 1)
 
         metric = HealthMetric.objects.filter(
@@ -607,20 +611,22 @@ class ReportServiceTest(TestCase):
                 ],
             )
 
-    def test_create_record_with_images(self):
-        event = ReportArchiveService.create_record_with_images(
-            patient=self.patient,
-            created_by_doctor=self.doctor_profile,
-            event_type=ReportImage.RecordType.CHECKUP,
-            event_date=date(2025, 3, 1),
-            images=[
-                {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
-                {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
-            ],
-            hospital_name="医院A",
-            department_name="肿瘤科",
-            interpretation="备注",
-        )
+    @patch("health_data.tasks.process_archive_job_task.delay", side_effect=run_archive_job)
+    def test_create_record_with_images(self, _mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = ReportArchiveService.create_record_with_images(
+                patient=self.patient,
+                created_by_doctor=self.doctor_profile,
+                event_type=ReportImage.RecordType.CHECKUP,
+                event_date=date(2025, 3, 1),
+                images=[
+                    {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
+                    {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
+                ],
+                hospital_name="医院A",
+                department_name="肿瘤科",
+                interpretation="备注",
+            )
         self.assertEqual(event.patient, self.patient)
         self.assertEqual(event.hospital_name, "医院A")
         self.assertEqual(event.interpretation, "备注")
@@ -638,7 +644,8 @@ class ReportServiceTest(TestCase):
         self.assertIsNone(metric.task_id)
         self.assertTrue(images.filter(health_metric=metric).exists())
 
-    def test_create_record_with_images_matches_task(self):
+    @patch("health_data.tasks.process_archive_job_task.delay", side_effect=run_archive_job)
+    def test_create_record_with_images_matches_task(self, _mock_delay):
         report_date = timezone.localdate()
         task = DailyTask.objects.create(
             patient=self.patient,
@@ -648,16 +655,17 @@ class ReportServiceTest(TestCase):
             status=TaskStatus.PENDING,
             interaction_payload={"checkup_id": self.checkup_item.id},
         )
-        event = ReportArchiveService.create_record_with_images(
-            patient=self.patient,
-            created_by_doctor=self.doctor_profile,
-            event_type=ReportImage.RecordType.CHECKUP,
-            event_date=report_date,
-            images=[
-                {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
-                {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
-            ],
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            event = ReportArchiveService.create_record_with_images(
+                patient=self.patient,
+                created_by_doctor=self.doctor_profile,
+                event_type=ReportImage.RecordType.CHECKUP,
+                event_date=report_date,
+                images=[
+                    {"image_url": "https://example.com/a.png", "checkup_item_id": self.checkup_item.id},
+                    {"image_url": "https://example.com/b.png", "checkup_item_id": self.checkup_item.id},
+                ],
+            )
         images = ReportImage.objects.filter(clinical_event=event)
         metric = HealthMetric.objects.filter(
             patient=self.patient, metric_type=MetricType.CHECKUP
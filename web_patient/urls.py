@@ -10,6 +10,7 @@ urlpatterns = [
     path("dashboard/", views.patient_dashboard, name="patient_dashboard"),
     path("reminder/settings/", views.reminder_settings, name="reminder_settings"),
     path("health_calendar/", views.health_calendar, name="health_calendar"),
+    path("health_calendar/month/", views.health_calendar_month, name="health_calendar_month"),
     path("home/", views.patient_home, name="patient_home"),
     path("plan/", views.management_plan, name="management_plan"),
     path("medication/", views.my_medication, name="my_medication"),
@@ -39,7 +39,7 @@ from .api import delete_health_metric, update_health_metric, submit_medication
 from .chat import consultation_chat
 from .my_followup import my_followup
 from .my_examination import my_examination
-from .health_calendar import health_calendar
+from .health_calendar import health_calendar, health_calendar_month
 
 __all__ = [
     "bind_landing",
@@ -85,6 +85,7 @@ __all__ = [
     "my_followup",
     "my_examination",
     "health_calendar",
+    "health_calendar_month",
     "query_last_metric",
     "membership_status",
     "delete_report_image",
@@ -1,12 +1,13 @@
-from datetime import datetime
+import calendar
+from datetime import date, datetime
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
 from django.utils import timezone
 
 from core.models import choices as core_choices
-from core.service.tasks import get_daily_plan_summary
+from core.service.tasks import get_daily_plan_summary, get_plan_summaries_for_range
 from core.service.treatment_cycle import get_active_treatment_cycle
 from health_data.models import MetricType
 from health_data.services.health_metric import HealthMetricService
@@ -49,8 +50,8 @@ NEW_GENERAL_MONITORING_TYPES = {
 }
 
 
-def _query_calendar_metrics(patient_id, target_date, summary_list):
-    """按计划涉及的指标类型查询指定日期最后一条有效记录。"""
+def _collect_calendar_metric_types(summary_list):
+    """返回计划摘要涉及、需要回显数值的指标类型集合。"""
     metric_types_to_query = set()
     for item in summary_list:
         task_type = item.get("task_type")
@@ -77,16 +78,19 @@ def _query_calendar_metrics(patient_id, target_date, summary_list):
             )
         else:
             metric_types_to_query.add(definition.metric_type)
+    return metric_types_to_query
 
-    daily_metrics = {}
-    for metric_type in sorted(metric_types_to_query):
-        metric_result = HealthMetricService.query_last_metric_for_date(
-            patient_id=patient_id,
-            target_date=target_date,
-            metric_type=metric_type,
-        )
-        daily_metrics[metric_type] = metric_result.get(metric_type)
-    return daily_metrics
+
+def _query_calendar_metrics(patient_id, target_date, summary_list):
+    """按计划涉及的指标类型查询指定日期最后一条有效记录（单次查询）。"""
+    metric_types = _collect_calendar_metric_types(summary_list)
+    metrics_by_date = HealthMetricService.query_last_metrics_for_range(
+        patient_id,
+        target_date,
+        target_date,
+        sorted(metric_types),
+    )
+    return metrics_by_date.get(target_date, {})
 
 
 def _format_calendar_metric_value(plan_type, definition, daily_metrics):
@@ -133,50 +137,11 @@ def _build_calendar_task_urls():
     return task_urls
 
 
-@auto_wechat_login
-@check_patient
-def health_calendar(request: HttpRequest) -> HttpResponse:
+def _build_calendar_daily_plans(summary_list, daily_metrics, cached_plans):
     """
-    【页面说明】患者端健康日历 `/p/health_calendar/`
+    将某天的计划摘要转换为日历卡片列表；已有指标记录或会话内已提交的计划提升为完成。
+    单日视图与月度热力图共用，保证两处的完成判定一致。
     """
-    patient = request.patient
-
-    # 1. 获取日期参数，默认为今天
-    date_str = request.GET.get("date")
-    if date_str:
-        try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            target_date = timezone.localdate()
-    else:
-        target_date = timezone.localdate()
-
-    active_cycle = get_active_treatment_cycle(patient)
-    action_enabled = False
-    if active_cycle:
-        cycle_end = active_cycle.end_date
-        if cycle_end is None:
-            action_enabled = target_date >= active_cycle.start_date
-        else:
-            action_enabled = active_cycle.start_date <= target_date <= cycle_end
-
-    # 2. 获取该日期的计划摘要
-    summary_list = []
-    # 只有当目标日期不晚于今天时，才查询计划
-    if target_date <= timezone.localdate():
-        summary_list = get_daily_plan_summary(patient, task_date=target_date)
-
-    # 3. 获取该日期的具体指标数据（用于回显数值）
-    daily_metrics = _query_calendar_metrics(
-        patient.id,
-        target_date,
-        summary_list,
-    )
-
-    metric_plan_cache = request.session.get("metric_plan_cache") or {}
-    cached_plans = metric_plan_cache.get(target_date.strftime("%Y-%m-%d")) or {}
-
-    # 4. 构建视图数据
     daily_plans = []
     for item in summary_list:
         title_val = item.get("title") or ""
@@ -332,6 +297,54 @@ def health_calendar(request: HttpRequest) -> HttpResponse:
     daily_plans.sort(
         key=lambda item: CALENDAR_PLAN_SORT_ORDER.get(item.get("type"), 999)
     )
+    return daily_plans
+
+
+@auto_wechat_login
+@check_patient
+def health_calendar(request: HttpRequest) -> HttpResponse:
+    """
+    【页面说明】患者端健康日历 `/p/health_calendar/`
+    """
+    patient = request.patient
+
+    # 1. 获取日期参数，默认为今天
+    date_str = request.GET.get("date")
+    if date_str:
+        try:
+            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            target_date = timezone.localdate()
+    else:
+        target_date = timezone.localdate()
+
+    active_cycle = get_active_treatment_cycle(patient)
+    action_enabled = False
+    if active_cycle:
+        cycle_end = active_cycle.end_date
+        if cycle_end is None:
+            action_enabled = target_date >= active_cycle.start_date
+        else:
+            action_enabled = active_cycle.start_date <= target_date <= cycle_end
+
+    # 2. 获取该日期的计划摘要
+    summary_list = []
+    # 只有当目标日期不晚于今天时，才查询计划
+    if target_date <= timezone.localdate():
+        summary_list = get_daily_plan_summary(patient, task_date=target_date)
+
+    # 3. 获取该日期的具体指标数据（用于回显数值）
+    daily_metrics = _query_calendar_metrics(
+        patient.id,
+        target_date,
+        summary_list,
+    )
+
+    metric_plan_cache = request.session.get("metric_plan_cache") or {}
+    cached_plans = metric_plan_cache.get(target_date.strftime("%Y-%m-%d")) or {}
+
+    # 4. 构建视图数据
+    daily_plans = _build_calendar_daily_plans(summary_list, daily_metrics, cached_plans)
 
     # URL 映射 (用于跳转)
     task_url_mapping = _build_calendar_task_urls()
@@ -353,3 +366,74 @@ def health_calendar(request: HttpRequest) -> HttpResponse:
         return render(request, "web_patient/partials/_daily_plan_list.html", context)
 
     return render(request, "web_patient/health_calendar.html", context)
+
+
+def _resolve_heatmap_level(daily_plans):
+    """completed：全部完成；partial：部分完成；pending：均未完成。"""
+    completed = sum(1 for plan in daily_plans if plan["status"] == "completed")
+    if completed == len(daily_plans):
+        return "completed"
+    return "partial" if completed else "pending"
+
+
+@auto_wechat_login
+@check_patient
+def health_calendar_month(request: HttpRequest) -> JsonResponse:
+    """
+    【接口说明】健康日历月度完成热力图 `/p/health_calendar/month/?month=YYYY-MM`
+
+    - 一次请求返回整月（截至今天）每天的计划完成情况，
+      计划与指标各只查询一次（get_plan_summaries_for_range / query_last_metrics_for_range）。
+    - 完成判定与单日视图相同（_build_calendar_daily_plans）。
+
+    【返回值说明】
+    - {"success": True, "month": "2025-01",
+       "days": {"2025-01-03": {"level": "partial", "completed": 1, "total": 3}}}
+      无计划的日期不返回。
+    """
+    patient = request.patient
+    today = timezone.localdate()
+    try:
+        month_start = datetime.strptime(request.GET.get("month") or "", "%Y-%m").date()
+    except ValueError:
+        month_start = today.replace(day=1)
+    month_end = date(
+        month_start.year,
+        month_start.month,
+        calendar.monthrange(month_start.year, month_start.month)[1],
+    )
+    range_end = min(month_end, today)
+
+    days = {}
+    if month_start <= range_end:
+        summaries = get_plan_summaries_for_range(patient, month_start, range_end)
+        metric_types = set()
+        for summary_list in summaries.values():
+            metric_types.update(_collect_calendar_metric_types(summary_list))
+        metrics_by_date = HealthMetricService.query_last_metrics_for_range(
+            patient.id,
+            month_start,
+            range_end,
+            sorted(metric_types),
+        )
+        metric_plan_cache = request.session.get("metric_plan_cache") or {}
+        for day, summary_list in summaries.items():
+            if not summary_list:
+                continue
+            day_key = day.strftime("%Y-%m-%d")
+            daily_plans = _build_calendar_daily_plans(
+                summary_list,
+                metrics_by_date.get(day, {}),
+                metric_plan_cache.get(day_key) or {},
+            )
+            if not daily_plans:
+                continue
+            days[day_key] = {
+                "level": _resolve_heatmap_level(daily_plans),
+                "completed": sum(1 for plan in daily_plans if plan["status"] == "completed"),
+                "total": len(daily_plans),
+            }
+
+    return JsonResponse(
+        {"success": True, "month": month_start.strftime("%Y-%m"), "days": days}
+    )
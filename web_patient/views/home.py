@@ -1,8 +1,6 @@
 import logging
-import time
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-from django.core.cache import cache
 from django.http import HttpRequest, HttpResponse
 from django.middleware.csrf import get_token
 from django.shortcuts import redirect, render
@@ -11,6 +9,7 @@ from django.utils import timezone
 from django.views.decorators.cache import never_cache
 
 from core.models import choices as core_choices
+from core.service.cache_fetch import fetch_cached
 from core.service.tasks import get_daily_plan_summary
 from health_data.models import MetricType
 from health_data.services.health_metric import HealthMetricService
@@ -25,6 +24,7 @@ from web_patient.services.home_cache import (
     get_patient_home_unread_cache_key,
 )
 from web_patient.services.home_plan_access import resolve_home_plan_access
+from users.services.viewer_context import viewer_context_for
 from users.services.patient import PatientService
 from wx.services.oauth import generate_menu_auth_url
 
@@ -156,22 +156,17 @@ def _cache_key(namespace: str, patient_id: int, date_key: str, user_id: int = No
 
 
 def _fetch_with_cache(cache_key: str, bypass_cache: bool, fetcher, perf_log: dict, perf_key: str):
-    if not bypass_cache:
-        cached_payload = cache.get(cache_key)
-        if isinstance(cached_payload, dict) and "value" in cached_payload:
-            perf_log[f"{perf_key}_cache"] = "hit"
-            perf_log[f"{perf_key}_ms"] = 0.0
-            return cached_payload["value"]
-
-    start_at = time.perf_counter()
-    value = fetcher()
-    duration_ms = round((time.perf_counter() - start_at) * 1000, 2)
-
-    perf_log[f"{perf_key}_cache"] = "bypass" if bypass_cache else "miss"
-    perf_log[f"{perf_key}_ms"] = duration_ms
-
-    cache.set(cache_key, {"value": value}, HOME_CACHE_TTL_SECONDS)
-    return value
+    # 早间提醒推送时同一患者的并发请求只回源一次，其余请求等待或返回旧值。
+    result = fetch_cached(
+        cache_key,
+        fetcher,
+        HOME_CACHE_TTL_SECONDS,
+        namespace=f"web_patient.home.{perf_key}",
+        bypass=bypass_cache,
+    )
+    perf_log[f"{perf_key}_cache"] = result.status
+    perf_log[f"{perf_key}_ms"] = round(result.compute_ms, 2)
+    return result.value
 
 
 def _build_daily_plans(summary_list):
@@ -384,7 +379,11 @@ def patient_home(request: HttpRequest) -> HttpResponse:
         return redirect(onboarding_url)
 
     is_family = patient.user_id != request.user.id
-    home_plan_access = resolve_home_plan_access(patient)
+    viewer_context = viewer_context_for(request, patient)
+    home_plan_access = resolve_home_plan_access(
+        patient,
+        has_active_cycle=viewer_context.has_active_cycle if viewer_context else None,
+    )
     is_member = home_plan_access.mode == "member"
 
     patient_id = patient.id or None
@@ -57,8 +57,9 @@ def my_examination(request: HttpRequest) -> HttpResponse:
         first_img = images.first()
         report_date = first_img.report_date if first_img and first_img.report_date else upload.created_at.date()
         
-        # 提取所有图片 URL
+        # 提取所有图片 URL；宫格用衍生版本 srcset，点击预览仍取原图
         preview_images = [img.image_url for img in images]
+        image_sources = [(img.image_url, img.srcset) for img in images]
         
         if report_date != current_date:
             if current_group:
@@ -69,11 +70,13 @@ def my_examination(request: HttpRequest) -> HttpResponse:
                 "date": current_date,
                 "reports": [], # 保留结构兼容
                 "images": [], 
+                "image_sources": [],
                 "ids": [] 
             }
         
         # 将图片添加到当前日期组
         current_group["images"].extend(preview_images)
+        current_group["image_sources"].extend(image_sources)
         # 记录 ReportUpload ID 用于删除
         current_group["ids"].append(upload.id)
         
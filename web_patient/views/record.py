@@ -31,11 +31,12 @@ from health_data.models import (
 from core.models import QuestionnaireCode, DailyTask, Questionnaire
 from core.models.choices import PlanItemCategory, TaskStatus
 from patient_alerts.services.todo_list import TodoListService
-from core.service.tasks import get_daily_plan_summary
+from core.service.tasks import get_daily_plan_summary, invalidate_adherence_cache
 from core.service.checkup import get_active_checkup_library
 from market.service.order import get_paid_orders_for_patient
 from web_patient.services.home_cache import invalidate_patient_home_plan_cache
 from web_patient.services.home_plan_access import resolve_home_plan_access
+from users.services.viewer_context import viewer_context_for
 from web_patient.forms import BloodPressureHeartRateForm, GeneralMonitoringMetricForm
 from wx.services.oauth import generate_menu_auth_url
 import calendar
@@ -144,7 +145,11 @@ def query_last_metric(request: HttpRequest) -> JsonResponse:
     if not patient:
         return JsonResponse({"error": "No patient info"}, status=400)
 
-    home_plan_access = resolve_home_plan_access(patient)
+    viewer_context = viewer_context_for(request, patient)
+    home_plan_access = resolve_home_plan_access(
+        patient,
+        has_active_cycle=viewer_context.has_active_cycle if viewer_context else None,
+    )
     if not home_plan_access.can_view_daily_plan:
         return JsonResponse({"success": True, "plans": {}})
 
@@ -1331,6 +1336,9 @@ def record_checkup(request: HttpRequest) -> HttpResponse:
                         task.completed_at = now_ts
                         task.interaction_payload = payload
                         task.save(update_fields=["status", "completed_at", "interaction_payload"])
+                    transaction.on_commit(
+                        lambda patient_id=patient.id: invalidate_adherence_cache(patient_id)
+                    )
                 
                 try:
                     date_key = today.strftime("%Y-%m-%d")
@@ -1374,6 +1382,7 @@ def record_checkup(request: HttpRequest) -> HttpResponse:
                 uploaded_images.append({
                     "id": img.id,
                     "url": img.image_url,
+                    "srcset": img.srcset,
                     "date": img.report_date.strftime("%Y-%m-%d") if img.report_date else ""
                 })
         else:
@@ -1389,6 +1398,7 @@ def record_checkup(request: HttpRequest) -> HttpResponse:
                     uploaded_images.append({
                         "id": img.id,
                         "url": img.image_url,
+                        "srcset": img.srcset,
                         "date": img.report_date.strftime("%Y-%m-%d") if img.report_date else ""
                     })
 
@@ -1850,18 +1860,23 @@ def _load_review_image_groups_batch(
         if date_list:
             images_qs = (
                 base_qs.filter(report_date__in=date_list)
-                .values("report_date", "image_url")
+                .values("report_date", "image_url", "renditions")
                 .order_by("-report_date", "-id")
             )
             images_by_date = {report_date: [] for report_date in date_list}
+            thumbnails_by_date = {report_date: [] for report_date in date_list}
             for row in images_qs:
                 images_by_date.setdefault(row["report_date"], []).append(row["image_url"])
+                thumbnails_by_date.setdefault(row["report_date"], []).append(
+                    ReportImage.thumbnail_url_for(row["image_url"], row["renditions"])
+                )
 
             for report_date in date_list:
                 groups.append(
                     {
                         "report_date": report_date.strftime("%Y-%m-%d"),
                         "image_urls": images_by_date.get(report_date, []),
+                        "thumbnail_urls": thumbnails_by_date.get(report_date, []),
                     }
                 )
 
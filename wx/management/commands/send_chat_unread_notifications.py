@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from django.core.management.base import BaseCommand
 
+from core.service.job_ledger import track_job_run
 from wx.services.chat_notifications import send_chat_unread_notifications
 
 
@@ -24,11 +25,14 @@ class Command(BaseCommand):
             help="Maximum messages to scan per run (default: 200).",
         )
 
+    @track_job_run()
     def handle(self, *args, **options) -> None:
         delay_seconds = options.get("delay_seconds", 30)
         limit = options.get("limit", 200)
-        sent = send_chat_unread_notifications(
-            delay_seconds=delay_seconds,
-            limit=limit,
-        )
+        with self.job_run.phase("send_notifications"):
+            sent = send_chat_unread_notifications(
+                delay_seconds=delay_seconds,
+                limit=limit,
+            )
+        self.job_run.add_rows("notifications_sent", sent)
         self.stdout.write(self.style.SUCCESS(f"Sent {sent} unread chat notification(s)."))